@@ -0,0 +1,67 @@
+"""
+Building health scaling over AnalyticsPool worker processes.
+
+Builds the same synthetic station as benchmarks.building_health in a
+temporary SQLite file, then runs AnalyticsPool.building_health() with 1..N
+workers (each opening the file read-only) and checks every run returns
+the single-process result.
+
+    python -m benchmarks.analytics_pool
+    python -m benchmarks.analytics_pool --zones 800 --max-workers 8
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from src.analytics.analytics_pool import AnalyticsPool
+from src.analytics.zone_health import zone_health_to_dict
+from src.config import AnalyticsConfig
+from src.store import sqlite_store
+
+from .building_health import COMFORT, build_station
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--zones", type=int, default=400)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    end = datetime.now(timezone.utc).replace(tzinfo=None)
+    start = end - timedelta(hours=args.hours)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.sqlite")
+        sqlite_store.init(db_path, retention_hours=0)
+        zones = build_station(args.zones, args.hours, end)
+        print(f"{len(zones)} zones, {args.hours} h window, {os.cpu_count()} CPUs")
+
+        baseline = None
+        base_s = 0.0
+        for workers in range(1, args.max_workers + 1):
+            pool = AnalyticsPool(db_path, AnalyticsConfig(workers=workers, min_zones_per_worker=1))
+            pool.start()
+            try:
+                best = float("inf")
+                for _ in range(args.repeat):
+                    t0 = time.perf_counter()
+                    result = [zone_health_to_dict(m) for m in pool.building_health("S", zones, COMFORT, start, end)]
+                    best = min(best, time.perf_counter() - t0)
+            finally:
+                pool.shutdown()
+
+            if baseline is None:
+                baseline, base_s = result, best
+            same = "identical" if result == baseline else "DIFFERENT"
+            print(f"workers={workers:<2} {best:7.2f} s  x{base_s / best:4.2f}  {same}")
+
+
+if __name__ == "__main__":
+    main()
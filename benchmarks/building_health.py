@@ -0,0 +1,128 @@
+"""
+Station-wide zone health: compute_building_health() vs. compute_zone_health()
+per zone (what /summary/building_health used to do).
+
+Fills a temporary SQLite store with a synthetic station (jittered 1-minute
+samples, some zones missing roles or setpoints, some drifting out of band),
+runs both paths over the same window and checks every zone_health_to_dict()
+field is identical.
+
+    python -m benchmarks.building_health
+    python -m benchmarks.building_health --zones 400 --hours 24
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from src.analytics.building_health import compute_building_health
+from src.analytics.zone_health import compute_zone_health, zone_health_to_dict
+from src.config import ComfortConfig
+from src.store import sqlite_store
+
+_ROLES = ("space_temp", "space_temp_sp", "flow", "flow_sp", "damper", "reheat")
+
+COMFORT = ComfortConfig(
+    occupied_start="07:00",
+    occupied_end="18:00",
+    setpoint_column="sp",
+    temp_column="temp",
+    timestamp_column="timestamp",
+    equip_column="equip",
+    comfort_band_degF=1.5,
+)
+
+
+def build_station(zones: int, hours: int, end: datetime, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    rnd = random.Random(seed)
+    start = end - timedelta(hours=hours)
+    infos: Dict[str, Dict[str, Any]] = {}
+    rows = []
+    for z in range(zones):
+        root = f"vav{z:04d}"
+        info: Dict[str, Any] = {}
+        offset = rnd.uniform(-4, 4)
+        leak = rnd.random() < 0.2
+        for role in _ROLES:
+            if rnd.random() < 0.1:
+                continue  # role not wired on this zone
+            hid = f"/S/{root}_{role}"
+            info[role] = hid
+            step = 60 if role != "flow_sp" else rnd.choice([60, 300])
+            ts = start + timedelta(seconds=rnd.uniform(0, step))
+            while ts < end:
+                minute = (ts - start).total_seconds() / 60.0
+                if role == "space_temp":
+                    v = 72 + offset + math.sin(minute / 90) + rnd.gauss(0, 0.5)
+                elif role == "space_temp_sp":
+                    v = 72.0
+                elif role == "flow":
+                    v = max(0.0, 400 + 150 * math.sin(minute / 60) + rnd.gauss(0, 40))
+                elif role == "flow_sp":
+                    v = 400 + 150 * math.sin(minute / 60)
+                elif role == "damper":
+                    v = 95.0 if leak else min(100.0, max(0.0, 50 + 40 * math.sin(minute / 60)))
+                else:
+                    v = max(0.0, 30 * math.sin(minute / 120))
+                rows.append(("S", hid, ts.isoformat(), float(round(v, 2)), "ok"))
+                # Duplicate and near-tie timestamps now and then
+                jitter = 0 if rnd.random() < 0.02 else rnd.uniform(-5, 5)
+                ts += timedelta(seconds=step + jitter)
+        infos[root] = info
+    sqlite_store.bulk_load([rows])
+    return infos
+
+
+def _same(a: Any, b: Any) -> bool:
+    if isinstance(a, float) and isinstance(b, float):
+        return a == b or (math.isnan(a) and math.isnan(b))
+    return a == b
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--zones", type=int, default=400)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    end = datetime.now(timezone.utc).replace(tzinfo=None)
+    start = end - timedelta(hours=args.hours)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_store.init(os.path.join(tmp, "bench.sqlite"), retention_hours=0)
+        zones = build_station(args.zones, args.hours, end, args.seed)
+
+        t0 = time.perf_counter()
+        per_zone = [
+            zone_health_to_dict(compute_zone_health("S", root, info, COMFORT, start, end))
+            for root, info in zones.items()
+        ]
+        per_zone_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        batch = [zone_health_to_dict(m) for m in compute_building_health("S", zones, COMFORT, start, end)]
+        batch_s = time.perf_counter() - t0
+
+    mismatches = 0
+    for a, b in zip(per_zone, batch):
+        bad = [k for k in a if not _same(a[k], b.get(k))]
+        if bad:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  {a['zone_root']}: " + ", ".join(f"{k} {a[k]!r} != {b.get(k)!r}" for k in bad))
+
+    print(f"{len(zones)} zones, {args.hours} h window")
+    print(f"per-zone  {per_zone_s:7.2f} s")
+    print(f"batch     {batch_s:7.2f} s  x{per_zone_s / batch_s:.1f}")
+    print(f"zones with mismatches: {mismatches} of {len(per_zone)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+On/off cycle analytics on 1-second fan / compressor status: the old
+per-sample Python loop vs. cycles.segment_cycles() / cycle_stats().
+
+Generates a fleet of units with random ON/OFF run lengths (some
+short-cycling), checks every unit's short-cycle count and ON% match the
+loop, and reports throughput.
+
+    python -m benchmarks.cycles
+    python -m benchmarks.cycles --units 20 --hours 24
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.analytics.cycles import cycle_stats, segment_cycles, series_on_off
+
+from .kernels import legacy_cycles
+
+
+def build_unit(rng: np.random.Generator, hours: int) -> pd.DataFrame:
+    n = hours * 3600
+    # Alternating runs; short-cycling units switch every few minutes
+    mean_run = rng.choice([120, 900, 2400])
+    runs = rng.exponential(mean_run, n // 30 + 2).astype(np.int64) + 1
+    state = np.repeat(np.arange(len(runs)) % 2 == int(rng.integers(2)), runs)[:n]
+    ts = np.datetime64("2026-01-05T00:00:00", "ns") + np.arange(n).astype("timedelta64[s]")
+    return pd.DataFrame({"timestamp": ts, "value": state.astype(float)})
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=10)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    units = [build_unit(rng, args.hours) for _ in range(args.units)]
+    samples = sum(len(df) for df in units)
+
+    t0 = time.perf_counter()
+    legacy = [legacy_cycles(df) for df in units]
+    legacy_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    stats = [cycle_stats(*series_on_off(df)) for df in units]
+    engine_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    intervals = sum(len(segment_cycles(*series_on_off(df))) for df in units)
+    segment_s = time.perf_counter() - t0
+
+    mismatches = sum(
+        1
+        for a, b in zip(legacy, stats)
+        if (a["short_cycle_count"], a["on_pct"]) != (b.short_cycle_count, b.on_pct)
+    )
+    runtime: Tuple[float, float] = (
+        min(s.runtime_hours for s in stats),
+        max(s.runtime_hours for s in stats),
+    )
+    print(f"{args.units} units x {args.hours} h of 1 s samples ({samples:,} samples, {intervals:,} intervals)")
+    print(f"python loop   {legacy_s:7.3f} s  ({samples / legacy_s:12,.0f} samples/s)")
+    print(f"cycle_stats   {engine_s:7.3f} s  ({samples / engine_s:12,.0f} samples/s)  x{legacy_s / engine_s:.1f}")
+    print(f"segment only  {segment_s:7.3f} s")
+    print(f"runtime hours {runtime[0]:.1f} .. {runtime[1]:.1f}")
+    print(f"mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
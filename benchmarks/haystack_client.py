@@ -0,0 +1,140 @@
+"""
+HaystackHistoryClient read strategies against the local stand-in station.
+
+Starts src/niagara_client/standin_server.py in-process with a fixed
+latency, then times one day of history for every point:
+
+    sequential   his_read per point, cache off
+    fan-out      his_read_many, single-point reads across the thread pool
+    multi        his_read_many with the multi-id hisRead grid
+    cached       the same his_read_many again with the range cache warm
+
+then checks the multi-id fallback: a station that rejects the grid turns
+multi-id reads off for the session, while HTTP 500s only retry the failed
+batch point by point and leave multi-id reads on.
+
+    python -m benchmarks.haystack_client
+    python -m benchmarks.haystack_client --equips 50 --latency-ms 80 --max-inflight 8
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.niagara_client.haystack_client import HaystackConfig, HaystackHistoryClient
+from src.niagara_client.standin_server import StandinConfig, StandinServer
+
+
+def _client(srv: StandinServer, **kwargs: object) -> HaystackHistoryClient:
+    return HaystackHistoryClient(HaystackConfig(uri=srv.uri, username="bench", password="bench", **kwargs))
+
+
+def _timed(name: str, srv: StandinServer, fn: Callable[[], int]) -> None:
+    srv.reset_stats()
+    t0 = time.perf_counter()
+    samples = fn()
+    elapsed = time.perf_counter() - t0
+    requests = sum(srv.stats.requests.values())
+    print(
+        f"{name:<11} {elapsed:7.2f} s  samples={samples:<7} station requests={requests:<5} "
+        f"max in flight={srv.stats.max_inflight_seen}"
+    )
+
+
+def _read_all(
+    client: HaystackHistoryClient, ids: List[str], range_str: str
+) -> Tuple[Dict[str, list], int]:
+    """Samples per id, and the number of per-point errors."""
+    samples: Dict[str, list] = {}
+    errors = 0
+    for r in client.his_read_many(ids, range_str, use_cache=False):
+        samples[r.entity_id] = r.samples
+        errors += r.error is not None
+    return samples, errors
+
+
+def check_fallback(srv: StandinServer, ids: List[str], range_str: str, batch: int) -> int:
+    """Multi-id fallback checks; returns the number of mismatches."""
+    mismatches = 0
+
+    def expect(name: str, ok: bool) -> None:
+        nonlocal mismatches
+        mismatches += not ok
+        print(f"  {'ok  ' if ok else 'FAIL'} {name}")
+
+    reference, _ = _read_all(_client(srv, multi_his_read=False, his_cache_max_samples=0), ids, range_str)
+    batches = -(-len(ids) // batch)
+
+    # Station without the multi-id grid: error grid on the first request
+    srv.cfg.multi_his_read = False
+    client = _client(srv, multi_his_read=True, multi_batch_size=batch)
+    samples, errors = _read_all(client, ids, range_str)
+    expect("unsupported: every point read singly", samples == reference and errors == 0)
+    expect("unsupported: multi-id turned off", client._multi_supported is False)
+    srv.cfg.multi_his_read = True
+
+    # HTTP 500 on every request: batches fail, multi-id stays on
+    srv.cfg.failure_rate, srv.cfg.fail_ops = 1.0, {"hisRead"}
+    client = _client(srv, multi_his_read=True, multi_batch_size=batch)
+    samples, errors = _read_all(client, ids, range_str)
+    expect("5xx: errors reported per point", errors == len(ids))
+    expect("5xx: multi-id still on", client._multi_supported is True)
+    srv.cfg.failure_rate, srv.cfg.fail_ops = 0.0, set()
+
+    srv.reset_stats()
+    samples, errors = _read_all(client, ids, range_str)
+    expect("recovered: same samples as single reads", samples == reference and errors == 0)
+    expect(
+        f"recovered: {batches} multi-id requests",
+        srv.stats.requests.get("hisRead", 0) == batches,
+    )
+    return mismatches
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--equips", type=int, default=10)
+    parser.add_argument("--points-per-equip", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--max-inflight", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--range", default="yesterday")
+    parser.add_argument("--batch", type=int, default=50, help="multi_batch_size")
+    args = parser.parse_args(argv)
+
+    cfg = StandinConfig(
+        equips=args.equips,
+        points_per_equip=args.points_per_equip,
+        latency_ms=args.latency_ms,
+        max_inflight=args.max_inflight,
+    )
+    with StandinServer(cfg) as srv:
+        ids = srv.point_ids()
+        print(f"{len(ids)} points, range={args.range!r}, latency={args.latency_ms:g} ms")
+
+        seq = _client(srv, multi_his_read=False, his_cache_max_samples=0)
+        _timed("sequential", srv, lambda: sum(len(seq.his_read(i, args.range)) for i in ids))
+
+        fan = _client(srv, multi_his_read=False, max_concurrency=args.concurrency)
+
+        def fan_out() -> int:
+            return sum(len(r.samples) for r in fan.his_read_many(ids, args.range))
+
+        _timed("fan-out", srv, fan_out)
+
+        multi = _client(
+            srv, multi_his_read=True, max_concurrency=args.concurrency, multi_batch_size=args.batch
+        )
+        _timed("multi", srv, lambda: sum(len(r.samples) for r in multi.his_read_many(ids, args.range)))
+
+        _timed("cached", srv, fan_out)
+
+        srv.cfg.latency_ms = 0.0
+        print("multi-id fallback:")
+        mismatches = check_fallback(srv, ids, args.range, args.batch)
+        print(f"mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
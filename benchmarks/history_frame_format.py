@@ -0,0 +1,129 @@
+"""
+Row-object vs. columnar historyData frames: payload size and decode cost.
+
+Builds the same synthetic history in both formats (see
+HISTORY_COLUMNS_VERSION in src/niagara_client/mqtt_history_ingest.py) and
+measures raw / gzipped payload bytes, decode_history_payload time, and
+decode + SQLite store time.
+
+    python -m benchmarks.history_frame_format
+    python -m benchmarks.history_frame_format --frames 500 --rows 720
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from src.niagara_client.mqtt_history_ingest import (
+    HISTORY_COLUMNS_VERSION,
+    count_samples,
+    decode_history_payload,
+    store_history_samples,
+)
+from src.store import history_store, sqlite_store
+
+
+_STATUS_NAMES = ["{ok}", "{stale}"]
+
+
+def _frame_header(f: int) -> Dict[str, object]:
+    return {
+        "messageType": "history",
+        "stationName": "BenchStation",
+        "equipment": f"VAV {f // 8:03d}",
+        "point": {
+            "n:displayName": f"Point {f % 8}",
+            "n:history": f"/BenchStation/Vav{f // 8:03d}_P{f % 8}",
+            "m:zone": "Marker",
+        },
+    }
+
+
+def build_payloads(frames: int, rows: int, seed: int = 0) -> Dict[str, List[bytes]]:
+    """Same samples encoded as row-object and columnar frames."""
+    rnd = random.Random(seed)
+    tz = timezone(timedelta(hours=-7))
+    start = datetime.now(tz).replace(microsecond=249_000) - timedelta(minutes=rows)
+
+    row_payloads: List[bytes] = []
+    col_payloads: List[bytes] = []
+    for f in range(frames):
+        stamps = [start + timedelta(seconds=60 * i) for i in range(rows)]
+        values = [round(68 + rnd.random() * 8, 2) for _ in range(rows)]
+        codes = [0 if rnd.random() > 0.01 else 1 for _ in range(rows)]
+
+        row_frame = _frame_header(f)
+        row_frame["historyData"] = [
+            {
+                "timestamp": ts.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3] + ts.strftime("%z"),
+                "value": v,
+                "status": _STATUS_NAMES[c],
+            }
+            for ts, v, c in zip(stamps, values, codes)
+        ]
+        row_payloads.append(json.dumps(row_frame).encode("utf-8"))
+
+        col_frame = _frame_header(f)
+        col_frame["historyData"] = {
+            "version": HISTORY_COLUMNS_VERSION,
+            "ts": [int(ts.timestamp() * 1000) for ts in stamps],
+            "value": values,
+            "status": codes,
+            "statusNames": _STATUS_NAMES,
+        }
+        col_payloads.append(json.dumps(col_frame, separators=(",", ":")).encode("utf-8"))
+
+    return {"rows": row_payloads, "columns": col_payloads}
+
+
+def _timed(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(name: str, payloads: List[bytes], repeat: int) -> None:
+    raw = sum(len(p) for p in payloads)
+    gz = sum(len(gzip.compress(p)) for p in payloads)
+    samples = sum(count_samples(decode_history_payload(p)) for p in payloads)
+
+    def decode_all() -> None:
+        for p in payloads:
+            decode_history_payload(p)
+
+    def decode_and_store() -> None:
+        sqlite_store.init(":memory:", retention_hours=0)
+        history_store.clear()
+        for p in payloads:
+            store_history_samples(decode_history_payload(p))
+
+    decode_s = _timed(decode_all, repeat)
+    store_s = _timed(decode_and_store, repeat)
+    print(
+        f"{name:<8} samples={samples:<8} raw={raw / 1e6:8.2f} MB  gzip={gz / 1e6:7.2f} MB  "
+        f"decode={decode_s * 1e3:8.1f} ms ({samples / decode_s:11,.0f}/s)  "
+        f"decode+store={store_s * 1e3:8.1f} ms ({samples / store_s:10,.0f}/s)"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=360)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    for name, payloads in build_payloads(args.frames, args.rows).items():
+        run(name, payloads, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
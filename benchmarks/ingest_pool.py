@@ -0,0 +1,204 @@
+"""
+Decode throughput of the multi-process ingest pool vs. worker count.
+
+Runs fully offline: payloads come from an MQTT capture file (see
+src/niagara_client/mqtt_capture.py) or are synthesised. By default they
+are spread across workers by the pool's local dispatch(); with --broker
+they are published to an in-process MQTT broker stand-in
+(mqtt_broker_standin) and reach the workers through the real
+$share/<group>/<topic> subscriptions. --workers 0 is the single-process
+baseline (decode + store in the calling thread).
+
+Every run checks that SQLite holds exactly the decoded rows per series
+("mismatches"); broker runs also print how the group was balanced.
+
+    python -m benchmarks.ingest_pool --workers 0 1 2 4
+    python -m benchmarks.ingest_pool --broker --workers 1 2 --frames 500
+    python -m benchmarks.ingest_pool --capture cap.bin.gz --workers 1 4
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import paho.mqtt.client as mqtt
+
+from src.config import AppConfig
+from src.niagara_client.mqtt_broker_standin import MqttBrokerStandin
+from src.niagara_client.mqtt_capture import read_capture
+from src.niagara_client.mqtt_history_ingest import (
+    HistoryColumns,
+    decode_history_payload,
+    ingest_stats,
+    store_history_samples,
+)
+from src.niagara_client.mqtt_ingest_pool import IngestWorkerPool
+from src.store import sqlite_store
+
+SeriesCounts = Dict[Tuple[str, str], int]
+
+
+def synthetic_payloads(frames: int = 2000, rows_per_frame: int = 120, seed: int = 0) -> List[bytes]:
+    rnd = random.Random(seed)
+    tz = timezone(timedelta(hours=-7))
+    start = datetime.now(tz) - timedelta(hours=12)
+    out: List[bytes] = []
+    for f in range(frames):
+        rows = []
+        for i in range(rows_per_frame):
+            ts = start + timedelta(seconds=60 * i)
+            rows.append(
+                {
+                    "timestamp": ts.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3] + ts.strftime("%z"),
+                    "value": round(68 + rnd.random() * 8, 2),
+                    "status": "{ok}",
+                }
+            )
+        frame = {
+            "messageType": "history",
+            "stationName": "BenchStation",
+            "equipment": f"VAV {f // 8:03d}",
+            "point": {
+                "n:displayName": f"Point {f % 8}",
+                "n:history": f"/BenchStation/Vav{f // 8:03d}_P{f % 8}",
+                "m:zone": "Marker",
+            },
+            "historyData": rows,
+        }
+        out.append(json.dumps(frame).encode("utf-8"))
+    return out
+
+
+def _bench_cfg() -> AppConfig:
+    return AppConfig.model_validate(
+        {
+            "site_name": "bench",
+            "data_source": {"type": "mqtt_history"},
+            "comfort": {
+                "occupied_start": "07:00",
+                "occupied_end": "18:00",
+                "setpoint_column": "zn_sp",
+                "temp_column": "zn_t",
+                "timestamp_column": "timestamp",
+                "equip_column": "zone_root",
+                "comfort_band_degF": 2.0,
+            },
+        }
+    )
+
+
+def expected_rows(payloads: List[bytes]) -> SeriesCounts:
+    counts: SeriesCounts = Counter()
+    for payload in payloads:
+        for r in decode_history_payload(payload):
+            counts[(r.station_name, r.history_id)] += len(r) if isinstance(r, HistoryColumns) else 1
+    return counts
+
+
+def _mismatches(expected: SeriesCounts) -> int:
+    stored = dict(
+        ((station, history_id), n)
+        for station, history_id, n in sqlite_store._get_conn().execute(
+            "SELECT station, history_id, COUNT(*) FROM history_samples GROUP BY station, history_id;"
+        )
+    )
+    return sum(1 for key in set(expected) | set(stored) if expected.get(key) != stored.get(key))
+
+
+def _report(label: str, samples: int, elapsed: float, expected: SeriesCounts) -> float:
+    rate = samples / elapsed
+    print(
+        f"{label:<22} samples={samples:<9} elapsed={elapsed:7.2f}s  "
+        f"rate={rate:12,.0f} samples/s  mismatches={_mismatches(expected)}"
+    )
+    return rate
+
+
+def run_inline(payloads: List[bytes], expected: SeriesCounts) -> float:
+    sqlite_store.init(":memory:", retention_hours=0)
+    ingest_stats.reset()
+    t0 = time.perf_counter()
+    for payload in payloads:
+        store_history_samples(decode_history_payload(payload))
+    return _report("inline (no pool)", ingest_stats.samples, time.perf_counter() - t0, expected)
+
+
+def run(workers: int, payloads: List[bytes], expected: SeriesCounts) -> float:
+    sqlite_store.init(":memory:", retention_hours=0)
+    pool = IngestWorkerPool(_bench_cfg(), workers=workers, use_broker=False)
+    pool.start()
+    pool.wait_ready()
+    t0 = time.perf_counter()
+    for payload in payloads:
+        pool.dispatch(payload)
+    pool.stop(timeout=600)
+    return _report(f"workers={workers} dispatch", pool.samples_written, time.perf_counter() - t0, expected)
+
+
+def run_broker(workers: int, payloads: List[bytes], expected: SeriesCounts, timeout: float = 600.0) -> float:
+    sqlite_store.init(":memory:", retention_hours=0)
+    total = sum(expected.values())
+    with MqttBrokerStandin() as broker:
+        cfg = _bench_cfg()
+        cfg.mqtt.host, cfg.mqtt.port = broker.host, broker.port
+        pool = IngestWorkerPool(cfg, workers=workers)
+        pool.start()
+        if not pool.wait_ready():
+            raise SystemExit("pool workers did not subscribe to the broker stand-in")
+
+        publisher = mqtt.Client(client_id="bench-publisher")
+        publisher.connect(broker.host, broker.port)
+        publisher.loop_start()
+        t0 = time.perf_counter()
+        for payload in payloads:
+            publisher.publish(cfg.mqtt.history_topic, payload, qos=1)
+        deadline = time.monotonic() + timeout
+        while pool.samples_written < total and time.monotonic() < deadline:
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - t0
+        publisher.loop_stop()
+        publisher.disconnect()
+        pool.stop()
+        rate = _report(f"workers={workers} broker", pool.samples_written, elapsed, expected)
+        shares = sorted(n for cid, n in broker.stats.delivered.items() if cid != "bench-publisher")
+        print(f"    $share deliveries per worker: {shares} of {broker.stats.published} published")
+    return rate
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4],
+                        help="worker counts to run; 0 = inline baseline")
+    parser.add_argument("--broker", action="store_true",
+                        help="deliver through the MQTT broker stand-in ($share subscriptions)")
+    parser.add_argument("--capture", default=None, help="replay payloads from a capture file")
+    parser.add_argument("--frames", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    if args.capture:
+        payloads = [rec.payload for rec in read_capture(args.capture)]
+    else:
+        payloads = synthetic_payloads(frames=args.frames)
+    expected = expected_rows(payloads)
+    print(f"{len(payloads)} payloads, {sum(expected.values())} rows, {os.cpu_count()} CPU(s)")
+
+    base: Optional[float] = None
+    for n in args.workers:
+        if n <= 0:
+            rate = run_inline(payloads, expected)
+        elif args.broker:
+            rate = run_broker(n, payloads, expected)
+        else:
+            rate = run(n, payloads, expected)
+        base = base or rate
+        print(f"    speedup vs first run: {rate / base:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
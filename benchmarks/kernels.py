@@ -0,0 +1,238 @@
+"""
+Metric functions on analytics.kernels vs. the pandas implementations they
+replaced (kept verbatim below), from 1k to 1M samples.
+
+Covers comfort (compute_zone_comfort), flow tracking
+(compute_flow_tracking), RTU on/off cycling (_compute_binary_cycles) and
+discharge-air tracking (_compute_discharge_metrics). Inputs are jittered
+1-minute series with duplicate timestamps and a few NaN values; every
+result is checked to be identical.
+
+    python -m benchmarks.kernels
+    python -m benchmarks.kernels --sizes 1000 10000 --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import time
+from datetime import datetime
+from datetime import time as dtime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.analytics.comfort import compute_zone_comfort
+from src.analytics.flow import FlowTrackingConfig, compute_flow_tracking
+from src.analytics.rtu import _compute_binary_cycles, _compute_discharge_metrics
+from src.config import ComfortConfig
+
+COMFORT = ComfortConfig(
+    occupied_start="07:00",
+    occupied_end="18:00",
+    setpoint_column="sp",
+    temp_column="temp",
+    timestamp_column="timestamp",
+    equip_column="equip",
+    comfort_band_degF=1.5,
+)
+
+
+# ---------------------------------------------------------------------------
+# The pandas implementations, kept for comparison (timestamp sorts made
+# stable, as kernels.sort_order orders equal timestamps)
+# ---------------------------------------------------------------------------
+
+
+def legacy_comfort(df: pd.DataFrame, c: ComfortConfig) -> dict:
+    if df.empty:
+        return {"samples": 0, "within_band_pct": None, "mean_error_degF": None}
+    df = df.copy()
+    df["__time"] = df[c.timestamp_column].dt.time
+    occ_start = dtime(*map(int, c.occupied_start.split(":")))
+    occ_end = dtime(*map(int, c.occupied_end.split(":")))
+    occupied = df[(df["__time"] >= occ_start) & (df["__time"] <= occ_end)]
+    if occupied.empty:
+        return {"samples": 0, "within_band_pct": None, "mean_error_degF": None}
+    occupied["error"] = occupied[c.temp_column] - occupied[c.setpoint_column]
+    occupied["abs_error"] = occupied["error"].abs()
+    total = len(occupied)
+    within_band = (occupied["abs_error"] <= c.comfort_band_degF).sum()
+    return {
+        "samples": int(total),
+        "within_band_pct": float(within_band / total * 100.0),
+        "mean_error_degF": float(occupied["error"].mean()),
+    }
+
+
+def legacy_flow(df_flow: pd.DataFrame, df_flow_sp: pd.DataFrame, cfg: FlowTrackingConfig) -> dict:
+    if df_flow.empty:
+        return {"samples": 0, "within_band_pct": None, "mean_error_cfm": None, "mean_error_pct": None}
+    df_flow = df_flow.copy().sort_values("timestamp", kind="stable").rename(columns={"value": "flow"})
+    if df_flow_sp is None or df_flow_sp.empty:
+        return {"samples": int(len(df_flow)), "within_band_pct": None, "mean_error_cfm": None, "mean_error_pct": None}
+    df_sp = df_flow_sp.copy().sort_values("timestamp", kind="stable").rename(columns={"value": "flow_sp"})
+    merged = pd.merge_asof(
+        df_flow, df_sp, on="timestamp", direction="nearest",
+        tolerance=pd.Timedelta(seconds=cfg.merge_tolerance_seconds),
+    )
+    merged = merged.dropna(subset=["flow_sp"])
+    if merged.empty:
+        return {"samples": 0, "within_band_pct": None, "mean_error_cfm": None, "mean_error_pct": None}
+    merged["error_cfm"] = merged["flow"] - merged["flow_sp"]
+    merged["error_pct"] = merged["error_cfm"] / merged["flow_sp"].where(merged["flow_sp"] != 0, pd.NA)
+    tol_cfm = merged["flow_sp"].abs() * cfg.pct_tolerance
+    if cfg.abs_cfm_tolerance is not None:
+        tol_cfm = tol_cfm.clip(lower=cfg.abs_cfm_tolerance)
+    merged["within_band"] = merged["error_cfm"].abs() <= tol_cfm
+    error_pct_valid = merged["error_pct"].dropna()
+    return {
+        "samples": int(len(merged)),
+        "within_band_pct": float(merged["within_band"].mean() * 100.0),
+        "mean_error_cfm": float(merged["error_cfm"].mean()),
+        "mean_error_pct": float(error_pct_valid.abs().mean() * 100.0) if not error_pct_valid.empty else None,
+    }
+
+
+def legacy_cycles(df: pd.DataFrame, threshold: float = 0.5, min_cycle_minutes: float = 10.0) -> dict:
+    if df.empty:
+        return {"samples": 0, "on_pct": None, "short_cycle_count": None}
+    df = df.sort_values("timestamp", kind="stable").copy()
+    on = df["value"] > threshold
+    ts = df["timestamp"]
+    short_cycles = 0
+    prev_state = bool(on.iloc[0])
+    on_start: Optional[datetime] = ts.iloc[0] if prev_state else None
+    for t, state in zip(ts.iloc[1:], on.iloc[1:]):
+        state = bool(state)
+        if state == prev_state:
+            continue
+        if prev_state and not state:
+            if on_start is not None and (t - on_start).total_seconds() / 60.0 < min_cycle_minutes:
+                short_cycles += 1
+            on_start = None
+        elif not prev_state and state:
+            on_start = t
+        prev_state = state
+    return {"samples": int(len(df)), "on_pct": float(on.mean() * 100.0), "short_cycle_count": short_cycles}
+
+
+def legacy_discharge(df_da: pd.DataFrame, df_da_sp: pd.DataFrame, band_degF: float = 2.0) -> dict:
+    if df_da.empty or df_da_sp.empty:
+        return {"samples": 0, "within_band_pct": None, "mean_error_degF": None}
+    merged = pd.merge_asof(
+        df_da.sort_values("timestamp", kind="stable").rename(columns={"value": "da"}),
+        df_da_sp.sort_values("timestamp", kind="stable").rename(columns={"value": "da_sp"}),
+        on="timestamp", direction="nearest", tolerance=pd.Timedelta(seconds=60),
+    ).dropna(subset=["da", "da_sp"])
+    if merged.empty:
+        return {"samples": 0, "within_band_pct": None, "mean_error_degF": None}
+    merged["error"] = merged["da"] - merged["da_sp"]
+    samples = int(len(merged))
+    within_band = int((merged["error"].abs() <= band_degF).sum())
+    return {
+        "samples": samples,
+        "within_band_pct": float(within_band / samples * 100.0),
+        "mean_error_degF": float(merged["error"].mean()),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Inputs
+# ---------------------------------------------------------------------------
+
+
+def _timestamps(rng: np.random.Generator, n: int, step_s: float) -> pd.Series:
+    steps = rng.uniform(step_s - 5, step_s + 5, n)
+    steps[rng.random(n) < 0.02] = 0.0  # duplicate timestamps
+    offsets = (np.cumsum(steps) * 1e9).astype(np.int64).astype("timedelta64[ns]")
+    return pd.Series(np.datetime64("2026-01-05T00:00:00", "ns") + offsets)
+
+
+def _with_nans(rng: np.random.Generator, v: np.ndarray) -> np.ndarray:
+    v = v.round(2)
+    v[rng.random(len(v)) < 0.001] = np.nan
+    return v
+
+
+def build_inputs(n: int, seed: int = 0) -> Dict[str, Tuple[Any, ...]]:
+    rng = np.random.default_rng(seed)
+    ts = _timestamps(rng, n, 60)
+    ts_sp = _timestamps(rng, max(1, n // 5), 300)
+    minute = np.arange(n)
+    temp = _with_nans(rng, 72 + np.sin(minute / 90) + rng.normal(0, 0.8, n))
+    flow = _with_nans(rng, np.maximum(0, 400 + 150 * np.sin(minute / 60) + rng.normal(0, 40, n)))
+    flow_sp = (400 + 150 * np.sin(np.arange(len(ts_sp)) * 5 / 60)).round(1)
+    flow_sp[rng.random(len(flow_sp)) < 0.01] = 0.0
+    fan = (np.sin(minute / 7) + rng.normal(0, 0.3, n) > 0).astype(float)
+    da_sp = np.full(len(ts_sp), 55.0)
+
+    comfort_df = pd.DataFrame({"timestamp": ts, "temp": temp, "sp": 72.0})
+    flow_df = pd.DataFrame({"timestamp": ts, "value": flow})
+    flow_sp_df = pd.DataFrame({"timestamp": ts_sp, "value": flow_sp})
+    fan_df = pd.DataFrame({"timestamp": ts, "value": fan})
+    da_df = pd.DataFrame({"timestamp": ts, "value": temp - 17})
+    da_sp_df = pd.DataFrame({"timestamp": ts_sp, "value": da_sp})
+    flow_cfg = FlowTrackingConfig(abs_cfm_tolerance=25.0)
+    return {
+        "comfort": (comfort_df, COMFORT),
+        "flow": (flow_df, flow_sp_df, flow_cfg),
+        "cycles": (fan_df,),
+        "discharge": (da_df, da_sp_df),
+    }
+
+
+CASES: List[Tuple[str, Callable[..., dict], Callable[..., dict]]] = [
+    ("comfort", legacy_comfort, compute_zone_comfort),
+    ("flow", legacy_flow, compute_flow_tracking),
+    ("cycles", legacy_cycles, _compute_binary_cycles),
+    ("discharge", legacy_discharge, _compute_discharge_metrics),
+]
+
+
+def _same(a: dict, b: dict) -> bool:
+    for k in a:
+        x, y = a[k], b.get(k)
+        if isinstance(x, float) and isinstance(y, float) and math.isnan(x) and math.isnan(y):
+            continue
+        if x != y:
+            return False
+    return True
+
+
+def _timed(fn: Callable[[], dict], repeat: int) -> Tuple[float, dict]:
+    best, result = float("inf"), {}
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    mismatches = 0
+    print(f"{'metric':<10} {'samples':>9} {'pandas':>10} {'kernels':>10}  speedup")
+    for n in args.sizes:
+        inputs = build_inputs(n)
+        for name, legacy, current in CASES:
+            # The legacy cycle loop is per-row Python; cap its repeats
+            repeat = 1 if name == "cycles" and n >= 100_000 else args.repeat
+            legacy_s, expected = _timed(lambda: legacy(*inputs[name]), repeat)
+            kernel_s, got = _timed(lambda: current(*inputs[name]), args.repeat)
+            same = _same(expected, got)
+            mismatches += not same
+            print(
+                f"{name:<10} {n:>9,} {legacy_s * 1e3:8.2f}ms {kernel_s * 1e3:8.2f}ms"
+                f"  x{legacy_s / kernel_s:6.1f}{'' if same else '  MISMATCH'}"
+            )
+    print(f"mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
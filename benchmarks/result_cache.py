@@ -0,0 +1,110 @@
+"""
+Dashboard refreshes of zone health with and without the window result
+cache (analytics.result_cache).
+
+Fills a temporary SQLite store with a synthetic station, then simulates
+refresh rounds: between rounds live ingest writes one sample to every
+series of a fraction of the zones (--touched), and every zone's health is
+requested for the same snapped window. The uncached path recomputes every
+zone each round; the cached path only recomputes zones whose series got
+samples. After each round every cached result is checked against a fresh
+compute_zone_health().
+
+    python -m benchmarks.result_cache
+    python -m benchmarks.result_cache --zones 200 --rounds 20 --touched 0.05
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from src.analytics.result_cache import ResultCache, snap_window, zone_series
+from src.analytics.zone_health import compute_zone_health, zone_health_to_dict
+from src.niagara_client.mqtt_history_ingest import HistorySample
+from src.store import sqlite_store
+
+from .building_health import COMFORT, _same, build_station
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--zones", type=int, default=40)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--rounds", type=int, default=8)
+    parser.add_argument("--touched", type=float, default=0.1, help="fraction of zones ingested per round")
+    parser.add_argument("--bucket", type=float, default=60.0, help="window bucket seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rnd = random.Random(args.seed)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    cache = ResultCache(max_entries=args.zones * 2)
+    sqlite_store.add_sample_listener(cache.invalidate_series)
+
+    uncached_s = cached_s = 0.0
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_store.init(os.path.join(tmp, "bench.sqlite"), retention_hours=0)
+        zones = build_station(args.zones, args.hours, now, args.seed)
+
+        for r in range(args.rounds):
+            # Refreshes land in the same bucket; a new bucket now and then
+            now += timedelta(seconds=args.bucket / 4)
+            start, end = snap_window(args.hours, args.bucket, now)
+            if r:
+                touched = rnd.sample(list(zones), max(1, int(len(zones) * args.touched)))
+                sqlite_store.add_batch(
+                    HistorySample("S", hid, now, 72.0 + rnd.gauss(0, 1), "ok")
+                    for root in touched
+                    for hid in zones[root].values()
+                )
+
+            t0 = time.perf_counter()
+            fresh = {
+                root: zone_health_to_dict(compute_zone_health("S", root, info, COMFORT, start, end))
+                for root, info in zones.items()
+            }
+            uncached_s += time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            cached = {
+                root: zone_health_to_dict(
+                    cache.get_or_compute(
+                        ("zone_health", "S", root, start, end),
+                        info,
+                        zone_series("S", [info]),
+                        lambda root=root, info=info: compute_zone_health(
+                            "S", root, info, COMFORT, start, end
+                        ),
+                    )
+                )
+                for root, info in zones.items()
+            }
+            cached_s += time.perf_counter() - t0
+
+            for root, a in fresh.items():
+                b = cached[root]
+                if any(not _same(a[k], b.get(k)) for k in a):
+                    mismatches += 1
+                    if mismatches <= 5:
+                        print(f"  round {r}: {root} differs")
+
+    sqlite_store.remove_sample_listener(cache.invalidate_series)
+    stats = cache.snapshot_stats()
+    print(f"{len(zones)} zones x {args.rounds} rounds, {args.touched:.0%} of zones ingested per round")
+    print(f"uncached  {uncached_s:7.2f} s")
+    print(f"cached    {cached_s:7.2f} s  x{uncached_s / cached_s:.1f}")
+    print(
+        f"hit rate {stats.hit_rate:.1%}  ({stats.hits} hits, {stats.misses} misses, "
+        f"{stats.invalidations} invalidated, {stats.evictions} evicted)"
+    )
+    print(f"results with mismatches: {mismatches} of {len(zones) * args.rounds}")
+
+
+if __name__ == "__main__":
+    main()
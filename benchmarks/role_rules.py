@@ -0,0 +1,107 @@
+"""
+Role inference throughput: the compiled RoleRuleEngine vs. the original
+per-call linear scan (every rule, label re-lowercased, tag sets rebuilt,
+uncompiled re.search).
+
+Classifies synthetic point names (a mix of tagged and name-only points,
+plus names no rule matches) and checks both paths agree on every point.
+
+    python -m benchmarks.role_rules
+    python -m benchmarks.role_rules --points 100000 --repeat 3
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from src.analytics.role_rules import RoleRule, RoleRuleEngine, get_rules
+
+_NAMES = [
+    "Space Temp", "Zone Temp", "ZN T", "Room Temp Setpoint", "Effective Setpoint",
+    "Box Flow", "Airflow", "CFM SP", "Min CFM", "Damper Position", "OA Damper",
+    "Reheat", "HW Valve", "Supply Fan Speed", "Fan Cmd", "Fan Status",
+    "Cooling Valve", "Compressor 2 Cmd", "Stage 1 Status",
+    # Nothing matches these
+    "Discharge Air Temp", "Mixed Air Temp", "Occupied Mode", "Alarm", "Static Pressure",
+    "Outside Air Humidity", "Schedule Override", "Unit Enable",
+]
+_TAG_SETS = [
+    [], [], [],
+    ["zone", "temp", "sensor"],
+    ["zone", "temp", "sp"],
+    ["air", "flow", "zone"],
+    ["air", "flow", "zone", "sp"],
+    ["damper"],
+    ["zoneairtempsensor"],
+    ["discharge", "air", "temp", "sensor"],
+    ["his", "point", "cur"],
+]
+
+Point = Tuple[str, List[str]]
+
+
+def synthetic_points(n: int, seed: int = 0) -> List[Point]:
+    rnd = random.Random(seed)
+    out: List[Point] = []
+    for i in range(n):
+        name = f"VAV-{i // 12:04d} {rnd.choice(_NAMES)}"
+        out.append((name, list(rnd.choice(_TAG_SETS))))
+    return out
+
+
+def legacy_infer(rules: Sequence[RoleRule], label: str, tags: Optional[List[Any]]) -> Optional[str]:
+    """The pre-engine infer_role, kept verbatim for comparison."""
+    tag_set = {str(t).lower() for t in tags} if tags else None
+    best: Optional[Tuple[int, RoleRule]] = None
+    for rule in rules:
+        s = (label or "").lower()
+        ts = {str(t).lower() for t in tag_set} if tag_set else set()
+        if rule.tags_all and not {str(t).lower() for t in rule.tags_all}.issubset(ts):
+            continue
+        if rule.tags_any and not (ts & {str(t).lower() for t in rule.tags_any}):
+            continue
+        if rule.name_regex and not any(re.search(p, s) for p in rule.name_regex):
+            continue
+        if best is None or rule.priority < best[0]:
+            best = (rule.priority, rule)
+    return best[1].role if best else None
+
+
+def _timed(fn: Callable[[], List[Optional[str]]], repeat: int) -> Tuple[float, List[Optional[str]]]:
+    best, result = float("inf"), []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rules = get_rules()
+    points = synthetic_points(args.points)
+
+    t_compile = time.perf_counter()
+    engine = RoleRuleEngine(rules)
+    t_compile = time.perf_counter() - t_compile
+
+    legacy_s, legacy = _timed(lambda: [legacy_infer(rules, n, t) for n, t in points], args.repeat)
+    engine_s, compiled = _timed(lambda: [engine.infer(n, t) for n, t in points], args.repeat)
+
+    mismatches = sum(1 for a, b in zip(legacy, compiled) if a != b)
+    matched = sum(1 for r in compiled if r)
+    print(f"{len(rules)} rules, {len(points)} points ({matched} with a role), compile {t_compile * 1e3:.2f} ms")
+    print(f"legacy  {legacy_s:7.3f} s  ({len(points) / legacy_s:10,.0f} points/s)")
+    print(f"engine  {engine_s:7.3f} s  ({len(points) / engine_s:10,.0f} points/s)  x{legacy_s / engine_s:.1f}")
+    print(f"mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
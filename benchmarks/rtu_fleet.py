@@ -0,0 +1,120 @@
+"""
+Station-wide RTU health: compute_fleet_rtu_health() vs. compute_rtu_health()
+per unit (what a client polling /summary/rtu_health did per unit).
+
+Fills a temporary SQLite store with a synthetic fleet: fan status or only
+a fan command, compressor command or only a cooling valve, discharge air
+with and without a setpoint, short-cycling units, some duplicate
+timestamps. Both paths run over the same window and every
+rtu_health_to_dict() field is checked to be identical.
+
+    python -m benchmarks.rtu_fleet
+    python -m benchmarks.rtu_fleet --units 200 --hours 24 --step 10
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from src.analytics.rtu import compute_rtu_health, rtu_health_to_dict, rtu_severity_key
+from src.analytics.rtu_fleet import compute_fleet_rtu_health
+from src.store import sqlite_store
+
+from .building_health import _same
+
+
+def build_fleet(units: int, hours: int, step: int, end: datetime, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    rnd = random.Random(seed)
+    start = end - timedelta(hours=hours)
+    infos: Dict[str, Dict[str, Any]] = {}
+    rows = []
+
+    def series(hid: str, value_at) -> None:
+        ts = start + timedelta(seconds=rnd.uniform(0, step))
+        while ts < end:
+            rows.append(("S", hid, ts.isoformat(), float(value_at(ts)), "ok"))
+            if rnd.random() > 0.01:  # else a duplicate timestamp
+                ts += timedelta(seconds=step + rnd.uniform(-1, 1))
+
+    def on_off(cycle_minutes: float):
+        phase = rnd.uniform(0, cycle_minutes)
+        return lambda ts: float(((ts - start).total_seconds() / 60 + phase) % cycle_minutes < cycle_minutes / 2)
+
+    for u in range(units):
+        root = f"rtu{u:03d}"
+        info: Dict[str, Any] = {"equipment": root}
+        fan_cycle = rnd.choice([8, 30, 180, 1e9])   # short-cycling .. always on
+        fan_role = "fan_status" if rnd.random() < 0.7 else "fan_cmd"
+        info[fan_role] = f"/S/{root}_{fan_role}"
+        series(info[fan_role], on_off(fan_cycle))
+        if fan_role == "fan_status" and rnd.random() < 0.5:
+            info["fan_cmd"] = f"/S/{root}_fan_cmd"  # wired but unused
+            series(info["fan_cmd"], on_off(fan_cycle))
+        if rnd.random() < 0.8:
+            cool_role = "compressor_cmd" if rnd.random() < 0.7 else "cooling_valve"
+            info[cool_role] = f"/S/{root}_{cool_role}"
+            series(info[cool_role], on_off(rnd.choice([6, 20, 60])))
+        if rnd.random() < 0.6:
+            offset = rnd.uniform(-3, 3)
+            info["discharge_air"] = f"/S/{root}_da"
+            series(info["discharge_air"], lambda ts, o=offset: round(55 + o + rnd.gauss(0, 1.5), 2))
+            if rnd.random() < 0.8:
+                info["discharge_air_sp"] = f"/S/{root}_da_sp"
+                series(info["discharge_air_sp"], lambda ts: 55.0)
+        infos[root] = info
+    sqlite_store.bulk_load([rows])
+    return infos
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=60)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--step", type=int, default=60, help="seconds between samples")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    end = datetime.now(timezone.utc).replace(tzinfo=None)
+    start = end - timedelta(hours=args.hours)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_store.init(os.path.join(tmp, "bench.sqlite"), retention_hours=0)
+        units = build_fleet(args.units, args.hours, args.step, end, args.seed)
+        series = sum(1 for info in units.values() for k in info if k != "equipment")
+
+        t0 = time.perf_counter()
+        per_unit = [compute_rtu_health("S", root, info, start, end) for root, info in units.items()]
+        per_unit_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        fleet = compute_fleet_rtu_health("S", units, start, end)
+        fleet_s = time.perf_counter() - t0
+
+    mismatches = 0
+    for a, b in zip(map(rtu_health_to_dict, per_unit), map(rtu_health_to_dict, fleet)):
+        bad = [
+            f"{k}.{j}" if isinstance(a[k], dict) else k
+            for k in a
+            for j in (a[k] if isinstance(a[k], dict) else [None])
+            if not _same(a[k][j] if j else a[k], (b[k][j] if j else b[k]))
+        ]
+        if bad:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  {a['zone_root']}: {', '.join(bad)}")
+
+    worst = sorted(fleet, key=rtu_severity_key)[:3]
+    print(f"{len(units)} units, {series} wired series, {args.hours} h at {args.step} s")
+    print(f"per-unit  {per_unit_s:7.2f} s")
+    print(f"fleet     {fleet_s:7.2f} s  x{per_unit_s / fleet_s:.1f}")
+    print("worst: " + ", ".join(f"{m.zone_root} ({m.status}: {', '.join(m.reasons)})" for m in worst))
+    print(f"units with mismatches: {mismatches} of {len(per_unit)}")
+
+
+if __name__ == "__main__":
+    main()
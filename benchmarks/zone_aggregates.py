@@ -0,0 +1,138 @@
+"""
+Rolling-window building health from per-minute aggregates
+(ZoneAggregates) vs. compute_building_health() over every sample.
+
+Fills a temporary SQLite store with a synthetic station, then streams
+--minutes of live ingest (one sample per series per minute, a few late by
+a minute) and reads the last --hours after every minute from both paths.
+
+Checks, after the stream:
+  * the incrementally maintained buckets equal buckets rebuilt from
+    scratch on the final data (every zone_health_to_dict() field);
+  * against compute_building_health() on the same window: zones that
+    differ beyond float rounding (samples paired across the window edges)
+    are counted and the largest difference per field is reported.
+
+    python -m benchmarks.zone_aggregates
+    python -m benchmarks.zone_aggregates --zones 400 --hours 24 --minutes 30
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from src.analytics.building_health import compute_building_health
+from src.analytics.zone_aggregates import ZoneAggregates
+from src.analytics.zone_health import zone_health_to_dict
+from src.niagara_client.mqtt_history_ingest import HistorySample
+from src.store import sqlite_store
+
+from .building_health import COMFORT, _same, build_station
+
+_LIVE = {
+    "space_temp": lambda rnd: 72 + rnd.gauss(0, 1.5),
+    "space_temp_sp": lambda rnd: 72.0,
+    "flow": lambda rnd: max(0.0, 400 + rnd.gauss(0, 60)),
+    "flow_sp": lambda rnd: 400.0,
+    "damper": lambda rnd: rnd.choice([3.0, 50.0, 90.0]),
+    "reheat": lambda rnd: max(0.0, rnd.gauss(5, 10)),
+}
+
+
+def _dicts(metrics: List[Any]) -> List[Dict[str, Any]]:
+    return [zone_health_to_dict(m) for m in metrics]
+
+
+def _close(a: Any, b: Any) -> bool:
+    if isinstance(a, float) and isinstance(b, float):
+        return _same(a, b) or abs(a - b) <= 1e-9 * max(1.0, abs(a))
+    return a == b
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--zones", type=int, default=100)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--minutes", type=int, default=10, help="minutes of live ingest to stream")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-zones", type=int, default=2000, help="zones kept (LRU)")
+    args = parser.parse_args(argv)
+
+    rnd = random.Random(args.seed)
+    now = datetime.now(timezone.utc).replace(tzinfo=None, second=0, microsecond=0)
+    aggregates = ZoneAggregates(COMFORT, max_hours=args.hours, max_zones=args.max_zones)
+    sqlite_store.add_sample_listener(aggregates.mark)
+
+    full_s = incremental_s = 0.0
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_store.init(os.path.join(tmp, "bench.sqlite"), retention_hours=0)
+        zones = build_station(args.zones, args.hours, now, args.seed)
+        series = sum(len(info) for info in zones.values())
+
+        t0 = time.perf_counter()
+        aggregates.building_health("S", zones, now - timedelta(hours=args.hours), now)
+        cold_s = time.perf_counter() - t0
+
+        for _ in range(args.minutes):
+            now += timedelta(minutes=1)
+            samples = []
+            for info in zones.values():
+                for role, hid in info.items():
+                    late = rnd.random() < 0.05
+                    ts = now - timedelta(seconds=rnd.uniform(60, 90) if late else rnd.uniform(0, 30))
+                    samples.append(HistorySample("S", hid, ts, round(_LIVE[role](rnd), 2), "ok"))
+            sqlite_store.add_batch(samples)
+            start = now - timedelta(hours=args.hours)
+
+            t0 = time.perf_counter()
+            incremental = _dicts(aggregates.building_health("S", zones, start, now))
+            incremental_s += time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            full = _dicts(compute_building_health("S", zones, COMFORT, start, now))
+            full_s += time.perf_counter() - t0
+
+        rebuilt = _dicts(ZoneAggregates(COMFORT, max_hours=args.hours).building_health("S", zones, start, now))
+
+    sqlite_store.remove_sample_listener(aggregates.mark)
+    stats = aggregates.snapshot_stats()
+
+    stale = sum(1 for a, b in zip(rebuilt, incremental) if any(not _same(a[k], b[k]) for k in a))
+    differ = rounding = 0
+    worst: Dict[str, float] = {}
+    for a, b in zip(full, incremental):
+        bad = [k for k in a if not _same(a[k], b[k])]
+        rounding += bool(bad) and all(_close(a[k], b[k]) for k in bad)
+        differ += bool(bad) and not all(_close(a[k], b[k]) for k in bad)
+        for k in bad:
+            if isinstance(a[k], (int, float)) and isinstance(b[k], (int, float)):
+                worst[k] = max(worst.get(k, 0.0), abs(a[k] - b[k]))
+            else:
+                worst[k] = math.inf
+
+    n = args.minutes
+    print(f"{len(zones)} zones, {series} series, {args.hours} h window, {n} minutes streamed")
+    print(f"cold build      {cold_s:7.2f} s")
+    print(f"full window     {full_s / n * 1e3:7.1f} ms per read")
+    print(f"aggregates      {incremental_s / n * 1e3:7.1f} ms per read  x{full_s / incremental_s:.1f}")
+    print(
+        f"buckets: {stats.minutes:,} zone-minutes, {stats.updated_minutes:,} computed while streaming, "
+        f"{stats.evicted_zones} zones evicted"
+    )
+    print(
+        f"vs compute_building_health: {differ} of {len(zones)} zones differ, "
+        f"{rounding} more only by float rounding"
+    )
+    for k, d in sorted(worst.items()):
+        print(f"  {k:<32} max |diff| {d:.3g}")
+    print(f"incremental vs rebuilt mismatches: {stale}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# src/analytics/analytics_pool.py
+"""
+Process pool for station-wide analytics.
+
+Zones are split into contiguous shards, one task per shard; each worker
+process opens the SQLite store read-only (sqlite_store.init_readonly) and
+runs the normal single-process code on its shard:
+
+  - building health: compute_building_health() per shard
+  - RTU health:      compute_fleet_rtu_health() per shard
+
+Results are pickled back per shard as it finishes. iter_* methods yield
+(shard zone_roots, results) in completion order; the plain methods
+reassemble them in the caller's zone order, so the output is the same
+as the in-process call.
+
+With workers <= 1, or too few zones to be worth the IPC, everything runs
+in the calling process.
+"""
+from __future__ import annotations
+
+import multiprocessing as mp
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..config import AnalyticsConfig, ComfortConfig
+from ..store import sqlite_store
+from .building_health import compute_building_health
+from .rtu import RTUHealthMetrics
+from .rtu_fleet import compute_fleet_rtu_health
+from .zone_health import ZoneHealthMetrics
+
+Zones = Dict[str, Dict[str, Any]]
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+
+def _worker_init(db_path: str) -> None:
+    sqlite_store.init_readonly(db_path)
+
+
+def _building_shard(
+    station: str,
+    zones: Zones,
+    comfort_cfg: ComfortConfig,
+    start: Optional[datetime],
+    end: Optional[datetime],
+    tolerance_seconds: float,
+) -> List[ZoneHealthMetrics]:
+    return compute_building_health(station, zones, comfort_cfg, start, end, tolerance_seconds)
+
+
+def _rtu_shard(
+    station: str,
+    zones: Zones,
+    start: Optional[datetime],
+    end: Optional[datetime],
+) -> List[RTUHealthMetrics]:
+    return compute_fleet_rtu_health(station, zones, start, end)
+
+
+# ---------------------------------------------------------------------------
+# Pool
+# ---------------------------------------------------------------------------
+
+
+class AnalyticsPool:
+    """
+    Long-lived worker processes for building / fleet analytics.
+
+        pool = AnalyticsPool(cfg.db_path, cfg.analytics)
+        metrics = pool.building_health("AmsShop", zones, cfg.comfort, start, end)
+        pool.shutdown()
+    """
+
+    def __init__(self, db_path: str, cfg: AnalyticsConfig) -> None:
+        self.db_path = db_path
+        self.workers = max(1, cfg.workers)
+        self.min_zones_per_worker = max(1, cfg.min_zones_per_worker)
+        self.merge_tolerance_seconds = cfg.merge_tolerance_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=mp.get_context("spawn"),
+                initializer=_worker_init,
+                initargs=(self.db_path,),
+            )
+        return self._executor
+
+    def start(self) -> None:
+        """Start the worker processes now instead of on first use."""
+        if self.workers > 1:
+            pool = self._pool()
+            for f in [pool.submit(int) for _ in range(self.workers)]:
+                f.result()
+            print(f"[analytics-pool] {self.workers} workers on {self.db_path}")
+
+    def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def shards(self, zones: Zones) -> List[Zones]:
+        """Contiguous, near-equal shards; a single shard when pooling is not worth it."""
+        n = min(self.workers, len(zones) // self.min_zones_per_worker)
+        if n <= 1:
+            return [zones]
+        roots = list(zones)
+        bounds = [len(roots) * i // n for i in range(n + 1)]
+        return [{r: zones[r] for r in roots[a:b]} for a, b in zip(bounds, bounds[1:])]
+
+    def _run(
+        self, fn: Callable[..., List[Any]], station: str, zones: Zones, *args: Any
+    ) -> Iterator[Tuple[List[str], List[Any]]]:
+        shards = self.shards(zones)
+        if len(shards) == 1:
+            yield list(zones), fn(station, zones, *args)
+            return
+        pool = self._pool()
+        futures: Dict[Future, List[str]] = {
+            pool.submit(fn, station, shard, *args): list(shard) for shard in shards
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+    @staticmethod
+    def _ordered(zones: Zones, parts: Iterator[Tuple[List[str], List[Any]]]) -> List[Any]:
+        by_root: Dict[str, Any] = {}
+        for roots, results in parts:
+            by_root.update(zip(roots, results))
+        return [by_root[root] for root in zones]
+
+    # ------------------------------------------------------------------
+    # Analytics
+    # ------------------------------------------------------------------
+
+    def iter_building_health(
+        self,
+        station: str,
+        zones: Zones,
+        comfort_cfg: ComfortConfig,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Iterator[Tuple[List[str], List[ZoneHealthMetrics]]]:
+        return self._run(
+            _building_shard, station, zones, comfort_cfg, start, end, self.merge_tolerance_seconds
+        )
+
+    def building_health(
+        self,
+        station: str,
+        zones: Zones,
+        comfort_cfg: ComfortConfig,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[ZoneHealthMetrics]:
+        """compute_building_health() sharded across the workers."""
+        return self._ordered(zones, self.iter_building_health(station, zones, comfort_cfg, start, end))
+
+    def iter_rtu_health(
+        self,
+        station: str,
+        zones: Zones,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Iterator[Tuple[List[str], List[RTUHealthMetrics]]]:
+        return self._run(_rtu_shard, station, zones, start, end)
+
+    def rtu_health(
+        self,
+        station: str,
+        zones: Zones,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[RTUHealthMetrics]:
+        """compute_fleet_rtu_health() sharded across the workers."""
+        return self._ordered(zones, self.iter_rtu_health(station, zones, start, end))
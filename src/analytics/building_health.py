@@ -0,0 +1,366 @@
+# src/analytics/building_health.py
+"""
+Station-wide zone health in one pass.
+
+compute_zone_health() runs six SQLite queries and an alignment pass per
+zone. compute_building_health() produces the same
+ZoneHealthMetrics for every zone of a station at once:
+
+  1. every series referenced by the zones is loaded under one store
+     lock (sqlite_store.query_series_many) and parsed in bulk;
+  2. each role pairing the per-zone aligned frame reads (temp <-
+     setpoint, flow <- flow setpoint, damper <- flow / flow setpoint,
+     reheat <- temp / setpoint) is done for all zones with a single
+     kernels.nearest_indexer call over (zone, timestamp) keys;
+  3. counts are grouped with np.bincount and means / percentages use
+     the same kernels per zone, so every value matches
+     zone_health_to_dict() of the per-zone path.
+
+Score and status use the per-zone helpers unchanged.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config import ComfortConfig
+from ..store import sqlite_store
+from . import kernels
+from .zone_health import (
+    MERGE_TOLERANCE_SECONDS,
+    ZoneHealthMetrics,
+    _compute_overall_score,
+    _derive_status_and_reasons,
+    _parse_time,
+)
+
+
+# zone_info keys the metrics read
+_ROLES = ("space_temp", "space_temp_sp", "flow", "flow_sp", "damper", "reheat")
+
+
+@dataclass
+class _Series:
+    """All loaded samples, sorted by (series, timestamp)."""
+
+    ts: np.ndarray                         # int64 ns since epoch, naive UTC
+    values: np.ndarray                     # float64
+    bounds: Dict[str, Tuple[int, int]]     # history_id -> [start, stop)
+
+    def span(self, history_id: Optional[str]) -> Tuple[int, int]:
+        if not history_id:
+            return (0, 0)
+        return self.bounds.get(history_id, (0, 0))
+
+
+@dataclass
+class _Column:
+    """One role's samples for every zone, concatenated in zone order."""
+
+    key: np.ndarray        # int64: zone * stride + (ts - base); sorted
+    ts: np.ndarray         # int64 ns since epoch
+    values: np.ndarray
+    zone: np.ndarray       # int64 zone index per sample
+    counts: np.ndarray     # samples per zone
+
+    @property
+    def present(self) -> np.ndarray:
+        return self.counts > 0
+
+
+def _parse_ts_ns(ts_text: Sequence[str]) -> np.ndarray:
+    """ISO strings -> int64 ns (naive UTC); unparseable -> NaT (min int64)."""
+    # Same result as _query_series_df's format="mixed" for the ISO strings
+    # the store writes, at a fraction of the cost; anything else falls
+    # back to the mixed parser.
+    parsed = pd.to_datetime(pd.Series(ts_text, dtype=object), utc=True, format="ISO8601", errors="coerce")
+    bad = parsed.isna()
+    if bad.any():
+        parsed[bad] = pd.to_datetime(
+            pd.Series(ts_text, dtype=object)[bad], utc=True, format="mixed", errors="coerce"
+        )
+    naive = parsed.dt.tz_convert("UTC").dt.tz_localize(None)
+    return naive.to_numpy(dtype="datetime64[ns]").view("int64")
+
+
+def _load(station: str, history_ids: Sequence[str], start: datetime, end: datetime) -> _Series:
+    by_id = sqlite_store.query_series_many(station, history_ids, start, end)
+    if not by_id:
+        return _Series(np.empty(0, np.int64), np.empty(0, np.float64), {})
+
+    ids = list(by_id)
+    ts_text: List[str] = []
+    values: List[float] = []
+    ts_of, value_of = itemgetter(0), itemgetter(1)
+    for rows in by_id.values():
+        ts_text.extend(map(ts_of, rows))
+        values.extend(map(value_of, rows))
+    codes = np.repeat(np.arange(len(ids)), [len(rows) for rows in by_id.values()])
+    ts = _parse_ts_ns(ts_text)
+    vals = np.asarray(values, dtype=np.float64)
+
+    # Drop unparseable timestamps, then sort each series by parsed time
+    keep = ts != np.iinfo(np.int64).min
+    codes, ts, vals = codes[keep], ts[keep], vals[keep]
+    order = np.lexsort((ts, codes))
+    codes, ts, vals = codes[order], ts[order], vals[order]
+
+    edges = np.searchsorted(codes, np.arange(len(ids) + 1))
+    bounds = {h: (int(edges[i]), int(edges[i + 1])) for i, h in enumerate(ids)}
+    return _Series(ts, vals, bounds)
+
+
+def _column(series: _Series, ids: Sequence[Optional[str]], base: int, stride: int) -> _Column:
+    spans = [series.span(h) for h in ids]
+    counts = np.fromiter((b - a for a, b in spans), dtype=np.int64, count=len(spans))
+    if counts.sum():
+        idx = np.concatenate([np.arange(a, b) for a, b in spans])
+    else:
+        idx = np.empty(0, np.int64)
+    zone = np.repeat(np.arange(len(ids), dtype=np.int64), counts)
+    ts = series.ts[idx]
+    return _Column(zone * stride + (ts - base), ts, series.values[idx], zone, counts)
+
+
+def _nearest(left: _Column, right: _Column, tolerance_ns: int) -> np.ndarray:
+    """
+    Row of ``right`` the per-zone alignment picks for each row of
+    ``left``, or -1. Zones never match across each other: the key stride
+    leaves more than the tolerance between consecutive zones.
+    """
+    return kernels.nearest_indexer(left.key, right.key, tolerance_ns)
+
+
+def _occupied(ts: np.ndarray, comfort_cfg: ComfortConfig) -> np.ndarray:
+    return kernels.time_of_day_mask(
+        ts, _parse_time(comfort_cfg.occupied_start), _parse_time(comfort_cfg.occupied_end)
+    )
+
+
+def _means(zone: np.ndarray, values: np.ndarray, zones: int) -> List[Optional[float]]:
+    """Per-zone mean of ``values`` (grouped, zone-sorted)."""
+    edges = np.searchsorted(zone, np.arange(zones + 1))
+    return [kernels.mean(values[edges[z] : edges[z + 1]]) for z in range(zones)]
+
+
+@dataclass
+class _Aligned:
+    """
+    Row-level alignment of every zone's roles (zone-sorted within each
+    group of rows), i.e. what the per-zone metrics count and average.
+    """
+
+    col: Dict[str, _Column]
+    # Occupied temp samples with their nearest setpoint
+    comfort_zone: np.ndarray
+    comfort_ts: np.ndarray
+    comfort_error: np.ndarray
+    # Flow samples with their nearest flow setpoint
+    flow_zone: np.ndarray
+    flow_ts: np.ndarray
+    flow_error: np.ndarray
+    flow_within: np.ndarray
+    # Damper samples with their nearest flow (and flow setpoint, NaN if none)
+    d_zone: np.ndarray
+    d_ts: np.ndarray
+    d_val: np.ndarray
+    d_flow: np.ndarray
+    d_sp: np.ndarray
+    d_has_sp: np.ndarray
+    # Occupied reheat samples with their nearest temp and setpoint
+    r_zone: np.ndarray
+    r_ts: np.ndarray
+    r_hot: np.ndarray
+
+
+def _align(
+    station: str,
+    infos: List[Dict[str, Any]],
+    comfort_cfg: ComfortConfig,
+    start: datetime,
+    end: datetime,
+    tolerance_seconds: float,
+) -> Optional[_Aligned]:
+    """
+    Load and align the roles of ``infos`` (zone index = position) over
+    [start, end]; None if the (zone, timestamp) keys would overflow and
+    the zones have to be split.
+    """
+    nz = len(infos)
+    wanted = sorted({info[r] for info in infos for r in _ROLES if info.get(r)})
+    series = _load(station, wanted, start, end)
+
+    base = int(series.ts.min()) if len(series.ts) else 0
+    span = int(series.ts.max()) - base if len(series.ts) else 0
+    tol_ns = int(round(tolerance_seconds * 1e9))
+    stride = span + 2 * tol_ns + 1
+    if nz > 1 and nz * stride >= np.iinfo(np.int64).max:
+        return None
+
+    col = {r: _column(series, [info.get(r) for info in infos], base, stride) for r in _ROLES}
+    temp, sp = col["space_temp"], col["space_temp_sp"]
+    flow, flow_sp = col["flow"], col["flow_sp"]
+    damper, reheat = col["damper"], col["reheat"]
+
+    # ---- Comfort: temp rows <- nearest setpoint -------------------------
+    m = _nearest(temp, sp, tol_ns)
+    ok = (m >= 0) & _occupied(temp.ts, comfort_cfg)
+    comfort_error = temp.values[ok] - sp.values[m[ok]]
+
+    # ---- Flow tracking: flow rows <- nearest flow setpoint --------------
+    m = _nearest(flow, flow_sp, tol_ns)
+    f_ok = m >= 0
+    f_sp = flow_sp.values[m[f_ok]]
+    flow_error = flow.values[f_ok] - f_sp
+
+    # ---- Damper sanity: damper rows <- nearest flow, flow setpoint ------
+    m_flow = _nearest(damper, flow, tol_ns)
+    m_sp = _nearest(damper, flow_sp, tol_ns)
+    d_ok = m_flow >= 0
+    d_sp_idx = m_sp[d_ok]
+    has_sp = d_sp_idx >= 0
+    d_sp = np.where(has_sp, flow_sp.values[np.maximum(d_sp_idx, 0)] if len(flow_sp.values) else 0.0, np.nan)
+
+    # ---- Reheat waste: reheat rows <- nearest temp, setpoint ------------
+    m_t = _nearest(reheat, temp, tol_ns)
+    m_s = _nearest(reheat, sp, tol_ns)
+    r_ok = (m_t >= 0) & (m_s >= 0) & _occupied(reheat.ts, comfort_cfg)
+    hot = (reheat.values[r_ok] > 10.0) & (temp.values[m_t[r_ok]] >= sp.values[m_s[r_ok]] + 1.0)
+
+    return _Aligned(
+        col=col,
+        comfort_zone=temp.zone[ok],
+        comfort_ts=temp.ts[ok],
+        comfort_error=comfort_error,
+        flow_zone=flow.zone[f_ok],
+        flow_ts=flow.ts[f_ok],
+        flow_error=flow_error,
+        flow_within=np.abs(flow_error) <= np.abs(f_sp) * 0.1,
+        d_zone=damper.zone[d_ok],
+        d_ts=damper.ts[d_ok],
+        d_val=damper.values[d_ok],
+        d_flow=flow.values[m_flow[d_ok]],
+        d_sp=d_sp,
+        d_has_sp=has_sp,
+        r_zone=reheat.zone[r_ok],
+        r_ts=reheat.ts[r_ok],
+        r_hot=hot,
+    )
+
+
+def _empty_metrics(station: str, zone_root: str, info: Dict[str, Any]) -> ZoneHealthMetrics:
+    return ZoneHealthMetrics(
+        station=station,
+        zone_root=zone_root,
+        space_temp=info.get("space_temp"),
+        space_temp_sp=info.get("space_temp_sp"),
+        flow=info.get("flow"),
+        flow_sp=info.get("flow_sp"),
+        damper=info.get("damper"),
+        reheat=info.get("reheat"),
+        fan_cmd=info.get("fan_cmd"),
+        fan_status=info.get("fan_status"),
+    )
+
+
+def compute_building_health(
+    station: str,
+    zones: Dict[str, Dict[str, Any]],
+    comfort_cfg: ComfortConfig,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    tolerance_seconds: float = MERGE_TOLERANCE_SECONDS,
+) -> List[ZoneHealthMetrics]:
+    """
+    ZoneHealthMetrics for every zone in ``zones`` (zone_root -> zone_info,
+    e.g. get_zone_index().pairs[station]), in the same order, equal to
+    calling compute_zone_health() for each zone with the same tolerance.
+    """
+    if end is None:
+        end = datetime.utcnow()
+    if start is None:
+        start = end - timedelta(hours=24)
+
+    roots = list(zones)
+    infos = [zones[root] for root in roots]
+    nz = len(roots)
+    metrics = [_empty_metrics(station, root, info) for root, info in zip(roots, infos)]
+    if not nz:
+        return metrics
+
+    a = _align(station, infos, comfort_cfg, start, end, tolerance_seconds)
+    if a is None:
+        # Keys would overflow: split the station
+        half = nz // 2
+        first = dict(zip(roots[:half], infos[:half]))
+        second = dict(zip(roots[half:], infos[half:]))
+        return compute_building_health(
+            station, first, comfort_cfg, start, end, tolerance_seconds
+        ) + compute_building_health(station, second, comfort_cfg, start, end, tolerance_seconds)
+
+    col = a.col
+    temp, sp = col["space_temp"], col["space_temp_sp"]
+    flow, flow_sp = col["flow"], col["flow_sp"]
+    damper, reheat = col["damper"], col["reheat"]
+
+    comfort_n = np.bincount(a.comfort_zone, minlength=nz)
+    comfort_within = np.bincount(
+        a.comfort_zone[np.abs(a.comfort_error) <= comfort_cfg.comfort_band_degF], minlength=nz
+    )
+    comfort_mean = _means(a.comfort_zone, a.comfort_error, nz)
+
+    flow_n = np.bincount(a.flow_zone, minlength=nz)
+    flow_within = np.bincount(a.flow_zone[a.flow_within], minlength=nz)
+    flow_mean = _means(a.flow_zone, a.flow_error, nz)
+
+    d_zone, d_flow, d_sp = a.d_zone, a.d_flow, a.d_sp
+    d_total = np.bincount(d_zone, minlength=nz)
+    d_sp_n = np.bincount(d_zone[a.d_has_sp], minlength=nz)
+    use_sp = d_sp_n > 0
+    f_max = np.full(nz, -np.inf)
+    np.maximum.at(f_max, d_zone, d_flow)
+
+    high_open = a.d_val >= 80.0
+    closed = a.d_val <= 5.0
+    row_sp = use_sp[d_zone]
+    with np.errstate(invalid="ignore"):
+        low_flow = np.where(row_sp, d_flow < 0.5 * d_sp, d_flow < 0.3 * f_max[d_zone])
+        high_flow = np.where(row_sp, d_flow > 0.8 * d_sp, d_flow > 0.7 * f_max[d_zone])
+    counted = np.where(row_sp, a.d_has_sp, f_max[d_zone] > 0)
+    d_leak = np.bincount(d_zone[counted & high_open & low_flow], minlength=nz)
+    d_stuck = np.bincount(d_zone[counted & closed & high_flow], minlength=nz)
+    d_denom = np.where(use_sp, d_sp_n, d_total)
+
+    r_total = np.bincount(a.r_zone, minlength=nz)
+    r_hot = np.bincount(a.r_zone[a.r_hot], minlength=nz)
+
+    for z, mtr in enumerate(metrics):
+        if temp.present[z] and sp.present[z] and comfort_n[z]:
+            mtr.comfort_samples = int(comfort_n[z])
+            mtr.comfort_within_band_pct = kernels.pct(comfort_within[z], comfort_n[z])
+            mtr.comfort_mean_error_degF = comfort_mean[z]
+
+        if flow.present[z]:
+            if not flow_sp.present[z]:
+                mtr.flow_samples = int(flow.counts[z])
+            elif flow_n[z]:
+                mtr.flow_samples = int(flow_n[z])
+                mtr.flow_within_band_pct = kernels.pct(flow_within[z], flow_n[z])
+                mtr.mean_flow_error_cfm = flow_mean[z]
+
+        if damper.present[z] and flow.present[z] and d_total[z] and d_denom[z] > 0:
+            mtr.damper_high_open_low_flow_pct = kernels.pct(d_leak[z], d_denom[z])
+            mtr.damper_closed_high_flow_pct = kernels.pct(d_stuck[z], d_denom[z])
+
+        if reheat.present[z] and temp.present[z] and sp.present[z] and r_total[z]:
+            mtr.reheat_waste_pct = kernels.pct(r_hot[z], r_total[z])
+
+        mtr.overall_score = _compute_overall_score(mtr)
+        _derive_status_and_reasons(mtr)
+
+    return metrics
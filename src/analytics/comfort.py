@@ -1,7 +1,9 @@
 from datetime import time
+import numpy as np
 import pandas as pd
 
 from ..config import ComfortConfig
+from . import kernels
 
 
 def _parse_time(s: str) -> time:
@@ -29,31 +31,30 @@ def compute_zone_comfort(
     sp_col = c.setpoint_column
     t_col = c.temp_column
 
-    df = df.copy()
-    df["__time"] = df[ts_col].dt.time
+    ts = df[ts_col]
+    if getattr(ts.dt, "tz", None) is not None:
+        # Occupied hours are wall-clock times
+        ts = ts.dt.tz_localize(None)
 
     occ_start = _parse_time(c.occupied_start)
     occ_end = _parse_time(c.occupied_end)
 
-    occupied = df[(df["__time"] >= occ_start) & (df["__time"] <= occ_end)]
+    occupied = kernels.time_of_day_mask(kernels.to_ns(ts), occ_start, occ_end)
 
-    if occupied.empty:
+    if not occupied.any():
         return {
             "samples": 0,
             "within_band_pct": None,
             "mean_error_degF": None,
         }
 
-    occupied["error"] = occupied[t_col] - occupied[sp_col]
-    occupied["abs_error"] = occupied["error"].abs()
-
-    total = len(occupied)
-    within_band = (occupied["abs_error"] <= c.comfort_band_degF).sum()
-    within_band_pct = within_band / total * 100.0
-    mean_error = occupied["error"].mean()
+    error = (
+        df[t_col].to_numpy(dtype=np.float64)[occupied]
+        - df[sp_col].to_numpy(dtype=np.float64)[occupied]
+    )
 
     return {
-        "samples": int(total),
-        "within_band_pct": float(within_band_pct),
-        "mean_error_degF": float(mean_error),
+        "samples": int(len(error)),
+        "within_band_pct": kernels.band_pct(error, c.comfort_band_degF),
+        "mean_error_degF": kernels.mean(error),
     }
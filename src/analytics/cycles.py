@@ -0,0 +1,165 @@
+# src/analytics/cycles.py
+"""
+On/off cycle segmentation for fan and compressor status series.
+
+segment_cycles() splits a sorted on/off series into runs at array speed
+(kernels.run_lengths) and returns every ON and OFF interval:
+
+    seg = segment_cycles(ts_ns, values > 0.5)
+    seg.on_periods().duration_s      # each ON interval, seconds
+
+An interval starts at the first sample of a run and ends at the first
+sample of the next run, so it includes the time until the state change
+was seen. The last interval ends at the last sample and is still open
+(closed=False); the first one may have started before the window.
+
+cycle_stats() derives what RTU / fleet analytics report: ON%, runtime
+hours, starts per hour and short cycles (closed ON intervals shorter
+than min_cycle_minutes). grouped_cycle_stats() does the same for many
+units' series concatenated into one set of arrays.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import kernels
+
+_HOUR_NS = 3_600 * 1_000_000_000
+
+
+@dataclass(frozen=True)
+class CycleSegments:
+    """Consecutive runs of on/off series (parallel arrays, time order per group)."""
+
+    start_ns: np.ndarray   # int64, first sample of the run
+    end_ns: np.ndarray     # int64, first sample of the next run (last sample for a group's final run)
+    on: np.ndarray         # bool, state during the run
+    closed: np.ndarray     # bool, False for a group's final run (state unchanged at window end)
+    group: np.ndarray      # int64, series the run belongs to (all 0 for a single series)
+
+    def __len__(self) -> int:
+        return len(self.start_ns)
+
+    @property
+    def duration_ns(self) -> np.ndarray:
+        return self.end_ns - self.start_ns
+
+    @property
+    def duration_s(self) -> np.ndarray:
+        return self.duration_ns / 1e9
+
+    def select(self, mask: np.ndarray) -> "CycleSegments":
+        return CycleSegments(
+            self.start_ns[mask], self.end_ns[mask], self.on[mask], self.closed[mask], self.group[mask]
+        )
+
+    def on_periods(self) -> "CycleSegments":
+        return self.select(self.on)
+
+    def off_periods(self) -> "CycleSegments":
+        return self.select(~self.on)
+
+
+def segment_cycles(
+    ts_ns: np.ndarray,
+    on: np.ndarray,
+    group: Optional[np.ndarray] = None,
+) -> CycleSegments:
+    """
+    Split on/off series into their ON and OFF intervals. ``group`` labels
+    the series of each sample when several are concatenated (each
+    series' samples contiguous and time-sorted); runs never cross series.
+    """
+    if group is None:
+        group = np.zeros(len(ts_ns), dtype=np.int64)
+    starts, lengths, state = kernels.run_lengths(np.asarray(on, dtype=bool), group)
+    run_group = group[starts]
+    # A run ends where the next one starts; a series' last run at its last sample
+    last = np.r_[run_group[1:] != run_group[:-1], True] if len(starts) else np.empty(0, dtype=bool)
+    end_idx = np.where(last, starts + lengths - 1, starts + lengths)
+    return CycleSegments(ts_ns[starts], ts_ns[end_idx], state, ~last, run_group)
+
+
+def series_on_off(df: pd.DataFrame, threshold: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (timestamp ns, ON) arrays of a [timestamp, value] frame in time order;
+    value > threshold is ON.
+    """
+    ts = kernels.to_ns(df["timestamp"])
+    values = df["value"].to_numpy(dtype=np.float64)
+    order = kernels.sort_order(ts)
+    return ts[order], values[order] > threshold
+
+
+@dataclass
+class CycleStats:
+    samples: int = 0
+    on_pct: Optional[float] = None
+    # Total ON time, including an ON run still open at the window end
+    runtime_hours: Optional[float] = None
+    # OFF -> ON transitions seen in the window
+    starts: int = 0
+    starts_per_hour: Optional[float] = None
+    short_cycle_count: Optional[int] = None
+
+
+def grouped_cycle_stats(
+    ts_ns: np.ndarray,
+    on: np.ndarray,
+    group: np.ndarray,
+    groups: int,
+    min_cycle_minutes: float = 10.0,
+) -> List[CycleStats]:
+    """
+    cycle_stats() for ``groups`` concatenated series at once (``group`` as
+    for segment_cycles, values 0..groups-1); series without samples get
+    an empty CycleStats.
+    """
+    seg = segment_cycles(ts_ns, on, group)
+    on_seg = seg.on_periods()
+    short = on_seg.closed & (on_seg.duration_s / 60.0 < min_cycle_minutes)
+
+    samples = np.bincount(group, minlength=groups)
+    on_samples = np.bincount(group[np.asarray(on, dtype=bool)], minlength=groups)
+    # OFF -> ON: ON runs that are not their series' first run
+    first = np.r_[True, seg.group[1:] != seg.group[:-1]] if len(seg) else np.empty(0, dtype=bool)
+    starts = np.bincount(seg.group[seg.on & ~first], minlength=groups)
+    shorts = np.bincount(on_seg.group[short], minlength=groups)
+    runtime_ns = np.zeros(groups, dtype=np.int64)
+    np.add.at(runtime_ns, on_seg.group, on_seg.duration_ns)
+    edges = np.searchsorted(group, np.arange(groups + 1))
+
+    out: List[CycleStats] = []
+    for g in range(groups):
+        n = int(samples[g])
+        if not n:
+            out.append(CycleStats())
+            continue
+        span_hours = (int(ts_ns[edges[g + 1] - 1]) - int(ts_ns[edges[g]])) / _HOUR_NS
+        out.append(
+            CycleStats(
+                samples=n,
+                on_pct=kernels.pct(on_samples[g], n),
+                runtime_hours=int(runtime_ns[g]) / _HOUR_NS,
+                starts=int(starts[g]),
+                starts_per_hour=int(starts[g]) / span_hours if span_hours > 0 else None,
+                short_cycle_count=int(shorts[g]),
+            )
+        )
+    return out
+
+
+def cycle_stats(
+    ts_ns: np.ndarray,
+    on: np.ndarray,
+    min_cycle_minutes: float = 10.0,
+) -> CycleStats:
+    """Runtime, starts and short-cycling of a time-sorted on/off series."""
+    if len(on) == 0:
+        return CycleStats()
+    group = np.zeros(len(on), dtype=np.int64)
+    return grouped_cycle_stats(ts_ns, on, group, 1, min_cycle_minutes)[0]
@@ -3,10 +3,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+from . import kernels
+
 
 @dataclass
 class FlowTrackingConfig:
@@ -48,11 +51,9 @@ def compute_flow_tracking(
         }
 
     # Normalise timestamps
-    df_flow = df_flow.copy()
-    if not pd.api.types.is_datetime64_any_dtype(df_flow[t_col]):
-        df_flow[t_col] = pd.to_datetime(df_flow[t_col])
-
-    df_flow = df_flow.sort_values(t_col).rename(columns={v_col: "flow"})
+    ts_flow = df_flow[t_col]
+    if not pd.api.types.is_datetime64_any_dtype(ts_flow):
+        ts_flow = pd.to_datetime(ts_flow)
 
     if df_flow_sp is None or df_flow_sp.empty:
         # No setpoint available; we cannot compute tracking.
@@ -63,24 +64,41 @@ def compute_flow_tracking(
             "mean_error_pct": None,
         }
 
-    df_sp = df_flow_sp.copy()
-    if not pd.api.types.is_datetime64_any_dtype(df_sp[t_col]):
-        df_sp[t_col] = pd.to_datetime(df_sp[t_col])
+    ts_sp = df_flow_sp[t_col]
+    if not pd.api.types.is_datetime64_any_dtype(ts_sp):
+        ts_sp = pd.to_datetime(ts_sp)
 
-    df_sp = df_sp.sort_values(t_col).rename(columns={v_col: "flow_sp"})
+    flow_ns, flow = _sorted_arrays(ts_flow, df_flow[v_col])
+    sp_ns, sp = _sorted_arrays(ts_sp, df_flow_sp[v_col])
 
-    # Align using merge_asof (nearest neighbor within tolerance)
-    merged = pd.merge_asof(
-        df_flow,
-        df_sp,
-        on=t_col,
-        direction="nearest",
-        tolerance=pd.Timedelta(seconds=cfg.merge_tolerance_seconds),
+    # Align: nearest setpoint within tolerance (merge_asof "nearest")
+    flow_sp = kernels.asof_nearest(
+        flow_ns, sp_ns, sp, kernels.seconds_to_ns(cfg.merge_tolerance_seconds)
     )
 
     # Drop rows where we failed to find a setpoint
-    merged = merged.dropna(subset=["flow_sp"])
-    if merged.empty:
+    matched = ~np.isnan(flow_sp)
+    return flow_tracking_arrays(flow[matched], flow_sp[matched], cfg)
+
+
+def _sorted_arrays(ts: pd.Series, values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    ts_ns = kernels.to_ns(ts)
+    v = values.to_numpy(dtype=np.float64)
+    order = kernels.sort_order(ts_ns)
+    return ts_ns[order], v[order]
+
+
+def flow_tracking_arrays(
+    flow: np.ndarray,
+    flow_sp: np.ndarray,
+    cfg: FlowTrackingConfig,
+) -> dict:
+    """
+    Tracking metrics from flow samples already aligned with their setpoint
+    (equal-length arrays, no missing setpoints), e.g. the flow rows of
+    zone_health.align_zone_frame().
+    """
+    if len(flow) == 0:
         return {
             "samples": 0,
             "within_band_pct": None,
@@ -88,31 +106,22 @@ def compute_flow_tracking(
             "mean_error_pct": None,
         }
 
-    merged["error_cfm"] = merged["flow"] - merged["flow_sp"]
-    merged["error_pct"] = merged["error_cfm"] / merged["flow_sp"].where(
-        merged["flow_sp"] != 0, pd.NA
-    )
+    error_cfm = flow - flow_sp
+    with np.errstate(invalid="ignore"):
+        error_pct = error_cfm / np.where(flow_sp != 0, flow_sp, np.nan)
 
     # Tolerance: max(abs_cfm_tol, pct_tol * setpoint)
-    pct_tol = cfg.pct_tolerance
+    tol_cfm = np.abs(flow_sp) * cfg.pct_tolerance
     if cfg.abs_cfm_tolerance is not None:
-        tol_cfm = merged["flow_sp"].abs() * pct_tol
-        tol_cfm = tol_cfm.clip(lower=cfg.abs_cfm_tolerance)
-    else:
-        tol_cfm = merged["flow_sp"].abs() * pct_tol
-
-    merged["within_band"] = merged["error_cfm"].abs() <= tol_cfm
+        tol_cfm = np.maximum(tol_cfm, cfg.abs_cfm_tolerance)
 
-    samples = int(len(merged))
-    within_band_pct = float(merged["within_band"].mean() * 100.0)
-    mean_error_cfm = float(merged["error_cfm"].mean())
     # Mean of absolute error percentage (ignore rows where setpoint==0)
-    error_pct_valid = merged["error_pct"].dropna()
-    mean_error_pct = float(error_pct_valid.abs().mean() * 100.0) if not error_pct_valid.empty else None
+    error_pct_valid = error_pct[~np.isnan(error_pct)]
+    mean_abs_pct = kernels.mean(np.abs(error_pct_valid))
 
     return {
-        "samples": samples,
-        "within_band_pct": within_band_pct,
-        "mean_error_cfm": mean_error_cfm,
-        "mean_error_pct": mean_error_pct,
+        "samples": int(len(flow)),
+        "within_band_pct": kernels.band_pct(error_cfm, tol_cfm),
+        "mean_error_cfm": kernels.mean(error_cfm),
+        "mean_error_pct": mean_abs_pct * 100.0 if mean_abs_pct is not None else None,
     }
@@ -0,0 +1,193 @@
+# src/analytics/kernels.py
+"""
+NumPy kernels shared by the comfort, flow, zone health and RTU metrics.
+
+Every function works on plain aligned arrays (timestamps as int64
+nanoseconds, values as float64, states as bool) so the metric modules
+can skip DataFrame copies, temporary columns and boolean-mask indexing
+on what are usually a few thousand samples.
+
+Results are bit-for-bit what the pandas code they replaced returned:
+means skip NaN the way Series.mean() does, percentages divide the same
+integer counts, and nearest_indexer() picks the rows
+pd.merge_asof(direction="nearest", tolerance=...) would.
+"""
+from __future__ import annotations
+
+from datetime import time
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+_DAY_NS = 86_400 * 1_000_000_000
+_SECOND_NS = 1_000_000_000
+_NAT = np.iinfo(np.int64).min
+
+
+# ---------------------------------------------------------------------------
+# Timestamps
+# ---------------------------------------------------------------------------
+
+
+def to_ns(ts: Any) -> np.ndarray:
+    """
+    int64 nanoseconds for datetime-like input (Series, Index, array).
+    Naive timestamps are taken as they are, tz-aware ones as UTC.
+    """
+    return np.asarray(ts, dtype="datetime64[ns]").view(np.int64)
+
+
+def seconds_to_ns(seconds: float) -> int:
+    return int(round(seconds * _SECOND_NS))
+
+
+def time_of_day_mask(ts_ns: np.ndarray, start: time, end: time) -> np.ndarray:
+    """
+    start <= time-of-day <= end, inclusive at both ends like comparing
+    Series.dt.time against datetime.time (microsecond resolution).
+    NaT is never inside the window.
+    """
+    lo = ((start.hour * 60 + start.minute) * 60 + start.second) * _SECOND_NS + start.microsecond * 1000
+    hi = ((end.hour * 60 + end.minute) * 60 + end.second) * _SECOND_NS + end.microsecond * 1000
+    tod = ts_ns % _DAY_NS
+    tod -= tod % 1000
+    return (tod >= lo) & (tod <= hi) & (ts_ns != _NAT)
+
+
+def sort_order(ts_ns: np.ndarray) -> np.ndarray:
+    """
+    Row order by timestamp; equal timestamps keep their input order (a
+    stable sort, like zone_health._query_series_df), so every path that
+    loads the same rows orders ties the same way.
+    """
+    return np.argsort(ts_ns, kind="stable")
+
+
+# ---------------------------------------------------------------------------
+# Alignment
+# ---------------------------------------------------------------------------
+
+
+def _searchsorted_sorted(right_ns: np.ndarray, left_ns: np.ndarray, side: str) -> np.ndarray:
+    """
+    np.searchsorted(right_ns, left_ns, side) for sorted ``left_ns``. When
+    right is the shorter array it is cheaper to place right into left and
+    count: #right < left[i] is the number of right rows whose
+    searchsorted(left, side="right") position is <= i (mirrored for
+    side="right").
+    """
+    if len(right_ns) >= len(left_ns):
+        return np.searchsorted(right_ns, left_ns, side=side)
+    pos = np.searchsorted(left_ns, right_ns, side="right" if side == "left" else "left")
+    return np.cumsum(np.bincount(pos, minlength=len(left_ns) + 1)[: len(left_ns)])
+
+
+def nearest_indexer(left_ns: np.ndarray, right_ns: np.ndarray, tolerance_ns: int) -> np.ndarray:
+    """
+    For each (sorted) left timestamp, the row of the (sorted) right
+    timestamps that pd.merge_asof(direction="nearest", tolerance=...)
+    would pick, or -1. Ties go to the earlier right row, as in pandas.
+    """
+    n = len(right_ns)
+    if n == 0 or len(left_ns) == 0:
+        return np.full(len(left_ns), -1, dtype=np.int64)
+    fwd = _searchsorted_sorted(right_ns, left_ns, "left")
+    fwd_ts = right_ns[np.minimum(fwd, n - 1)]
+    # The last right row <= left sits just before fwd, unless fwd is an
+    # exact match: then it is the last of the equal timestamps
+    back = fwd - 1
+    exact = np.flatnonzero(fwd_ts == left_ns)
+    if len(exact):
+        back[exact] = np.searchsorted(right_ns, left_ns[exact], side="right") - 1
+    back_diff = left_ns - right_ns[np.maximum(back, 0)]
+    fwd_diff = fwd_ts - left_ns
+    back_ok = (back >= 0) & (back_diff <= tolerance_ns)
+    fwd_ok = (fwd < n) & (fwd_diff <= tolerance_ns)
+    out = np.where(back_ok, back, np.where(fwd_ok, fwd, -1))
+    return np.where(back_ok & fwd_ok, np.where(back_diff <= fwd_diff, back, fwd), out)
+
+
+def take_nearest(values: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """values[idx] with NaN where idx is -1 (no match)."""
+    if len(values) == 0:
+        return np.full(len(idx), np.nan)
+    return np.where(idx >= 0, values[np.maximum(idx, 0)], np.nan)
+
+
+def asof_nearest(
+    left_ns: np.ndarray,
+    right_ns: np.ndarray,
+    right_values: np.ndarray,
+    tolerance_ns: int,
+) -> np.ndarray:
+    """The right value merge_asof(direction="nearest") attaches to each left row."""
+    return take_nearest(right_values, nearest_indexer(left_ns, right_ns, tolerance_ns))
+
+
+# ---------------------------------------------------------------------------
+# Reductions
+# ---------------------------------------------------------------------------
+
+
+def mean(values: np.ndarray) -> Optional[float]:
+    """
+    NaN-skipping mean, summed exactly as Series.mean() does (NaN entries
+    count as 0.0 in the sum); None for no values, NaN if all are NaN.
+    """
+    n = len(values)
+    if n == 0:
+        return None
+    nan = np.isnan(values)
+    count = n - int(np.count_nonzero(nan))
+    if count == n:
+        return float(values.sum() / count)
+    if count == 0:
+        return float("nan")
+    return float(np.where(nan, 0.0, values).sum() / count)
+
+
+def pct(count: Any, total: Any) -> float:
+    """count / total as a percentage (integer counts, as the pandas sums were)."""
+    return float(np.int64(count) / total * 100.0)
+
+
+def fraction_pct(mask: np.ndarray) -> Optional[float]:
+    """Share of True entries, in percent; None for an empty mask."""
+    n = len(mask)
+    return pct(np.count_nonzero(mask), n) if n else None
+
+
+def band_pct(error: np.ndarray, band: Any) -> Optional[float]:
+    """Share of |error| <= band (scalar or per-sample), in percent; NaN errors count as outside."""
+    return fraction_pct(np.abs(error) <= band)
+
+
+def threshold_pct(values: np.ndarray, threshold: float) -> Optional[float]:
+    """Share of values above ``threshold``, in percent; NaN counts as not above."""
+    return fraction_pct(values > threshold)
+
+
+# ---------------------------------------------------------------------------
+# Run lengths
+# ---------------------------------------------------------------------------
+
+
+def run_lengths(
+    state: np.ndarray, group: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Runs of equal consecutive values: (start index, length, value) per run.
+    With ``group`` (same length, grouped rows contiguous) runs also break
+    where the group changes. cycles.segment_cycles() builds ON/OFF
+    intervals on top of this.
+    """
+    n = len(state)
+    if n == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, state[:0]
+    change = state[1:] != state[:-1]
+    if group is not None:
+        change |= group[1:] != group[:-1]
+    starts = np.flatnonzero(np.r_[True, change])
+    lengths = np.diff(np.r_[starts, n])
+    return starts, lengths, state[starts]
@@ -0,0 +1,213 @@
+# src/analytics/result_cache.py
+"""
+Bounded LRU cache of zone / RTU health results per time window.
+
+A rolling window ending at datetime.utcnow() is unique per request, so
+summary endpoints snap their window with snap_window(): the end is
+rounded UP to the next bucket boundary and the start is ``hours`` before
+it. Every request within one bucket then asks for the same window and
+the window still covers the newest samples.
+
+Entries are keyed by (kind, station, zone, start, end) and remember the
+(station, history_id) series they were computed from. sqlite_store
+reports every series that receives samples; entries reading one of those
+series are dropped, all others stay valid. Each entry also keeps the
+zone dict (or station zone map) it was computed for: the zone index
+publishes a new one when a zone's series or roles change, so a cached
+result for the old zone layout is never returned.
+
+    cache = ResultCache(max_entries=1024)
+    sqlite_store.add_sample_listener(cache.invalidate_series)
+    start, end = snap_window(24, bucket_seconds=60)
+    metrics = cache.get_or_compute(
+        ("zone_health", station, zone, start, end),
+        zone_info,
+        zone_series(station, [zone_info]),
+        lambda: compute_zone_health(...),
+    )
+
+Cached values are shared between callers and must be treated as read-only.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, List, Optional, Set, Tuple
+
+from ..store import sqlite_store
+from .rtu import RTU_ROLES
+from .zone_pairs import ZONE_ROLES
+
+SeriesKey = Tuple[str, str]
+
+_EPOCH = datetime(1970, 1, 1)
+_SERIES_ROLES = tuple(dict.fromkeys(ZONE_ROLES + RTU_ROLES))
+
+
+def snap_window(
+    hours: float,
+    bucket_seconds: float,
+    now: Optional[datetime] = None,
+) -> Tuple[datetime, datetime]:
+    """
+    (start, end) of the last ``hours`` with ``end`` rounded up to a
+    multiple of ``bucket_seconds`` since the epoch (naive UTC, like
+    datetime.utcnow()). bucket_seconds <= 0 leaves ``now`` as the end.
+    """
+    if now is None:
+        now = datetime.utcnow()
+    bucket_us = int(round(bucket_seconds * 1_000_000))
+    end = now
+    if bucket_us > 0:
+        us = (now - _EPOCH) // timedelta(microseconds=1)
+        end = _EPOCH + timedelta(microseconds=-(-us // bucket_us) * bucket_us)
+    return end - timedelta(hours=hours), end
+
+
+def zone_series(station: str, zone_infos: Iterable[Dict[str, Any]]) -> FrozenSet[SeriesKey]:
+    """(station, history_id) of every role series wired to the given zones."""
+    return frozenset(
+        (station, info[role]) for info in zone_infos for role in _SERIES_ROLES if info.get(role)
+    )
+
+
+@dataclass
+class ResultCacheStats:
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0            # misses on an entry whose zone layout changed
+    invalidations: int = 0    # entries dropped because their series got samples
+    discarded: int = 0        # results not stored: samples arrived while computing
+    evictions: int = 0
+    entries: int = 0
+    hit_rate: Optional[float] = None
+
+
+@dataclass
+class _Entry:
+    value: Any
+    scope: Any
+    series: FrozenSet[SeriesKey]
+
+
+@dataclass(eq=False)
+class _Pending:
+    series: FrozenSet[SeriesKey]
+    invalidated: bool = False
+
+
+class ResultCache:
+    """
+    Thread-safe window result cache with per-series invalidation (see
+    module docstring). max_entries <= 0 disables caching.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self.stats = ResultCacheStats()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._by_series: Dict[SeriesKey, Set[Hashable]] = {}
+        self._pending: List[_Pending] = []
+        self._generation = sqlite_store.generation()
+        self._lock = threading.Lock()
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        scope: Any,
+        series: FrozenSet[SeriesKey],
+        compute: Callable[[], Any],
+    ) -> Any:
+        """
+        Cached value for ``key`` if it was computed for the same ``scope``
+        object (compared by identity) and none of ``series`` received
+        samples since; otherwise compute() (outside the lock) and store
+        the result.
+        """
+        if self.max_entries <= 0:
+            return compute()
+
+        with self._lock:
+            self._check_generation()
+            entry = self._entries.get(key)
+            if entry is not None and entry.scope is scope:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry.value
+            if entry is not None:
+                self._drop(key)
+                self.stats.stale += 1
+            self.stats.misses += 1
+            pending = _Pending(series)
+            self._pending.append(pending)
+
+        try:
+            value = compute()
+        except BaseException:
+            with self._lock:
+                self._pending.remove(pending)
+            raise
+
+        with self._lock:
+            self._pending.remove(pending)
+            if pending.invalidated:
+                self.stats.discarded += 1
+                return value
+            self._drop(key)
+            self._entries[key] = _Entry(value, scope, series)
+            for s in series:
+                self._by_series.setdefault(s, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.stats.evictions += 1
+        return value
+
+    def invalidate_series(self, keys: Iterable[SeriesKey]) -> None:
+        """Drop every entry computed from one of ``keys`` (sqlite_store sample listener)."""
+        with self._lock:
+            keys = set(keys)
+            for pending in self._pending:
+                if not pending.invalidated and not pending.series.isdisjoint(keys):
+                    pending.invalidated = True
+            for s in keys:
+                for key in list(self._by_series.get(s, ())):
+                    self._drop(key)
+                    self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_series.clear()
+
+    def snapshot_stats(self) -> ResultCacheStats:
+        with self._lock:
+            stats = ResultCacheStats(**vars(self.stats))
+            stats.entries = len(self._entries)
+            lookups = stats.hits + stats.misses
+            stats.hit_rate = stats.hits / lookups if lookups else None
+            return stats
+
+    # ------------------------------------------------------------------
+    # Internals (lock held)
+    # ------------------------------------------------------------------
+
+    def _check_generation(self) -> None:
+        # sqlite_store.init() opened a new database: nothing cached applies
+        generation = sqlite_store.generation()
+        if generation != self._generation:
+            self._entries.clear()
+            self._by_series.clear()
+            self._generation = generation
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for s in entry.series:
+            keys = self._by_series.get(s)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_series[s]
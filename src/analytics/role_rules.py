@@ -1,12 +1,14 @@
 # src/analytics/role_rules.py
 from __future__ import annotations
 
+import hashlib
 import json
 import re
-from dataclasses import dataclass
-from functools import lru_cache
+import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Pattern, Sequence, Set, Tuple
 
 
 # ---------------------------------------------------------------------------
@@ -22,6 +24,16 @@ class RoleRule:
     tags_any: List[str]
     priority: int = 100  # lower = stronger
 
+    # Normalised / compiled forms, built once in __post_init__
+    required_tags: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    any_tags: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    patterns: List[Pattern[str]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.required_tags = frozenset(str(t).lower() for t in self.tags_all)
+        self.any_tags = frozenset(str(t).lower() for t in self.tags_any)
+        self.patterns = [re.compile(pat) for pat in self.name_regex]
+
     def matches(self, label: str, tags: Optional[Set[str]]) -> bool:
         """
         Check whether this rule matches a given label + tag set.
@@ -37,25 +49,145 @@ class RoleRule:
             tag_set = {str(t).lower() for t in tags}
 
         # tags_all: all required tags must be present
-        if self.tags_all:
-            required = {str(t).lower() for t in self.tags_all}
-            if not required.issubset(tag_set):
-                return False
+        if self.required_tags and not self.required_tags.issubset(tag_set):
+            return False
 
         # tags_any: at least one tag must be present (if specified)
-        if self.tags_any:
-            any_required = {str(t).lower() for t in self.tags_any}
-            if not (tag_set & any_required):
-                return False
+        if self.any_tags and not (tag_set & self.any_tags):
+            return False
 
         # name_regex: at least one must match (if specified)
-        if self.name_regex:
-            return any(re.search(pat, s) for pat in self.name_regex)
+        if self.patterns:
+            return any(p.search(s) for p in self.patterns)
 
         # If no name_regex, tags were enough
         return True
 
 
+# ---------------------------------------------------------------------------
+# Compiled rule set
+# ---------------------------------------------------------------------------
+
+# Backreferences are numbered / named relative to the whole pattern, so
+# they would break once a pattern is merged into a larger alternation.
+_BACKREF = re.compile(r"\\[1-9]|\(\?P=")
+
+
+class RoleRuleEngine:
+    """
+    A rule list compiled for fast repeated infer() calls.
+
+    - Rules are sorted by (priority, file order) once, so the first rule
+      that matches is the answer (same tie-break as the original linear
+      scan: the earlier rule wins on equal priority).
+    - Every tag that appears in any rule gets a bit; tags_all / tags_any
+      become masks, and the rules whose tag conditions pass are looked up
+      per distinct input mask and memoised.
+    - Each rule's name_regex list is merged into one alternation, and all
+      patterns of all rules into a single combined one: one search rejects
+      every name-based rule at once for labels nothing matches.
+
+    (Named groups in the combined pattern would identify the matching
+    rule directly, but they defeat CPython's alternation fast paths and
+    made the search ~8x slower than this non-capturing form.)
+    """
+
+    def __init__(self, rules: Sequence[RoleRule]) -> None:
+        order = sorted(range(len(rules)), key=lambda i: (rules[i].priority, i))
+        self.rules: List[RoleRule] = [rules[i] for i in order]
+
+        tags = sorted({t for r in self.rules for t in r.required_tags | r.any_tags})
+        self.tag_bits: Dict[str, int] = {t: 1 << i for i, t in enumerate(tags)}
+
+        self._masks: List[Tuple[int, int]] = [
+            (self._mask(r.required_tags), self._mask(r.any_tags)) for r in self.rules
+        ]
+        # Per rule: its name patterns as one alternation (None = no name condition)
+        self._rule_names: List[Optional[Pattern[str]]] = [
+            _merge(rule) if rule.patterns else None for rule in self.rules
+        ]
+        # Every name pattern of every rule, for the one-search reject
+        self._combined: Optional[Pattern[str]] = None
+        all_patterns = [p for r in self.rules for p in r.name_regex]
+        if all_patterns and not any(_BACKREF.search(p) for p in all_patterns):
+            try:
+                self._combined = re.compile("|".join(f"(?:{p})" for p in all_patterns))
+            except re.error:
+                self._combined = None
+        self._candidates: Dict[int, List[int]] = {}
+
+    def _mask(self, tags: Iterable[str]) -> int:
+        bits = self.tag_bits
+        mask = 0
+        for t in tags:
+            mask |= bits.get(t, 0)
+        return mask
+
+    def _candidates_for(self, mask: int) -> List[int]:
+        found = self._candidates.get(mask)
+        if found is None:
+            found = [
+                idx
+                for idx, (all_mask, any_mask) in enumerate(self._masks)
+                if all_mask & mask == all_mask and (not any_mask or any_mask & mask)
+            ]
+            self._candidates[mask] = found
+        return found
+
+    def infer(self, label: str, tags: Optional[Iterable[Any]] = None) -> Optional[str]:
+        mask = self._mask(str(t).lower() for t in tags) if tags else 0
+        candidates = self._candidates_for(mask)
+        if not candidates:
+            return None
+
+        s = (label or "").lower()
+        searched = False
+        for idx in candidates:
+            names = self._rule_names[idx]
+            if names is None:
+                return self.rules[idx].role
+            if not searched and self._combined is not None:
+                searched = True
+                if self._combined.search(s) is None:
+                    # No name pattern matches this label at all; only
+                    # tag-only rules further down can still apply.
+                    return self._first_tag_only(candidates, idx)
+            if names.search(s):
+                return self.rules[idx].role
+        return None
+
+    def _first_tag_only(self, candidates: List[int], start: int) -> Optional[str]:
+        for idx in candidates:
+            if idx > start and self._rule_names[idx] is None:
+                return self.rules[idx].role
+        return None
+
+
+def _merge(rule: RoleRule) -> Pattern[str]:
+    if len(rule.patterns) == 1:
+        return rule.patterns[0]
+    if any(_BACKREF.search(p) for p in rule.name_regex):
+        return _AnyOf(rule.patterns)  # type: ignore[return-value]
+    try:
+        return re.compile("|".join(f"(?:{p})" for p in rule.name_regex))
+    except re.error:
+        return _AnyOf(rule.patterns)  # type: ignore[return-value]
+
+
+class _AnyOf:
+    """Fallback for patterns that cannot share one regex (e.g. inline flags)."""
+
+    def __init__(self, patterns: List[Pattern[str]]) -> None:
+        self._patterns = patterns
+
+    def search(self, s: str) -> Any:
+        for p in self._patterns:
+            m = p.search(s)
+            if m:
+                return m
+        return None
+
+
 # ---------------------------------------------------------------------------
 # Default rules – tag-first, name-fallback
 #
@@ -390,28 +522,181 @@ def _default_rules() -> List[RoleRule]:
     return rules
 
 
-@lru_cache(maxsize=1)
-def get_rules() -> List[RoleRule]:
+def _rules_path() -> Path:
+    return Path(__file__).resolve().parents[2] / "config" / "role_rules.json"
+
+
+def _file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _fingerprint(rules: Sequence[RoleRule]) -> str:
+    spec = [(r.role, r.priority, r.name_regex, r.tags_all, r.tags_any) for r in rules]
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+# ---------------------------------------------------------------------------
+# Loaded rule set, memo and hot reload
+# ---------------------------------------------------------------------------
+
+# How often (seconds) get_rules()/infer_role() stat role_rules.json
+RELOAD_CHECK_SECONDS = 2.0
+
+# Distinct (label, tags) results kept; cleared wholesale beyond this
+_MEMO_MAX = 200_000
+
+MemoKey = Tuple[str, FrozenSet[str]]
+
+# Called after a reload with the memo keys whose role changed
+RulesListener = Callable[[Dict[MemoKey, Tuple[Optional[str], Optional[str]]]], None]
+
+_reload_lock = threading.RLock()
+_rules: Optional[List[RoleRule]] = None
+_engine: Optional[RoleRuleEngine] = None
+_rules_fp: str = ""
+_rules_version: int = 0
+_stamp: Optional[Tuple[int, int]] = None
+_checked_at: float = float("-inf")
+_memo: Dict[MemoKey, Optional[str]] = {}
+_listeners: List[RulesListener] = []
+
+
+def _read_rules(path: Path, previous: Optional[List[RoleRule]]) -> List[RoleRule]:
     """
     Load role rules from config/role_rules.json if present; otherwise
     fall back to built-in defaults.
-    """
-    here = Path(__file__).resolve()
-    project_root = here.parents[2]
-    cfg_path = project_root / "config" / "role_rules.json"
 
+    On a hot reload (``previous`` set) a file that fails to parse keeps
+    the previous rules, so saving a half-edited file does not reclassify
+    every point.
+    """
     try:
-        rules = _load_rules_from_file(cfg_path)
-        print(f"[role_rules] Loaded {len(rules)} rules from {cfg_path}")
+        rules = _load_rules_from_file(path)
+        print(f"[role_rules] Loaded {len(rules)} rules from {path}")
         return rules
     except FileNotFoundError:
-        print(f"[role_rules] No role_rules.json at {cfg_path}, using built-in defaults")
+        print(f"[role_rules] No role_rules.json at {path}, using built-in defaults")
     except Exception as e:  # noqa: BLE001
+        if previous is not None:
+            print(f"[role_rules] Failed to reload role_rules.json: {e}, keeping current rules")
+            return previous
         print(f"[role_rules] Failed to load role_rules.json: {e}, using defaults")
 
     return _default_rules()
 
 
+def memo_key(label: str, tags: Optional[Iterable[Any]] = None) -> MemoKey:
+    """Normalised (label, tag set) key that infer_role memoizes on."""
+    return ((label or "").lower(), frozenset(str(t).lower() for t in tags) if tags else frozenset())
+
+
+def check_for_update(force: bool = False) -> bool:
+    """
+    Reload config/role_rules.json if it changed on disk (checked at most
+    every RELOAD_CHECK_SECONDS unless ``force``).
+
+    On a reload every memoized (label, tags) pair is re-classified with
+    the new engine and listeners get the pairs whose role changed.
+    Returns True when a new rule set was installed.
+    """
+    global _rules, _engine, _rules_fp, _rules_version, _stamp, _checked_at, _memo
+
+    now = time.monotonic()
+    if not force and _rules is not None and now - _checked_at < RELOAD_CHECK_SECONDS:
+        return False
+
+    with _reload_lock:
+        if not force and _rules is not None and now - _checked_at < RELOAD_CHECK_SECONDS:
+            return False
+        _checked_at = now
+        path = _rules_path()
+        stamp = _file_stamp(path)
+        if not force and _rules is not None and stamp == _stamp:
+            return False
+
+        first = _rules is None
+        rules = _read_rules(path, _rules)
+        _stamp = stamp
+        fp = _fingerprint(rules)
+        if fp == _rules_fp:
+            # Touched or rewritten with the same rules
+            return False
+
+        engine = RoleRuleEngine(rules)
+        changed: Dict[MemoKey, Tuple[Optional[str], Optional[str]]] = {}
+        memo: Dict[MemoKey, Optional[str]] = {}
+        for key, old in list(_memo.items()):
+            new = engine.infer(key[0], key[1])
+            memo[key] = new
+            if new != old:
+                changed[key] = (old, new)
+
+        _rules, _engine, _rules_fp, _memo = rules, engine, fp, memo
+        _rules_version += 1
+        listeners = list(_listeners)
+
+    if not first:
+        print(f"[role_rules] Rules reloaded (version {_rules_version}): {len(changed)} of {len(memo)} label/tag sets changed role")
+    for listener in listeners:
+        try:
+            listener(changed)
+        except Exception as e:  # noqa: BLE001
+            print(f"[role_rules] Reload listener failed: {e}")
+    return True
+
+
+def add_rules_listener(listener: RulesListener) -> None:
+    """Register a callback run after each rules reload."""
+    with _reload_lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+
+def remove_rules_listener(listener: RulesListener) -> None:
+    with _reload_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def get_rules() -> List[RoleRule]:
+    """The current rule set (config/role_rules.json or built-in defaults)."""
+    check_for_update()
+    assert _rules is not None
+    return _rules
+
+
+def get_engine() -> RoleRuleEngine:
+    """The configured rules (see get_rules) compiled into a RoleRuleEngine."""
+    check_for_update()
+    assert _engine is not None
+    return _engine
+
+
+def rules_fingerprint() -> str:
+    """Short hash of the current rule set; changes whenever a reload changes the rules."""
+    check_for_update()
+    return _rules_fp
+
+
+def rules_version() -> int:
+    """Incremented every time a different rule set is installed."""
+    return _rules_version
+
+
+def remember_role(label: str, tags: Optional[Iterable[Any]], role: Optional[str]) -> None:
+    """Seed the memo with a role computed under the current rules (e.g. loaded from disk)."""
+    if len(_memo) < _MEMO_MAX:
+        _memo[memo_key(label, tags)] = role
+
+
+def memo_size() -> int:
+    return len(_memo)
+
+
 # ---------------------------------------------------------------------------
 # Public API: infer role from label + tags
 # ---------------------------------------------------------------------------
@@ -422,6 +707,9 @@ def infer_role(label: str, tags: Optional[List[Any]] = None) -> Optional[str]:
     Infer the analytic role of a point from its name and tags using the
     configured rule set (JSON or built-in defaults).
 
+    Results are memoized per (lowercased label, tag set) until the rules
+    file changes.
+
     Args:
         label: point display name or history id
         tags:  list of tag suffixes, e.g. ["air", "flow", "zone", "sp"]
@@ -431,19 +719,15 @@ def infer_role(label: str, tags: Optional[List[Any]] = None) -> Optional[str]:
         "damper", "reheat", "fan_cmd", "fan_status", etc., or None if
         no rule matches.
     """
-    rules = get_rules()
-
-    tag_set: Optional[Set[str]] = None
-    if tags:
-        tag_set = {str(t).lower() for t in tags}
-
-    best: Optional[Tuple[int, RoleRule]] = None
-    for rule in rules:
-        if rule.matches(label, tag_set):
-            if best is None or rule.priority < best[0]:
-                best = (rule.priority, rule)
-
-    if best is None:
-        return None
-
-    return best[1].role
+    engine = get_engine()
+    key = memo_key(label, tags)
+    try:
+        return _memo[key]
+    except KeyError:
+        pass
+    role = engine.infer(key[0], key[1])
+    if engine is _engine:  # a concurrent reload owns the memo otherwise
+        if len(_memo) >= _MEMO_MAX:
+            _memo.clear()
+        _memo[key] = role
+    return role
@@ -4,10 +4,14 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+from . import kernels
+from .cycles import cycle_stats, series_on_off
+
 # Reuse the same sqlite → DataFrame helper as zone_health
 from .zone_health import _query_series_df
 
@@ -22,12 +26,16 @@ class FanMetrics:
     samples: int = 0
     on_pct: Optional[float] = None
     short_cycle_count: Optional[int] = None
+    runtime_hours: Optional[float] = None
+    starts_per_hour: Optional[float] = None
 
 
 @dataclass
 class CoolingMetrics:
     samples: int = 0
     short_cycle_count: Optional[int] = None
+    runtime_hours: Optional[float] = None
+    starts_per_hour: Optional[float] = None
 
 
 @dataclass
@@ -52,11 +60,26 @@ class RTUHealthMetrics:
     reasons: List[str] = field(default_factory=list)
 
 
+# Series each metric reads, in order of preference
+FAN_ROLES = ("fan_status", "fan_cmd")
+COOLING_ROLES = ("compressor_cmd", "cooling_valve")
+DISCHARGE_ROLES = ("discharge_air", "discharge_air_sp")
+RTU_ROLES = FAN_ROLES + COOLING_ROLES + DISCHARGE_ROLES
+
+
 # -----------------------------
 # Low-level helpers
 # -----------------------------
 
 
+def _sorted_arrays(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """(timestamp ns, value) arrays of a [timestamp, value] frame, in time order."""
+    ts = kernels.to_ns(df["timestamp"])
+    values = df["value"].to_numpy(dtype=np.float64)
+    order = kernels.sort_order(ts)
+    return ts[order], values[order]
+
+
 def _compute_binary_cycles(
     df: pd.DataFrame,
     threshold: float = 0.5,
@@ -68,48 +91,24 @@ def _compute_binary_cycles(
       - samples
       - on_pct
       - short_cycle_count (ON periods shorter than min_cycle_minutes)
+      - runtime_hours, starts_per_hour
     """
     if df.empty:
         return {
             "samples": 0,
             "on_pct": None,
             "short_cycle_count": None,
+            "runtime_hours": None,
+            "starts_per_hour": None,
         }
 
-    df = df.sort_values("timestamp").copy()
-    on = df["value"] > threshold
-    ts = df["timestamp"]
-
-    samples = int(len(df))
-    on_pct = float(on.mean() * 100.0)
-
-    short_cycles = 0
-    prev_state = bool(on.iloc[0])
-    on_start: Optional[datetime] = ts.iloc[0] if prev_state else None
-
-    for t, state in zip(ts.iloc[1:], on.iloc[1:]):
-        state = bool(state)
-        if state == prev_state:
-            continue
-
-        # Transition
-        if prev_state and not state:
-            # ON -> OFF: complete a cycle
-            if on_start is not None:
-                dur_min = (t - on_start).total_seconds() / 60.0
-                if dur_min < min_cycle_minutes:
-                    short_cycles += 1
-            on_start = None
-        elif not prev_state and state:
-            # OFF -> ON: new ON period
-            on_start = t
-
-        prev_state = state
-
+    stats = cycle_stats(*series_on_off(df, threshold), min_cycle_minutes)
     return {
-        "samples": samples,
-        "on_pct": on_pct,
-        "short_cycle_count": short_cycles,
+        "samples": stats.samples,
+        "on_pct": stats.on_pct,
+        "short_cycle_count": stats.short_cycle_count,
+        "runtime_hours": stats.runtime_hours,
+        "starts_per_hour": stats.starts_per_hour,
     }
 
 
@@ -131,37 +130,24 @@ def _compute_discharge_metrics(
             "mean_error_degF": None,
         }
 
-    df_da = df_da.sort_values("timestamp").rename(columns={"value": "da"})
-    df_sp = df_da_sp.sort_values("timestamp").rename(columns={"value": "da_sp"})
+    da_ts, da = _sorted_arrays(df_da)
+    sp_ts, sp = _sorted_arrays(df_da_sp)
+    da_sp = kernels.asof_nearest(da_ts, sp_ts, sp, kernels.seconds_to_ns(60))
 
-    merged = pd.merge_asof(
-        df_da,
-        df_sp,
-        on="timestamp",
-        direction="nearest",
-        tolerance=pd.Timedelta(seconds=60),
-    )
-
-    merged = merged.dropna(subset=["da", "da_sp"])
-    if merged.empty:
+    matched = ~(np.isnan(da) | np.isnan(da_sp))
+    if not matched.any():
         return {
             "samples": 0,
             "within_band_pct": None,
             "mean_error_degF": None,
         }
 
-    merged["error"] = merged["da"] - merged["da_sp"]
-    merged["abs_error"] = merged["error"].abs()
-
-    samples = int(len(merged))
-    within_band = int((merged["abs_error"] <= band_degF).sum())
-    within_band_pct = float(within_band / samples * 100.0)
-    mean_error = float(merged["error"].mean())
+    error = da[matched] - da_sp[matched]
 
     return {
-        "samples": samples,
-        "within_band_pct": within_band_pct,
-        "mean_error_degF": mean_error,
+        "samples": int(len(error)),
+        "within_band_pct": kernels.band_pct(error, band_degF),
+        "mean_error_degF": kernels.mean(error),
     }
 
 
@@ -202,35 +188,28 @@ def compute_rtu_health(
         start = end - pd.Timedelta(hours=24)
 
     # --- Fan metrics ---------------------------------------------------------
-    fan_cmd_id = zone_info.get("fan_cmd")
-    fan_status_id = zone_info.get("fan_status")
-
-    df_cmd = _query_series_df(station, fan_cmd_id, start, end)
-    df_status = _query_series_df(station, fan_status_id, start, end)
-
     # Prefer status if we have it; fall back to command
-    df_fan = df_status if not df_status.empty else df_cmd
+    df_fan = _first_with_data(station, zone_info, FAN_ROLES, start, end)
 
     fan_raw = _compute_binary_cycles(df_fan)
     m.fan_metrics = FanMetrics(
         samples=fan_raw["samples"],
         on_pct=fan_raw["on_pct"],
         short_cycle_count=fan_raw["short_cycle_count"],
+        runtime_hours=fan_raw["runtime_hours"],
+        starts_per_hour=fan_raw["starts_per_hour"],
     )
 
     # --- Cooling metrics (compressor command) -------------------------------
-    compressor_cmd_id = zone_info.get("compressor_cmd")
-    cooling_cmd_id = zone_info.get("cooling_valve")  # optional future role
-
-    df_comp = _query_series_df(station, compressor_cmd_id, start, end)
-    df_cool = _query_series_df(station, cooling_cmd_id, start, end)
-
-    df_cooling = df_comp if not df_comp.empty else df_cool
+    # cooling_valve is the fallback when there is no compressor command
+    df_cooling = _first_with_data(station, zone_info, COOLING_ROLES, start, end)
     cool_raw = _compute_binary_cycles(df_cooling)
 
     m.cooling_metrics = CoolingMetrics(
         samples=cool_raw["samples"],
         short_cycle_count=cool_raw["short_cycle_count"],
+        runtime_hours=cool_raw["runtime_hours"],
+        starts_per_hour=cool_raw["starts_per_hour"],
     )
 
     # --- Discharge-air tracking (if you add those roles later) --------------
@@ -238,7 +217,10 @@ def compute_rtu_health(
     discharge_sp_id = zone_info.get("discharge_air_sp")
 
     df_da = _query_series_df(station, discharge_id, start, end)
-    df_da_sp = _query_series_df(station, discharge_sp_id, start, end)
+    if df_da.empty:
+        df_da_sp = df_da
+    else:
+        df_da_sp = _query_series_df(station, discharge_sp_id, start, end)
 
     da_raw = _compute_discharge_metrics(df_da, df_da_sp)
     m.discharge_metrics = DischargeAirMetrics(
@@ -247,7 +229,28 @@ def compute_rtu_health(
         mean_error_degF=da_raw["mean_error_degF"],
     )
 
-    # --- Status + reasons ----------------------------------------------------
+    _derive_rtu_status(m)
+    return m
+
+
+def _first_with_data(
+    station: str,
+    zone_info: Dict[str, Any],
+    roles: Tuple[str, ...],
+    start: datetime,
+    end: datetime,
+) -> pd.DataFrame:
+    """Samples of the first of ``roles`` with data in the window; later roles are only queried if needed."""
+    df = pd.DataFrame(columns=["timestamp", "value"])
+    for role in roles:
+        df = _query_series_df(station, zone_info.get(role), start, end)
+        if not df.empty:
+            break
+    return df
+
+
+def _derive_rtu_status(m: RTUHealthMetrics) -> None:
+    """Set m.status / m.reasons from the fan, cooling and discharge metrics."""
     reasons: List[str] = []
     critical = False
     warning = False
@@ -293,7 +296,20 @@ def compute_rtu_health(
         m.status = "no_data"
 
     m.reasons = sorted(set(reasons))
-    return m
+
+
+_STATUS_RANK = {"critical": 0, "warning": 1, "ok": 2, "no_data": 3}
+
+
+def rtu_severity_key(m: RTUHealthMetrics) -> Tuple[Any, ...]:
+    """Sort key putting the worst units first: status, then short cycles, then discharge tracking."""
+    return (
+        _STATUS_RANK.get(m.status, len(_STATUS_RANK)),
+        -len(m.reasons),
+        -((m.fan_metrics.short_cycle_count or 0) + (m.cooling_metrics.short_cycle_count or 0)),
+        m.discharge_metrics.within_band_pct if m.discharge_metrics.within_band_pct is not None else 100.0,
+        m.zone_root,
+    )
 
 
 def rtu_health_to_dict(m: RTUHealthMetrics) -> Dict[str, Any]:
@@ -308,10 +324,14 @@ def rtu_health_to_dict(m: RTUHealthMetrics) -> Dict[str, Any]:
             "samples": m.fan_metrics.samples,
             "on_pct": m.fan_metrics.on_pct,
             "short_cycle_count": m.fan_metrics.short_cycle_count,
+            "runtime_hours": m.fan_metrics.runtime_hours,
+            "starts_per_hour": m.fan_metrics.starts_per_hour,
         },
         "cooling_metrics": {
             "samples": m.cooling_metrics.samples,
             "short_cycle_count": m.cooling_metrics.short_cycle_count,
+            "runtime_hours": m.cooling_metrics.runtime_hours,
+            "starts_per_hour": m.cooling_metrics.starts_per_hour,
         },
         "discharge_metrics": {
             "samples": m.discharge_metrics.samples,
@@ -0,0 +1,223 @@
+# src/analytics/rtu_fleet.py
+"""
+RTU health for every unit of a station in one pass.
+
+compute_rtu_health() queries a unit's series one at a time.
+compute_fleet_rtu_health() produces the same RTUHealthMetrics for all
+units at once:
+
+  1. only the series the metrics read are loaded, in bulk
+     (sqlite_store.query_series_many): the preferred fan / cooling
+     series of each unit first, fallbacks only for units whose preferred
+     series has no samples in the window, and the discharge-air setpoint
+     only where there is discharge-air data;
+  2. fan and cooling cycles for all units come from one
+     cycles.grouped_cycle_stats() call each;
+  3. discharge air is aligned with its setpoint for all units with one
+     kernels.nearest_indexer call over (unit, timestamp) keys.
+
+Status and reasons use the per-unit helper unchanged.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from ..store import sqlite_store
+from . import kernels
+from .building_health import _parse_ts_ns
+from .cycles import CycleStats, grouped_cycle_stats
+from .rtu import (
+    COOLING_ROLES,
+    FAN_ROLES,
+    CoolingMetrics,
+    DischargeAirMetrics,
+    FanMetrics,
+    RTUHealthMetrics,
+    _derive_rtu_status,
+)
+
+# Same as rtu._compute_binary_cycles / _compute_discharge_metrics defaults
+_ON_THRESHOLD = 0.5
+_MIN_CYCLE_MINUTES = 10.0
+_DISCHARGE_TOLERANCE_NS = kernels.seconds_to_ns(60)
+_DISCHARGE_BAND_DEGF = 2.0
+
+Samples = Tuple[np.ndarray, np.ndarray]   # (ts ns, values), time order
+
+
+def _load(station: str, history_ids: Sequence[str], start: datetime, end: datetime) -> Dict[str, Samples]:
+    by_id = sqlite_store.query_series_many(station, history_ids, start, end)
+    if not by_id:
+        return {}
+    ts_text: List[str] = []
+    values: List[float] = []
+    ts_of, value_of = itemgetter(0), itemgetter(1)
+    for rows in by_id.values():
+        ts_text.extend(map(ts_of, rows))
+        values.extend(map(value_of, rows))
+    ts_all = _parse_ts_ns(ts_text)
+    values_all = np.asarray(values, dtype=np.float64)
+    out: Dict[str, Samples] = {}
+    pos = 0
+    for history_id, rows in by_id.items():
+        ts, v = ts_all[pos : pos + len(rows)], values_all[pos : pos + len(rows)]
+        pos += len(rows)
+        keep = ts != np.iinfo(np.int64).min
+        ts, v = ts[keep], v[keep]
+        order = kernels.sort_order(ts)
+        ts, v = ts[order], v[order]
+        if len(ts):
+            out[history_id] = (ts, v)
+    return out
+
+
+def _concat(samples: List[Optional[Samples]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(ts, values, unit) of every unit's samples, unit by unit."""
+    present = [(i, s) for i, s in enumerate(samples) if s is not None]
+    if not present:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, np.empty(0, dtype=np.float64), empty
+    ts = np.concatenate([s[0] for _, s in present])
+    values = np.concatenate([s[1] for _, s in present])
+    unit = np.repeat([i for i, _ in present], [len(s[0]) for _, s in present]).astype(np.int64)
+    return ts, values, unit
+
+
+def _cycles(samples: List[Optional[Samples]]) -> List[CycleStats]:
+    ts, values, unit = _concat(samples)
+    return grouped_cycle_stats(ts, values > _ON_THRESHOLD, unit, len(samples), _MIN_CYCLE_MINUTES)
+
+
+def _discharge(da: List[Optional[Samples]], sp: List[Optional[Samples]]) -> List[DischargeAirMetrics]:
+    n = len(da)
+    paired = [d if d is not None and s is not None else None for d, s in zip(da, sp)]
+    left_ts, left_v, left_unit = _concat(paired)
+    right_ts, right_v, right_unit = _concat([s if p is not None else None for p, s in zip(paired, sp)])
+    out = [DischargeAirMetrics() for _ in range(n)]
+    if not len(left_ts):
+        return out
+
+    # (unit, timestamp) keys; the stride keeps units further apart than
+    # the tolerance. Split into chunks of units if keys would overflow.
+    base = int(min(left_ts.min(), right_ts.min()))
+    stride = int(max(left_ts.max(), right_ts.max())) - base + 2 * _DISCHARGE_TOLERANCE_NS + 1
+    per_chunk = max(1, int(np.iinfo(np.int64).max // stride) - 1)
+    for lo in range(0, n, per_chunk):
+        hi = lo + per_chunk
+        lm = (left_unit >= lo) & (left_unit < hi)
+        rm = (right_unit >= lo) & (right_unit < hi)
+        left_key = (left_unit[lm] - lo) * stride + (left_ts[lm] - base)
+        right_key = (right_unit[rm] - lo) * stride + (right_ts[rm] - base)
+        da_sp = kernels.take_nearest(
+            right_v[rm], kernels.nearest_indexer(left_key, right_key, _DISCHARGE_TOLERANCE_NS)
+        )
+        da_v = left_v[lm]
+        matched = ~(np.isnan(da_v) | np.isnan(da_sp))
+        error = da_v[matched] - da_sp[matched]
+        unit = left_unit[lm][matched]
+
+        counts = np.bincount(unit - lo, minlength=min(hi, n) - lo)
+        within = np.bincount(unit[np.abs(error) <= _DISCHARGE_BAND_DEGF] - lo, minlength=len(counts))
+        edges = np.searchsorted(unit, np.arange(lo, lo + len(counts) + 1))
+        for k, count in enumerate(counts):
+            if count:
+                out[lo + k] = DischargeAirMetrics(
+                    samples=int(count),
+                    within_band_pct=kernels.pct(within[k], count),
+                    mean_error_degF=kernels.mean(error[edges[k] : edges[k + 1]]),
+                )
+    return out
+
+
+def compute_fleet_rtu_health(
+    station: str,
+    zones: Dict[str, Dict[str, Any]],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[RTUHealthMetrics]:
+    """
+    RTUHealthMetrics for every unit in ``zones`` (zone_root -> zone_info),
+    in the same order, equal to calling compute_rtu_health() for each.
+    """
+    if end is None:
+        end = datetime.utcnow()
+    if start is None:
+        start = end - timedelta(hours=24)
+
+    roots = list(zones)
+    infos = [zones[root] for root in roots]
+    n = len(roots)
+
+    loaded: Dict[str, Samples] = {}
+    queried: Set[str] = set()
+
+    def fetch(ids: List[Optional[str]]) -> None:
+        new = [h for h in dict.fromkeys(ids) if h and h not in queried]
+        queried.update(new)
+        if new:
+            loaded.update(_load(station, new, start, end))
+
+    # Fan / cooling: walk each unit's preference list, one bulk load per level
+    candidates = {
+        "fan": [[info[r] for r in FAN_ROLES if info.get(r)] for info in infos],
+        "cooling": [[info[r] for r in COOLING_ROLES if info.get(r)] for info in infos],
+    }
+    chosen: Dict[str, List[Optional[Samples]]] = {k: [None] * n for k in candidates}
+    level = 0
+    while True:
+        want = [
+            ids[level]
+            for key, per_unit in candidates.items()
+            for z, ids in enumerate(per_unit)
+            if chosen[key][z] is None and level < len(ids)
+        ]
+        if level == 0:
+            want += [info.get("discharge_air") for info in infos]
+        elif level == 1:
+            want += [
+                info.get("discharge_air_sp") for info in infos if info.get("discharge_air") in loaded
+            ]
+        if not [h for h in want if h]:
+            break
+        fetch(want)
+        for key, per_unit in candidates.items():
+            for z, ids in enumerate(per_unit):
+                if chosen[key][z] is None and level < len(ids):
+                    chosen[key][z] = loaded.get(ids[level])
+        level += 1
+
+    da = [loaded.get(info.get("discharge_air") or "") for info in infos]
+    da_sp = [loaded.get(info.get("discharge_air_sp") or "") for info in infos]
+
+    fan = _cycles(chosen["fan"])
+    cooling = _cycles(chosen["cooling"])
+    discharge = _discharge(da, da_sp)
+
+    metrics: List[RTUHealthMetrics] = []
+    for z, (root, info) in enumerate(zip(roots, infos)):
+        m = RTUHealthMetrics(
+            station=station,
+            zone_root=root,
+            equipment=info.get("equipment"),
+            fan_metrics=FanMetrics(
+                samples=fan[z].samples,
+                on_pct=fan[z].on_pct,
+                short_cycle_count=fan[z].short_cycle_count,
+                runtime_hours=fan[z].runtime_hours,
+                starts_per_hour=fan[z].starts_per_hour,
+            ),
+            cooling_metrics=CoolingMetrics(
+                samples=cooling[z].samples,
+                short_cycle_count=cooling[z].short_cycle_count,
+                runtime_hours=cooling[z].runtime_hours,
+                starts_per_hour=cooling[z].starts_per_hour,
+            ),
+            discharge_metrics=discharge[z],
+        )
+        _derive_rtu_status(m)
+        metrics.append(m)
+    return metrics
@@ -0,0 +1,158 @@
+# src/analytics/series_roles.py
+"""
+Per-series role assignments on top of role_rules.infer_role.
+
+Each (station, history_id) remembers the label / tag set its role was
+inferred from, so repeat zone_pairs_as_dicts() calls are a dict lookup
+per series. Assignments are persisted in sqlite_store's series_roles
+table together with the role_rules fingerprint; after a restart with the
+same rules they are reused (and seed the role_rules memo) instead of
+being recomputed.
+
+When role_rules.json is hot-reloaded only the series whose role actually
+changed are rewritten, and role listeners are told which ones:
+
+    add_role_listener(lambda changed: ...)   # {(station, history_id): (old, new)}
+"""
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from ..store import sqlite_store
+from . import role_rules
+
+SeriesKey = Tuple[str, str]
+RoleChange = Tuple[Optional[str], Optional[str]]
+RoleListener = Callable[[Dict[SeriesKey, RoleChange]], None]
+
+
+@dataclass
+class _Assignment:
+    label: str                 # role_rules.memo_key() label (lowercased)
+    tags: FrozenSet[str]
+    role: Optional[str]
+    rules_fp: str
+
+
+_lock = threading.RLock()
+_assignments: Dict[SeriesKey, _Assignment] = {}
+_dirty: Dict[SeriesKey, _Assignment] = {}
+_loaded_generation: Optional[int] = None
+_listeners: List[RoleListener] = []
+
+
+def _row(key: SeriesKey, a: _Assignment) -> Tuple[str, str, str, str, Optional[str], str]:
+    return (key[0], key[1], a.label, json.dumps(sorted(a.tags)), a.role, a.rules_fp)
+
+
+def _ensure_loaded() -> None:
+    """(Re)load persisted assignments after sqlite_store.init()."""
+    global _loaded_generation
+    generation = sqlite_store.generation()
+    if _loaded_generation == generation:
+        return
+    with _lock:
+        if _loaded_generation == generation:
+            return
+        fp = role_rules.rules_fingerprint()
+        _assignments.clear()
+        _dirty.clear()
+        for station, history_id, label, tags_json, role, rules_fp in sqlite_store.load_series_roles():
+            tags = frozenset(json.loads(tags_json))
+            _assignments[(station, history_id)] = _Assignment(label, tags, role, rules_fp)
+            if rules_fp == fp:
+                role_rules.remember_role(label, tags, role)
+        _loaded_generation = generation
+
+
+def role_for_series(
+    station: str,
+    history_id: str,
+    label: str,
+    tags: Optional[Iterable[Any]] = None,
+) -> Optional[str]:
+    """
+    Role for one series, reusing its stored assignment while the label,
+    tags and rule set are unchanged. New assignments are persisted on
+    flush().
+    """
+    _ensure_loaded()
+    fp = role_rules.rules_fingerprint()  # also picks up edits to role_rules.json
+    key = (station, history_id)
+    norm_label, norm_tags = role_rules.memo_key(label, tags)
+    a = _assignments.get(key)
+    if a is not None and a.rules_fp == fp and a.label == norm_label and a.tags == norm_tags:
+        return a.role
+
+    role = role_rules.infer_role(norm_label, norm_tags)
+    a = _Assignment(norm_label, norm_tags, role, fp)
+    with _lock:
+        _assignments[key] = a
+        _dirty[key] = a
+    return role
+
+
+def flush() -> int:
+    """Persist assignments made since the last flush; returns the row count."""
+    with _lock:
+        if not _dirty:
+            return 0
+        rows = [_row(key, a) for key, a in _dirty.items()]
+        _dirty.clear()
+    sqlite_store.save_series_roles(rows)
+    return len(rows)
+
+
+def assignments() -> Dict[SeriesKey, Optional[str]]:
+    """Snapshot of the current (station, history_id) -> role map."""
+    _ensure_loaded()
+    with _lock:
+        return {key: a.role for key, a in _assignments.items()}
+
+
+def add_role_listener(listener: RoleListener) -> None:
+    """Register a callback for series whose role changed after a rules reload."""
+    with _lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+
+def remove_role_listener(listener: RoleListener) -> None:
+    with _lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def _on_rules_reloaded(_changed_keys: Dict[role_rules.MemoKey, RoleChange]) -> None:
+    # Re-check every known series against the new rules. Label/tag sets
+    # already in the role_rules memo were just re-classified, so this is
+    # a dict lookup per series plus one engine call per unseen set.
+    if _loaded_generation is None:
+        return
+    fp = role_rules.rules_fingerprint()
+    changed: Dict[SeriesKey, RoleChange] = {}
+    with _lock:
+        for key, a in _assignments.items():
+            role = role_rules.infer_role(a.label, a.tags)
+            if role != a.role:
+                changed[key] = (a.role, role)
+            updated = _Assignment(a.label, a.tags, role, fp)
+            _assignments[key] = updated
+            _dirty[key] = updated
+        listeners = list(_listeners)
+
+    flush()
+    if not changed:
+        return
+    print(f"[series_roles] {len(changed)} series changed role after rules reload")
+    for listener in listeners:
+        try:
+            listener(changed)
+        except Exception as e:  # noqa: BLE001
+            print(f"[series_roles] Role listener failed: {e}")
+
+
+role_rules.add_rules_listener(_on_rules_reloaded)
@@ -0,0 +1,526 @@
+# src/analytics/zone_aggregates.py
+"""
+Per-minute zone health aggregates, kept up to date from ingest.
+
+compute_zone_health() / compute_building_health() read and align every
+sample of the window on each call. ZoneAggregates instead keeps, per zone
+and per minute, the counts and sums the metrics are made of:
+
+    role samples (whether a role has data in the window),
+    comfort rows / within band / error sum,
+    flow tracking rows / within band / error sum,
+    damper rows / with flow setpoint / leak and stuck counts / max flow,
+    occupied reheat rows / reheat while hot
+
+A rolling window is then a sum over its minutes: O(minutes) per zone,
+whatever the sample rate. Buckets are filled with the same row-level
+alignment as compute_building_health() (building_health._align), loading
+the bucket range plus the merge tolerance on both sides so every sample
+sees the same nearest neighbours as in a full-window pass.
+
+sqlite_store reports the time span every write covers per series
+(mark(), a sample listener); the minutes of the affected zones within the
+merge tolerance of that span are recomputed on the next read, so late and
+out-of-order samples are handled too. Zones are built lazily on first
+request, and minutes a later (longer or newer) window needs are added on
+demand.
+
+Memory is bounded both ways: each zone keeps at most max_hours of minutes
+(about 150 bytes a minute, plus the damper flows without a setpoint), and
+at most max_zones zones are kept; the least recently read are evicted and
+rebuilt from the store if requested again. Windows longer than max_hours
+are clamped, so callers route those to compute_building_health().
+
+Results equal compute_building_health() except near the window edges
+(the window is widened to whole minutes, and a sample may pair with a
+neighbour just outside the window) and for the rounding of the summed
+mean errors.
+
+The "damper without flow setpoint" heuristic compares flows against the
+window's maximum flow, so those damper rows' flows are kept per minute
+(sorted) and counted with searchsorted.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ..config import ComfortConfig
+from ..store import sqlite_store
+from . import kernels
+from .building_health import _ROLES, _Aligned, _align, _empty_metrics, _parse_ts_ns
+from .zone_health import (
+    MERGE_TOLERANCE_SECONDS,
+    ZoneHealthMetrics,
+    _compute_overall_score,
+    _derive_status_and_reasons,
+)
+
+SeriesKey = Tuple[str, str]
+ZoneKey = Tuple[str, str]
+
+BUCKET_NS = 60 * 1_000_000_000
+_EPOCH = datetime(1970, 1, 1)
+_NAT = np.iinfo(np.int64).min
+
+# Per-minute counts (int32 columns)
+(
+    T_ROWS, SP_ROWS, F_ROWS, FSP_ROWS, D_ROWS, R_ROWS,
+    C_N, C_IN, C_ERR_N,
+    FL_N, FL_IN, FL_ERR_N,
+    D_N, D_SP_N, D_SP_LEAK, D_SP_STUCK,
+    R_N, R_HOT,
+) = range(18)
+_COUNTS = 18
+# Per-minute sums (float64 columns), NaN errors skipped
+C_ERR, FL_ERR = range(2)
+_SUMS = 2
+
+_ROW_FIELDS = {
+    "space_temp": T_ROWS,
+    "space_temp_sp": SP_ROWS,
+    "flow": F_ROWS,
+    "flow_sp": FSP_ROWS,
+    "damper": D_ROWS,
+    "reheat": R_ROWS,
+}
+
+# minute -> (sorted flows of high-open, of closed) damper rows without a setpoint
+NoSetpointFlows = Dict[int, Tuple[np.ndarray, np.ndarray]]
+
+
+def _to_ns(dt: datetime) -> int:
+    return (dt - _EPOCH) // timedelta(microseconds=1) * 1000
+
+
+def _from_ns(ns: int, round_up: bool = False) -> datetime:
+    us = -(-ns // 1000) if round_up else ns // 1000
+    return _EPOCH + timedelta(microseconds=us)
+
+
+def minute_range(start: datetime, end: datetime) -> Tuple[int, int]:
+    """Minutes [first, stop) covering [start, end] (naive UTC)."""
+    return _to_ns(start) // BUCKET_NS, -(-_to_ns(end) // BUCKET_NS)
+
+
+@dataclass
+class _Block:
+    """Buckets of one zone for minutes [lo, lo + len(counts))."""
+
+    counts: np.ndarray     # (minutes, _COUNTS) int32
+    sums: np.ndarray       # (minutes, _SUMS) float64
+    f_max: np.ndarray      # (minutes,) max flow of damper rows, -inf if none
+    no_sp: NoSetpointFlows
+
+
+@dataclass(eq=False)
+class _ZoneBuckets:
+    info: Dict[str, Any]               # zone dict the buckets were built for
+    series: FrozenSet[SeriesKey]
+    lo: int
+    block: _Block
+    dirty: Optional[Tuple[int, int]] = None   # minutes to recompute
+
+    @property
+    def hi(self) -> int:
+        return self.lo + len(self.block.counts)
+
+
+def _bucket(a: _Aligned, comfort_cfg: ComfortConfig, nz: int, lo: int, hi: int) -> List[_Block]:
+    """Per-minute buckets of every zone of ``a`` for minutes [lo, hi)."""
+    n = hi - lo
+    size = nz * n
+    # int32 like the stored blocks, so the per-zone views need no copy
+    counts = np.zeros((size, _COUNTS), dtype=np.int32)
+    sums = np.zeros((size, _SUMS))
+    f_max = np.full(size, -np.inf)
+
+    def bins(zone: np.ndarray, ts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        minute = ts // BUCKET_NS
+        keep = (minute >= lo) & (minute < hi)
+        return zone[keep] * n + (minute[keep] - lo), keep
+
+    def count(fld: int, g: np.ndarray) -> None:
+        counts[:, fld] += np.bincount(g, minlength=size)
+
+    def add(fld: int, n_fld: int, g: np.ndarray, values: np.ndarray) -> None:
+        ok = ~np.isnan(values)
+        sums[:, fld] += np.bincount(g[ok], weights=values[ok], minlength=size)
+        count(n_fld, g[ok])
+
+    for role, fld in _ROW_FIELDS.items():
+        count(fld, bins(a.col[role].zone, a.col[role].ts)[0])
+
+    g, keep = bins(a.comfort_zone, a.comfort_ts)
+    error = a.comfort_error[keep]
+    count(C_N, g)
+    count(C_IN, g[np.abs(error) <= comfort_cfg.comfort_band_degF])
+    add(C_ERR, C_ERR_N, g, error)
+
+    g, keep = bins(a.flow_zone, a.flow_ts)
+    count(FL_N, g)
+    count(FL_IN, g[a.flow_within[keep]])
+    add(FL_ERR, FL_ERR_N, g, a.flow_error[keep])
+
+    g, keep = bins(a.d_zone, a.d_ts)
+    d_val, d_flow, d_sp, has_sp = a.d_val[keep], a.d_flow[keep], a.d_sp[keep], a.d_has_sp[keep]
+    high_open = d_val >= 80.0
+    closed = d_val <= 5.0
+    with np.errstate(invalid="ignore"):
+        leak = has_sp & high_open & (d_flow < 0.5 * d_sp)
+        stuck = has_sp & closed & (d_flow > 0.8 * d_sp)
+    count(D_N, g)
+    count(D_SP_N, g[has_sp])
+    count(D_SP_LEAK, g[leak])
+    count(D_SP_STUCK, g[stuck])
+    np.maximum.at(f_max, g, d_flow)
+
+    no_sp: List[NoSetpointFlows] = [{} for _ in range(nz)]
+    # NaN flows never count as low or high, so they are not kept
+    usable = ~has_sp & ~np.isnan(d_flow)
+    for slot, mask in enumerate((usable & high_open, usable & closed)):
+        gm, fm = g[mask], d_flow[mask]
+        order = np.lexsort((fm, gm))
+        gm, fm = gm[order], fm[order]
+        keys, first = np.unique(gm, return_index=True)
+        for key, flows in zip(keys.tolist(), np.split(fm, first[1:])):
+            z, minute = divmod(key, n)
+            pair = no_sp[z].get(lo + minute, (np.empty(0), np.empty(0)))
+            no_sp[z][lo + minute] = (flows, pair[1]) if slot == 0 else (pair[0], flows)
+
+    g, keep = bins(a.r_zone, a.r_ts)
+    count(R_N, g)
+    count(R_HOT, g[a.r_hot[keep]])
+
+    counts = counts.reshape(nz, n, _COUNTS)
+    sums = sums.reshape(nz, n, _SUMS)
+    f_max = f_max.reshape(nz, n)
+    return [_Block(counts[z], sums[z], f_max[z], no_sp[z]) for z in range(nz)]
+
+
+def _mean(total: float, n: int) -> float:
+    # kernels.mean(): NaN when every error was NaN
+    return float(total / n) if n else float("nan")
+
+
+def _window_metrics(
+    station: str,
+    zone_root: str,
+    info: Dict[str, Any],
+    e: _ZoneBuckets,
+    a: int,
+    b: int,
+) -> ZoneHealthMetrics:
+    """ZoneHealthMetrics from the buckets of minutes [a, b)."""
+    m = _empty_metrics(station, zone_root, info)
+    i, j = max(a - e.lo, 0), max(b - e.lo, 0)
+    c = e.block.counts[i:j].sum(axis=0, dtype=np.int64)
+    s = e.block.sums[i:j].sum(axis=0)
+
+    if c[T_ROWS] and c[SP_ROWS] and c[C_N]:
+        m.comfort_samples = int(c[C_N])
+        m.comfort_within_band_pct = kernels.pct(c[C_IN], c[C_N])
+        m.comfort_mean_error_degF = _mean(s[C_ERR], c[C_ERR_N])
+
+    if c[F_ROWS]:
+        if not c[FSP_ROWS]:
+            m.flow_samples = int(c[F_ROWS])
+        elif c[FL_N]:
+            m.flow_samples = int(c[FL_N])
+            m.flow_within_band_pct = kernels.pct(c[FL_IN], c[FL_N])
+            m.mean_flow_error_cfm = _mean(s[FL_ERR], c[FL_ERR_N])
+
+    if c[D_ROWS] and c[F_ROWS] and c[D_N]:
+        if c[D_SP_N]:
+            leak, stuck, denom = c[D_SP_LEAK], c[D_SP_STUCK], c[D_SP_N]
+        else:
+            # No flow setpoint in the window: thresholds relative to max flow
+            f_max = float(np.max(e.block.f_max[i:j], initial=-np.inf))
+            leak = stuck = 0
+            if f_max > 0:
+                for minute, (open_flows, closed_flows) in e.block.no_sp.items():
+                    if a <= minute < b:
+                        leak += int(np.searchsorted(open_flows, 0.3 * f_max, side="left"))
+                        stuck += len(closed_flows) - int(
+                            np.searchsorted(closed_flows, 0.7 * f_max, side="right")
+                        )
+            denom = c[D_N]
+        m.damper_high_open_low_flow_pct = kernels.pct(leak, denom)
+        m.damper_closed_high_flow_pct = kernels.pct(stuck, denom)
+
+    if c[R_ROWS] and c[T_ROWS] and c[SP_ROWS] and c[R_N]:
+        m.reheat_waste_pct = kernels.pct(c[R_HOT], c[R_N])
+
+    m.overall_score = _compute_overall_score(m)
+    _derive_status_and_reasons(m)
+    return m
+
+
+def _store(e: _ZoneBuckets, lo: int, block: _Block) -> None:
+    """Write ``block`` (minutes [lo, lo + len)) into e, extending its coverage."""
+    hi = lo + len(block.counts)
+    new_lo, new_hi = min(e.lo, lo), max(e.hi, hi)
+    if (new_lo, new_hi) != (e.lo, e.hi):
+        n = new_hi - new_lo
+        counts = np.zeros((n, _COUNTS), dtype=np.int32)
+        sums = np.zeros((n, _SUMS))
+        f_max = np.full(n, -np.inf)
+        off = e.lo - new_lo
+        counts[off : off + len(e.block.counts)] = e.block.counts
+        sums[off : off + len(e.block.counts)] = e.block.sums
+        f_max[off : off + len(e.block.counts)] = e.block.f_max
+        e.block = _Block(counts, sums, f_max, e.block.no_sp)
+        e.lo = new_lo
+    off = lo - e.lo
+    e.block.counts[off : off + len(block.counts)] = block.counts
+    e.block.sums[off : off + len(block.counts)] = block.sums
+    e.block.f_max[off : off + len(block.counts)] = block.f_max
+    for minute in [k for k in e.block.no_sp if lo <= k < hi]:
+        del e.block.no_sp[minute]
+    e.block.no_sp.update(block.no_sp)
+
+
+def _trim(e: _ZoneBuckets, max_minutes: int) -> None:
+    cut = len(e.block.counts) - max_minutes
+    if cut <= 0:
+        return
+    e.block = _Block(
+        e.block.counts[cut:].copy(),
+        e.block.sums[cut:].copy(),
+        e.block.f_max[cut:].copy(),
+        {k: v for k, v in e.block.no_sp.items() if k >= e.lo + cut},
+    )
+    e.lo += cut
+
+
+@dataclass
+class ZoneAggregateStats:
+    zones: int = 0
+    minutes: int = 0            # buckets held, all zones
+    evicted_zones: int = 0      # dropped as least recently read (max_zones)
+    built_minutes: int = 0      # zone-minutes computed for new zones and older minutes
+    updated_minutes: int = 0    # zone-minutes computed for newer minutes or after ingest
+    marked_series: int = 0      # series with new samples, counted once per read
+    reads: int = 0
+
+
+class ZoneAggregates:
+    """
+    Per-minute zone health buckets for one comfort config and merge
+    tolerance (see module docstring).
+
+        aggregates = ZoneAggregates(comfort_cfg, tolerance_seconds=30)
+        sqlite_store.add_sample_listener(aggregates.mark)
+        aggregates.building_health(station, zones, start, end)
+    """
+
+    def __init__(
+        self,
+        comfort_cfg: ComfortConfig,
+        tolerance_seconds: float = MERGE_TOLERANCE_SECONDS,
+        max_hours: float = 24,
+        max_zones: int = 2000,
+    ) -> None:
+        self.comfort_cfg = comfort_cfg
+        self.tolerance_seconds = tolerance_seconds
+        self._tol_ns = kernels.seconds_to_ns(tolerance_seconds)
+        # One extra minute: snapped window ends are rounded up
+        self.max_hours = max_hours
+        self._max_minutes = int(max_hours * 60) + 1
+        self._max_zones = max(1, max_zones)
+        self.stats = ZoneAggregateStats()
+        # Least recently read first
+        self._zones: "OrderedDict[ZoneKey, _ZoneBuckets]" = OrderedDict()
+        self._by_series: Dict[SeriesKey, Set[ZoneKey]] = {}
+        self._generation = sqlite_store.generation()
+        self._lock = threading.Lock()
+        # Separate from _lock: mark() runs inside sqlite_store writes,
+        # while reads query sqlite_store holding _lock.
+        self._pending_lock = threading.Lock()
+        # Written span per series since the last read, merged like the
+        # store compares ts_utc (as strings)
+        self._pending: Dict[SeriesKey, Tuple[str, str]] = {}
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+
+    def mark(self, spans: Dict[SeriesKey, Tuple[str, str]]) -> None:
+        """Queue written (oldest, newest) ts_utc per series (sqlite_store sample listener)."""
+        with self._pending_lock:
+            for key, (oldest, newest) in spans.items():
+                span = self._pending.get(key)
+                if span is not None:
+                    oldest, newest = min(oldest, span[0]), max(newest, span[1])
+                self._pending[key] = (oldest, newest)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def zone_health(
+        self,
+        station: str,
+        zone_root: str,
+        zone_info: Dict[str, Any],
+        start: datetime,
+        end: datetime,
+    ) -> ZoneHealthMetrics:
+        return self.building_health(station, {zone_root: zone_info}, start, end)[0]
+
+    def building_health(
+        self,
+        station: str,
+        zones: Dict[str, Dict[str, Any]],
+        start: datetime,
+        end: datetime,
+    ) -> List[ZoneHealthMetrics]:
+        """
+        ZoneHealthMetrics for every zone in ``zones`` over [start, end]
+        (widened to whole minutes), in the same order.
+        """
+        a, b = minute_range(start, end)
+        a = max(a, b - self._max_minutes)
+        with self._lock:
+            self.stats.reads += 1
+            self._drain()
+            entries = self._refresh(station, zones, a, b)
+            return [
+                _window_metrics(station, root, zones[root], e, a, b)
+                for root, e in zip(zones, entries)
+            ]
+
+    def snapshot_stats(self) -> ZoneAggregateStats:
+        with self._lock:
+            stats = ZoneAggregateStats(**vars(self.stats))
+            stats.zones = len(self._zones)
+            stats.minutes = sum(len(e.block.counts) for e in self._zones.values())
+            return stats
+
+    # ------------------------------------------------------------------
+    # Internals (lock held)
+    # ------------------------------------------------------------------
+
+    def _drain(self) -> None:
+        generation = sqlite_store.generation()
+        if generation != self._generation:
+            # New database: every bucket is stale
+            self._zones.clear()
+            self._by_series.clear()
+            self._generation = generation
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        self.stats.marked_series += len(pending)
+        ts = _parse_ts_ns([t for span in pending.values() for t in span])
+        for i, key in enumerate(pending):
+            zone_keys = self._by_series.get(key)
+            if not zone_keys:
+                continue
+            oldest, newest = int(ts[2 * i]), int(ts[2 * i + 1])
+            for zone_key in zone_keys:
+                e = self._zones[zone_key]
+                if oldest == _NAT or newest == _NAT:
+                    lo, hi = e.lo, e.hi
+                else:
+                    lo = (oldest - self._tol_ns) // BUCKET_NS
+                    hi = (newest + self._tol_ns) // BUCKET_NS + 1
+                lo, hi = max(lo, e.lo), min(hi, e.hi)
+                if lo >= hi:
+                    continue
+                if e.dirty is not None:
+                    lo, hi = min(lo, e.dirty[0]), max(hi, e.dirty[1])
+                e.dirty = (lo, hi)
+
+    def _refresh(
+        self, station: str, zones: Dict[str, Dict[str, Any]], a: int, b: int
+    ) -> List[_ZoneBuckets]:
+        """Bring every zone's buckets for minutes [a, b) up to date."""
+        fresh: List[str] = []
+        head: Dict[int, List[str]] = {}
+        tail: List[str] = []
+        tail_lo, tail_hi = b, a
+        for root, info in zones.items():
+            e = self._zones.get((station, root))
+            if e is None or e.info is not info or e.hi < a:
+                fresh.append(root)
+                continue
+            if a < e.lo:
+                head.setdefault(e.lo, []).append(root)
+            # Minutes after the covered range and minutes ingest touched
+            lo, hi = (e.hi, b) if b > e.hi else (b, a)
+            if e.dirty is not None:
+                lo, hi = min(lo, e.dirty[0]), max(hi, e.dirty[1])
+                e.dirty = None
+            if lo < hi:
+                tail.append(root)
+                tail_lo, tail_hi = min(tail_lo, lo), max(tail_hi, hi)
+
+        if fresh:
+            for root, block in zip(fresh, self._compute(station, zones, fresh, a, b)):
+                self._install(station, root, zones[root], a, block)
+            self.stats.built_minutes += len(fresh) * (b - a)
+        for stop, roots in head.items():
+            for root, block in zip(roots, self._compute(station, zones, roots, a, stop)):
+                _store(self._zones[(station, root)], a, block)
+            self.stats.built_minutes += len(roots) * (stop - a)
+        if tail:
+            for root, block in zip(tail, self._compute(station, zones, tail, tail_lo, tail_hi)):
+                _store(self._zones[(station, root)], tail_lo, block)
+            self.stats.updated_minutes += len(tail) * (tail_hi - tail_lo)
+
+        entries = []
+        for root in zones:
+            self._zones.move_to_end((station, root))
+            e = self._zones[(station, root)]
+            _trim(e, self._max_minutes)
+            entries.append(e)
+        self._evict()
+        return entries
+
+    def _evict(self) -> None:
+        while len(self._zones) > self._max_zones:
+            zone_key, e = self._zones.popitem(last=False)
+            for key in e.series:
+                zone_keys = self._by_series.get(key)
+                if zone_keys is not None:
+                    zone_keys.discard(zone_key)
+                    if not zone_keys:
+                        del self._by_series[key]
+            self.stats.evicted_zones += 1
+
+    def _compute(
+        self, station: str, zones: Dict[str, Dict[str, Any]], roots: List[str], lo: int, hi: int
+    ) -> List[_Block]:
+        infos = [zones[root] for root in roots]
+        start = _from_ns(lo * BUCKET_NS - self._tol_ns)
+        end = _from_ns(hi * BUCKET_NS + self._tol_ns, round_up=True)
+        aligned = _align(station, infos, self.comfort_cfg, start, end, self.tolerance_seconds)
+        if aligned is None:
+            # (zone, timestamp) keys would overflow: split the zones
+            half = len(roots) // 2
+            return self._compute(station, zones, roots[:half], lo, hi) + self._compute(
+                station, zones, roots[half:], lo, hi
+            )
+        return _bucket(aligned, self.comfort_cfg, len(infos), lo, hi)
+
+    def _install(self, station: str, root: str, info: Dict[str, Any], lo: int, block: _Block) -> None:
+        zone_key = (station, root)
+        old = self._zones.get(zone_key)
+        if old is not None:
+            for key in old.series:
+                zone_keys = self._by_series.get(key)
+                if zone_keys is not None:
+                    zone_keys.discard(zone_key)
+                    if not zone_keys:
+                        del self._by_series[key]
+        series = frozenset((station, info[r]) for r in _ROLES if info.get(r))
+        self._zones[zone_key] = _ZoneBuckets(info, series, lo, block)
+        for key in series:
+            self._by_series.setdefault(key, set()).add(zone_key)
@@ -4,13 +4,16 @@ from dataclasses import dataclass, field, asdict
 from datetime import datetime, time, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from ..config import ComfortConfig
 from ..store import sqlite_store
-from .flow import compute_flow_tracking, FlowTrackingConfig
+from . import kernels
+from .flow import FlowTrackingConfig, flow_tracking_arrays
 
 
+# Default role alignment window; configurable as analytics.merge_tolerance_seconds
 MERGE_TOLERANCE_SECONDS = 30
 
 
@@ -91,7 +94,7 @@ def _query_series_df(
     ts = pd.to_datetime(df["ts"], utc=True, format="mixed", errors="coerce")
     df = df.assign(timestamp=ts.dt.tz_convert("UTC").dt.tz_localize(None))
     df = df.dropna(subset=["timestamp"])
-    df = df.sort_values("timestamp")
+    df = df.sort_values("timestamp", kind="stable")
     return df[["timestamp", "value"]].reset_index(drop=True)
 
 
@@ -100,55 +103,111 @@ def _parse_time(s: str) -> time:
     return time(hour=h, minute=m)
 
 
-def _compute_comfort_metrics(
-    df_temp: pd.DataFrame,
-    df_sp: pd.DataFrame,
-    comfort_cfg: ComfortConfig,
-) -> Tuple[int, Optional[float], Optional[float]]:
-    """Return (samples, within_band_pct, mean_error_degF) for occupied window."""
-    if df_temp.empty or df_sp.empty:
-        return 0, None, None
+# ---------------------------------------------------------------------------
+# Alignment: one zone-wide frame with every role on a common timeline
+# ---------------------------------------------------------------------------
 
-    # Align temp and setpoint by nearest timestamp
-    merged = pd.merge_asof(
-        df_temp.sort_values("timestamp"),
-        df_sp.sort_values("timestamp"),
-        on="timestamp",
-        direction="nearest",
-        tolerance=pd.Timedelta(seconds=MERGE_TOLERANCE_SECONDS),
-        suffixes=("_temp", "_sp"),
-    )
+# Roles compute_zone_health reads, i.e. the aligned frame's value columns
+ALIGNED_ROLES = ("space_temp", "space_temp_sp", "flow", "flow_sp", "damper", "reheat")
 
-    merged = merged.dropna(subset=["value_temp", "value_sp"])
-    if merged.empty:
-        return 0, None, None
 
-    occ_start = _parse_time(comfort_cfg.occupied_start)
-    occ_end = _parse_time(comfort_cfg.occupied_end)
-    merged["time"] = merged["timestamp"].dt.time
+def align_zone_frame(
+    series: Dict[str, pd.DataFrame],
+    tolerance_seconds: float = MERGE_TOLERANCE_SECONDS,
+) -> pd.DataFrame:
+    """
+    Align every role of a zone once.
 
-    occupied = merged[
-        (merged["time"] >= occ_start) & (merged["time"] <= occ_end)
-    ].copy()
+    ``series`` maps role -> DataFrame[timestamp, value] (from
+    _query_series_df). The result has one row per sample of every role,
+    ordered by timestamp, with columns:
 
-    if occupied.empty:
-        return 0, None, None
+        timestamp, anchor (role the row's sample belongs to),
+        space_temp, space_temp_sp, flow, flow_sp, damper, reheat
+
+    The anchor's own column holds the sample; every other role column
+    holds that role's nearest sample within the tolerance (NaN if none),
+    exactly what merge_asof(direction="nearest") of the anchor series
+    with that role would give. Metrics select rows by anchor instead of
+    merging pairs of series again.
+    """
+    tol_ns = kernels.seconds_to_ns(tolerance_seconds)
+    present = {
+        role: df.sort_values("timestamp", kind="stable")
+        for role, df in series.items()
+        if role in ALIGNED_ROLES and not df.empty
+    }
+    stamps = {role: kernels.to_ns(df["timestamp"]) for role, df in present.items()}
+    values = {role: df["value"].to_numpy(dtype=np.float64) for role, df in present.items()}
+
+    blocks: List[pd.DataFrame] = []
+    for anchor, df in present.items():
+        cols: Dict[str, Any] = {
+            "timestamp": df["timestamp"].to_numpy(),
+            "anchor": anchor,
+        }
+        for role in ALIGNED_ROLES:
+            if role == anchor:
+                cols[role] = values[role]
+            elif role in present:
+                cols[role] = kernels.asof_nearest(stamps[anchor], stamps[role], values[role], tol_ns)
+            else:
+                cols[role] = np.full(len(df), np.nan)
+        blocks.append(pd.DataFrame(cols))
+
+    if not blocks:
+        return pd.DataFrame(columns=["timestamp", "anchor", *ALIGNED_ROLES])
+    frame = pd.concat(blocks, ignore_index=True)
+    return frame.sort_values("timestamp", kind="stable").reset_index(drop=True)
 
-    occupied["error"] = occupied["value_temp"] - occupied["value_sp"]
-    occupied["abs_error"] = occupied["error"].abs()
 
-    samples = int(len(occupied))
-    within_band = (occupied["abs_error"] <= comfort_cfg.comfort_band_degF).sum()
-    within_band_pct = float(within_band / samples * 100.0)
-    mean_error = float(occupied["error"].mean())
+def _anchored(
+    frame: pd.DataFrame, anchor: str, required: List[str]
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    (timestamps ns, role -> values) for the rows of ``anchor`` samples that
+    found a match for every ``required`` role.
+    """
+    keep = frame["anchor"].to_numpy() == anchor
+    cols = {role: frame[role].to_numpy(dtype=np.float64) for role in ALIGNED_ROLES}
+    for role in required:
+        keep &= ~np.isnan(cols[role])
+    ts = kernels.to_ns(frame["timestamp"])[keep]
+    return ts, {role: col[keep] for role, col in cols.items()}
+
+
+def _occupied_mask(ts: np.ndarray, comfort_cfg: ComfortConfig) -> np.ndarray:
+    return kernels.time_of_day_mask(
+        ts, _parse_time(comfort_cfg.occupied_start), _parse_time(comfort_cfg.occupied_end)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Metrics over the aligned frame
+# ---------------------------------------------------------------------------
+
+
+def _compute_comfort_metrics(
+    frame: pd.DataFrame,
+    comfort_cfg: ComfortConfig,
+) -> Tuple[int, Optional[float], Optional[float]]:
+    """Return (samples, within_band_pct, mean_error_degF) for occupied window."""
+    # Temp samples with the nearest setpoint, occupied hours only
+    ts, rows = _anchored(frame, "space_temp", ["space_temp", "space_temp_sp"])
+    occupied = _occupied_mask(ts, comfort_cfg)
+    if not occupied.any():
+        return 0, None, None
 
-    return samples, within_band_pct, mean_error
+    error = rows["space_temp"][occupied] - rows["space_temp_sp"][occupied]
+    return (
+        int(len(error)),
+        kernels.band_pct(error, comfort_cfg.comfort_band_degF),
+        kernels.mean(error),
+    )
 
 
 def _compute_flow_and_damper_metrics(
-    df_flow: pd.DataFrame,
-    df_flow_sp: pd.DataFrame,
-    df_damper: pd.DataFrame,
+    frame: pd.DataFrame,
 ) -> Tuple[int, Optional[float], Optional[float], Optional[float], Optional[float]]:
     """Compute flow tracking and damper sanity metrics.
 
@@ -165,25 +224,24 @@ def _compute_flow_and_damper_metrics(
     damper_high_open_low_flow_pct = None
     damper_closed_high_flow_pct = None
 
+    anchor = frame["anchor"].to_numpy()
+    has_flow = bool((anchor == "flow").any())
+    has_flow_sp = bool((anchor == "flow_sp").any())
+
     # Flow tracking
-    if not df_flow.empty:
-        if df_flow_sp.empty:
+    if has_flow:
+        if not has_flow_sp:
             # Treat single series as flow with no SP; we can still count samples but not tracking
-            flow_samples = int(len(df_flow))
+            flow_samples = int(np.count_nonzero(anchor == "flow"))
         else:
-            # Adapt frames for compute_flow_tracking
-            cfg = FlowTrackingConfig()
-            cfg.timestamp_column = "timestamp"
-            cfg.value_column = "value"
-            cfg.merge_tolerance_seconds = MERGE_TOLERANCE_SECONDS
-
-            metrics = compute_flow_tracking(df_flow, df_flow_sp, cfg)
+            _, rows = _anchored(frame, "flow", ["flow_sp"])
+            metrics = flow_tracking_arrays(rows["flow"], rows["flow_sp"], FlowTrackingConfig())
             flow_samples = int(metrics.get("samples", 0))
             flow_within_band_pct = metrics.get("within_band_pct")
             mean_error_cfm = metrics.get("mean_error_cfm")
 
     # Damper sanity (requires at least flow + damper; use flow_sp if available)
-    if df_damper.empty or df_flow.empty:
+    if not (anchor == "damper").any() or not has_flow:
         return (
             flow_samples,
             flow_within_band_pct,
@@ -192,27 +250,10 @@ def _compute_flow_and_damper_metrics(
             damper_closed_high_flow_pct,
         )
 
-    merged = pd.merge_asof(
-        df_damper.sort_values("timestamp").rename(columns={"value": "damper"}),
-        df_flow.sort_values("timestamp").rename(columns={"value": "flow"}),
-        on="timestamp",
-        direction="nearest",
-        tolerance=pd.Timedelta(seconds=MERGE_TOLERANCE_SECONDS),
-    )
-
-    if not df_flow_sp.empty:
-        merged = pd.merge_asof(
-            merged.sort_values("timestamp"),
-            df_flow_sp.sort_values("timestamp").rename(columns={"value": "flow_sp"}),
-            on="timestamp",
-            direction="nearest",
-            tolerance=pd.Timedelta(seconds=MERGE_TOLERANCE_SECONDS),
-        )
-    else:
-        merged["flow_sp"] = None
-
-    merged = merged.dropna(subset=["damper", "flow"])
-    if merged.empty:
+    # Damper samples with the nearest flow (and flow setpoint, if any)
+    _, rows = _anchored(frame, "damper", ["damper", "flow"])
+    total = len(rows["damper"])
+    if total == 0:
         return (
             flow_samples,
             flow_within_band_pct,
@@ -221,43 +262,34 @@ def _compute_flow_and_damper_metrics(
             damper_closed_high_flow_pct,
         )
 
-    total = len(merged)
-
     # Define "high open" and "closed"
-    high_open = merged["damper"] >= 80.0
-    closed = merged["damper"] <= 5.0
+    high_open = rows["damper"] >= 80.0
+    closed = rows["damper"] <= 5.0
+    f, f_sp = rows["flow"], rows["flow_sp"]
+    has_sp = ~np.isnan(f_sp)
 
     # Define "low flow" vs "high flow" relative to SP if present; otherwise heuristics
-    if merged["flow_sp"].notna().any():
-        # Use SP if we have it
-        merged_valid_sp = merged.dropna(subset=["flow_sp"]).copy()
-        if not merged_valid_sp.empty:
-            low_flow = merged_valid_sp["flow"] < 0.5 * merged_valid_sp["flow_sp"]
-            high_flow = merged_valid_sp["flow"] > 0.8 * merged_valid_sp["flow_sp"]
-            high_open_low_flow = (high_open.loc[merged_valid_sp.index] & low_flow).sum()
-            closed_high_flow = (closed.loc[merged_valid_sp.index] & high_flow).sum()
-            denom = len(merged_valid_sp)
-        else:
-            high_open_low_flow = 0
-            closed_high_flow = 0
-            denom = total
+    if has_sp.any():
+        # Use SP where we have it
+        low_flow = f[has_sp] < 0.5 * f_sp[has_sp]
+        high_flow = f[has_sp] > 0.8 * f_sp[has_sp]
+        high_open_low_flow = np.count_nonzero(high_open[has_sp] & low_flow)
+        closed_high_flow = np.count_nonzero(closed[has_sp] & high_flow)
+        denom = int(np.count_nonzero(has_sp))
     else:
         # No SP – use relative thresholds based on observed flow distribution
-        f = merged["flow"]
-        if f.max() <= 0:
+        f_max = f.max()
+        if f_max <= 0:
             high_open_low_flow = 0
             closed_high_flow = 0
-            denom = total
         else:
-            low_flow = f < 0.3 * f.max()
-            high_flow = f > 0.7 * f.max()
-            high_open_low_flow = (high_open & low_flow).sum()
-            closed_high_flow = (closed & high_flow).sum()
-            denom = total
+            high_open_low_flow = np.count_nonzero(high_open & (f < 0.3 * f_max))
+            closed_high_flow = np.count_nonzero(closed & (f > 0.7 * f_max))
+        denom = total
 
     if denom > 0:
-        damper_high_open_low_flow_pct = float(high_open_low_flow / denom * 100.0)
-        damper_closed_high_flow_pct = float(closed_high_flow / denom * 100.0)
+        damper_high_open_low_flow_pct = kernels.pct(high_open_low_flow, denom)
+        damper_closed_high_flow_pct = kernels.pct(closed_high_flow, denom)
 
     return (
         flow_samples,
@@ -269,55 +301,22 @@ def _compute_flow_and_damper_metrics(
 
 
 def _compute_reheat_waste_metrics(
-    df_reheat: pd.DataFrame,
-    df_temp: pd.DataFrame,
-    df_sp: pd.DataFrame,
+    frame: pd.DataFrame,
     comfort_cfg: ComfortConfig,
 ) -> Optional[float]:
     """Estimate reheat waste percentage (occupied samples with reheat > 0 while hot).
 
     For now we keep this simple and do not feed it into status; Phase 3 will refine.
     """
-    if df_reheat.empty or df_temp.empty or df_sp.empty:
-        return None
-
-    merged = pd.merge_asof(
-        df_reheat.sort_values("timestamp").rename(columns={"value": "reheat"}),
-        df_temp.sort_values("timestamp").rename(columns={"value": "temp"}),
-        on="timestamp",
-        direction="nearest",
-        tolerance=pd.Timedelta(seconds=MERGE_TOLERANCE_SECONDS),
-    )
-
-    merged = pd.merge_asof(
-        merged.sort_values("timestamp"),
-        df_sp.sort_values("timestamp").rename(columns={"value": "sp"}),
-        on="timestamp",
-        direction="nearest",
-        tolerance=pd.Timedelta(seconds=MERGE_TOLERANCE_SECONDS),
-    )
-
-    merged = merged.dropna(subset=["reheat", "temp", "sp"])
-    if merged.empty:
-        return None
-
-    occ_start = _parse_time(comfort_cfg.occupied_start)
-    occ_end = _parse_time(comfort_cfg.occupied_end)
-    merged["time"] = merged["timestamp"].dt.time
-
-    occupied = merged[
-        (merged["time"] >= occ_start) & (merged["time"] <= occ_end)
-    ].copy()
-    if occupied.empty:
-        return None
+    # Reheat samples with the nearest temp and setpoint, occupied hours only
+    ts, rows = _anchored(frame, "reheat", ["reheat", "space_temp", "space_temp_sp"])
+    occupied = _occupied_mask(ts, comfort_cfg)
 
     # Simple heuristic: any positive reheat above 10% while > 1°F above setpoint
-    hot_and_reheat = (occupied["reheat"] > 10.0) & (
-        occupied["temp"] >= occupied["sp"] + 1.0
+    hot_and_reheat = (rows["reheat"][occupied] > 10.0) & (
+        rows["space_temp"][occupied] >= rows["space_temp_sp"][occupied] + 1.0
     )
-    total = len(occupied)
-    waste_pct = float(hot_and_reheat.sum() / total * 100.0) if total > 0 else None
-    return waste_pct
+    return kernels.fraction_pct(hot_and_reheat)
 
 
 def _compute_overall_score(metrics: ZoneHealthMetrics) -> Optional[float]:
@@ -480,10 +479,13 @@ def compute_zone_health(
     comfort_cfg: ComfortConfig,
     start: Optional[datetime] = None,
     end: Optional[datetime] = None,
+    tolerance_seconds: float = MERGE_TOLERANCE_SECONDS,
 ) -> ZoneHealthMetrics:
     """Compute ZoneHealthMetrics for a single zone root.
 
     zone_info is typically a dict from zone_pairs_as_dicts()[station][zone_root].
+    tolerance_seconds is the nearest-sample alignment window between roles
+    (analytics.merge_tolerance_seconds).
     """
     metrics = ZoneHealthMetrics(
         station=station,
@@ -512,12 +514,25 @@ def compute_zone_health(
     df_damper = _query_series_df(station, metrics.damper, start, end)
     df_reheat = _query_series_df(station, metrics.reheat, start, end)
 
+    # One alignment pass for every metric below
+    frame = align_zone_frame(
+        {
+            "space_temp": df_temp,
+            "space_temp_sp": df_sp,
+            "flow": df_flow,
+            "flow_sp": df_flow_sp,
+            "damper": df_damper,
+            "reheat": df_reheat,
+        },
+        tolerance_seconds,
+    )
+
     # Comfort
     (
         metrics.comfort_samples,
         metrics.comfort_within_band_pct,
         metrics.comfort_mean_error_degF,
-    ) = _compute_comfort_metrics(df_temp, df_sp, comfort_cfg)
+    ) = _compute_comfort_metrics(frame, comfort_cfg)
 
     # Flow + damper
     (
@@ -526,12 +541,10 @@ def compute_zone_health(
         metrics.mean_flow_error_cfm,
         metrics.damper_high_open_low_flow_pct,
         metrics.damper_closed_high_flow_pct,
-    ) = _compute_flow_and_damper_metrics(df_flow, df_flow_sp, df_damper)
+    ) = _compute_flow_and_damper_metrics(frame)
 
     # Reheat waste (not yet used in status)
-    metrics.reheat_waste_pct = _compute_reheat_waste_metrics(
-        df_reheat, df_temp, df_sp, comfort_cfg
-    )
+    metrics.reheat_waste_pct = _compute_reheat_waste_metrics(frame, comfort_cfg)
 
     # Overall score
     metrics.overall_score = _compute_overall_score(metrics)
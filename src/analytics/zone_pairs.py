@@ -1,12 +1,15 @@
 # src/analytics/zone_pairs.py
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass
-from typing import Any, Dict, List, Optional
+import re
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
 
 from ..store import sqlite_store
 from ..niagara_client.mqtt_history_ingest import niagara_canonical_name
-from .role_rules import infer_role
+from . import role_rules, series_roles
+from .series_roles import flush as flush_series_roles, role_for_series
 
 
 # ---------------------------------------------------------------------------
@@ -168,8 +171,8 @@ def zone_pairs_as_dicts(limit: int = 50_000) -> Dict[str, Dict[str, Dict[str, An
         floor: Optional[str] = row.get("floor")
         tags_raw = row.get("tags") or []
 
-        # Infer the analytic role using label + tags
-        role = infer_role(point_name, tags_raw)
+        # Infer the analytic role using label + tags (memoized per series)
+        role = role_for_series(station, history_id, point_name, tags_raw)
         if not role:
             # This point does not participate in analytics roles
             continue
@@ -190,6 +193,8 @@ def zone_pairs_as_dicts(limit: int = 50_000) -> Dict[str, Dict[str, Dict[str, An
             setattr(zone, hist_attr, history_id)
             setattr(zone, name_attr, point_name)
 
+    flush_series_roles()
+
     # Convert nested ZonePair objects into plain dicts
     out: Dict[str, Dict[str, Dict[str, Any]]] = {}
     for st_name, zones in index.items():
@@ -200,6 +205,303 @@ def zone_pairs_as_dicts(limit: int = 50_000) -> Dict[str, Dict[str, Dict[str, An
     return out
 
 
+# ---------------------------------------------------------------------------
+# Materialized zone index, maintained from sqlite_store change events
+# ---------------------------------------------------------------------------
+
+SeriesKey = Tuple[str, str]
+ZoneKey = Tuple[str, str]  # (station, zone_root)
+
+
+class _Member(NamedTuple):
+    history_id: str
+    equipment: str
+    floor: Optional[str]
+    point_name: str
+    role: str
+
+
+# Leading letters of the canonical equipment name -> equipment class
+_EQUIPMENT_CLASSES: Dict[str, str] = {
+    "vav": "vav",
+    "cav": "vav",
+    "rtu": "rtu",
+    "ahu": "ahu",
+    "fcu": "fcu",
+    "hp": "heat_pump",
+    "wshp": "heat_pump",
+    "vrf": "vrf",
+    "erv": "erv",
+    "doas": "doas",
+}
+_CLASS_PREFIX = re.compile(r"[a-z]+")
+
+ZONE_SORT_KEYS = ("equipment", "zone_root", "floor")
+ZONE_ROLES = tuple(_ROLE_ATTR_MAP)
+
+
+def equipment_class(zone_root: str) -> str:
+    """Equipment class from a canonical zone_root ("vav1_01" -> "vav"), else "other"."""
+    m = _CLASS_PREFIX.match(zone_root or "")
+    return _EQUIPMENT_CLASSES.get(m.group(0), "other") if m else "other"
+
+
+@dataclass(frozen=True)
+class StationZones:
+    """
+    Zones of one station plus secondary indexes, rebuilt only when one of
+    the station's zones changes. Index values are zone_root sets; the
+    ``order`` lists hold every zone_root presorted by each ZONE_SORT_KEYS
+    entry, so filtered listings are a scan + slice without sorting.
+    """
+
+    zones: Dict[str, Dict[str, Any]]
+    classes: Dict[str, str] = field(default_factory=dict)         # zone_root -> class
+    by_floor: Dict[Optional[str], FrozenSet[str]] = field(default_factory=dict)
+    by_class: Dict[str, FrozenSet[str]] = field(default_factory=dict)
+    by_role: Dict[str, FrozenSet[str]] = field(default_factory=dict)
+    order: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, zones: Dict[str, Dict[str, Any]]) -> "StationZones":
+        classes = {root: equipment_class(root) for root in zones}
+        by_floor: Dict[Optional[str], Set[str]] = {}
+        by_class: Dict[str, Set[str]] = {}
+        by_role: Dict[str, Set[str]] = {}
+        for root, info in zones.items():
+            by_floor.setdefault(info.get("floor"), set()).add(root)
+            by_class.setdefault(classes[root], set()).add(root)
+            for role, (hist_attr, _name_attr) in _ROLE_ATTR_MAP.items():
+                if info.get(hist_attr) is not None:
+                    by_role.setdefault(role, set()).add(root)
+
+        def equipment_key(root: str) -> Tuple[str, str]:
+            return (zones[root].get("equipment") or root, root)
+
+        def floor_key(root: str) -> Tuple[bool, str, str, str]:
+            floor = zones[root].get("floor")
+            return (floor is None, floor or "", *equipment_key(root))
+
+        return cls(
+            zones=zones,
+            classes=classes,
+            by_floor={k: frozenset(v) for k, v in by_floor.items()},
+            by_class={k: frozenset(v) for k, v in by_class.items()},
+            by_role={k: frozenset(v) for k, v in by_role.items()},
+            order={
+                "equipment": tuple(sorted(zones, key=equipment_key)),
+                "zone_root": tuple(sorted(zones)),
+                "floor": tuple(sorted(zones, key=floor_key)),
+            },
+        )
+
+    def query(
+        self,
+        floor: Optional[str] = None,
+        equipment_class: Optional[str] = None,
+        roles: Iterable[str] = (),
+        sort: str = "equipment",
+        descending: bool = False,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Tuple[int, List[str]]:
+        """
+        zone_roots matching every given filter (``roles``: zone has all of
+        them), in ``sort`` order. Returns (total matches, requested page).
+        """
+        if sort not in self.order:
+            raise ValueError(f"sort must be one of {', '.join(ZONE_SORT_KEYS)}")
+
+        sets: List[FrozenSet[str]] = []
+        if floor is not None:
+            sets.append(self.by_floor.get(floor, frozenset()))
+        if equipment_class is not None:
+            sets.append(self.by_class.get(equipment_class, frozenset()))
+        for role in roles:
+            sets.append(self.by_role.get(role, frozenset()))
+
+        order: Iterable[str] = self.order[sort]
+        if descending:
+            order = reversed(self.order[sort])
+        if not sets:
+            matched = list(order)
+        else:
+            sets.sort(key=len)
+            wanted = sets[0].intersection(*sets[1:])
+            matched = [root for root in order if root in wanted] if wanted else []
+        end = None if limit is None else offset + limit
+        return len(matched), matched[offset:end]
+
+
+@dataclass(frozen=True)
+class ZoneIndexSnapshot:
+    """
+    One published version of the zone index. ``pairs`` has the same shape
+    as zone_pairs_as_dicts(); zone dicts are shared between versions and
+    must be treated as read-only. ``stations`` adds the per-station
+    secondary indexes (see StationZones).
+    """
+
+    version: int
+    pairs: Dict[str, Dict[str, Dict[str, Any]]]
+    stations: Dict[str, StationZones] = field(default_factory=dict)
+
+    def zone(self, station: str, zone_root: str) -> Optional[Dict[str, Any]]:
+        return find_zone_pair(self.pairs, station, zone_root)
+
+    def station(self, station: str) -> Optional[StationZones]:
+        return self.stations.get(station)
+
+
+def _build_zone(station: str, zone_root: str, members: List[_Member]) -> Dict[str, Any]:
+    """ZonePair dict for one zone, with the same precedence as zone_pairs_as_dicts()."""
+    members = sorted(members)
+    zone = ZonePair(
+        station=station,
+        zone_root=zone_root,
+        equipment=members[0].equipment,
+        floor=next((m.floor for m in members if m.floor is not None), None),
+    )
+    for m in members:
+        attrs = _ROLE_ATTR_MAP.get(m.role)
+        if not attrs:
+            continue
+        hist_attr, name_attr = attrs
+        if getattr(zone, hist_attr) is None:
+            setattr(zone, hist_attr, m.history_id)
+            setattr(zone, name_attr, m.point_name)
+    return zone.to_dict()
+
+
+class ZoneIndex:
+    """
+    Zone index kept up to date incrementally instead of rebuilt per request.
+
+    sqlite_store reports series that were added, pruned or had their
+    metadata changed, and series_roles reports series whose role changed
+    after a role_rules.json reload. Those keys are queued; the next
+    snapshot() re-derives only the affected zones and publishes a new
+    ZoneIndexSnapshot (copy-on-write per station), so readers holding an
+    older snapshot never see it change.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Separate from _lock: mark() runs inside sqlite_store writes,
+        # while snapshot() calls back into sqlite_store holding _lock.
+        self._pending_lock = threading.Lock()
+        self._pending: Set[SeriesKey] = set()
+        self._members: Dict[SeriesKey, Tuple[ZoneKey, _Member]] = {}
+        self._zones: Dict[ZoneKey, Dict[str, _Member]] = {}
+        self._generation: Optional[int] = None
+        self._snapshot = ZoneIndexSnapshot(version=0, pairs={})
+
+    def mark(self, keys: Iterable[SeriesKey]) -> None:
+        """Queue series to be re-derived on the next snapshot()."""
+        with self._pending_lock:
+            self._pending.update(keys)
+
+    def snapshot(self) -> ZoneIndexSnapshot:
+        role_rules.check_for_update()
+        generation = sqlite_store.generation()
+        if generation == self._generation and not self._pending:
+            return self._snapshot
+
+        with self._lock:
+            if generation != self._generation:
+                # New database: start over from every stored series
+                self._members.clear()
+                self._zones.clear()
+                with self._pending_lock:
+                    self._pending.clear()
+                self._generation = generation
+                touched = self._apply(sqlite_store.series_keys())
+                self._publish(touched, rebuild=True)
+            elif self._pending:
+                with self._pending_lock:
+                    keys, self._pending = self._pending, set()
+                self._publish(self._apply(keys), rebuild=False)
+        flush_series_roles()
+        return self._snapshot
+
+    def _member_for(self, key: SeriesKey) -> Optional[Tuple[ZoneKey, _Member]]:
+        station, history_id = key
+        if not station or not history_id or not sqlite_store.has_series(key):
+            return None
+        meta = sqlite_store.get_series_meta(key)
+        equipment = meta.get("equipment")
+        if not equipment:
+            return None
+        point_name = meta.get("point_name") or history_id
+        role = role_for_series(station, history_id, point_name, meta.get("tags") or [])
+        if not role:
+            return None
+        zone_key = (station, _canonical_zone_root_from_equipment(equipment))
+        return zone_key, _Member(history_id, equipment, meta.get("floor"), point_name, role)
+
+    def _apply(self, keys: Iterable[SeriesKey]) -> Set[ZoneKey]:
+        touched: Set[ZoneKey] = set()
+        for key in keys:
+            old = self._members.pop(key, None)
+            if old is not None:
+                self._zones[old[0]].pop(key[1], None)
+                touched.add(old[0])
+            new = self._member_for(key)
+            if new is not None:
+                self._members[key] = new
+                self._zones.setdefault(new[0], {})[key[1]] = new[1]
+                touched.add(new[0])
+        return touched
+
+    def _publish(self, touched: Set[ZoneKey], rebuild: bool) -> None:
+        if not touched and not rebuild:
+            return
+        pairs = {} if rebuild else dict(self._snapshot.pairs)
+        stations = {} if rebuild else dict(self._snapshot.stations)
+        changed_zones: Dict[ZoneKey, Optional[Dict[str, Any]]] = {}
+        for zone_key in touched:
+            members = self._zones.get(zone_key)
+            if members:
+                changed_zones[zone_key] = _build_zone(zone_key[0], zone_key[1], list(members.values()))
+            else:
+                self._zones.pop(zone_key, None)
+                changed_zones[zone_key] = None
+
+        for station in sorted({st for st, _ in touched}):
+            zones = dict(pairs.get(station, {}))
+            for (st, zone_root), info in changed_zones.items():
+                if st != station:
+                    continue
+                if info is None:
+                    zones.pop(zone_root, None)
+                else:
+                    zones[zone_root] = info
+            if not zones:
+                pairs.pop(station, None)
+                stations.pop(station, None)
+                continue
+            # Same zone order as zone_pairs_as_dicts(): first history_id
+            first = {root: min(self._zones[(station, root)]) for root in zones}
+            pairs[station] = {root: zones[root] for root in sorted(zones, key=first.__getitem__)}
+            stations[station] = StationZones.build(pairs[station])
+
+        self._snapshot = ZoneIndexSnapshot(
+            version=self._snapshot.version + 1,
+            pairs={st: pairs[st] for st in sorted(pairs)},
+            stations=stations,
+        )
+
+
+_zone_index = ZoneIndex()
+sqlite_store.add_series_listener(_zone_index.mark)
+series_roles.add_role_listener(_zone_index.mark)
+
+
+def get_zone_index() -> ZoneIndexSnapshot:
+    """Current zone index snapshot (see ZoneIndex); cheap when nothing changed."""
+    return _zone_index.snapshot()
+
+
 # ---------------------------------------------------------------------------
 # Helper to find a specific zone
 # ---------------------------------------------------------------------------
@@ -1,51 +1,195 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from dataclasses import asdict
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import io
 import os
 import sqlite3
+import tempfile
 import traceback
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 from ..config import AppConfig, ComfortConfig, load_config
-from ..analytics.zone_pairs import zone_pairs_as_dicts, find_zone_pair
+from ..analytics.zone_pairs import (
+    ZONE_ROLES,
+    ZONE_SORT_KEYS,
+    equipment_class,
+    find_zone_pair,
+    get_zone_index,
+)
 from ..analytics.zone_health import compute_zone_health, zone_health_to_dict
+from ..analytics.analytics_pool import AnalyticsPool
+from ..analytics.result_cache import ResultCache, snap_window, zone_series
+from ..analytics.zone_aggregates import ZoneAggregates
 from ..analytics.flow import compute_flow_tracking, FlowTrackingConfig
 from ..analytics.comfort import compute_zone_comfort
-from ..analytics.rtu import compute_rtu_health, rtu_health_to_dict
+from ..analytics.rtu import RTU_ROLES, compute_rtu_health, rtu_health_to_dict, rtu_severity_key
 from ..niagara_client.mqtt_history_ingest import make_history_mqtt_client
-from ..store import history_store, sqlite_store
+from ..niagara_client.mqtt_async_ingest import AsyncMqttIngest
+from ..niagara_client.mqtt_ingest_pool import IngestWorkerPool
+from ..niagara_client.haystack_sync import HaystackSyncer
+from ..niagara_client.haystack_watch import HaystackWatchFeed
+from ..store import bulk_import, history_store, sqlite_store
 from ..niagara_client.haystack_client import (
     HaystackHistoryClient,
     HaystackConfig as HSClientConfig,
 )
 
 
-app = FastAPI(title="Niagara Copilot Edge")
-
 # ---- Global initialization -------------------------------------------------
 
 _config: AppConfig = load_config()
 
 # Initialize SQLite history store
-sqlite_store.init(_config.db_path, _config.db_retention_hours)
+sqlite_store.init(
+    _config.db_path,
+    _config.db_retention_hours,
+    reset=_config.db_reset_on_start,
+)
 
-# MQTT history ingestion → history_store + sqlite_store
-# The mqtt_history_ingest module's callback now writes directly to both stores,
-# so we just need to construct the client with the full AppConfig.
-try:
-    _mqtt_client = make_history_mqtt_client(_config)
-except Exception as e:  # noqa: BLE001
-    # We don't crash the API if MQTT fails; just log and continue.
-    print(f"[warn] MQTT history client init failed: {e}")  # noqa: T201
-    _mqtt_client = None
+# MQTT history ingestion → history_store + sqlite_store.
+# Started from the app lifespan (not at import time) so it shares the
+# server's lifecycle; mqtt.mode picks paho's own thread or the event loop,
+# and mqtt.ingest_workers > 1 switches to the shared-subscription pool.
+_mqtt_client: Any = None
+
+
+async def _start_mqtt() -> None:
+    global _mqtt_client
+    try:
+        if _config.mqtt.ingest_workers > 1:
+            pool = IngestWorkerPool(_config)
+            pool.start()
+            _mqtt_client = pool
+        elif _config.mqtt.mode == "asyncio":
+            ingest = AsyncMqttIngest(_config)
+            await ingest.start()
+            _mqtt_client = ingest
+        else:
+            _mqtt_client = make_history_mqtt_client(_config)
+    except Exception as e:  # noqa: BLE001
+        # We don't crash the API if MQTT fails; just log and continue.
+        print(f"[warn] MQTT history client init failed: {e}")  # noqa: T201
+        _mqtt_client = None
+
+
+async def _stop_mqtt() -> None:
+    global _mqtt_client
+    client, _mqtt_client = _mqtt_client, None
+    if client is None:
+        return
+    try:
+        if isinstance(client, AsyncMqttIngest):
+            await client.stop()
+        else:
+            client.loop_stop()
+            client.disconnect()
+    except Exception as e:  # noqa: BLE001
+        print(f"[warn] MQTT history client shutdown failed: {e}")  # noqa: T201
+
+
+# Haystack -> SQLite history sync (data_source.type == "haystack")
+_haystack_syncer: Optional[HaystackSyncer] = None
+
+
+def _start_haystack_sync() -> None:
+    global _haystack_syncer
+    if _config.data_source.type != "haystack" or _haystack_client is None or hs_cfg is None:
+        return
+    if not hs_cfg.sync.enabled:
+        print("[info] Haystack sync disabled (haystack.sync.enabled=false)")
+        return
+    _haystack_syncer = HaystackSyncer(
+        _haystack_client, hs_cfg.sync, default_station=hs_cfg.project
+    )
+    _haystack_syncer.start()
+
+
+def _stop_haystack_sync() -> None:
+    global _haystack_syncer
+    syncer, _haystack_syncer = _haystack_syncer, None
+    if syncer is not None:
+        syncer.stop()
+
+
+# Haystack watchSub / watchPoll live values (haystack.watch.enabled)
+_haystack_watch: Optional[HaystackWatchFeed] = None
+
+
+def _start_haystack_watch() -> None:
+    global _haystack_watch
+    if _haystack_client is None or hs_cfg is None or not hs_cfg.watch.enabled:
+        return
+    _haystack_watch = HaystackWatchFeed(
+        _haystack_client, hs_cfg.watch, default_station=hs_cfg.project
+    )
+    _haystack_watch.start()
+
+
+def _stop_haystack_watch() -> None:
+    global _haystack_watch
+    feed, _haystack_watch = _haystack_watch, None
+    if feed is not None:
+        feed.stop()
+
+
+# Worker processes for station-wide analytics (analytics.workers; 1 = in-process)
+_analytics_pool = AnalyticsPool(_config.db_path, _config.analytics)
+
+# Zone / RTU health results per snapped window, dropped when one of their
+# series receives samples
+_result_cache = ResultCache(_config.analytics.result_cache_size)
+sqlite_store.add_sample_listener(_result_cache.invalidate_series)
+
+# Per-minute zone health buckets, updated from the spans ingest writes
+_zone_aggregates: Optional[ZoneAggregates] = None
+if _config.analytics.zone_aggregates:
+    _zone_aggregates = ZoneAggregates(
+        _config.comfort,
+        _config.analytics.merge_tolerance_seconds,
+        _config.analytics.aggregate_max_hours,
+        _config.analytics.aggregate_max_zones,
+    )
+    sqlite_store.add_sample_listener(_zone_aggregates.mark)
+
+
+def _aggregates_for(hours: int) -> Optional[ZoneAggregates]:
+    """The zone aggregates if they cover an ``hours`` window, else None."""
+    if _zone_aggregates is not None and hours <= _zone_aggregates.max_hours:
+        return _zone_aggregates
+    return None
+
+
+def _window(hours: int) -> Tuple[datetime, datetime]:
+    return snap_window(hours, _config.analytics.window_bucket_seconds)
+
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    await _start_mqtt()
+    _start_haystack_sync()
+    _start_haystack_watch()
+    _analytics_pool.start()
+    try:
+        yield
+    finally:
+        _analytics_pool.shutdown()
+        _stop_haystack_watch()
+        _stop_haystack_sync()
+        await _stop_mqtt()
+
+
+app = FastAPI(title="Niagara Copilot Edge", lifespan=_lifespan)
 
 # Haystack client (optional, only if config is present)
 _haystack_client: Optional[HaystackHistoryClient] = None
+hs_cfg = None
 try:
-    hs_cfg = None
     # Prefer top-level haystack config if present
     if getattr(_config, "haystack", None) is not None:
         hs_cfg = _config.haystack
@@ -65,6 +209,13 @@ try:
                 username=hs_cfg.username,
                 password=password,
                 proj=hs_cfg.project,
+                max_concurrency=hs_cfg.max_concurrency,
+                multi_his_read=hs_cfg.multi_his_read,
+                multi_batch_size=hs_cfg.multi_batch_size,
+                his_cache_max_samples=hs_cfg.his_cache_max_samples,
+                his_cache_settle_seconds=hs_cfg.his_cache_settle_seconds,
+                timezone=hs_cfg.timezone,
+                entity_cache_ttl_seconds=hs_cfg.entity_cache_ttl_seconds,
             )
         )
         print("[info] Haystack client initialised")
@@ -163,6 +314,7 @@ class ZoneIndexEntry(BaseModel):
     zone_root: str
     equipment: Optional[str] = None
     floor: Optional[str] = None
+    equipment_class: Optional[str] = None
 
     has_space_temp: bool = False
     has_space_temp_sp: bool = False
@@ -174,6 +326,15 @@ class ZoneIndexEntry(BaseModel):
     has_fan_status: bool = False
 
 
+class ZoneListResponse(BaseModel):
+    station: str
+    total: int      # zones matching the filters
+    offset: int
+    limit: int
+    version: int    # zone index version the page was read from
+    zones: List[ZoneIndexEntry]
+
+
 class ZoneHealthMetricsModel(BaseModel):
     # Identity
     station: str
@@ -237,26 +398,6 @@ def _rows_to_dataframe(rows: List[Dict[str, Any]]) -> Any:
     return df
 
 
-def _normalize_for_json(obj: Any) -> Any:
-    """
-    Recursively normalize Haystack / hszinc types to plain Python types that
-    FastAPI / Pydantic can serialize.
-
-    - Basic types (str, int, float, bool, None) are returned as-is.
-    - dict -> normalize values.
-    - list/tuple -> normalize each element.
-    - everything else -> str(obj).
-    """
-    if obj is None or isinstance(obj, (str, int, float, bool)):
-        return obj
-    if isinstance(obj, dict):
-        return {k: _normalize_for_json(v) for k, v in obj.items()}
-    if isinstance(obj, (list, tuple)):
-        return [_normalize_for_json(v) for v in obj]
-    # Fallback for MarkerType, Ref, Quantity, etc.
-    return str(obj)
-
-
 # ---- Basic health ----------------------------------------------------------
 
 
@@ -317,6 +458,58 @@ def debug_series_meta(
 
 
 
+@app.get("/debug/haystack_sync")
+def debug_haystack_sync() -> Dict[str, Any]:
+    """Counters from the background Haystack -> SQLite syncer."""
+    if _haystack_syncer is None:
+        return {"enabled": False}
+    return {"enabled": True, **asdict(_haystack_syncer.stats)}
+
+
+@app.get("/debug/live_values")
+def debug_live_values(
+    station: Optional[str] = Query(None, description="Optional station filter"),
+) -> Dict[str, Any]:
+    """Latest Haystack watch value per series (sqlite_store live_values)."""
+    rows = sqlite_store.get_live_values(station)
+    return {"count": len(rows), "rows": rows}
+
+
+@app.get("/debug/haystack_watch")
+def debug_haystack_watch() -> Dict[str, Any]:
+    """Counters and latest values from the Haystack watch feed."""
+    if _haystack_watch is None:
+        return {"enabled": False}
+    return {"enabled": True, **asdict(_haystack_watch.stats)}
+
+
+@app.get("/debug/haystack_cache")
+def debug_haystack_cache() -> Dict[str, Any]:
+    """Hit / miss counters for the Haystack his_read range and entity caches."""
+    if _haystack_client is None:
+        return {"his_read": None, "entities": None}
+    his_stats = _haystack_client.his_cache_stats()
+    entity_stats = _haystack_client.entity_cache_stats()
+    return {
+        "his_read": asdict(his_stats) if his_stats is not None else None,
+        "entities": asdict(entity_stats) if entity_stats is not None else None,
+    }
+
+
+@app.get("/debug/result_cache")
+def debug_result_cache() -> Dict[str, Any]:
+    """Hit rate and invalidation counters of the zone / RTU health result cache."""
+    return asdict(_result_cache.snapshot_stats())
+
+
+@app.get("/debug/zone_aggregates")
+def debug_zone_aggregates() -> Dict[str, Any]:
+    """Size and rebuild counters of the per-minute zone health aggregates."""
+    if _zone_aggregates is None:
+        return {"enabled": False}
+    return {"enabled": True, **asdict(_zone_aggregates.snapshot_stats())}
+
+
 @app.get("/debug/zone_pairs", response_model=List[ZonePairResponse])
 def debug_zone_pairs(
     station: Optional[str] = Query(None),
@@ -326,7 +519,7 @@ def debug_zone_pairs(
     Flatten the nested zone_pairs index into a simple list of ZonePairResponse,
     but keep equipment/floor and all roles visible.
     """
-    pairs_by_station = zone_pairs_as_dicts()
+    pairs_by_station = get_zone_index().pairs
     results: List[ZonePairResponse] = []
 
     for st_name, zones in pairs_by_station.items():
@@ -446,7 +639,7 @@ def debug_flow_tracking(
 ) -> FlowTrackingResponse:
     from ..store import sqlite_store as _sqlite_store
 
-    pairs_by_station = zone_pairs_as_dicts()
+    pairs_by_station = get_zone_index().pairs
     zone_info = find_zone_pair(pairs_by_station, station, zone)
     if zone_info is None:
         raise HTTPException(status_code=404, detail="Zone not found for station.")
@@ -474,7 +667,7 @@ def debug_flow_tracking(
     cfg = FlowTrackingConfig()
     cfg.timestamp_column = "timestamp"
     cfg.value_column = "value"
-    cfg.merge_tolerance_seconds = 30
+    cfg.merge_tolerance_seconds = _config.analytics.merge_tolerance_seconds
 
     metrics = compute_flow_tracking(df_flow, df_flow_sp, cfg)
 
@@ -494,6 +687,56 @@ def debug_flow_tracking(
     )
 
 
+# ---- Bulk import -----------------------------------------------------------
+
+# Request bodies above this size spill from memory to a temp file
+_IMPORT_SPOOL_BYTES = 64 * 1024 * 1024
+
+
+@app.post("/import/history")
+async def import_history(
+    request: Request,
+    format: Optional[str] = Query(
+        None,
+        description="ndjson (history frames, one per line) or csv; "
+        "defaults from Content-Type",
+    ),
+    chunk_rows: int = Query(bulk_import.DEFAULT_CHUNK_ROWS, ge=1000, le=1_000_000),
+) -> Dict[str, Any]:
+    """
+    Backfill history without going through MQTT.
+
+    The body is streamed to a spooled temp file, then imported with
+    bulk_import.import_stream (single SQLite transaction). Live ingest and
+    queries wait on the store lock for the duration of the import.
+    """
+    fmt = format
+    if fmt is None:
+        content_type = request.headers.get("content-type", "")
+        fmt = "csv" if "csv" in content_type else "ndjson"
+    if fmt not in bulk_import.IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format {fmt!r}")
+
+    spool = tempfile.SpooledTemporaryFile(max_size=_IMPORT_SPOOL_BYTES)
+    try:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        text = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+        try:
+            report = await run_in_threadpool(
+                bulk_import.import_stream, text, fmt, chunk_rows
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        spool.close()
+
+    result = asdict(report)
+    result["rows_per_minute"] = round(report.rows_per_minute)
+    return result
+
+
 # ---- Summary endpoints -----------------------------------------------------
 
 
@@ -509,7 +752,7 @@ def summary_zone_index(
     valid zone_root values to plug into /summary/zone_health,
     /summary/building_health, etc.
     """
-    pairs_by_station = zone_pairs_as_dicts()
+    pairs_by_station = get_zone_index().pairs
     zones = pairs_by_station.get(station)
     if not zones:
         raise HTTPException(status_code=404, detail="No zones found for station.")
@@ -517,49 +760,114 @@ def summary_zone_index(
     results: List[ZoneIndexEntry] = []
 
     for zone_root, info in zones.items():
-        results.append(
-            ZoneIndexEntry(
-                station=station,
-                zone_root=zone_root,
-                equipment=info.get("equipment"),
-                floor=info.get("floor"),
-                has_space_temp=info.get("space_temp") is not None,
-                has_space_temp_sp=info.get("space_temp_sp") is not None,
-                has_flow=info.get("flow") is not None,
-                has_flow_sp=info.get("flow_sp") is not None,
-                has_damper=info.get("damper") is not None,
-                has_reheat=info.get("reheat") is not None,
-                has_fan_cmd=info.get("fan_cmd") is not None,
-                has_fan_status=info.get("fan_status") is not None,
-            )
-        )
+        results.append(_zone_index_entry(station, zone_root, info))
 
     # Sort by equipment name if present, else by zone_root
     results.sort(key=lambda z: (z.equipment or z.zone_root))
     return results
 
 
+def _zone_index_entry(station: str, zone_root: str, info: Dict[str, Any]) -> ZoneIndexEntry:
+    return ZoneIndexEntry(
+        station=station,
+        zone_root=zone_root,
+        equipment=info.get("equipment"),
+        floor=info.get("floor"),
+        equipment_class=equipment_class(zone_root),
+        has_space_temp=info.get("space_temp") is not None,
+        has_space_temp_sp=info.get("space_temp_sp") is not None,
+        has_flow=info.get("flow") is not None,
+        has_flow_sp=info.get("flow_sp") is not None,
+        has_damper=info.get("damper") is not None,
+        has_reheat=info.get("reheat") is not None,
+        has_fan_cmd=info.get("fan_cmd") is not None,
+        has_fan_status=info.get("fan_status") is not None,
+    )
+
+
+@app.get("/summary/zones", response_model=ZoneListResponse)
+def summary_zones(
+    station: str = Query(..., description="Niagara station name"),
+    floor: Optional[str] = Query(None, description="Exact floor"),
+    equipment_class: Optional[str] = Query(
+        None, description="vav, rtu, ahu, fcu, heat_pump, vrf, erv, doas or other"
+    ),
+    has: List[str] = Query(
+        [], description="Roles the zone must have, e.g. has=flow&has=flow_sp"
+    ),
+    sort: str = Query("equipment", description="equipment, zone_root or floor"),
+    descending: bool = Query(False),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+) -> ZoneListResponse:
+    """
+    Filtered, sorted, paginated zone listing served from the zone index's
+    per-station floor / equipment class / role indexes.
+    """
+    snapshot = get_zone_index()
+    zones = snapshot.station(station)
+    if zones is None:
+        raise HTTPException(status_code=404, detail="No zones found for station.")
+    unknown = [role for role in has if role not in ZONE_ROLES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown role(s): {', '.join(unknown)}")
+    if sort not in ZONE_SORT_KEYS:
+        raise HTTPException(
+            status_code=400, detail=f"sort must be one of {', '.join(ZONE_SORT_KEYS)}"
+        )
+
+    total, page = zones.query(
+        floor=floor,
+        equipment_class=equipment_class,
+        roles=has,
+        sort=sort,
+        descending=descending,
+        offset=offset,
+        limit=limit,
+    )
+    return ZoneListResponse(
+        station=station,
+        total=total,
+        offset=offset,
+        limit=limit,
+        version=snapshot.version,
+        zones=[_zone_index_entry(station, root, zones.zones[root]) for root in page],
+    )
+
+
 @app.get("/summary/zone_health", response_model=ZoneHealthMetricsModel)
 def summary_zone_health(
     station: str = Query(...),
     zone: str = Query(..., description="Zone root (canonical)"),
     hours: int = Query(24, ge=1, le=168),
 ) -> ZoneHealthMetricsModel:
-    pairs_by_station = zone_pairs_as_dicts()
+    pairs_by_station = get_zone_index().pairs
     zone_info = find_zone_pair(pairs_by_station, station, zone)
     if zone_info is None:
         raise HTTPException(status_code=404, detail="Zone not found for station.")
 
-    end = datetime.utcnow()
-    start = end - timedelta(hours=hours)
+    start, end = _window(hours)
 
-    metrics = compute_zone_health(
-        station=station,
-        zone_root=zone,
-        zone_info=zone_info,
-        comfort_cfg=_config.comfort,
-        start=start,
-        end=end,
+    aggregates = _aggregates_for(hours)
+
+    def compute() -> Any:
+        if aggregates is not None:
+            return aggregates.zone_health(station, zone, zone_info, start, end)
+        return compute_zone_health(
+            station=station,
+            zone_root=zone,
+            zone_info=zone_info,
+            comfort_cfg=_config.comfort,
+            start=start,
+            end=end,
+            tolerance_seconds=_config.analytics.merge_tolerance_seconds,
+        )
+
+    metrics = _result_cache.get_or_compute(
+        ("zone_health", station, zone, start, end),
+        zone_info,
+        zone_series(station, [zone_info]),
+        compute,
     )
 
     return ZoneHealthMetricsModel(**zone_health_to_dict(metrics))
@@ -570,26 +878,38 @@ def summary_building_health(
     station: str = Query(...),
     hours: int = Query(24, ge=1, le=168),
 ) -> List[ZoneHealthMetricsModel]:
-    pairs_by_station = zone_pairs_as_dicts()
+    pairs_by_station = get_zone_index().pairs
     zones = pairs_by_station.get(station)
     if not zones:
         raise HTTPException(status_code=404, detail="No zones found for station.")
 
-    end = datetime.utcnow()
-    start = end - timedelta(hours=hours)
+    start, end = _window(hours)
 
-    results: List[ZoneHealthMetricsModel] = []
+    # From the per-minute aggregates when enabled; otherwise all zones in
+    # one pass (sharded over analytics workers when configured), same
+    # values as compute_zone_health per zone
+    aggregates = _aggregates_for(hours)
 
-    for zone_root, zone_info in zones.items():
-        metrics = compute_zone_health(
+    def compute() -> Any:
+        if aggregates is not None:
+            return aggregates.building_health(station, zones, start, end)
+        return _analytics_pool.building_health(
             station=station,
-            zone_root=zone_root,
-            zone_info=zone_info,
+            zones=zones,
             comfort_cfg=_config.comfort,
             start=start,
             end=end,
         )
-        results.append(ZoneHealthMetricsModel(**zone_health_to_dict(metrics)))
+
+    building = _result_cache.get_or_compute(
+        ("building_health", station, None, start, end),
+        zones,
+        zone_series(station, zones.values()),
+        compute,
+    )
+    results: List[ZoneHealthMetricsModel] = [
+        ZoneHealthMetricsModel(**zone_health_to_dict(metrics)) for metrics in building
+    ]
 
     # Sort worst first: primary by status, secondary by overall score ascending
     status_order = {"critical": 0, "warning": 1, "ok": 2, "no_data": 3}
@@ -618,21 +938,25 @@ def summary_rtu_health(
       - compressor/cooling short-cycling
       - discharge air tracking (once those roles are wired)
     """
-    pairs_by_station = zone_pairs_as_dicts()
+    pairs_by_station = get_zone_index().pairs
     zone_info = find_zone_pair(pairs_by_station, station, zone)
     if zone_info is None:
         raise HTTPException(status_code=404, detail="Zone/equipment not found for station.")
 
-    end = datetime.utcnow()
-    start = end - timedelta(hours=hours)
+    start, end = _window(hours)
 
     try:
-        metrics = compute_rtu_health(
-            station=station,
-            zone_root=zone,
-            zone_info=zone_info,
-            start=start,
-            end=end,
+        metrics = _result_cache.get_or_compute(
+            ("rtu_health", station, zone, start, end),
+            zone_info,
+            zone_series(station, [zone_info]),
+            lambda: compute_rtu_health(
+                station=station,
+                zone_root=zone,
+                zone_info=zone_info,
+                start=start,
+                end=end,
+            ),
         )
     except Exception as e:  # noqa: BLE001
         tb = traceback.format_exc()
@@ -647,6 +971,51 @@ def summary_rtu_health(
     return payload
 
 
+@app.get("/summary/fleet_rtu_health")
+def summary_fleet_rtu_health(
+    station: str = Query(...),
+    hours: int = Query(24, ge=1, le=168),
+    equipment_class: Optional[str] = Query(
+        None, description="Only this equipment class, e.g. rtu or ahu"
+    ),
+    limit: Optional[int] = Query(None, ge=1, description="Worst N units only"),
+) -> List[Dict[str, Any]]:
+    """
+    RTU health for every unit of a station (zones with a fan, compressor,
+    cooling valve or discharge-air series), worst first: critical, then
+    warning, ok and no_data; within a status, more reasons and more short
+    cycles first. Series are loaded in bulk and metrics computed for all
+    units in one pass (sharded over analytics workers when configured).
+    """
+    zones = get_zone_index().station(station)
+    if zones is None:
+        raise HTTPException(status_code=404, detail="No zones found for station.")
+
+    roots = set().union(*(zones.by_role.get(role, frozenset()) for role in RTU_ROLES))
+    if equipment_class is not None:
+        roots &= zones.by_class.get(equipment_class, frozenset())
+    units = {root: zones.zones[root] for root in zones.order["equipment"] if root in roots}
+
+    start, end = _window(hours)
+
+    try:
+        metrics = _result_cache.get_or_compute(
+            ("fleet_rtu_health", station, equipment_class, start, end),
+            zones,
+            zone_series(station, units.values()),
+            lambda: _analytics_pool.rtu_health(station=station, zones=units, start=start, end=end),
+        )
+    except Exception as e:  # noqa: BLE001
+        tb = traceback.format_exc()
+        print("[error] summary_fleet_rtu_health failed:\n", tb)  # noqa: T201
+        raise HTTPException(status_code=500, detail=f"RTU fleet health error: {e}")
+
+    metrics = sorted(metrics, key=rtu_severity_key)
+    if limit is not None:
+        metrics = metrics[:limit]
+    return [rtu_health_to_dict(m) for m in metrics]
+
+
 # ---- Haystack test endpoints ----------------------------------------------
 
 
@@ -662,9 +1031,9 @@ def haystack_test_zone_temps(
         )
 
     try:
-        points = _haystack_client.find_zone_temp_points(site_ref=site_ref, limit=500)
-        points_norm = _normalize_for_json(points)
-        return {"count": len(points_norm), "points": points_norm}
+        # Rows come back JSON-safe (and cached that way) from the client
+        points = _haystack_client.find_zone_temp_points(site_ref=site_ref, limit=500, json_safe=True)
+        return {"count": len(points), "points": points}
     except Exception as e:  # noqa: BLE001
         tb = traceback.format_exc()
         print("[error] haystack_test_zoneTemps failed:\n", tb)  # noqa: T201
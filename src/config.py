@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 
 import yaml
 from pydantic import BaseModel
@@ -16,6 +16,14 @@ DataSourceType = Literal[
     "haystack",
 ]
 
+# How the MQTT history client is driven:
+#   thread  -> paho's own background network thread (loop_start)
+#   asyncio -> paho sockets registered on the FastAPI event loop
+MqttIngestMode = Literal[
+    "thread",
+    "asyncio",
+]
+
 
 class MqttConfig(BaseModel):
     host: str = "localhost"
@@ -27,12 +35,78 @@ class MqttConfig(BaseModel):
     username: Optional[str] = None
     password_env: Optional[str] = None
 
+    # Session handling. clean_session=False + qos=1 gives a persistent
+    # broker session: messages published while we are down are queued.
+    client_id: Optional[str] = None      # required for persistent sessions; derived if unset
+    clean_session: bool = True
+    qos: int = 0
+    # Drop queued frames/rows at or below each series' persisted watermark.
+    # Late or backfilled rows older than the watermark are dropped too
+    # (counted, and logged per series outside startup catch-up)
+    resume_from_watermark: bool = False
+    catchup_idle_seconds: float = 2.0    # quiet gap that marks the end of startup catch-up
+
+    # Ingest runtime
+    mode: MqttIngestMode = "thread"
+    decode_workers: int = 1              # asyncio mode: concurrent decode/store batches
+    reconnect_min_seconds: float = 1.0   # asyncio mode: first reconnect delay
+    reconnect_max_seconds: float = 60.0  # asyncio mode: backoff ceiling
+
+    # Multi-process ingest: >1 launches that many decode workers subscribed
+    # via an MQTT v5 shared subscription ($share/<shared_group>/<history_topic>)
+    ingest_workers: int = 1
+    shared_group: str = "niagara_copilot"
+
+
+class HaystackSyncConfig(BaseModel):
+    """Background Haystack -> SQLite history sync (data_source.type == "haystack")."""
+    enabled: bool = True
+    point_filter: str = "point and his"
+    max_points: int = 5000
+    # Station name stored with synced series; defaults to each point's siteRef
+    # display name, then haystack.project
+    station: Optional[str] = None
+    interval_seconds: float = 300.0            # between incremental sync passes
+    discovery_interval_seconds: float = 3600.0  # between point re-discovery
+    initial_lookback_hours: int = 24           # first pull for points with no watermark
+    # Station load bounds
+    max_concurrency: int = 4
+    max_requests_per_second: float = 5.0
+    write_batch_points: int = 50               # points per SQLite transaction
+
+
+class HaystackWatchConfig(BaseModel):
+    """Live current values via Haystack watchSub / watchPoll."""
+    enabled: bool = False
+    # Explicit point ids; when empty, points come from point_filter
+    point_ids: List[str] = []
+    point_filter: str = "point and his and cur"
+    max_points: int = 1000
+    station: Optional[str] = None              # same defaulting as sync.station
+    poll_interval_seconds: float = 10.0
+    lease_seconds: int = 300                   # server drops the watch if polls stop
+    discovery_interval_seconds: float = 3600.0
+
 
 class HaystackConfig(BaseModel):
     uri: str
     username: str
     password_env: str = "NIAGARA_PASSWORD"
     project: str = "default"
+    # his_read_many: parallel request cap, multi-id hisRead (None = probe)
+    # and point ids per multi-id request
+    max_concurrency: int = 8
+    multi_his_read: Optional[bool] = None
+    multi_batch_size: int = 50
+    # his_read range cache: sample budget (0 = off), unsettled tail window,
+    # station timezone for resolving 'today' / date ranges (None = host zone)
+    his_cache_max_samples: int = 500_000
+    his_cache_settle_seconds: float = 300.0
+    timezone: Optional[str] = None
+    # read_by_filter entity metadata cache lifetime (0 = off)
+    entity_cache_ttl_seconds: float = 300.0
+    sync: HaystackSyncConfig = HaystackSyncConfig()
+    watch: HaystackWatchConfig = HaystackWatchConfig()
 
 
 class DataSourceConfig(BaseModel):
@@ -52,6 +126,31 @@ class ComfortConfig(BaseModel):
     comfort_band_degF: float
 
 
+class AnalyticsConfig(BaseModel):
+    # Worker processes for station-wide analytics (building health, RTU
+    # fleet). 1 = compute in the API process.
+    workers: int = 1
+    # Stations with fewer zones than this per worker stay in-process
+    min_zones_per_worker: int = 50
+    # Nearest-sample window when aligning a zone's roles (temp/setpoint,
+    # flow/flow setpoint, damper, reheat) for zone and building health
+    merge_tolerance_seconds: float = 30
+    # Summary endpoints round their window end up to this many seconds so
+    # repeated requests share a window (0 = exact utcnow()), and cache up
+    # to result_cache_size results per window (0 = off); see result_cache
+    window_bucket_seconds: float = 60
+    result_cache_size: int = 1024
+    # Zone / building health from per-minute aggregates updated on ingest
+    # (zone_aggregates) instead of re-reading every sample. Off by default:
+    # results can differ at the window edges (see analytics.zone_aggregates).
+    # Buckets are kept for windows up to aggregate_max_hours (longer ones
+    # are computed from the store) and for the aggregate_max_zones most
+    # recently read zones
+    zone_aggregates: bool = False
+    aggregate_max_hours: float = 24
+    aggregate_max_zones: int = 2000
+
+
 class AppConfig(BaseModel):
     site_name: str
     data_source: DataSourceConfig
@@ -61,10 +160,16 @@ class AppConfig(BaseModel):
     # Local SQLite history store path and retention
     db_path: str = "data/history.sqlite"
     db_retention_hours: int = 24 * 30  # 30 days default
+    # Drop and recreate history tables on start. Set False to keep history
+    # (and MQTT resume watermarks, the series catalog) across restarts;
+    # required for history seeded with src.store.bulk_import.
+    db_reset_on_start: bool = True
 
     # Optional global Haystack defaults
     haystack: Optional[HaystackConfig] = None
 
+    analytics: AnalyticsConfig = AnalyticsConfig()
+
 
 def load_config(path: Path | str = "config/config.yaml") -> AppConfig:
     """
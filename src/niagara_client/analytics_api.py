@@ -1,6 +1,10 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
 
 import requests
 from pydantic import BaseModel, Field, ValidationError
@@ -33,9 +37,28 @@ class AnalyticsResponseEnvelope(BaseModel):
     responses: List[AnalyticsResponse]
 
 
+@dataclass
+class AnalyticsClientStats:
+    posts: int = 0                # HTTP requests sent
+    nodes_requested: int = 0      # GetNode entries across all posts
+    cache_hits: int = 0
+    errors: int = 0
+    total_post_seconds: float = 0.0
+    last_post_seconds: Optional[float] = None
+    max_post_seconds: float = 0.0
+
+    @property
+    def mean_post_seconds(self) -> float:
+        return self.total_post_seconds / self.posts if self.posts else 0.0
+
+
 class AnalyticsApiClient:
     """
     Thin client for Niagara Analytics Web API.
+
+    GetNode responses are cached for ``cache_ttl_seconds`` (0 disables the
+    cache). get_nodes() packs many GetNode requests into one envelope, and
+    crawl() walks a tree level by level with those batches.
     """
 
     def __init__(
@@ -45,33 +68,172 @@ class AnalyticsApiClient:
         password: str,
         timeout: int = 10,
         verify_ssl: bool = True,
+        batch_size: int = 200,
+        max_concurrency: int = 4,
+        cache_ttl_seconds: float = 300.0,
     ) -> None:
         self._base_url = base_url.rstrip("/")
         self._timeout = timeout
         self._session = requests.Session()
         self._session.auth = (username, password)
         self._verify_ssl = verify_ssl
+        self._batch_size = max(1, batch_size)
+        self._max_concurrency = max(1, max_concurrency)
+        self._cache_ttl = cache_ttl_seconds
+        # node -> (expires_at monotonic, response)
+        self._cache: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.stats = AnalyticsClientStats()
 
     def _post(self, payload: Dict[str, Any]) -> AnalyticsResponseEnvelope:
-        resp = self._session.post(
-            self._base_url,
-            json=payload,
-            timeout=self._timeout,
-            verify=self._verify_ssl,
-        )
-        resp.raise_for_status()
+        t0 = time.perf_counter()
+        try:
+            resp = self._session.post(
+                self._base_url,
+                json=payload,
+                timeout=self._timeout,
+                verify=self._verify_ssl,
+            )
+            resp.raise_for_status()
+        except Exception:
+            with self._lock:
+                self.stats.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - t0
+            with self._lock:
+                self.stats.posts += 1
+                self.stats.nodes_requested += len(payload.get("requests", ()))
+                self.stats.total_post_seconds += elapsed
+                self.stats.last_post_seconds = elapsed
+                self.stats.max_post_seconds = max(self.stats.max_post_seconds, elapsed)
         try:
             return AnalyticsResponseEnvelope.parse_obj(resp.json())
         except ValidationError as exc:
             raise ValueError("Failed to parse analytics response envelope") from exc
 
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def _cached(self, node: str) -> Optional[AnalyticsResponse]:
+        if self._cache_ttl <= 0:
+            return None
+        with self._lock:
+            hit = self._cache.get(node)
+            if hit is None:
+                return None
+            if hit[0] <= time.monotonic():
+                del self._cache[node]
+                return None
+            self.stats.cache_hits += 1
+            return hit[1]
+
+    def _remember(self, responses: Dict[str, AnalyticsResponse]) -> None:
+        if self._cache_ttl <= 0:
+            return
+        expires_at = time.monotonic() + self._cache_ttl
+        with self._lock:
+            for node, response in responses.items():
+                self._cache[node] = (expires_at, response)
+
+    def invalidate(self, node: Optional[str] = None) -> None:
+        """Drop one cached node, or the whole cache."""
+        with self._lock:
+            if node is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(node, None)
+
     def get_node(self, node: str) -> AnalyticsResponse:
         """
         Returns the first response in the envelope for a GetNode call.
         """
+        cached = self._cached(node)
+        if cached is not None:
+            return cached
         payload = {"requests": [{"message": "GetNode", "node": node}]}
         envelope = self._post(payload)
         if not envelope.responses:
             raise ValueError("Analytics response envelope contained no entries")
 
-        return envelope.responses[0]
+        response = envelope.responses[0]
+        self._remember({node: response})
+        return response
+
+    def get_nodes(self, nodes: Iterable[str]) -> Dict[str, AnalyticsResponse]:
+        """
+        GetNode for many nodes: cached ones are answered locally, the rest
+        are sent ``batch_size`` per POST, with up to ``max_concurrency``
+        POSTs in flight. Returns {node: response}; nodes the server left out
+        of its envelope are missing from the result.
+        """
+        out: Dict[str, AnalyticsResponse] = {}
+        todo: List[str] = []
+        for node in dict.fromkeys(nodes):
+            cached = self._cached(node)
+            if cached is not None:
+                out[node] = cached
+            else:
+                todo.append(node)
+        if not todo:
+            return out
+
+        batches = [todo[i:i + self._batch_size] for i in range(0, len(todo), self._batch_size)]
+        if len(batches) == 1:
+            results = [self._get_batch(batches[0])]
+        else:
+            workers = min(self._max_concurrency, len(batches))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="getnode") as pool:
+                results = list(pool.map(self._get_batch, batches))
+        for fetched in results:
+            out.update(fetched)
+            self._remember(fetched)
+        return out
+
+    def _get_batch(self, nodes: List[str]) -> Dict[str, AnalyticsResponse]:
+        payload = {"requests": [{"message": "GetNode", "node": n} for n in nodes]}
+        envelope = self._post(payload)
+        fetched: Dict[str, AnalyticsResponse] = {}
+        for i, response in enumerate(envelope.responses):
+            # Match on the echoed node; fall back to request order
+            node = response.node if response.node in nodes else (nodes[i] if i < len(nodes) else None)
+            if node is not None:
+                fetched[node] = response
+        return fetched
+
+    def crawl(
+        self,
+        root: str = "slot:/",
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+    ) -> Dict[str, AnalyticsResponse]:
+        """
+        Breadth-first walk from root. Each level's children are fetched
+        with one get_nodes() call, so a tree costs about
+        ceil(level size / batch_size) POSTs per level. Children are taken
+        from ``data[].data`` of responses with hasChildren set.
+        """
+        seen: Dict[str, AnalyticsResponse] = {}
+        level = [root]
+        depth = 0
+        while level:
+            if max_nodes is not None:
+                level = level[: max(0, max_nodes - len(seen))]
+                if not level:
+                    break
+            responses = self.get_nodes(level)
+            seen.update(responses)
+            if max_depth is not None and depth >= max_depth:
+                break
+            next_level: List[str] = []
+            for node in level:
+                response = responses.get(node)
+                if response is None or not response.hasChildren:
+                    continue
+                for child in response.data or []:
+                    if child.data not in seen:
+                        next_level.append(child.data)
+            level = list(dict.fromkeys(next_level))
+            depth += 1
+        return seen
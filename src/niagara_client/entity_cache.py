@@ -0,0 +1,260 @@
+# src/niagara_client/entity_cache.py
+"""
+TTL cache for Haystack entity metadata (read_by_filter results).
+
+Rows are stored once, already normalized by HaystackHistoryClient, keyed by
+filter expression. Every cached row is also indexed by its id, so point
+lookups after a discovery call (or an explicit bulk prefetch) never go back
+to the station.
+
+"All entities of a site / equip" is only answered from a complete result of
+that scope's own filter (site_filter() / equip_filter()): rows other
+filters happened to return are not known to be all of them.
+
+A JSON-safe copy of a filter's rows is built lazily on first request and
+kept with the entry, so API handlers do not re-walk the grid per call.
+
+Cached rows are shared between callers and must be treated as read-only.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+Row = Dict[str, Any]
+
+# (id, siteRef id, equipRef id) for one row, all without the leading '@'
+RowRefs = Tuple[str, Optional[str], Optional[str]]
+
+
+@dataclass
+class EntityCacheStats:
+    hits: int = 0             # read_by_filter calls served locally
+    misses: int = 0
+    expired: int = 0          # misses caused by TTL
+    lookups: int = 0          # by_id / by_site / by_equip calls
+    lookup_misses: int = 0    # including scopes with no complete result cached
+    invalidations: int = 0
+    filters: int = 0
+    entities: int = 0
+
+
+@dataclass
+class _FilterEntry:
+    rows: List[Row]
+    refs: List[RowRefs]
+    limit: int
+    expires_at: float
+    json_rows: Optional[List[Row]] = None
+
+    @property
+    def complete(self) -> bool:
+        """True when the server returned fewer rows than the limit asked for."""
+        return len(self.rows) < self.limit
+
+
+@dataclass
+class _EntityEntry:
+    row: Row
+    expires_at: float
+    filters: Set[str] = field(default_factory=set)
+
+
+def to_json_safe(obj: Any) -> Any:
+    """
+    Recursively normalize Haystack / hszinc types to plain Python types that
+    FastAPI / Pydantic can serialize: dicts and lists are copied, basic
+    types are returned as-is and everything else (Marker, Ref, Quantity,
+    ...) becomes str(obj).
+    """
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    if isinstance(obj, dict):
+        return {k: to_json_safe(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_json_safe(v) for v in obj]
+    return str(obj)
+
+
+def _bare(ref: Optional[str]) -> Optional[str]:
+    if ref is None:
+        return None
+    return ref[1:] if ref.startswith("@") else ref
+
+
+def site_filter(site_ref: str) -> str:
+    """The read filter for every entity of a site."""
+    return f"siteRef==@{_bare(site_ref)}"
+
+
+def equip_filter(equip_ref: str) -> str:
+    """The read filter for every entity of an equip."""
+    return f"equipRef==@{_bare(equip_ref)}"
+
+
+class EntityCache:
+    """
+    Thread-safe filter -> rows cache with an id index.
+
+        cache = EntityCache(ttl_seconds=300)
+        rows = cache.get("point and his", limit=1000)
+        if rows is None:
+            rows, refs = fetch(...)
+            cache.put("point and his", 1000, rows, refs)
+        cache.by_id("S.AmsShop.Vav1_01.ZoneTemp")
+        cache.by_equip("S.AmsShop.Vav1_01")   # None until equip_filter() is cached
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, max_filters: int = 256) -> None:
+        self.ttl = ttl_seconds
+        self.max_filters = max(1, max_filters)
+        self.stats = EntityCacheStats()
+        self._filters: "OrderedDict[str, _FilterEntry]" = OrderedDict()
+        self._entities: Dict[str, _EntityEntry] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Filter results
+    # ------------------------------------------------------------------
+
+    def _fresh_entry(self, filter_expr: str, now: float) -> Optional[_FilterEntry]:
+        entry = self._filters.get(filter_expr)
+        if entry is not None and entry.expires_at <= now:
+            self._drop_filter(filter_expr)
+            self.stats.expired += 1
+            return None
+        return entry
+
+    def _lookup(self, filter_expr: str, limit: int) -> Optional[_FilterEntry]:
+        entry = self._fresh_entry(filter_expr, time.monotonic())
+        # A result fetched with a larger limit (or one that was complete)
+        # also answers smaller requests.
+        if entry is None or not (limit <= entry.limit or entry.complete):
+            self.stats.misses += 1
+            return None
+        self._filters.move_to_end(filter_expr)
+        self.stats.hits += 1
+        return entry
+
+    def get(self, filter_expr: str, limit: int) -> Optional[List[Row]]:
+        """Cached rows for (filter, limit), or None on a miss."""
+        with self._lock:
+            entry = self._lookup(filter_expr, limit)
+            return None if entry is None else entry.rows[:limit]
+
+    def get_json(self, filter_expr: str, limit: int) -> Optional[List[Row]]:
+        """Like get(), but JSON-safe rows (built once per cached result)."""
+        with self._lock:
+            entry = self._lookup(filter_expr, limit)
+            if entry is None:
+                return None
+            if entry.json_rows is None:
+                entry.json_rows = to_json_safe(entry.rows)
+            return entry.json_rows[:limit]
+
+    def put(self, filter_expr: str, limit: int, rows: List[Row], refs: List[RowRefs]) -> None:
+        """Store a read_by_filter result; ``refs`` is parallel to ``rows``."""
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._drop_filter(filter_expr)
+            self._filters[filter_expr] = _FilterEntry(rows, refs, limit, expires_at)
+            for row, (entity_id, _site, _equip) in zip(rows, refs):
+                self._index(entity_id, row, expires_at, filter_expr)
+            while len(self._filters) > self.max_filters:
+                self._drop_filter(next(iter(self._filters)))
+            self._refresh_counts()
+
+    # ------------------------------------------------------------------
+    # Entity lookups
+    # ------------------------------------------------------------------
+
+    def by_id(self, entity_id: str) -> Optional[Row]:
+        with self._lock:
+            self.stats.lookups += 1
+            entity = self._live_entity(_bare(entity_id) or "", time.monotonic())
+            if entity is None:
+                self.stats.lookup_misses += 1
+                return None
+            return entity.row
+
+    def by_site(self, site_ref: str) -> Optional[List[Row]]:
+        """Every entity of a site, or None unless site_filter() is cached complete."""
+        with self._lock:
+            return self._scope_rows(site_filter(site_ref))
+
+    def by_equip(self, equip_ref: str) -> Optional[List[Row]]:
+        """Every entity of an equip, or None unless equip_filter() is cached complete."""
+        with self._lock:
+            return self._scope_rows(equip_filter(equip_ref))
+
+    # ------------------------------------------------------------------
+    # Invalidation / stats
+    # ------------------------------------------------------------------
+
+    def invalidate(self, filter_expr: Optional[str] = None) -> None:
+        """Drop one filter's result (and the entities it indexed), or everything."""
+        with self._lock:
+            self.stats.invalidations += 1
+            if filter_expr is None:
+                self._filters.clear()
+                self._entities.clear()
+            else:
+                self._drop_filter(filter_expr)
+            self._refresh_counts()
+
+    def snapshot_stats(self) -> EntityCacheStats:
+        with self._lock:
+            self._refresh_counts()
+            return EntityCacheStats(**vars(self.stats))
+
+    # ------------------------------------------------------------------
+    # Internals (lock held)
+    # ------------------------------------------------------------------
+
+    def _index(
+        self,
+        entity_id: str,
+        row: Row,
+        expires_at: float,
+        filter_expr: str,
+    ) -> None:
+        old = self._entities.get(entity_id)
+        filters = {filter_expr}
+        if old is not None:
+            filters |= old.filters
+        self._entities[entity_id] = _EntityEntry(row, expires_at, filters)
+
+    def _drop_filter(self, filter_expr: str) -> None:
+        entry = self._filters.pop(filter_expr, None)
+        if entry is None:
+            return
+        for entity_id, _, _ in entry.refs:
+            entity = self._entities.get(entity_id)
+            if entity is None:
+                continue
+            entity.filters.discard(filter_expr)
+            if not entity.filters:
+                del self._entities[entity_id]
+
+    def _live_entity(self, entity_id: str, now: float) -> Optional[_EntityEntry]:
+        entity = self._entities.get(entity_id)
+        if entity is None or entity.expires_at <= now:
+            return None
+        return entity
+
+    def _scope_rows(self, filter_expr: str) -> Optional[List[Row]]:
+        # Only a complete result of the scope's own filter lists all of it
+        self.stats.lookups += 1
+        entry = self._fresh_entry(filter_expr, time.monotonic())
+        if entry is None or not entry.complete:
+            self.stats.lookup_misses += 1
+            return None
+        self._filters.move_to_end(filter_expr)
+        return entry.rows
+
+    def _refresh_counts(self) -> None:
+        self.stats.filters = len(self._filters)
+        self.stats.entities = len(self._entities)
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 try:
     # pyhaystack Niagara client
+    import hszinc
+    from pyhaystack.client.http.exceptions import HTTPStatusError
     from pyhaystack.client.niagara import NiagaraHaystackSession
+    from pyhaystack.exception import HaystackError
 except ImportError as e:  # noqa: BLE001
     # Make the error obvious at import time if pyhaystack is missing
     raise ImportError(
@@ -14,6 +20,32 @@ except ImportError as e:  # noqa: BLE001
         "Install with: pip install pyhaystack"
     ) from e
 
+from .entity_cache import (
+    EntityCache,
+    EntityCacheStats,
+    RowRefs,
+    equip_filter,
+    site_filter,
+    to_json_safe,
+)
+from .his_cache import HisCacheStats, HisReadCache
+
+# Row limit of entities_for_site / entities_for_equip reads: high enough
+# that the result is complete, so the cache can answer the scope later
+_SCOPE_LIMIT = 100_000
+
+# HTTP statuses that mean the station does not take the multi-id hisRead grid
+_MULTI_UNSUPPORTED_STATUS = (400, 404)
+
+
+# hszinc's pyparsing grammar is not safe to run from several threads at
+# once (pyparsing probes parse-action arity on first use, racily), which
+# his_read_many's thread pool would trigger. The client therefore asks
+# pyhaystack for raw responses and parses them itself (_parse_grid) under
+# this lock. Grid parsing is CPU-bound under the GIL anyway, so serialising
+# it costs nothing; requests still overlap.
+_PARSE_LOCK = threading.Lock()
+
 
 @dataclass
 class HaystackConfig:
@@ -24,12 +56,43 @@ class HaystackConfig:
     username:  Niagara / nHaystack username
     password:  Password for the user
     proj:      Optional project/station hint (not used by NiagaraHaystackSession)
+    max_concurrency: Max parallel hisRead requests issued by his_read_many
+    multi_his_read:  Use the multi-id hisRead grid (True/False), or None to
+                     ask the server via pyhaystack's feature probe
+    multi_batch_size: Point ids per multi-id hisRead request
+    his_cache_max_samples: Sample budget of the his_read range cache (0 disables it)
+    his_cache_settle_seconds: Most recent window never treated as complete
+    timezone:  Station IANA timezone used to resolve 'today' / date ranges
+               for the cache (None = this host's local zone)
+    entity_cache_ttl_seconds: Lifetime of cached read_by_filter results
+               (0 disables the entity cache)
     """
 
     uri: str
     username: str
     password: str
     proj: str = "default"
+    max_concurrency: int = 8
+    multi_his_read: Optional[bool] = None
+    multi_batch_size: int = 50
+    his_cache_max_samples: int = 500_000
+    his_cache_settle_seconds: float = 300.0
+    timezone: Optional[str] = None
+    entity_cache_ttl_seconds: float = 300.0
+
+
+# A Haystack range string ('today', '2025-11-27,2025-11-28', ...) or a
+# slice(start, end) of datetimes, which pyhaystack encodes as a DateTime range.
+HaystackRange = Union[str, slice]
+
+
+@dataclass
+class HisReadResult:
+    """One point's outcome from HaystackHistoryClient.his_read_many."""
+
+    entity_id: str
+    samples: List[Tuple[datetime, float]] = field(default_factory=list)
+    error: Optional[Exception] = None
 
 
 class HaystackHistoryClient:
@@ -37,7 +100,8 @@ class HaystackHistoryClient:
     Minimal wrapper around pyhaystack for:
 
       - Discovering entities via tag filters (read_by_filter)
-      - Reading history for a point (his_read)
+      - Reading history for a point (his_read) or many points (his_read_many)
+      - Live current values via watches (watch_sub / watch_poll / watch_unsub)
 
     Designed to be:
 
@@ -56,32 +120,81 @@ class HaystackHistoryClient:
             password=cfg.password,
             pint=False,
         )
+        self._login_lock = threading.Lock()
+        self._multi_supported: Optional[bool] = cfg.multi_his_read
+        # Set by the first multi-id hisRead that succeeds; after that a
+        # failed batch is never taken as "unsupported"
+        self._multi_confirmed = False
+        self._size_http_pool(max(1, cfg.max_concurrency))
+
+        self._his_cache: Optional[HisReadCache] = None
+        if cfg.his_cache_max_samples > 0:
+            tz = None
+            if cfg.timezone:
+                from zoneinfo import ZoneInfo
+
+                tz = ZoneInfo(cfg.timezone)
+            self._his_cache = HisReadCache(
+                max_samples=cfg.his_cache_max_samples,
+                settle_seconds=cfg.his_cache_settle_seconds,
+                tz=tz,
+            )
+        self._entity_cache: Optional[EntityCache] = None
+        if cfg.entity_cache_ttl_seconds > 0:
+            self._entity_cache = EntityCache(ttl_seconds=cfg.entity_cache_ttl_seconds)
 
     # -------------------------------------------------------------------------
     # Core API (matches HistoryClient protocol)
     # -------------------------------------------------------------------------
 
-    def read_by_filter(self, filter_expr: str, limit: int = 1000) -> List[Dict[str, Any]]:
+    def read_by_filter(
+        self,
+        filter_expr: str,
+        limit: int = 1000,
+        use_cache: bool = True,
+        json_safe: bool = False,
+    ) -> List[Dict[str, Any]]:
         """
         Run a Haystack `read` operation with a filter expression.
 
+        Results are served from the entity cache while fresh (see
+        entity_cache_ttl_seconds); pass use_cache=False to force a station
+        read. Cached rows are shared, so do not mutate them.
+
         Returns:
             List of dictionaries; each dict is a row of tags for one entity.
+            With json_safe=True, hszinc values (markers, refs, ...) are
+            converted to plain JSON types.
 
         Important: we special-case 'id' so you always get a usable string.
         """
-        op = self._session.read(filter_expr=filter_expr, limit=limit)
-        op.wait()
-        grid = op.result
+        cache = self._entity_cache if use_cache else None
+        if cache is not None:
+            cached = cache.get_json(filter_expr, limit) if json_safe else cache.get(filter_expr, limit)
+            if cached is not None:
+                return cached
+
+        grid = _parse_grid(
+            self._session._on_read(
+                ids=None, filter_expr=filter_expr, limit=limit, callback=None, raw_response=True
+            )
+        )
 
         rows: List[Dict[str, Any]] = []
+        refs: List[RowRefs] = []
         for row in grid:
+            refs.append((
+                _ref_name(row.get("id")) or "",
+                _ref_name(row.get("siteRef")),
+                _ref_name(row.get("equipRef")),
+            ))
             row_dict: Dict[str, Any] = {}
             for k, v in row.items():
                 # 'id' is usually an hszinc Ref; we want a stable string like '@<id>'
+                # (Ref.name is the id; Ref.value is only its display name)
                 if k == "id":
-                    if hasattr(v, "value") and v.value is not None:
-                        row_dict["id"] = f"@{v.value}"
+                    if isinstance(v, hszinc.Ref):
+                        row_dict["id"] = f"@{v.name}"
                     else:
                         row_dict["id"] = str(v)
                     continue
@@ -95,9 +208,67 @@ class HaystackHistoryClient:
                 row_dict[k] = val
             rows.append(row_dict)
 
-        return rows
+        if self._entity_cache is not None:
+            self._entity_cache.put(filter_expr, limit, rows, refs)
+            if json_safe:
+                return self._entity_cache.get_json(filter_expr, limit) or []
+        return to_json_safe(rows) if json_safe else rows
 
-    def his_read(self, entity_id: str, range_str: str) -> List[Tuple[datetime, float]]:
+    def prefetch_entities(self, filter_expr: str = "point or equip", limit: int = 10000) -> int:
+        """
+        Load a whole class of entities in one read so later get_entity
+        calls are answered locally. (entities_for_equip / entities_for_site
+        are cached per scope, by their own first read.) Returns the number
+        of rows cached.
+        """
+        return len(self.read_by_filter(filter_expr, limit=limit, use_cache=False))
+
+    def get_entity(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        """One entity's tags by id; reads `id==@...` from the station on a cache miss."""
+        if self._entity_cache is not None:
+            row = self._entity_cache.by_id(entity_id)
+            if row is not None:
+                return row
+        rows = self.read_by_filter(f"id==@{_point_ref(entity_id)}", limit=1)
+        return rows[0] if rows else None
+
+    def entities_for_equip(self, equip_ref: str) -> List[Dict[str, Any]]:
+        """
+        Every entity whose equipRef is equip_ref: from a complete cached
+        `equipRef==@...` read, otherwise read from the station.
+        """
+        if self._entity_cache is not None:
+            rows = self._entity_cache.by_equip(equip_ref)
+            if rows is not None:
+                return rows
+        return self.read_by_filter(equip_filter(equip_ref), limit=_SCOPE_LIMIT)
+
+    def entities_for_site(self, site_ref: str) -> List[Dict[str, Any]]:
+        """
+        Every entity whose siteRef is site_ref: from a complete cached
+        `siteRef==@...` read, otherwise read from the station.
+        """
+        if self._entity_cache is not None:
+            rows = self._entity_cache.by_site(site_ref)
+            if rows is not None:
+                return rows
+        return self.read_by_filter(site_filter(site_ref), limit=_SCOPE_LIMIT)
+
+    def entity_cache_stats(self) -> Optional[EntityCacheStats]:
+        """read_by_filter cache counters, or None when the cache is disabled."""
+        return self._entity_cache.snapshot_stats() if self._entity_cache is not None else None
+
+    def invalidate_entity_cache(self, filter_expr: Optional[str] = None) -> None:
+        """Forget one filter's cached result, or all entity metadata."""
+        if self._entity_cache is not None:
+            self._entity_cache.invalidate(filter_expr)
+
+    def his_read(
+        self,
+        entity_id: str,
+        range_str: HaystackRange,
+        use_cache: bool = True,
+    ) -> List[Tuple[datetime, float]]:
         """
         Read history for a historized point by its Haystack id and a range string.
 
@@ -109,33 +280,252 @@ class HaystackHistoryClient:
                        - 'yesterday'
                        - '2025-11-27,2025-11-28'
                        - '2025-11-27T00:00,2025-11-27T23:59'
+                       or slice(start_datetime, end_datetime)
+            use_cache: Serve already-fetched parts of the range from the local
+                       range cache and only request the missing sub-ranges.
 
         Returns:
             List of (timestamp, value) tuples.
         """
-        # pyhaystack docs: point can be the ID string of the historical point entity
-        if isinstance(entity_id, str) and entity_id.startswith("@"):
-            point_id = entity_id[1:]  # strip leading '@'
+        if use_cache and self._his_cache is not None:
+            return self._his_cache.read(_point_ref(entity_id), range_str, fetch=self._his_read_raw)
+        return self._his_read_raw(entity_id, range_str)
+
+    def _his_read_raw(self, entity_id: str, range_str: HaystackRange) -> List[Tuple[datetime, float]]:
+        op = self._session._on_his_read(
+            point=_point_ref(entity_id), rng=range_str, callback=None, raw_response=True
+        )
+        return _grid_to_samples(_parse_grid(op))
+
+    def his_cache_stats(self) -> Optional[HisCacheStats]:
+        """his_read range cache counters, or None when the cache is disabled."""
+        return self._his_cache.snapshot_stats() if self._his_cache is not None else None
+
+    def invalidate_his_cache(self, entity_id: Optional[str] = None) -> None:
+        """Forget cached history for one point, or for all points."""
+        if self._his_cache is not None:
+            self._his_cache.invalidate(_point_ref(entity_id) if entity_id else None)
+
+    def his_read_many(
+        self,
+        entity_ids: Iterable[str],
+        range_str: HaystackRange,
+        max_workers: Optional[int] = None,
+        throttle: Optional[Callable[[], None]] = None,
+        use_cache: bool = True,
+    ) -> Iterator[HisReadResult]:
+        """
+        Read history for many points over the same range, yielding one
+        HisReadResult per id as soon as its data arrives (completion order,
+        not input order). Per-point failures are reported in ``error``
+        rather than raised.
+
+        Uses the multi-id hisRead grid (batches of ``multi_batch_size``)
+        when the server supports it; otherwise issues single-point hisReads
+        across a thread pool of at most ``max_concurrency`` requests, all on
+        the one shared (already authenticated) session. A failed batch is
+        re-read point by point; multi-id reads are only turned off for the
+        session when the station rejects the first one (error grid or HTTP
+        400/404), not on timeouts or server errors.
+
+        ``throttle``, if given, is called (from the worker thread) before
+        every request, e.g. to apply a rate limit. Single-point reads go
+        through the his_read range cache unless ``use_cache`` is False; the
+        multi-id grid path always reads from the station.
+        """
+        ids = list(dict.fromkeys(entity_ids))
+        if not ids:
+            return
+        workers = max(1, max_workers or self._cfg.max_concurrency)
+        self._ensure_logged_in()
+
+        if self._use_multi_his_read():
+            size = max(1, self._cfg.multi_batch_size)
+            jobs = [ids[i:i + size] for i in range(0, len(ids), size)]
+            read_job = self._read_batch
         else:
-            point_id = entity_id
+            jobs = [[entity_id] for entity_id in ids]
+            read_job = partial(self._read_single, use_cache=use_cache)
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(jobs)), thread_name_prefix="hisread") as pool:
+            futures = [pool.submit(read_job, job, range_str, throttle) for job in jobs]
+            try:
+                for fut in as_completed(futures):
+                    yield from fut.result()
+            finally:
+                # Caller stopped early: drop requests that have not started.
+                for fut in futures:
+                    fut.cancel()
 
-        op = self._session.his_read(point=point_id, rng=range_str)
-        op.wait()
-        grid = op.result
+    # -------------------------------------------------------------------------
+    # Watches (live current values)
+    # -------------------------------------------------------------------------
 
-        samples: List[Tuple[datetime, float]] = []
-        for row in grid:
-            ts = row["ts"]
-            val = row["val"]
+    def watch_sub(
+        self,
+        entity_ids: Iterable[str],
+        watch_id: Optional[str] = None,
+        watch_dis: str = "niagara-copilot",
+        lease_seconds: Optional[int] = None,
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Open a watch on entity_ids (or add them to an existing watch_id).
 
+        Returns (watch_id, rows); rows carry each point's current value as
+        {'id', 'curVal', 'curStatus', ...}.
+        """
+        grid = hszinc.Grid()
+        if watch_id is not None:
+            grid.metadata["watchId"] = watch_id
+        else:
+            grid.metadata["watchDis"] = watch_dis
+        if lease_seconds is not None:
+            grid.metadata["lease"] = hszinc.Quantity(lease_seconds, "s")
+        grid.column["id"] = {}
+        for entity_id in entity_ids:
+            grid.append({"id": hszinc.Ref(_point_ref(entity_id))})
+        result = self._post_grid_sync("watchSub", grid)
+        new_id = result.metadata.get("watchId", watch_id)
+        if new_id is None:
+            raise RuntimeError("watchSub response has no watchId")
+        return str(new_id), _watch_rows(result)
+
+    def watch_poll(self, watch_id: str, refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Poll a watch: rows for points whose value changed since the last
+        poll, or for every point when refresh=True. Each poll also renews
+        the watch lease.
+        """
+        grid = hszinc.Grid()
+        grid.metadata["watchId"] = watch_id
+        if refresh:
+            grid.metadata["refresh"] = hszinc.MARKER
+        grid.column["empty"] = {}
+        return _watch_rows(self._post_grid_sync("watchPoll", grid))
+
+    def watch_unsub(self, watch_id: str, entity_ids: Optional[Iterable[str]] = None) -> None:
+        """Remove entity_ids from a watch, or close it when entity_ids is None."""
+        grid = hszinc.Grid()
+        grid.metadata["watchId"] = watch_id
+        grid.column["id"] = {}
+        if entity_ids is None:
+            grid.metadata["close"] = hszinc.MARKER
+        else:
+            for entity_id in entity_ids:
+                grid.append({"id": hszinc.Ref(_point_ref(entity_id))})
+        self._post_grid_sync("watchUnsub", grid)
+
+    def _post_grid_sync(self, op_name: str, grid: Any) -> Any:
+        # pyhaystack's own watch_* helpers post unsub to watchSub and ignore
+        # refresh, so the watch grids are built here.
+        self._ensure_logged_in()
+        return _parse_grid(self._session._post_grid(op_name, grid, None, raw_response=True))
+
+    # -------------------------------------------------------------------------
+    # his_read_many internals
+    # -------------------------------------------------------------------------
+
+    def _read_single(
+        self,
+        ids: List[str],
+        range_str: HaystackRange,
+        throttle: Optional[Callable[[], None]] = None,
+        use_cache: bool = True,
+    ) -> List[HisReadResult]:
+        entity_id = ids[0]
+        try:
+            if throttle is not None:
+                throttle()
+            return [HisReadResult(entity_id, self.his_read(entity_id, range_str, use_cache))]
+        except Exception as e:  # noqa: BLE001
+            return [HisReadResult(entity_id, error=e)]
+
+    def _read_batch(
+        self,
+        ids: List[str],
+        range_str: HaystackRange,
+        throttle: Optional[Callable[[], None]] = None,
+    ) -> List[HisReadResult]:
+        if self._multi_supported is False:
+            # Turned off by another batch of this call
+            return self._read_singles(ids, range_str, throttle)
+        try:
+            if throttle is not None:
+                throttle()
+            grid = hszinc.Grid()
+            grid.metadata["range"] = _range_to_str(range_str)
+            grid.column["id"] = {}
+            for entity_id in ids:
+                grid.append({"id": hszinc.Ref(_point_ref(entity_id))})
+            result = _parse_grid(self._session._post_grid("hisRead", grid, None, raw_response=True))
+        except Exception as e:  # noqa: BLE001
+            if not self._multi_confirmed and _multi_unsupported(e):
+                # Station rejected the grid: stop trying for this session.
+                print(f"[haystack] multi-id hisRead not supported ({e}); using single-point reads")
+                self._multi_supported = False
+            else:
+                # Timeout, 5xx, one bad point...: retry this batch singly only.
+                print(f"[haystack] multi-id hisRead batch failed ({e}); reading its {len(ids)} points singly")
+            return self._read_singles(ids, range_str, throttle)
+        self._multi_confirmed = True
+
+        # Response columns: ts, v0..vN in request order
+        series: List[List[Tuple[datetime, float]]] = [[] for _ in ids]
+        for row in result:
+            ts = row["ts"]
             if hasattr(ts, "value"):
                 ts = ts.value
-            if hasattr(val, "value"):
-                val = val.value
-
-            samples.append((ts, val))
+            for i in range(len(ids)):
+                val = row.get(f"v{i}")
+                if val is None:
+                    continue
+                if hasattr(val, "value"):
+                    val = val.value
+                series[i].append((ts, val))
+        return [HisReadResult(entity_id, samples) for entity_id, samples in zip(ids, series)]
 
-        return samples
+    def _read_singles(
+        self,
+        ids: List[str],
+        range_str: HaystackRange,
+        throttle: Optional[Callable[[], None]] = None,
+    ) -> List[HisReadResult]:
+        out: List[HisReadResult] = []
+        for entity_id in ids:
+            out.extend(self._read_single([entity_id], range_str, throttle))
+        return out
+
+    def _use_multi_his_read(self) -> bool:
+        if self._multi_supported is None:
+            try:
+                # pyhaystack parses the 'about' / 'ops' grids itself
+                with _PARSE_LOCK:
+                    op = self._session.has_features([self._session.FEATURE_HISREAD_MULTI])
+                    op.wait()
+                    features = op.result
+                self._multi_supported = bool(features.get(self._session.FEATURE_HISREAD_MULTI))
+            except Exception:  # noqa: BLE001
+                self._multi_supported = False
+        return self._multi_supported
+
+    def _ensure_logged_in(self) -> None:
+        """Authenticate once up front so concurrent requests share the login."""
+        with self._login_lock:
+            if self._session.is_logged_in:
+                return
+            op = self._session.authenticate()
+            op.wait()
+
+    def _size_http_pool(self, size: int) -> None:
+        # requests keeps 10 pooled connections per host by default; match
+        # max_concurrency so parallel reads reuse sockets instead of churning.
+        http = getattr(getattr(self._session, "_client", None), "_session", None)
+        if hasattr(http, "mount"):
+            import requests.adapters
+
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=size)
+            http.mount("http://", adapter)
+            http.mount("https://", adapter)
 
     # -------------------------------------------------------------------------
     # Convenience helpers
@@ -145,6 +535,7 @@ class HaystackHistoryClient:
         self,
         site_ref: Optional[str] = None,
         limit: int = 500,
+        json_safe: bool = False,
     ) -> List[Dict[str, Any]]:
         """
         Convenience helper: find all zone temp points.
@@ -157,4 +548,87 @@ class HaystackHistoryClient:
         else:
             filter_expr = "point and zone and temp"
 
-        return self.read_by_filter(filter_expr, limit=limit)
+        return self.read_by_filter(filter_expr, limit=limit, json_safe=json_safe)
+
+
+def _point_ref(entity_id: str) -> str:
+    # pyhaystack docs: point can be the ID string of the historical point entity
+    if isinstance(entity_id, str) and entity_id.startswith("@"):
+        return entity_id[1:]  # strip leading '@'
+    return entity_id
+
+
+def _parse_grid(op: Any) -> Any:
+    """
+    Wait for a raw_response grid operation and parse its body, as
+    pyhaystack's grid operations do, but under _PARSE_LOCK. An error grid
+    raises HaystackError; HTTP errors are raised by op.result.
+    """
+    op.wait()
+    response = op.result
+    content_type = response.content_type
+    if content_type in ("text/zinc", "text/plain"):
+        mode = hszinc.MODE_ZINC
+    elif content_type == "application/json":
+        mode = hszinc.MODE_JSON
+    else:
+        # text/html: most likely a login page after the session expired
+        raise ValueError(f"Unrecognised grid content type {content_type!r}")
+    with _PARSE_LOCK:
+        grid = hszinc.parse(response.text, mode=mode, single=True)
+    if "err" in grid.metadata:
+        raise HaystackError(grid.metadata.get("dis", "Unknown Error"), grid.metadata.get("traceback"))
+    return grid
+
+
+def _multi_unsupported(e: Exception) -> bool:
+    # Error grid, or the station has no / refuses the POST hisRead form
+    if isinstance(e, HaystackError):
+        return True
+    return isinstance(e, HTTPStatusError) and e.status in _MULTI_UNSUPPORTED_STATUS
+
+
+def _ref_name(val: Any) -> Optional[str]:
+    # Bare id of an hszinc Ref (or '@id' string); None for anything else
+    if isinstance(val, hszinc.Ref):
+        return val.name
+    if isinstance(val, str) and val.startswith("@"):
+        return val[1:]
+    return None
+
+
+def _watch_rows(grid: Any) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for row in grid:
+        entity_id = _ref_name(row.get("id"))
+        if entity_id is None:
+            continue
+        out: Dict[str, Any] = {"id": f"@{entity_id}"}
+        for k, v in row.items():
+            if k != "id":
+                out[k] = v.value if hasattr(v, "value") else v
+        rows.append(out)
+    return rows
+
+
+def _range_to_str(rng: HaystackRange) -> str:
+    # Same encoding pyhaystack uses for hisRead's range argument
+    if isinstance(rng, slice):
+        return ",".join(hszinc.dump_scalar(p) for p in (rng.start, rng.stop))
+    return rng
+
+
+def _grid_to_samples(grid: Any) -> List[Tuple[datetime, float]]:
+    samples: List[Tuple[datetime, float]] = []
+    for row in grid:
+        ts = row["ts"]
+        val = row["val"]
+
+        if hasattr(ts, "value"):
+            ts = ts.value
+        if hasattr(val, "value"):
+            val = val.value
+
+        samples.append((ts, val))
+
+    return samples
@@ -0,0 +1,331 @@
+# src/niagara_client/haystack_sync.py
+"""
+Background Haystack -> SQLite history sync.
+
+With data_source.type == "haystack" nothing arrives over MQTT, so this
+syncer keeps sqlite_store populated instead:
+
+  1. discover historized points with read_by_filter (haystack.sync.point_filter),
+     recording equipment / point name / unit / marker tags in the series
+     catalog so zone_pairs and the /summary analytics can see them;
+  2. every interval, his_read_many only what is newer than each point's
+     persisted watermark (sqlite_store series_watermarks), grouping points
+     whose watermarks fall in the same window into one range;
+  3. write results as columnar blocks (sqlite_store.add_columns), several
+     points per transaction.
+
+Station load is bounded by haystack.sync.max_concurrency (parallel
+requests) and max_requests_per_second (token bucket shared by all workers).
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import hszinc
+
+from ..config import HaystackSyncConfig
+from .haystack_client import HaystackHistoryClient
+from .mqtt_history_ingest import HistoryColumns, datetime_to_epoch_ms
+
+
+# Watermarks are floored to this before grouping points into shared ranges;
+# rows at/below a point's exact watermark are dropped client-side.
+_RANGE_GRANULARITY = timedelta(minutes=5)
+
+
+class RateLimiter:
+    """Thread-safe token bucket: ``acquire()`` blocks until a token is free."""
+
+    def __init__(self, rate_per_second: float, burst: Optional[int] = None) -> None:
+        self.rate = rate_per_second
+        self.capacity = float(burst if burst is not None else max(1, int(rate_per_second)))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+@dataclass
+class SyncPoint:
+    entity_id: str        # '@S.AmsShop.Vav1_01.SpaceTemperature'
+    station: str
+    history_id: str       # stored history_id (the entity id)
+    point_name: str
+    equipment: Optional[str] = None
+    floor: Optional[str] = None
+    unit: Optional[str] = None
+    tags: Optional[List[str]] = None
+
+
+@dataclass
+class SyncStats:
+    passes: int = 0
+    points: int = 0
+    requests: int = 0
+    samples_written: int = 0
+    point_errors: int = 0
+    last_pass_seconds: Optional[float] = None
+    last_pass_at: Optional[str] = None
+    last_error: Optional[str] = None
+    # history_id -> error text from the most recent pass
+    failing_points: Dict[str, str] = field(default_factory=dict)
+
+
+def _point_from_row(row: Dict[str, Any], station: str) -> Optional[SyncPoint]:
+    entity_id = row.get("id")
+    if not entity_id:
+        return None
+    tags = sorted(k for k, v in row.items() if v is hszinc.MARKER)
+    point_name = row.get("navName") or row.get("dis") or entity_id
+    unit = row.get("unit")
+    return SyncPoint(
+        entity_id=str(entity_id),
+        station=station,
+        history_id=str(entity_id),
+        point_name=str(point_name),
+        equipment=str(row["equipRef"]) if row.get("equipRef") else None,
+        floor=str(row["floorRef"]) if row.get("floorRef") else None,
+        unit=str(unit) if unit is not None else None,
+        tags=tags or None,
+    )
+
+
+def _to_float(val: Any) -> Optional[float]:
+    if isinstance(val, bool):
+        return 1.0 if val else 0.0
+    if isinstance(val, (int, float)):
+        return float(val)
+    return None  # strings / enums / null are not stored
+
+
+class HaystackSyncer:
+    """
+    Periodic incremental sync of Haystack histories into sqlite_store.
+
+        syncer = HaystackSyncer(client, cfg.haystack.sync, default_station="default")
+        syncer.start()      # background thread
+        ...
+        syncer.stop()
+
+    ``sync_once()`` runs a single pass synchronously (discovering first if
+    needed) and returns the number of samples written.
+    """
+
+    def __init__(
+        self,
+        client: HaystackHistoryClient,
+        cfg: HaystackSyncConfig,
+        default_station: str = "default",
+    ) -> None:
+        self._client = client
+        self._cfg = cfg
+        self._default_station = default_station
+        self._limiter = RateLimiter(cfg.max_requests_per_second)
+        self._points: List[SyncPoint] = []
+        self._discovered_at = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = SyncStats()
+        # requests is counted from his_read_many's worker threads
+        self._stats_lock = threading.Lock()
+
+    def _count_request(self) -> None:
+        with self._stats_lock:
+            self.stats.requests += 1
+
+    # ------------------------------------------------------------------
+    # Discovery
+    # ------------------------------------------------------------------
+
+    def discover(self) -> List[SyncPoint]:
+        from ..store import sqlite_store
+
+        self._limiter.acquire()
+        self._count_request()
+        rows = self._client.read_by_filter(self._cfg.point_filter, limit=self._cfg.max_points)
+
+        points: List[SyncPoint] = []
+        for row in rows:
+            station = self._cfg.station or row.get("siteRef") or self._default_station
+            point = _point_from_row(row, str(station))
+            if point is None:
+                continue
+            points.append(point)
+            sqlite_store.update_series_meta(
+                (point.station, point.history_id),
+                point.equipment,
+                point.floor,
+                point.point_name,
+                point.unit,
+                point.tags,
+            )
+
+        self._points = points
+        self._discovered_at = time.monotonic()
+        self.stats.points = len(points)
+        print(f"[haystack-sync] discovered {len(points)} historized points")
+        return points
+
+    # ------------------------------------------------------------------
+    # Incremental pass
+    # ------------------------------------------------------------------
+
+    def _range_groups(self, now: datetime) -> Dict[datetime, List[Tuple[SyncPoint, Optional[datetime]]]]:
+        """Group points by range start; keeps each point's exact watermark."""
+        from ..store import sqlite_store
+
+        initial = now - timedelta(hours=self._cfg.initial_lookback_hours)
+        step = _RANGE_GRANULARITY.total_seconds()
+        groups: Dict[datetime, List[Tuple[SyncPoint, Optional[datetime]]]] = {}
+        for point in self._points:
+            wm_iso = sqlite_store.get_watermark(point.station, point.history_id)
+            watermark = datetime.fromisoformat(wm_iso) if wm_iso else None
+            if watermark is None:
+                start = initial
+            else:
+                start = datetime.fromtimestamp(
+                    (watermark.timestamp() // step) * step, tz=timezone.utc
+                )
+            groups.setdefault(start, []).append((point, watermark))
+        return groups
+
+    def sync_once(self) -> int:
+        from ..store import history_store, sqlite_store
+
+        if not self._points or (
+            time.monotonic() - self._discovered_at >= self._cfg.discovery_interval_seconds
+        ):
+            self.discover()
+
+        t0 = time.perf_counter()
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        written = 0
+        failing: Dict[str, str] = {}
+        pending: List[HistoryColumns] = []
+
+        def _flush() -> None:
+            nonlocal written
+            if not pending:
+                return
+            sqlite_store.add_columns(pending)
+            for block in pending:
+                history_store.add_columns(block)
+            written += sum(len(b) for b in pending)
+            pending.clear()
+
+        def _throttle() -> None:
+            self._limiter.acquire()
+            self._count_request()
+
+        for start, members in sorted(self._range_groups(now).items()):
+            by_id = {p.entity_id: (p, wm) for p, wm in members}
+            results = self._client.his_read_many(
+                list(by_id),
+                slice(start, now),
+                max_workers=self._cfg.max_concurrency,
+                throttle=_throttle,
+                use_cache=False,  # watermarks already make reads incremental
+            )
+            for result in results:
+                point, watermark = by_id[result.entity_id]
+                if result.error is not None:
+                    failing[point.history_id] = str(result.error)
+                    continue
+                block = self._to_columns(point, result.samples, watermark)
+                if block is not None:
+                    pending.append(block)
+                    if len(pending) >= self._cfg.write_batch_points:
+                        _flush()
+        _flush()
+
+        self.stats.passes += 1
+        self.stats.samples_written += written
+        self.stats.point_errors += len(failing)
+        self.stats.failing_points = failing
+        self.stats.last_pass_seconds = time.perf_counter() - t0
+        self.stats.last_pass_at = now.isoformat()
+        return written
+
+    @staticmethod
+    def _to_columns(
+        point: SyncPoint,
+        samples: List[Tuple[datetime, Any]],
+        watermark: Optional[datetime],
+    ) -> Optional[HistoryColumns]:
+        ts_ms: List[int] = []
+        values: List[float] = []
+        for ts, val in samples:
+            if watermark is not None and ts <= watermark:
+                continue
+            fval = _to_float(val)
+            if fval is None:
+                continue
+            ts_ms.append(datetime_to_epoch_ms(ts))
+            values.append(fval)
+        if not ts_ms:
+            return None
+        return HistoryColumns(
+            station_name=point.station,
+            history_id=point.history_id,
+            ts_ms=ts_ms,
+            values=values,
+            status=[None] * len(ts_ms),
+            equipment=point.equipment,
+            floor=point.floor,
+            point_name=point.point_name,
+            unit=point.unit,
+            tags=point.tags,
+        )
+
+    # ------------------------------------------------------------------
+    # Background thread
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="haystack-sync", daemon=True)
+        self._thread.start()
+        print(
+            f"[haystack-sync] started (every {self._cfg.interval_seconds:.0f}s, "
+            f"{self._cfg.max_concurrency} concurrent, "
+            f"{self._cfg.max_requests_per_second:g} req/s)"
+        )
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                written = self.sync_once()
+                print(
+                    f"[haystack-sync] pass {self.stats.passes}: {written} samples from "
+                    f"{self.stats.points} points in {self.stats.last_pass_seconds:.1f}s"
+                    + (f", {len(self.stats.failing_points)} failing" if self.stats.failing_points else "")
+                )
+            except Exception as e:  # noqa: BLE001
+                self.stats.last_error = str(e)
+                print(f"[haystack-sync] pass failed: {e}")
+            self._stop.wait(self._cfg.interval_seconds)
@@ -0,0 +1,248 @@
+# src/niagara_client/haystack_watch.py
+"""
+Live current values from a Haystack station via watchSub / watchPoll.
+
+Instead of his_read('today') per point, one watch is opened on the whole
+point set and polled every haystack.watch.poll_interval_seconds; the
+station only returns points whose value changed since the previous poll.
+Changes are upserted into sqlite_store's live_values table (latest value
+per (station, history_id), timestamped at poll time, status = curStatus).
+
+Live values are kept out of history_samples: the history syncer stores
+the station's trended records for the same series and period, and poll
+time samples mixed into them would double-count that period in every
+analytic.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import HaystackWatchConfig
+from .haystack_client import HaystackHistoryClient
+from .haystack_sync import SyncPoint, _point_from_row, _to_float
+from .mqtt_history_ingest import HistorySample
+
+
+@dataclass
+class WatchStats:
+    subscribes: int = 0
+    polls: int = 0
+    poll_errors: int = 0
+    points: int = 0
+    changes: int = 0              # rows returned by the station
+    samples_written: int = 0      # changes that carried a new numeric value (live_values)
+    watch_id: Optional[str] = None
+    last_poll_at: Optional[str] = None
+    last_poll_ms: Optional[float] = None
+    last_error: Optional[str] = None
+    # entity id -> (poll time ISO, value, status) for the latest change
+    latest: Dict[str, Tuple[str, float, Optional[str]]] = field(default_factory=dict)
+
+
+class HaystackWatchFeed:
+    """
+    One Haystack watch kept open and polled for deltas.
+
+        feed = HaystackWatchFeed(client, cfg.haystack.watch, default_station="default")
+        feed.start()       # background thread: subscribe, then poll
+        ...
+        feed.stop()        # closes the watch
+
+    ``subscribe()`` / ``poll_once()`` run a single step synchronously and
+    return the number of samples written.
+    """
+
+    def __init__(
+        self,
+        client: HaystackHistoryClient,
+        cfg: HaystackWatchConfig,
+        default_station: str = "default",
+    ) -> None:
+        self._client = client
+        self._cfg = cfg
+        self._default_station = default_station
+        self._points: Dict[str, SyncPoint] = {}
+        self._discovered_at = 0.0
+        self._watch_id: Optional[str] = None
+        self._watched: set = set()
+        self._last: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = WatchStats()
+
+    # ------------------------------------------------------------------
+    # Points
+    # ------------------------------------------------------------------
+
+    def _station_for(self, row: Dict[str, Any]) -> str:
+        return str(self._cfg.station or row.get("siteRef") or self._default_station)
+
+    def discover(self) -> List[SyncPoint]:
+        from ..store import sqlite_store
+
+        if self._cfg.point_ids:
+            rows = []
+            for entity_id in self._cfg.point_ids:
+                row = self._client.get_entity(entity_id)
+                rows.append(row if row is not None else {"id": f"@{entity_id.lstrip('@')}"})
+        else:
+            rows = self._client.read_by_filter(self._cfg.point_filter, limit=self._cfg.max_points)
+
+        points: Dict[str, SyncPoint] = {}
+        for row in rows:
+            point = _point_from_row(row, self._station_for(row))
+            if point is None:
+                continue
+            points[point.entity_id] = point
+            sqlite_store.update_series_meta(
+                (point.station, point.history_id),
+                point.equipment,
+                point.floor,
+                point.point_name,
+                point.unit,
+                point.tags,
+            )
+
+        self._points = points
+        self._discovered_at = time.monotonic()
+        self.stats.points = len(points)
+        return list(points.values())
+
+    # ------------------------------------------------------------------
+    # Watch lifecycle
+    # ------------------------------------------------------------------
+
+    def subscribe(self) -> int:
+        """Open the watch (or reconcile it with the current point set) and store initial values."""
+        wanted = set(self._points)
+        lease = self._cfg.lease_seconds
+        if self._watch_id is None:
+            self._watch_id, rows = self._client.watch_sub(sorted(wanted), lease_seconds=lease)
+        else:
+            rows = []
+            added = sorted(wanted - self._watched)
+            removed = sorted(self._watched - wanted)
+            if added:
+                self._watch_id, rows = self._client.watch_sub(
+                    added, watch_id=self._watch_id, lease_seconds=lease
+                )
+            if removed:
+                self._client.watch_unsub(self._watch_id, removed)
+                for entity_id in removed:
+                    self._last.pop(entity_id, None)
+        self._watched = wanted
+        self.stats.subscribes += 1
+        self.stats.watch_id = self._watch_id
+        print(f"[haystack-watch] watching {len(wanted)} points (watch {self._watch_id})")
+        return self._store(rows)
+
+    def poll_once(self) -> int:
+        if self._watch_id is None:
+            return self.subscribe()
+        t0 = time.perf_counter()
+        try:
+            rows = self._client.watch_poll(self._watch_id)
+        except Exception:
+            # Lease expired or station restarted: resubscribe next time.
+            self._watch_id = None
+            self._watched = set()
+            self.stats.poll_errors += 1
+            raise
+        self.stats.polls += 1
+        self.stats.last_poll_ms = (time.perf_counter() - t0) * 1e3
+        return self._store(rows)
+
+    def close(self) -> None:
+        watch_id, self._watch_id = self._watch_id, None
+        self._watched = set()
+        if watch_id is None:
+            return
+        try:
+            self._client.watch_unsub(watch_id)
+        except Exception as e:  # noqa: BLE001
+            print(f"[haystack-watch] closing watch {watch_id} failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Stores
+    # ------------------------------------------------------------------
+
+    def _store(self, rows: List[Dict[str, Any]]) -> int:
+        from ..store import sqlite_store
+
+        now = datetime.now(timezone.utc)
+        self.stats.last_poll_at = now.isoformat()
+        self.stats.changes += len(rows)
+
+        samples: List[HistorySample] = []
+        for row in rows:
+            point = self._points.get(row["id"])
+            value = _to_float(row.get("curVal"))
+            if point is None or value is None:
+                continue
+            status = row.get("curStatus")
+            status = str(status) if status is not None else None
+            # Some servers return unchanged points on every poll
+            if self._last.get(point.entity_id) == (value, status):
+                continue
+            self._last[point.entity_id] = (value, status)
+            self.stats.latest[point.entity_id] = (now.isoformat(), value, status)
+            samples.append(
+                HistorySample(
+                    station_name=point.station,
+                    history_id=point.history_id,
+                    timestamp=now,
+                    value=value,
+                    status=status,
+                    equipment=point.equipment,
+                    floor=point.floor,
+                    point_name=point.point_name,
+                    unit=point.unit,
+                    tags=point.tags,
+                )
+            )
+
+        if samples:
+            sqlite_store.put_live_values(samples)
+            self.stats.samples_written += len(samples)
+        return len(samples)
+
+    # ------------------------------------------------------------------
+    # Background thread
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="haystack-watch", daemon=True)
+        self._thread.start()
+        print(
+            f"[haystack-watch] started (poll every {self._cfg.poll_interval_seconds:g}s, "
+            f"lease {self._cfg.lease_seconds}s)"
+        )
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if not self._points or (
+                    time.monotonic() - self._discovered_at >= self._cfg.discovery_interval_seconds
+                ):
+                    self.discover()
+                    self.subscribe()
+                else:
+                    self.poll_once()
+            except Exception as e:  # noqa: BLE001
+                self.stats.last_error = str(e)
+                print(f"[haystack-watch] {e}")
+            self._stop.wait(self._cfg.poll_interval_seconds)
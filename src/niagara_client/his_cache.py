@@ -0,0 +1,246 @@
+# src/niagara_client/his_cache.py
+"""
+Range-aware cache for Haystack hisRead results.
+
+For each point we remember which time intervals have already been fetched
+from the station (merged when they overlap or touch) together with the
+samples in them. A read for [start, end] is answered from memory for the
+covered parts, and only the missing sub-ranges go to the station.
+
+Coverage never extends past ``now - settle`` at fetch time: Niagara can
+still append records for the last few minutes, so that tail is re-read on
+the next request instead of being treated as complete.
+
+Memory is bounded by a total sample budget; whole points are evicted in
+least-recently-used order.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Any, Callable, List, Optional, Tuple
+
+Interval = Tuple[datetime, datetime]
+Sample = Tuple[datetime, Any]
+
+
+@dataclass
+class HisCacheStats:
+    hits: int = 0             # reads served entirely from cache
+    partial_hits: int = 0     # reads that needed some sub-ranges fetched
+    misses: int = 0           # reads with nothing cached
+    passthrough: int = 0      # ranges we could not resolve (not cached)
+    fetches: int = 0          # station hisRead requests issued for gaps
+    samples_fetched: int = 0
+    samples_served: int = 0
+    evictions: int = 0
+    points: int = 0
+    samples_cached: int = 0
+
+
+@dataclass
+class _PointEntry:
+    coverage: List[Interval] = field(default_factory=list)   # sorted, disjoint
+    ts: List[datetime] = field(default_factory=list)          # sorted
+    values: List[Any] = field(default_factory=list)
+
+    def missing(self, start: datetime, end: datetime) -> List[Interval]:
+        gaps: List[Interval] = []
+        cursor = start
+        for c_start, c_end in self.coverage:
+            if c_end < cursor:
+                continue
+            if c_start > end:
+                break
+            if c_start > cursor:
+                gaps.append((cursor, c_start))
+            cursor = max(cursor, c_end)
+            if cursor >= end:
+                break
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def add(self, start: datetime, end: datetime, samples: List[Sample]) -> int:
+        """Merge samples (replacing equal timestamps); returns the net sample growth."""
+        before = len(self.ts)
+        new = sorted(samples, key=lambda s: s[0])
+        if new and (not self.ts or new[0][0] > self.ts[-1]):
+            # Common case: extending the tail
+            self.ts.extend(t for t, _ in new)
+            self.values.extend(v for _, v in new)
+        elif new:
+            by_ts = dict(zip(self.ts, self.values))
+            by_ts.update(new)
+            ordered = sorted(by_ts.items(), key=lambda s: s[0])
+            self.ts = [t for t, _ in ordered]
+            self.values = [v for _, v in ordered]
+        if start < end:
+            merged: List[Interval] = []
+            new_start, new_end = start, end
+            for c_start, c_end in self.coverage:
+                if c_end < new_start or c_start > new_end:
+                    merged.append((c_start, c_end))
+                else:
+                    new_start, new_end = min(new_start, c_start), max(new_end, c_end)
+            merged.append((new_start, new_end))
+            merged.sort()
+            self.coverage = merged
+        return len(self.ts) - before
+
+    def get(self, start: datetime, end: datetime) -> List[Sample]:
+        lo = bisect.bisect_left(self.ts, start)
+        hi = bisect.bisect_right(self.ts, end)
+        return list(zip(self.ts[lo:hi], self.values[lo:hi]))
+
+
+def resolve_range(rng: Any, tz: tzinfo, now: Optional[datetime] = None) -> Optional[Interval]:
+    """
+    Turn a Haystack range into a concrete [start, end] in absolute time.
+
+    Supports 'today', 'yesterday', 'YYYY-MM-DD', 'YYYY-MM-DD,YYYY-MM-DD'
+    (end date inclusive), 'YYYY-MM-DDTHH:MM[:SS],...' (naive times are
+    in ``tz``) and slice(start, end). Returns None for anything else.
+    """
+    now = now or datetime.now(timezone.utc)
+
+    def _day_start(d: date) -> datetime:
+        return datetime.combine(d, time.min).replace(tzinfo=tz)
+
+    def _point(text: str, is_end: bool) -> datetime:
+        text = text.strip()
+        if "T" in text:
+            dt = datetime.fromisoformat(text.split(" ")[0])
+            return dt if dt.tzinfo is not None else dt.replace(tzinfo=tz)
+        d = date.fromisoformat(text)
+        return _day_start(d + timedelta(days=1)) if is_end else _day_start(d)
+
+    if isinstance(rng, slice):
+        start, end = rng.start, rng.stop
+        if not isinstance(start, datetime) or not isinstance(end, datetime):
+            return None
+        start = start if start.tzinfo else start.replace(tzinfo=tz)
+        end = end if end.tzinfo else end.replace(tzinfo=tz)
+        return start, end
+
+    if not isinstance(rng, str):
+        return None
+    text = rng.strip().strip('"')
+    today = now.astimezone(tz).date()
+    try:
+        if text == "today":
+            return _day_start(today), _day_start(today + timedelta(days=1))
+        if text == "yesterday":
+            return _day_start(today - timedelta(days=1)), _day_start(today)
+        if "," in text:
+            a, b = text.split(",", 1)
+            return _point(a, False), _point(b, True)
+        return _point(text, False), _point(text, True)
+    except ValueError:
+        return None
+
+
+class HisReadCache:
+    """
+    Thread-safe (point, time range) cache in front of a hisRead function.
+
+        cache = HisReadCache(max_samples=500_000)
+        samples = cache.read(point_id, "yesterday", fetch=raw_his_read)
+
+    ``fetch(point_id, slice(start, end))`` must return [(ts, val), ...].
+    """
+
+    def __init__(
+        self,
+        max_samples: int = 500_000,
+        settle_seconds: float = 300.0,
+        tz: Optional[tzinfo] = None,
+    ) -> None:
+        self.max_samples = max_samples
+        self.settle = timedelta(seconds=settle_seconds)
+        self.tz = tz or datetime.now().astimezone().tzinfo or timezone.utc
+        self.stats = HisCacheStats()
+        self._entries: "OrderedDict[str, _PointEntry]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def read(
+        self,
+        point_id: str,
+        rng: Any,
+        fetch: Callable[[str, slice], List[Sample]],
+    ) -> List[Sample]:
+        now = datetime.now(timezone.utc)
+        interval = resolve_range(rng, self.tz, now)
+        if interval is None:
+            with self._lock:
+                self.stats.passthrough += 1
+            return fetch(point_id, rng)
+        start, end = interval
+
+        with self._lock:
+            entry = self._entries.get(point_id)
+            gaps = entry.missing(start, end) if entry is not None else [(start, end)]
+            if not gaps:
+                self._entries.move_to_end(point_id)
+                self.stats.hits += 1
+                out = entry.get(start, end)
+                self.stats.samples_served += len(out)
+                return out
+            if entry is not None and entry.coverage:
+                self.stats.partial_hits += 1
+            else:
+                self.stats.misses += 1
+
+        # Station round trips happen outside the lock
+        fetched: List[Tuple[Interval, List[Sample]]] = []
+        for g_start, g_end in gaps:
+            samples = fetch(point_id, slice(g_start, g_end))
+            fetched.append(((g_start, g_end), samples))
+
+        covered_until = now - self.settle
+        with self._lock:
+            entry = self._entries.get(point_id)
+            if entry is None:
+                entry = self._entries[point_id] = _PointEntry()
+            for (g_start, g_end), samples in fetched:
+                self.stats.fetches += 1
+                self.stats.samples_fetched += len(samples)
+                self._size += entry.add(g_start, min(g_end, covered_until), samples)
+            self._entries.move_to_end(point_id)
+            out = entry.get(start, end)
+            self.stats.samples_served += len(out)
+            self._evict()
+            return out
+
+    def invalidate(self, point_id: Optional[str] = None) -> None:
+        """Drop one point's cached data, or everything."""
+        with self._lock:
+            if point_id is None:
+                self._entries.clear()
+                self._size = 0
+            else:
+                entry = self._entries.pop(point_id, None)
+                if entry is not None:
+                    self._size -= len(entry.ts)
+            self._refresh_counts()
+
+    def snapshot_stats(self) -> HisCacheStats:
+        with self._lock:
+            self._refresh_counts()
+            return HisCacheStats(**vars(self.stats))
+
+    def _evict(self) -> None:
+        # Keep the most recently used point even if it alone exceeds the budget
+        while self._size > self.max_samples and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._size -= len(entry.ts)
+            self.stats.evictions += 1
+        self._refresh_counts()
+
+    def _refresh_counts(self) -> None:
+        self.stats.points = len(self._entries)
+        self.stats.samples_cached = self._size
@@ -0,0 +1,263 @@
+# src/niagara_client/mqtt_async_ingest.py
+"""
+Asyncio-driven MQTT history ingestion.
+
+Instead of paho's background network thread (loop_start), the client's
+socket is registered with the running asyncio loop (add_reader/add_writer),
+following paho's documented external-loop integration. Message callbacks
+therefore run on the FastAPI event loop, and the CPU-heavy decode + store
+step is handed to a small executor so HTTP handlers stay responsive. The
+blocking connect / reconnect (DNS lookup, TCP handshake) runs in the
+default executor; the socket callbacks it triggers are marshalled back
+onto the loop.
+
+Concurrency between ingest and queries is controlled by
+``mqtt.decode_workers``: at most that many batches are being decoded and
+written at any time; further messages wait in an asyncio queue. The
+shared state those jobs touch is thread-safe: history_store and
+sqlite_store hold their own locks and ingest_stats counts under one.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+import paho.mqtt.client as mqtt
+
+from ..config import AppConfig, MqttConfig
+from .mqtt_history_ingest import (
+    _on_equipment_message,
+    catchup_tracker,
+    configure_resume,
+    decode_history_payload,
+    ingest_stats,
+    resolve_client_id,
+    store_history_samples,
+)
+
+
+def _ingest_payload(payload: bytes) -> None:
+    """Executor job: decode + store one history payload."""
+    ingest_stats.count(messages=1)
+    store_history_samples(decode_history_payload(payload))
+
+
+class AsyncMqttIngest:
+    """
+    MQTT history/equipment subscriber driven by an asyncio event loop.
+
+    Usage (from a FastAPI lifespan):
+
+        ingest = AsyncMqttIngest(cfg)
+        await ingest.start()
+        ...
+        await ingest.stop()
+    """
+
+    def __init__(self, cfg: AppConfig) -> None:
+        self._mqtt_cfg: MqttConfig = cfg.mqtt
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._queue: Optional["asyncio.Queue[bytes]"] = None
+        self._workers: List[asyncio.Task] = []
+        self._misc_task: Optional[asyncio.Task] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, self._mqtt_cfg.decode_workers),
+            thread_name_prefix="mqtt-decode",
+        )
+
+        configure_resume(self._mqtt_cfg)
+        self._client = mqtt.Client(
+            client_id=resolve_client_id(self._mqtt_cfg),
+            clean_session=self._mqtt_cfg.clean_session,
+        )
+
+        if self._mqtt_cfg.username:
+            password = None
+            if self._mqtt_cfg.password_env:
+                password = os.getenv(self._mqtt_cfg.password_env) or None
+            self._client.username_pw_set(self._mqtt_cfg.username, password=password)
+
+        self._client.on_connect = self._on_connect
+        self._client.on_disconnect = self._on_disconnect
+        self._client.on_message = self._on_message
+        self._client.message_callback_add(self._mqtt_cfg.equipment_topic, _on_equipment_message)
+
+        # External event-loop integration hooks
+        self._client.on_socket_open = self._on_socket_open
+        self._client.on_socket_close = self._on_socket_close
+        self._client.on_socket_register_write = self._on_socket_register_write
+        self._client.on_socket_unregister_write = self._on_socket_unregister_write
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._queue = asyncio.Queue()
+        self._stopping = False
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"mqtt-ingest-{i}")
+            for i in range(max(1, self._mqtt_cfg.decode_workers))
+        ]
+        try:
+            await self._loop.run_in_executor(
+                None, self._client.connect, self._mqtt_cfg.host, self._mqtt_cfg.port, 60
+            )
+            print(
+                f"[mqtt] asyncio client connected to "
+                f"{self._mqtt_cfg.host}:{self._mqtt_cfg.port}"
+            )
+        except OSError as e:
+            print(f"[mqtt] initial connect failed: {e}; retrying in background")
+            self._schedule_reconnect()
+
+    async def stop(self, drain_timeout: float = 5.0) -> None:
+        """
+        Disconnect, let queued batches finish (bounded by drain_timeout),
+        then cancel workers and shut the executor down.
+        """
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        try:
+            self._client.disconnect()
+        except Exception as e:  # noqa: BLE001
+            print(f"[mqtt] disconnect failed: {e}")
+
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                print(f"[mqtt] shutdown with {self._queue.qsize()} undrained batches")
+
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._misc_task is not None:
+            self._misc_task.cancel()
+        self._executor.shutdown(wait=True)
+        print("[mqtt] asyncio client stopped")
+
+    # ------------------------------------------------------------------
+    # Ingest pipeline
+    # ------------------------------------------------------------------
+
+    async def _worker(self) -> None:
+        assert self._queue is not None and self._loop is not None
+        while True:
+            payload = await self._queue.get()
+            try:
+                await self._loop.run_in_executor(self._executor, _ingest_payload, payload)
+            except Exception as e:  # noqa: BLE001
+                print(f"[mqtt] ingest batch failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _on_message(self, client: mqtt.Client, userdata: Any, msg: mqtt.MQTTMessage) -> None:
+        # Runs on the event loop (via loop_read); keep it to a queue hand-off.
+        catchup_tracker.note_message()
+        if self._queue is not None:
+            self._queue.put_nowait(msg.payload)
+
+    # ------------------------------------------------------------------
+    # Connection management
+    # ------------------------------------------------------------------
+
+    def _on_connect(self, client: mqtt.Client, userdata: Any, flags: Any, rc: int) -> None:
+        if rc != 0:
+            print(f"[mqtt] connect returned rc={rc}")
+            return
+        catchup_tracker.begin()
+        client.subscribe(self._mqtt_cfg.history_topic, qos=self._mqtt_cfg.qos)
+        client.subscribe(self._mqtt_cfg.equipment_topic, qos=self._mqtt_cfg.qos)
+        print(
+            f"[mqtt] subscribed to history='{self._mqtt_cfg.history_topic}' "
+            f"and equipment='{self._mqtt_cfg.equipment_topic}'"
+        )
+
+    def _on_disconnect(self, client: mqtt.Client, userdata: Any, rc: int) -> None:
+        if self._stopping:
+            return
+        print(f"[mqtt] disconnected (rc={rc}); scheduling reconnect")
+        self._schedule_reconnect()
+
+    def _schedule_reconnect(self) -> None:
+        if self._loop is None or self._stopping:
+            return
+        if self._reconnect_task is not None and not self._reconnect_task.done():
+            return
+        self._reconnect_task = self._loop.create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self) -> None:
+        """Reconnect with capped exponential backoff plus jitter."""
+        assert self._loop is not None
+        delay = self._mqtt_cfg.reconnect_min_seconds
+        attempt = 0
+        while not self._stopping:
+            attempt += 1
+            sleep_for = delay * (0.5 + random.random() / 2)
+            await asyncio.sleep(sleep_for)
+            try:
+                await self._loop.run_in_executor(None, self._client.reconnect)
+                print(f"[mqtt] reconnected after {attempt} attempt(s)")
+                return
+            except OSError as e:
+                print(f"[mqtt] reconnect attempt {attempt} failed: {e}")
+                delay = min(delay * 2, self._mqtt_cfg.reconnect_max_seconds)
+
+    # ------------------------------------------------------------------
+    # paho <-> asyncio socket glue
+    # ------------------------------------------------------------------
+
+    def _on_loop(self, fn: Callable[..., Any], *args: Any) -> None:
+        """Run fn on the event loop: directly, or scheduled when paho calls
+        back from the executor thread running connect() / reconnect()."""
+        assert self._loop is not None
+        if threading.get_ident() == self._loop_thread:
+            fn(*args)
+        else:
+            self._loop.call_soon_threadsafe(fn, *args)
+
+    def _on_socket_open(self, client: mqtt.Client, userdata: Any, sock: socket.socket) -> None:
+        self._on_loop(self._socket_opened, client, sock)
+
+    def _socket_opened(self, client: mqtt.Client, sock: socket.socket) -> None:
+        assert self._loop is not None
+        self._loop.add_reader(sock, client.loop_read)
+        if self._misc_task is None or self._misc_task.done():
+            self._misc_task = self._loop.create_task(self._misc_loop())
+
+    def _on_socket_close(self, client: mqtt.Client, userdata: Any, sock: socket.socket) -> None:
+        assert self._loop is not None
+        self._on_loop(self._loop.remove_reader, sock)
+        self._on_loop(self._loop.remove_writer, sock)
+
+    def _on_socket_register_write(self, client: mqtt.Client, userdata: Any, sock: socket.socket) -> None:
+        assert self._loop is not None
+        self._on_loop(self._loop.add_writer, sock, client.loop_write)
+
+    def _on_socket_unregister_write(self, client: mqtt.Client, userdata: Any, sock: socket.socket) -> None:
+        assert self._loop is not None
+        self._on_loop(self._loop.remove_writer, sock)
+
+    async def _misc_loop(self) -> None:
+        """Keepalive pings and timeout handling (paho's loop_misc)."""
+        # Keeps ticking while disconnected so keepalive resumes after reconnect.
+        while not self._stopping:
+            self._client.loop_misc()
+            await asyncio.sleep(1)
@@ -0,0 +1,317 @@
+# src/niagara_client/mqtt_broker_standin.py
+"""
+Local stand-in for an MQTT broker, for offline tests of the ingest modes.
+
+Implements the subset of MQTT 3.1.1 / 5.0 the ingest clients use:
+
+    CONNECT / CONNACK            (v4 and v5; no auth, no will delivery)
+    SUBSCRIBE / SUBACK           topic filters with + / # wildcards, and
+                                 v5 shared subscriptions $share/<group>/<filter>
+    UNSUBSCRIBE / UNSUBACK
+    PUBLISH                      QoS 0 and 1 in (PUBACK for QoS 1), delivered at QoS 0
+    PINGREQ / PINGRESP, DISCONNECT
+
+Messages matching a shared subscription go to ONE member of the group,
+round-robin, the way brokers load-balance a $share group; plain
+subscriptions each get a copy. No sessions, retained messages or
+persistence.
+
+    with MqttBrokerStandin() as broker:
+        cfg.mqtt.host, cfg.mqtt.port = broker.host, broker.port
+        ...
+        print(broker.stats.delivered)   # client id -> messages delivered
+"""
+from __future__ import annotations
+
+import itertools
+import socket
+import socketserver
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+CONNECT, CONNACK, PUBLISH, PUBACK = 1, 2, 3, 4
+SUBSCRIBE, SUBACK, UNSUBSCRIBE, UNSUBACK = 8, 9, 10, 11
+PINGREQ, PINGRESP, DISCONNECT = 12, 13, 14
+
+
+@dataclass
+class BrokerStats:
+    connections: int = 0
+    published: int = 0                                          # PUBLISH packets received
+    delivered: Dict[str, int] = field(default_factory=dict)     # client id -> PUBLISH sent
+    dropped: int = 0                                            # published with no subscriber
+
+
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        n, digit = divmod(n, 128)
+        out.append(digit | (0x80 if n else 0))
+        if not n:
+            return bytes(out)
+
+
+def _string(s: str) -> bytes:
+    raw = s.encode("utf-8")
+    return len(raw).to_bytes(2, "big") + raw
+
+
+def _packet(kind: int, flags: int, body: bytes) -> bytes:
+    return bytes([kind << 4 | flags]) + _varint(len(body)) + body
+
+
+def topic_matches(topic_filter: str, topic: str) -> bool:
+    """MQTT topic filter match (+ one level, # the rest)."""
+    fparts = topic_filter.split("/")
+    tparts = topic.split("/")
+    for i, part in enumerate(fparts):
+        if part == "#":
+            return True
+        if i >= len(tparts) or (part != "+" and part != tparts[i]):
+            return False
+    return len(fparts) == len(tparts)
+
+
+class _Reader:
+    """Cursor over one packet body."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.pos = 0
+
+    def take(self, n: int) -> bytes:
+        chunk = self.data[self.pos : self.pos + n]
+        self.pos += n
+        return chunk
+
+    def u8(self) -> int:
+        return self.take(1)[0]
+
+    def u16(self) -> int:
+        return int.from_bytes(self.take(2), "big")
+
+    def string(self) -> str:
+        return self.take(self.u16()).decode("utf-8")
+
+    def varint(self) -> int:
+        n, shift = 0, 0
+        while True:
+            b = self.u8()
+            n |= (b & 0x7F) << shift
+            shift += 7
+            if not b & 0x80:
+                return n
+
+    def skip_properties(self) -> None:
+        self.take(self.varint())
+
+    def rest(self) -> bytes:
+        return self.data[self.pos :]
+
+
+class _Session:
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.client_id = ""
+        self.v5 = False
+        self.send_lock = threading.Lock()
+
+    def send(self, data: bytes) -> None:
+        with self.send_lock:
+            self.sock.sendall(data)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    server: "_Server"
+
+    def _recv_exact(self, n: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < n:
+            chunk = self.request.recv(n - len(buf))
+            if not chunk:
+                raise ConnectionError("client closed")
+            buf += chunk
+        return bytes(buf)
+
+    def _read_packet(self) -> Tuple[int, int, bytes]:
+        first = self._recv_exact(1)[0]
+        length, shift = 0, 0
+        while True:
+            b = self._recv_exact(1)[0]
+            length |= (b & 0x7F) << shift
+            shift += 7
+            if not b & 0x80:
+                break
+        return first >> 4, first & 0x0F, self._recv_exact(length) if length else b""
+
+    def handle(self) -> None:
+        session = _Session(self.request)
+        try:
+            while True:
+                kind, flags, body = self._read_packet()
+                if kind == DISCONNECT:
+                    return
+                self.server.on_packet(session, kind, flags, body)
+        except (ConnectionError, OSError):
+            return
+        finally:
+            self.server.drop_session(session)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, addr: Tuple[str, int]) -> None:
+        super().__init__(addr, _Handler)
+        self.stats = BrokerStats()
+        self.lock = threading.Lock()
+        # plain filter -> sessions; (group, filter) -> members + round-robin counter
+        self.subs: Dict[str, List[_Session]] = {}
+        self.shared: Dict[Tuple[str, str], Tuple[List[_Session], Any]] = {}
+
+    def on_packet(self, s: _Session, kind: int, flags: int, body: bytes) -> None:
+        r = _Reader(body)
+        if kind == CONNECT:
+            r.string()                       # protocol name
+            s.v5 = r.u8() == 5
+            r.u8()                           # connect flags
+            r.u16()                          # keepalive
+            if s.v5:
+                r.skip_properties()
+            s.client_id = r.string()
+            with self.lock:
+                self.stats.connections += 1
+            s.send(_packet(CONNACK, 0, b"\x00\x00\x00" if s.v5 else b"\x00\x00"))
+        elif kind == SUBSCRIBE:
+            pid = r.u16()
+            if s.v5:
+                r.skip_properties()
+            granted = bytearray()
+            while r.pos < len(r.data):
+                topic_filter = r.string()
+                qos = r.u8() & 0x03
+                self._subscribe(s, topic_filter)
+                granted.append(min(qos, 1))
+            props = b"\x00" if s.v5 else b""
+            s.send(_packet(SUBACK, 0, pid.to_bytes(2, "big") + props + bytes(granted)))
+        elif kind == UNSUBSCRIBE:
+            pid = r.u16()
+            if s.v5:
+                r.skip_properties()
+            codes = bytearray()
+            while r.pos < len(r.data):
+                self._unsubscribe(s, r.string())
+                codes.append(0)
+            tail = b"\x00" + bytes(codes) if s.v5 else b""
+            s.send(_packet(UNSUBACK, 0, pid.to_bytes(2, "big") + tail))
+        elif kind == PUBLISH:
+            qos = (flags >> 1) & 0x03
+            topic = r.string()
+            pid = r.u16() if qos else None
+            if s.v5:
+                r.skip_properties()
+            self._route(topic, r.rest())
+            if qos and pid is not None:
+                s.send(_packet(PUBACK, 0, pid.to_bytes(2, "big")))
+        elif kind == PINGREQ:
+            s.send(_packet(PINGRESP, 0, b""))
+        # PUBACK / PUBREC ... from subscribers: everything goes out at QoS 0
+
+    def _subscribe(self, s: _Session, topic_filter: str) -> None:
+        with self.lock:
+            if topic_filter.startswith("$share/"):
+                _, group, flt = topic_filter.split("/", 2)
+                members, _rr = self.shared.setdefault((group, flt), ([], itertools.count()))
+                if s not in members:
+                    members.append(s)
+            else:
+                members = self.subs.setdefault(topic_filter, [])
+                if s not in members:
+                    members.append(s)
+
+    def _unsubscribe(self, s: _Session, topic_filter: str) -> None:
+        with self.lock:
+            if topic_filter.startswith("$share/"):
+                _, group, flt = topic_filter.split("/", 2)
+                entry = self.shared.get((group, flt))
+                members = entry[0] if entry else []
+            else:
+                members = self.subs.get(topic_filter, [])
+            if s in members:
+                members.remove(s)
+
+    def drop_session(self, s: _Session) -> None:
+        with self.lock:
+            for members in self.subs.values():
+                if s in members:
+                    members.remove(s)
+            for members, _rr in self.shared.values():
+                if s in members:
+                    members.remove(s)
+
+    def _route(self, topic: str, payload: bytes) -> None:
+        with self.lock:
+            self.stats.published += 1
+            targets = {
+                id(m): m
+                for flt, members in self.subs.items()
+                if topic_matches(flt, topic)
+                for m in members
+            }
+            for (_group, flt), (members, rr) in self.shared.items():
+                if members and topic_matches(flt, topic):
+                    m = members[next(rr) % len(members)]
+                    targets[id(m)] = m
+            if not targets:
+                self.stats.dropped += 1
+            for m in targets.values():
+                self.stats.delivered[m.client_id] = self.stats.delivered.get(m.client_id, 0) + 1
+        for m in targets.values():
+            body = _string(topic) + (b"\x00" if m.v5 else b"") + payload
+            try:
+                m.send(_packet(PUBLISH, 0, body))
+            except OSError:
+                pass
+
+
+class MqttBrokerStandin:
+    """In-process MQTT broker stand-in on 127.0.0.1 (port 0 = pick a free port)."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self._server = _Server((host, port))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def host(self) -> str:
+        return str(self._server.server_address[0])
+
+    @property
+    def port(self) -> int:
+        return int(self._server.server_address[1])
+
+    @property
+    def stats(self) -> BrokerStats:
+        return self._server.stats
+
+    def start(self) -> "MqttBrokerStandin":
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, name="mqtt-broker-standin", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "MqttBrokerStandin":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
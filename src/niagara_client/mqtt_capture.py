@@ -0,0 +1,363 @@
+# src/niagara_client/mqtt_capture.py
+"""
+Capture raw MQTT traffic to a compact file and replay it offline.
+
+The capture format is a small binary log so multi-hour recordings stay
+manageable on the edge box:
+
+    header:  b"NCEMQTT1"
+    record:  <float64 arrival offset seconds> <uint16 topic len> <uint32 payload len>
+             <topic bytes (utf-8)> <payload bytes>
+
+Files ending in ``.gz`` are transparently gzip-compressed.
+
+Typical use:
+
+    # Record 10 minutes from the station broker
+    python -m src.niagara_client.mqtt_capture record --out cap.bin.gz --seconds 600
+
+    # Replay at 10x into a throwaway SQLite file and print a load report
+    python -m src.niagara_client.mqtt_capture replay cap.bin.gz --speed 10
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import queue
+import struct
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator, List, Optional, Sequence
+
+import paho.mqtt.client as mqtt
+
+from .mqtt_history_ingest import _on_equipment_message, _on_mqtt_message, ingest_stats
+
+
+CAPTURE_MAGIC = b"NCEMQTT1"
+_RECORD_HEADER = struct.Struct("<dHI")
+
+MessageHandler = Callable[[Any, Any, mqtt.MQTTMessage], None]
+
+
+# ---------------------------------------------------------------------------
+# Capture file I/O
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class CapturedMessage:
+    offset: float  # seconds since the start of the capture
+    topic: str
+    payload: bytes
+
+
+def _open_capture(path: Path, mode: str) -> BinaryIO:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode)  # type: ignore[return-value]
+    return path.open(mode)
+
+
+class CaptureWriter:
+    """
+    Append-only writer for capture files.
+
+    Thread-safe: paho delivers messages on its network thread while the
+    recorder may be closed from the main thread.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh: Optional[BinaryIO] = _open_capture(self._path, "wb")
+        self._fh.write(CAPTURE_MAGIC)
+        self._t0 = time.monotonic()
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def write(self, topic: str, payload: bytes, offset: Optional[float] = None) -> None:
+        if offset is None:
+            offset = time.monotonic() - self._t0
+        topic_b = topic.encode("utf-8")
+        with self._lock:
+            if self._fh is None:
+                return
+            self._fh.write(_RECORD_HEADER.pack(offset, len(topic_b), len(payload)))
+            self._fh.write(topic_b)
+            self._fh.write(payload)
+            self.count += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def __enter__(self) -> "CaptureWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def read_capture(path: Path | str) -> Iterator[CapturedMessage]:
+    """
+    Yield CapturedMessage records from a capture file in arrival order.
+    """
+    path = Path(path)
+    with _open_capture(path, "rb") as fh:
+        magic = fh.read(len(CAPTURE_MAGIC))
+        if magic != CAPTURE_MAGIC:
+            raise ValueError(f"{path} is not an MQTT capture file")
+
+        while True:
+            header = fh.read(_RECORD_HEADER.size)
+            if not header:
+                return
+            if len(header) < _RECORD_HEADER.size:
+                # Truncated tail (e.g. recorder killed mid-write)
+                print(f"[capture] truncated record header at end of {path}")
+                return
+            offset, topic_len, payload_len = _RECORD_HEADER.unpack(header)
+            topic_b = fh.read(topic_len)
+            payload = fh.read(payload_len)
+            if len(topic_b) < topic_len or len(payload) < payload_len:
+                print(f"[capture] truncated record at end of {path}")
+                return
+            yield CapturedMessage(offset=offset, topic=topic_b.decode("utf-8"), payload=payload)
+
+
+# ---------------------------------------------------------------------------
+# Recorder
+# ---------------------------------------------------------------------------
+
+
+def record(
+    host: str,
+    port: int,
+    topics: Sequence[str],
+    out_path: Path | str,
+    seconds: Optional[float] = None,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+) -> int:
+    """
+    Subscribe to ``topics`` with a dedicated client and write every message
+    to ``out_path`` until ``seconds`` elapse (or Ctrl+C).
+
+    Runs independently of the ingest client, so it can shadow production.
+    Returns the number of captured messages.
+    """
+    writer = CaptureWriter(out_path)
+    client = mqtt.Client()
+    if username:
+        client.username_pw_set(username, password=password)
+
+    def _on_message(_client: mqtt.Client, _userdata: Any, msg: mqtt.MQTTMessage) -> None:
+        writer.write(msg.topic, msg.payload)
+
+    def _on_connect(_client: mqtt.Client, _userdata: Any, _flags: Any, rc: int) -> None:
+        if rc != 0:
+            print(f"[capture] connect returned rc={rc}")
+        for topic in topics:
+            _client.subscribe(topic)
+
+    client.on_message = _on_message
+    client.on_connect = _on_connect
+    client.connect(host, port, keepalive=60)
+    client.loop_start()
+    print(f"[capture] recording {list(topics)} from {host}:{port} -> {out_path}")
+
+    try:
+        deadline = None if seconds is None else time.monotonic() + seconds
+        while deadline is None or time.monotonic() < deadline:
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.loop_stop()
+        client.disconnect()
+        writer.close()
+
+    print(f"[capture] wrote {writer.count} messages to {out_path}")
+    return writer.count
+
+
+# ---------------------------------------------------------------------------
+# Replayer
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class ReplayReport:
+    messages: int
+    samples: int
+    decode_errors: int
+    store_errors: int
+    elapsed_s: float
+    messages_per_sec: float
+    samples_per_sec: float
+    store_latency_p50_ms: Optional[float]
+    store_latency_p99_ms: Optional[float]
+    queue_depth_max: int
+    queue_depth_p99: Optional[int]
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _default_handler(history_topic: Optional[str], equipment_topic: Optional[str]) -> MessageHandler:
+    """
+    Route messages the same way make_history_mqtt_client does.
+    """
+
+    def _handler(client: Any, userdata: Any, msg: mqtt.MQTTMessage) -> None:
+        if equipment_topic is not None and msg.topic == equipment_topic:
+            _on_equipment_message(client, userdata, msg)
+        elif history_topic is None or msg.topic == history_topic:
+            _on_mqtt_message(client, userdata, msg)
+
+    return _handler
+
+
+def replay_capture(
+    path: Path | str,
+    speed: Optional[float] = 1.0,
+    handler: Optional[MessageHandler] = None,
+    history_topic: Optional[str] = None,
+    equipment_topic: Optional[str] = None,
+    max_queue: int = 0,
+) -> ReplayReport:
+    """
+    Feed a capture file through the ingest callback and measure throughput.
+
+    Args:
+        path:       capture file written by CaptureWriter / record().
+        speed:      1.0 replays with original inter-arrival gaps, N replays
+                    N times faster, None (or <= 0) replays as fast as possible.
+        handler:    paho-style on_message callback; defaults to the production
+                    history/equipment routing (_on_mqtt_message).
+        max_queue:  optional bound on the producer -> consumer queue (0 = unbounded).
+
+    A producer thread releases messages on the capture's schedule into a
+    queue drained by a single consumer, mirroring paho's one network thread.
+    Queue depth therefore shows how far ingest falls behind the offered load.
+    The caller must initialise sqlite_store first when using the default handler.
+    """
+    if handler is None:
+        handler = _default_handler(history_topic, equipment_topic)
+    if speed is not None and speed <= 0:
+        speed = None
+
+    q: "queue.Queue[Optional[CapturedMessage]]" = queue.Queue(maxsize=max_queue)
+    depths: List[int] = []
+    producer_error: List[BaseException] = []
+
+    def _produce() -> None:
+        try:
+            start = time.monotonic()
+            for rec in read_capture(path):
+                if speed is not None:
+                    due = start + rec.offset / speed
+                    delay = due - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                q.put(rec)
+        except BaseException as e:  # noqa: BLE001
+            producer_error.append(e)
+        finally:
+            q.put(None)
+
+    ingest_stats.reset()
+    messages = 0
+    t0 = time.perf_counter()
+
+    producer = threading.Thread(target=_produce, name="mqtt-replay-producer", daemon=True)
+    producer.start()
+
+    while True:
+        rec = q.get()
+        if rec is None:
+            break
+        depths.append(q.qsize())
+        msg = mqtt.MQTTMessage(topic=rec.topic.encode("utf-8"))
+        msg.payload = rec.payload
+        handler(None, None, msg)
+        messages += 1
+
+    elapsed = time.perf_counter() - t0
+    producer.join()
+    if producer_error:
+        raise producer_error[0]
+
+    latencies = list(ingest_stats.store_latencies_ms)
+    depth_p99 = _percentile([float(d) for d in depths], 99.0)
+    return ReplayReport(
+        messages=messages,
+        samples=ingest_stats.samples,
+        decode_errors=ingest_stats.decode_errors,
+        store_errors=ingest_stats.store_errors,
+        elapsed_s=elapsed,
+        messages_per_sec=messages / elapsed if elapsed > 0 else 0.0,
+        samples_per_sec=ingest_stats.samples / elapsed if elapsed > 0 else 0.0,
+        store_latency_p50_ms=_percentile(latencies, 50.0),
+        store_latency_p99_ms=_percentile(latencies, 99.0),
+        queue_depth_max=max(depths) if depths else 0,
+        queue_depth_p99=int(depth_p99) if depth_p99 is not None else None,
+    )
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Record / replay raw MQTT history traffic.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    rec = sub.add_parser("record", help="capture live MQTT traffic to a file")
+    rec.add_argument("--host", default="localhost")
+    rec.add_argument("--port", type=int, default=1883)
+    rec.add_argument("--topic", action="append", dest="topics",
+                     help="topic to capture (repeatable); defaults to the history and equipment topics")
+    rec.add_argument("--out", required=True)
+    rec.add_argument("--seconds", type=float, default=None)
+
+    rep = sub.add_parser("replay", help="replay a capture file through the ingest path")
+    rep.add_argument("path")
+    rep.add_argument("--speed", type=float, default=0.0,
+                     help="1 = real time, N = N times faster, 0 = as fast as possible")
+    rep.add_argument("--db", default=":memory:", help="SQLite path for the replay target")
+    rep.add_argument("--history-topic", default="niagara/histories")
+    rep.add_argument("--equipment-topic", default="niagara/equipment")
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "record":
+        topics = args.topics or ["niagara/histories", "niagara/equipment"]
+        record(args.host, args.port, topics, args.out, seconds=args.seconds)
+        return
+
+    from ..store import sqlite_store
+
+    sqlite_store.init(args.db, retention_hours=0)
+    report = replay_capture(
+        args.path,
+        speed=args.speed,
+        history_topic=args.history_topic,
+        equipment_topic=args.equipment_topic,
+    )
+    for key, val in asdict(report).items():
+        print(f"{key:>22}: {val}")
+
+
+if __name__ == "__main__":
+    _main()
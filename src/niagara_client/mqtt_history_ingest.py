@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import bisect
 import json
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Sequence
+import socket
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 import paho.mqtt.client as mqtt
 
@@ -90,6 +95,95 @@ class HistorySample:
         return niagara_canonical_name(self.history_id)
 
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def epoch_ms_to_datetime(ms: int) -> datetime:
+    """Epoch milliseconds -> aware UTC datetime (exact, no float rounding)."""
+    return _EPOCH + timedelta(milliseconds=ms)
+
+
+def datetime_to_epoch_ms(ts: datetime) -> int:
+    """Aware (or naive UTC) datetime -> epoch milliseconds, floored."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return (ts - _EPOCH) // timedelta(milliseconds=1)
+
+
+@dataclass
+class HistoryColumns:
+    """
+    One series' history rows in columnar form, as decoded from a columnar
+    historyData frame. Timestamps stay epoch milliseconds (ascending) so
+    the stores can take the arrays as-is instead of one HistorySample per row.
+    """
+
+    station_name: str
+    history_id: str
+    ts_ms: List[int]
+    values: List[float]
+    status: List[Optional[str]]
+
+    equipment: Optional[str] = None
+    floor: Optional[str] = None
+    point_name: Optional[str] = None
+    unit: Optional[str] = None
+    tags: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.ts_ms)
+
+    @property
+    def newest_timestamp(self) -> datetime:
+        return epoch_ms_to_datetime(self.ts_ms[-1])
+
+    def slice(self, start: int) -> "HistoryColumns":
+        """Rows from index ``start`` onwards, metadata shared."""
+        return HistoryColumns(
+            station_name=self.station_name,
+            history_id=self.history_id,
+            ts_ms=self.ts_ms[start:],
+            values=self.values[start:],
+            status=self.status[start:],
+            equipment=self.equipment,
+            floor=self.floor,
+            point_name=self.point_name,
+            unit=self.unit,
+            tags=self.tags,
+        )
+
+    def after(self, ts_ms: int) -> "HistoryColumns":
+        """Rows strictly newer than ``ts_ms``."""
+        return self.slice(bisect.bisect_right(self.ts_ms, ts_ms))
+
+    def to_samples(self) -> List[HistorySample]:
+        """Expand into HistorySample rows (for consumers that need objects)."""
+        return [
+            HistorySample(
+                station_name=self.station_name,
+                history_id=self.history_id,
+                timestamp=epoch_ms_to_datetime(ms),
+                value=float(v),
+                status=st,
+                equipment=self.equipment,
+                floor=self.floor,
+                point_name=self.point_name,
+                unit=self.unit,
+                tags=list(self.tags) if self.tags is not None else None,
+            )
+            for ms, v, st in zip(self.ts_ms, self.values, self.status)
+        ]
+
+
+# What the decoders hand to the stores: row samples and/or columnar blocks.
+HistoryRecord = Union[HistorySample, HistoryColumns]
+
+
+def count_samples(records: Iterable[HistoryRecord]) -> int:
+    """Number of history rows represented by decoded records."""
+    return sum(len(r) if isinstance(r, HistoryColumns) else 1 for r in records)
+
+
 # ---------------------------------------------------------------------------
 # MQTT frame validation / parsing (history)
 # ---------------------------------------------------------------------------
@@ -162,6 +256,116 @@ def _extract_point_metadata(point_obj: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+# Columnar historyData (exporter-controlled, schema version 1).
+#
+# Instead of an array of row objects, "historyData" may be an object of
+# parallel arrays:
+#
+#     "historyData": {
+#         "version": 1,
+#         "ts": [1764401400249, 1764401460249, ...],   # epoch ms, ascending
+#         "value": [71.5, 71.6, ...],                   # number or null
+#         "status": [0, 0, 1, ...],                     # optional
+#         "statusNames": ["{ok}", "{stale}"]            # optional
+#     }
+#
+# "status" entries are either strings / null, or integer indexes into
+# "statusNames". Rows with a null value are skipped, as in the row format.
+# All other frame fields (messageType, stationName, point, ...) are
+# unchanged, and the two formats can be mixed on the same topic.
+HISTORY_COLUMNS_VERSION = 1
+
+
+# Representable epoch-ms range (datetime years 1..9999)
+_MIN_TS_MS = -62_135_596_800_000
+_MAX_TS_MS = 253_402_300_799_999
+
+
+def _coerce_value(value: Any) -> Optional[float]:
+    """
+    float(value) as both history formats accept it; None for a value that
+    is not numeric or is NaN (history_samples.value is REAL NOT NULL).
+    """
+    try:
+        val = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if val != val else val
+
+
+def _coerce_ts_ms(ts: Any) -> Optional[int]:
+    """Integer epoch ms (integral floats accepted) in datetime range, else None."""
+    if isinstance(ts, bool):
+        return None
+    if isinstance(ts, float):
+        if not ts.is_integer():
+            return None
+        ts = int(ts)
+    elif not isinstance(ts, int):
+        return None
+    return ts if _MIN_TS_MS <= ts <= _MAX_TS_MS else None
+
+
+def _validate_history_columns(cols: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate a columnar historyData object; returns ts / value / status
+    lists of equal length, coerced per row like the row format (integer
+    epoch-ms ts, float value, str status) and sorted by ts. Null-valued
+    rows are removed; rows with an unusable ts or value are removed and
+    counted in "skipped".
+    """
+    version = cols.get("version")
+    if version != HISTORY_COLUMNS_VERSION:
+        raise ValueError(
+            f"Unsupported columnar historyData version={version!r}, "
+            f"expected {HISTORY_COLUMNS_VERSION}"
+        )
+
+    ts = cols.get("ts")
+    values = cols.get("value")
+    if not isinstance(ts, list) or not ts:
+        raise ValueError("historyData.ts must be a non-empty array")
+    if not isinstance(values, list) or len(values) != len(ts):
+        raise ValueError("historyData.value must be an array the same length as ts")
+
+    status = cols.get("status")
+    if status is None:
+        status = [None] * len(ts)
+    elif not isinstance(status, list) or len(status) != len(ts):
+        raise ValueError("historyData.status must be an array the same length as ts")
+    else:
+        names = cols.get("statusNames")
+        if isinstance(names, list):
+            try:
+                status = [names[code] if code is not None else None for code in status]
+            except (IndexError, TypeError) as e:
+                raise ValueError(f"historyData.status code not in statusNames: {e}") from e
+
+    out_ts: List[int] = []
+    out_values: List[float] = []
+    out_status: List[Optional[str]] = []
+    skipped = 0
+    for raw_ts, raw_value, st in zip(ts, values, status):
+        if raw_value is None:
+            continue
+        ms = _coerce_ts_ms(raw_ts)
+        val = _coerce_value(raw_value)
+        if ms is None or val is None:
+            skipped += 1
+            continue
+        out_ts.append(ms)
+        out_values.append(val)
+        out_status.append(str(st) if st is not None else None)
+
+    if any(a > b for a, b in zip(out_ts, out_ts[1:])):
+        order = sorted(range(len(out_ts)), key=out_ts.__getitem__)
+        out_ts = [out_ts[i] for i in order]
+        out_values = [out_values[i] for i in order]
+        out_status = [out_status[i] for i in order]
+
+    return {"ts": out_ts, "value": out_values, "status": out_status, "skipped": skipped}
+
+
 def _validate_history_frame(msg: Dict[str, Any]) -> Dict[str, Any]:
     """
     Validate and normalise a single MQTT JSON message for history.
@@ -194,8 +398,11 @@ def _validate_history_frame(msg: Dict[str, Any]) -> Dict[str, Any]:
     point_meta = _extract_point_metadata(point_obj)
 
     raw_rows = msg.get("historyData")
-    if not isinstance(raw_rows, Sequence) or not raw_rows:
-        raise ValueError("historyData must be a non-empty array")
+    columns: Optional[Dict[str, Any]] = None
+    if isinstance(raw_rows, dict):
+        columns = _validate_history_columns(raw_rows)
+    elif not isinstance(raw_rows, Sequence) or not raw_rows:
+        raise ValueError("historyData must be a non-empty array or a columnar object")
 
     return {
         "station_name": str(station_name),
@@ -205,16 +412,39 @@ def _validate_history_frame(msg: Dict[str, Any]) -> Dict[str, Any]:
         "history_id": point_meta["history_id"],
         "unit": point_meta["unit"],
         "tags": point_meta["tags"],
-        "rows": raw_rows,
+        "rows": raw_rows if columns is None else None,
+        "columns": columns,
     }
 
 
-def decode_history_frame(msg: Dict[str, Any]) -> List[HistorySample]:
+def decode_history_frame(msg: Dict[str, Any]) -> List[HistoryRecord]:
     """
-    Convert a validated MQTT JSON history frame into a list of HistorySample.
+    Convert a validated MQTT JSON history frame into a list of HistorySample,
+    or a single HistoryColumns block for columnar historyData (no per-row
+    parsing).
     """
     data = _validate_history_frame(msg)
 
+    columns = data["columns"]
+    if columns is not None:
+        ingest_stats.count(rows_skipped=columns["skipped"])
+        if not columns["ts"]:
+            return []
+        return [
+            HistoryColumns(
+                station_name=data["station_name"],
+                history_id=data["history_id"],
+                ts_ms=columns["ts"],
+                values=columns["value"],
+                status=columns["status"],
+                equipment=data["equipment"],
+                floor=data["floor"],
+                point_name=data["point_name"],
+                unit=data["unit"],
+                tags=data["tags"],
+            )
+        ]
+
     station_name: str = data["station_name"]
     equipment: Optional[str] = data["equipment"]
     floor: Optional[str] = data["floor"]
@@ -224,25 +454,32 @@ def decode_history_frame(msg: Dict[str, Any]) -> List[HistorySample]:
     tags: Optional[List[str]] = data["tags"]
     rows: Sequence[Dict[str, Any]] = data["rows"]
 
-    samples: List[HistorySample] = []
+    samples: List[HistoryRecord] = []
+    skipped = 0
 
     for row in rows:
+        if not isinstance(row, dict):
+            skipped += 1
+            continue
+
+        value = row.get("value")
+        if value is None:
+            continue
+
         ts_raw = row.get("timestamp")
         if ts_raw is None:
+            skipped += 1
             continue
 
         try:
             ts = _parse_timestamp(str(ts_raw))
         except Exception:
+            skipped += 1
             continue
 
-        value = row.get("value")
-        if value is None:
-            continue
-
-        try:
-            val_float = float(value)
-        except (TypeError, ValueError):
+        val_float = _coerce_value(value)
+        if val_float is None:
+            skipped += 1
             continue
 
         status = row.get("status")
@@ -264,6 +501,8 @@ def decode_history_frame(msg: Dict[str, Any]) -> List[HistorySample]:
             )
         )
 
+    if skipped:
+        ingest_stats.count(rows_skipped=skipped)
     return samples
 
 
@@ -295,24 +534,317 @@ def _on_equipment_message(client: mqtt.Client, userdata: Any, msg: mqtt.MQTTMess
 
 
 # ---------------------------------------------------------------------------
-# MQTT client wiring
+# Ingest counters
 # ---------------------------------------------------------------------------
 
 
-def _on_mqtt_message(client: mqtt.Client, userdata: Any, msg: mqtt.MQTTMessage) -> None:
+@dataclass
+class IngestStats:
     """
-    Default MQTT callback: history frames on history_topic.
+    Running counters for the history ingest callback.
+
+    Used by the capture/replay harness and debug tooling; store latencies
+    are kept in a bounded window so this never grows without limit.
     """
-    from ..store import history_store, sqlite_store
 
+    messages: int = 0
+    samples: int = 0
+    decode_errors: int = 0
+    rows_skipped: int = 0        # rows with an unusable timestamp / value
+    store_errors: int = 0
+    frames_discarded: int = 0    # whole frames at/below the series watermark
+    samples_discarded: int = 0   # rows at/below the watermark (whole or partial frames)
+    catchup_seconds: Optional[float] = None
+    store_latencies_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=10_000))
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def count(self, **deltas: int) -> None:
+        """Add to counters; decode / store may run on several threads."""
+        with self._lock:
+            for name, n in deltas.items():
+                setattr(self, name, getattr(self, name) + n)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.messages = 0
+            self.samples = 0
+            self.decode_errors = 0
+            self.rows_skipped = 0
+            self.store_errors = 0
+            self.frames_discarded = 0
+            self.samples_discarded = 0
+            self.catchup_seconds = None
+            self.store_latencies_ms.clear()
+
+
+ingest_stats = IngestStats()
+
+
+# ---------------------------------------------------------------------------
+# Resume-from-watermark
+# ---------------------------------------------------------------------------
+
+# (station_name, history_id) -> latest committed ts_utc ISO string, or None.
+# Unset means no filtering (every decoded row is stored).
+WatermarkLookup = Callable[[str, str], Optional[str]]
+_watermark_lookup: Optional[WatermarkLookup] = None
+
+
+def set_watermark_lookup(lookup: Optional[WatermarkLookup]) -> None:
+    """
+    Enable (or disable with None) dropping of rows at or below each series'
+    watermark. Usually ``sqlite_store.get_watermark``.
+    """
+    global _watermark_lookup
+    _watermark_lookup = lookup
+
+
+def _utc_iso(ts: datetime) -> str:
+    # Same normalisation as sqlite_store._to_utc_iso so strings compare.
+    if ts.tzinfo is None:
+        return ts.replace(tzinfo=timezone.utc).isoformat()
+    return ts.astimezone(timezone.utc).isoformat()
+
+
+def _frame_series_key(frame: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """
+    Cheap (station, history_id) extraction mirroring _extract_point_metadata,
+    without validating or walking the rows.
+    """
+    station = frame.get("stationName")
+    point = frame.get("point")
+    if not station or not isinstance(point, dict):
+        return None
+    point_name = point.get("n:displayName") or point.get("n:name")
+    history_id = point.get("n:history") or point.get("hs:history") or point_name
+    if not history_id:
+        return None
+    return str(station), str(history_id)
+
+
+def _frame_row_count(frame: Dict[str, Any]) -> int:
+    rows = frame.get("historyData")
+    if isinstance(rows, dict):
+        rows = rows.get("ts")
+    return len(rows) if isinstance(rows, list) else 0
+
+
+def _frame_newest_iso(frame: Dict[str, Any]) -> Optional[str]:
+    """
+    Newest timestamp of a frame, or None when it cannot be had cheaply
+    (the caller then filters row by row).
+
+    Columnar frames take max(ts). Row frames parse only the first and last
+    rows, which Niagara publishes in time order; a frame whose first row is
+    newer than its last is out of order, and gets None.
+    """
+    rows = frame.get("historyData")
+    if isinstance(rows, dict):
+        ts = rows.get("ts")
+        if not isinstance(ts, list) or not ts or not all(type(t) is int for t in ts):
+            return None
+        return _utc_iso(epoch_ms_to_datetime(max(ts)))
+    if not isinstance(rows, list) or not rows:
+        return None
+    ends: List[str] = []
+    for row in (rows[0], rows[-1]):
+        if not isinstance(row, dict) or row.get("timestamp") is None:
+            return None
+        try:
+            ends.append(_utc_iso(_parse_timestamp(str(row["timestamp"]))))
+        except Exception:  # noqa: BLE001
+            return None
+    first, last = ends
+    return last if first <= last else None
+
+
+def _decode_frame_after_watermark(frame: Dict[str, Any]) -> List[HistoryRecord]:
+    """
+    decode_history_frame, minus anything at or below the series watermark.
+
+    Frames entirely below the watermark (the typical persistent-session
+    backlog after a restart) are dropped before per-row parsing.
+    """
+    lookup = _watermark_lookup
+    key = _frame_series_key(frame) if lookup is not None else None
+    watermark = lookup(*key) if lookup is not None and key is not None else None
+    if watermark is None:
+        return decode_history_frame(frame)
+    assert key is not None
+
+    newest = _frame_newest_iso(frame)
+    if newest is not None and newest <= watermark:
+        dropped = _frame_row_count(frame)
+        ingest_stats.count(frames_discarded=1, samples_discarded=dropped)
+        drop_log.note(key, dropped, watermark)
+        return []
+
+    records = decode_history_frame(frame)
+    watermark_ms = datetime_to_epoch_ms(datetime.fromisoformat(watermark))
+    fresh: List[HistoryRecord] = []
+    for r in records:
+        if isinstance(r, HistoryColumns):
+            kept = r.after(watermark_ms)
+            if len(kept):
+                fresh.append(kept)
+        elif _utc_iso(r.timestamp) > watermark:
+            fresh.append(r)
+    dropped = count_samples(records) - count_samples(fresh)
+    if dropped:
+        ingest_stats.count(samples_discarded=dropped)
+        drop_log.note(key, dropped, watermark)
+    return fresh
+
+
+class WatermarkDropLog:
+    """
+    Reports rows dropped at or below their series watermark.
+
+    The filter cannot tell a replayed row from a late or backfilled one
+    with an older timestamp, so both are dropped; this makes the drops
+    visible per series. Outside catch-up (where replay is expected and
+    summarised by CatchupTracker) at most one line is printed every
+    ``interval_seconds``.
+    """
+
+    def __init__(self, interval_seconds: float = 60.0, top: int = 3) -> None:
+        self.interval_seconds = interval_seconds
+        self.top = top
+        self._lock = threading.Lock()
+        self._last_report = 0.0
+        # (station, history_id) -> (rows dropped, watermark at the last drop)
+        self._series: Dict[Tuple[str, str], Tuple[int, str]] = {}
+
+    def note(self, key: Tuple[str, str], dropped: int, watermark: str) -> None:
+        with self._lock:
+            n, _ = self._series.get(key, (0, watermark))
+            self._series[key] = (n + dropped, watermark)
+            due = time.monotonic() - self._last_report >= self.interval_seconds
+        if due and not catchup_tracker.active:
+            self.report()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series = {}
+            self._last_report = time.monotonic()
+
+    def report(self) -> None:
+        """Print and clear the drops noted since the last report."""
+        with self._lock:
+            series, self._series = self._series, {}
+            self._last_report = time.monotonic()
+        if not series:
+            return
+        total = sum(n for n, _ in series.values())
+        worst = sorted(series.items(), key=lambda item: -item[1][0])[: self.top]
+        examples = ", ".join(
+            f"{station}/{history_id} {n} (watermark {watermark})"
+            for (station, history_id), (n, watermark) in worst
+        )
+        print(
+            f"[mqtt] dropped {total} samples at or below their series watermark "
+            f"in {len(series)} series: {examples}; late or backfilled rows older "
+            f"than the watermark are not stored while resume_from_watermark is on"
+        )
+
+
+drop_log = WatermarkDropLog()
+
+
+class CatchupTracker:
+    """
+    Measures startup catch-up: the time from (re)connect until the broker's
+    queued backlog has been drained, detected as ``idle_seconds`` without
+    any history message.
+    """
+
+    def __init__(self, idle_seconds: float = 2.0) -> None:
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._active = False
+        self._t0 = 0.0
+        self._last = 0.0
+        self._base: Tuple[int, int, int, int] = (0, 0, 0, 0)
+
+    def _counters(self) -> Tuple[int, int, int, int]:
+        s = ingest_stats
+        return (s.messages, s.samples, s.frames_discarded, s.samples_discarded)
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    def begin(self) -> None:
+        with self._lock:
+            self._active = True
+            self._t0 = self._last = time.monotonic()
+            self._base = self._counters()
+        self._arm(self.idle_seconds)
+
+    def note_message(self) -> None:
+        if self._active:
+            self._last = time.monotonic()
+
+    def _arm(self, delay: float) -> None:
+        timer = threading.Timer(delay, self._check)
+        timer.daemon = True
+        timer.start()
+
+    def _check(self) -> None:
+        with self._lock:
+            if not self._active:
+                return
+            quiet_for = time.monotonic() - self._last
+            if quiet_for < self.idle_seconds:
+                self._arm(self.idle_seconds - quiet_for)
+                return
+            self._active = False
+            duration = self._last - self._t0
+            now = self._counters()
+        messages, samples, frames_dropped, samples_dropped = (
+            n - b for n, b in zip(now, self._base)
+        )
+        ingest_stats.catchup_seconds = duration
+        print(
+            f"[mqtt] catch-up complete in {duration:.2f}s: {messages} messages, "
+            f"{samples} samples stored, {frames_dropped} frames / "
+            f"{samples_dropped} samples discarded below watermark"
+        )
+        # The backlog's drops are in the line above; log only later ones
+        drop_log.clear()
+
+
+def resolve_client_id(mqtt_cfg: MqttConfig) -> str:
+    """
+    Client id to connect with. Persistent sessions are keyed by client id,
+    so derive a stable one per host when none is configured.
+    """
+    if mqtt_cfg.client_id:
+        return mqtt_cfg.client_id
+    if not mqtt_cfg.clean_session:
+        return f"niagara-copilot-edge-{socket.gethostname()}"
+    return ""
+
+
+# ---------------------------------------------------------------------------
+# MQTT client wiring
+# ---------------------------------------------------------------------------
+
+
+def decode_history_payload(payload: bytes) -> List[HistoryRecord]:
+    """
+    Decode a raw history-topic payload (one frame or a JSON array of frames)
+    into HistorySample / HistoryColumns records. Invalid frames are logged
+    and skipped.
+    """
     try:
-        payload = msg.payload.decode("utf-8")
-        data = json.loads(payload)
+        data = json.loads(payload.decode("utf-8"))
     except Exception as e:  # noqa: BLE001
+        ingest_stats.count(decode_errors=1)
         print(f"[mqtt] failed to decode JSON payload: {e}")
-        return
+        return []
 
-    all_samples: List[HistorySample] = []
+    all_samples: List[HistoryRecord] = []
 
     try:
         if isinstance(data, list):
@@ -321,30 +853,89 @@ def _on_mqtt_message(client: mqtt.Client, userdata: Any, msg: mqtt.MQTTMessage)
                     print(f"[mqtt] skipping non-object frame at index {idx}: {type(frame)}")
                     continue
                 try:
-                    all_samples.extend(decode_history_frame(frame))
+                    all_samples.extend(_decode_frame_after_watermark(frame))
                 except Exception as e:  # noqa: BLE001
+                    ingest_stats.count(decode_errors=1)
                     print(f"[mqtt] invalid history frame at index {idx}: {e}")
         elif isinstance(data, dict):
-            all_samples = decode_history_frame(data)
+            all_samples = _decode_frame_after_watermark(data)
         else:
             print(f"[mqtt] unexpected JSON root type: {type(data)}")
-            return
+            return []
     except Exception as e:  # extra safety
+        ingest_stats.count(decode_errors=1)
         print(f"[mqtt] invalid history frame: {e}")
-        return
+        return []
+
+    return all_samples
+
 
-    if not all_samples:
+def store_history_samples(samples: List[HistoryRecord]) -> None:
+    """
+    Write decoded samples / columnar blocks to the in-memory and SQLite stores.
+    """
+    from ..store import history_store, sqlite_store
+
+    if not samples:
         return
 
+    rows = [s for s in samples if isinstance(s, HistorySample)]
+    columns = [s for s in samples if isinstance(s, HistoryColumns)]
+    ingest_stats.count(samples=len(rows) + sum(len(c) for c in columns))
+
+    # Rows and each columnar block are written separately, so one bad block
+    # cannot discard the rest of a (possibly coalesced) write.
     try:
-        history_store.add_batch(all_samples)
+        history_store.add_batch(rows)
     except Exception as e:  # noqa: BLE001
         print(f"[mqtt] failed to add to in-memory history_store: {e}")
+    for block in columns:
+        try:
+            history_store.add_columns(block)
+        except Exception as e:  # noqa: BLE001
+            print(f"[mqtt] failed to add {block.history_id} to in-memory history_store: {e}")
 
+    t0 = time.perf_counter()
     try:
-        sqlite_store.add_batch(all_samples)
+        sqlite_store.add_batch(rows)
     except Exception as e:  # noqa: BLE001
+        ingest_stats.count(store_errors=1)
         print(f"[mqtt] failed to add to sqlite_store: {e}")
+    try:
+        sqlite_store.add_columns(columns)
+    except Exception:  # noqa: BLE001
+        # Nothing was committed; retry block by block to isolate the bad one(s)
+        for block in columns:
+            try:
+                sqlite_store.add_columns([block])
+            except Exception as e:  # noqa: BLE001
+                ingest_stats.count(store_errors=1)
+                print(f"[mqtt] failed to add {block.history_id} to sqlite_store: {e}")
+    ingest_stats.store_latencies_ms.append((time.perf_counter() - t0) * 1000.0)
+
+
+catchup_tracker = CatchupTracker()
+
+
+def _on_mqtt_message(client: mqtt.Client, userdata: Any, msg: mqtt.MQTTMessage) -> None:
+    """
+    Default MQTT callback: history frames on history_topic.
+    """
+    ingest_stats.count(messages=1)
+    catchup_tracker.note_message()
+    store_history_samples(decode_history_payload(msg.payload))
+
+
+def configure_resume(mqtt_cfg: MqttConfig) -> None:
+    """
+    Apply the session-resume settings shared by every MQTT ingest mode.
+    """
+    from ..store import sqlite_store
+
+    catchup_tracker.idle_seconds = mqtt_cfg.catchup_idle_seconds
+    if mqtt_cfg.resume_from_watermark:
+        set_watermark_lookup(sqlite_store.get_watermark)
+        print(f"[mqtt] resuming from {len(sqlite_store.get_watermarks())} persisted series watermarks")
 
 
 def make_history_mqtt_client(cfg: AppConfig) -> mqtt.Client:
@@ -354,8 +945,12 @@ def make_history_mqtt_client(cfg: AppConfig) -> mqtt.Client:
       - equipment/zone payloads on mqtt.equipment_topic
     """
     mqtt_cfg: MqttConfig = cfg.mqtt
+    configure_resume(mqtt_cfg)
 
-    client = mqtt.Client()
+    client = mqtt.Client(
+        client_id=resolve_client_id(mqtt_cfg),
+        clean_session=mqtt_cfg.clean_session,
+    )
 
     # Optional authentication
     if mqtt_cfg.username:
@@ -369,11 +964,18 @@ def make_history_mqtt_client(cfg: AppConfig) -> mqtt.Client:
     # History frames use the default on_message
     client.on_message = _on_mqtt_message
 
+    def _on_connect(c: mqtt.Client, userdata: Any, flags: Any, rc: int) -> None:
+        # A persistent session replays its backlog right after connect.
+        if rc == 0:
+            catchup_tracker.begin()
+
+    client.on_connect = _on_connect
+
     client.connect(mqtt_cfg.host, mqtt_cfg.port, keepalive=60)
 
     # Subscribe to both topics
-    client.subscribe(mqtt_cfg.history_topic)
-    client.subscribe(mqtt_cfg.equipment_topic)
+    client.subscribe(mqtt_cfg.history_topic, qos=mqtt_cfg.qos)
+    client.subscribe(mqtt_cfg.equipment_topic, qos=mqtt_cfg.qos)
 
     # Attach dedicated handler for equipment topic
     client.message_callback_add(mqtt_cfg.equipment_topic, _on_equipment_message)
@@ -0,0 +1,348 @@
+# src/niagara_client/mqtt_ingest_pool.py
+"""
+Multi-process MQTT history ingest using MQTT v5 shared subscriptions.
+
+Each worker process runs its own paho client subscribed to
+``$share/<group>/<history_topic>``; the broker load-balances history
+messages across the group so JSON decode + timestamp parsing scales with
+cores. Decoded samples are packed into columnar blocks (_pack) and shipped
+back to the parent over a multiprocessing queue, then written by a single
+writer thread, so SQLite keeps exactly one writer and the in-memory stores
+stay in the parent. That writer is the serial part: keep its per-row work
+(unpickling, store calls) well below the decode cost, or extra workers
+buy nothing.
+
+Per-series watermarks are sqlite_store's (series_watermarks, advanced in
+the same transaction as the rows the writer stores). With
+mqtt.resume_from_watermark, workers filter against a snapshot of them
+taken at start().
+
+For offline verification, ``IngestWorkerPool(cfg, use_broker=False)``
+skips the broker entirely: ``dispatch()`` round-robins payloads into
+per-worker inboxes exactly like a shared-subscription group would. The
+real subscription path can be exercised against
+mqtt_broker_standin.MqttBrokerStandin (``python -m
+benchmarks.ingest_pool --broker``); check it there, and on the target's
+core count, before raising mqtt.ingest_workers.
+"""
+from __future__ import annotations
+
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import paho.mqtt.client as mqtt
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
+
+from ..config import AppConfig
+from .mqtt_history_ingest import (
+    HistoryColumns,
+    HistoryRecord,
+    HistorySample,
+    _on_equipment_message,
+    catchup_tracker,
+    count_samples,
+    datetime_to_epoch_ms,
+    decode_history_payload,
+    resolve_client_id,
+    set_watermark_lookup,
+    store_history_samples,
+)
+
+# Session expiry requested for persistent (clean_session=False) v5 sessions
+_SESSION_EXPIRY_SECONDS = 7 * 24 * 3600
+
+
+# Max decoded batches coalesced into one store call by the writer
+_WRITER_COALESCE = 32
+
+
+def _pack(records: List[HistoryRecord]) -> List[HistoryRecord]:
+    """
+    Turn runs of row samples of one series (a row-format frame) into
+    HistoryColumns blocks before they cross the process boundary: a block
+    pickles as a few int / float lists instead of one dataclass, datetime
+    and tag list per row, and takes the stores' columnar path in the
+    writer. Runs with sub-millisecond or out-of-order timestamps stay rows.
+    """
+    out: List[HistoryRecord] = []
+    i, n = 0, len(records)
+    while i < n:
+        first = records[i]
+        if not isinstance(first, HistorySample):
+            out.append(first)
+            i += 1
+            continue
+        key = (first.station_name, first.history_id, first.equipment, first.floor,
+               first.point_name, first.unit, first.tags)
+        j = i + 1
+        while j < n:
+            r = records[j]
+            if not isinstance(r, HistorySample) or (
+                r.station_name, r.history_id, r.equipment, r.floor, r.point_name, r.unit, r.tags
+            ) != key:
+                break
+            j += 1
+        run = records[i:j]
+        i = j
+        ts_ms = [datetime_to_epoch_ms(s.timestamp) for s in run]
+        if any(s.timestamp.microsecond % 1000 for s in run) or any(
+            a > b for a, b in zip(ts_ms, ts_ms[1:])
+        ):
+            out.extend(run)
+            continue
+        out.append(
+            HistoryColumns(
+                station_name=first.station_name,
+                history_id=first.history_id,
+                ts_ms=ts_ms,
+                values=[s.value for s in run],
+                status=[s.status for s in run],
+                equipment=first.equipment,
+                floor=first.floor,
+                point_name=first.point_name,
+                unit=first.unit,
+                tags=first.tags,
+            )
+        )
+    return out
+
+
+def _worker_main(
+    worker_id: int,
+    settings: Dict[str, Any],
+    inbox: Optional[Any],
+    outbox: Any,
+    stop_event: Any,
+    ready: Any,
+) -> None:
+    """
+    Worker process entry point.
+
+    Reads payloads either from the broker (shared subscription) or from
+    ``inbox`` (local dispatch), decodes them and forwards sample batches.
+    Sets ``ready`` once it can take payloads (subscribed, with a broker).
+    """
+
+    watermarks = settings.get("watermarks")
+    if watermarks is not None:
+        # Startup snapshot from the parent; enough to skip the replay backlog.
+        set_watermark_lookup(lambda station, history_id: watermarks.get((station, history_id)))
+
+    def _forward(payload: bytes) -> None:
+        samples = decode_history_payload(payload)
+        if samples:
+            outbox.put(_pack(samples))
+
+    if inbox is not None:
+        ready.set()
+        while True:
+            payload = inbox.get()
+            if payload is None:
+                return
+            _forward(payload)
+
+    client = mqtt.Client(
+        client_id=f"{settings['client_id_prefix']}-w{worker_id}",
+        protocol=mqtt.MQTTv5,
+    )
+    if settings.get("username"):
+        client.username_pw_set(settings["username"], password=settings.get("password"))
+
+    shared_topic = f"$share/{settings['shared_group']}/{settings['history_topic']}"
+
+    def _on_connect(c: mqtt.Client, userdata: Any, flags: Any, rc: Any, properties: Any = None) -> None:
+        c.subscribe(shared_topic, qos=settings["qos"])
+        if worker_id == 0:
+            # Equipment payloads are tiny; one worker is enough.
+            c.subscribe(settings["equipment_topic"], qos=settings["qos"])
+        print(f"[mqtt-pool] worker {worker_id} subscribed to {shared_topic}")
+
+    def _on_subscribe(c: mqtt.Client, userdata: Any, mid: int, *args: Any) -> None:
+        ready.set()
+
+    def _on_message(c: mqtt.Client, userdata: Any, msg: mqtt.MQTTMessage) -> None:
+        _forward(msg.payload)
+
+    client.on_connect = _on_connect
+    client.on_subscribe = _on_subscribe
+    client.on_message = _on_message
+    client.message_callback_add(settings["equipment_topic"], _on_equipment_message)
+
+    connect_props = None
+    if not settings["clean_session"]:
+        connect_props = Properties(PacketTypes.CONNECT)
+        connect_props.SessionExpiryInterval = _SESSION_EXPIRY_SECONDS
+    client.connect(
+        settings["host"],
+        settings["port"],
+        keepalive=60,
+        clean_start=settings["clean_session"],
+        properties=connect_props,
+    )
+    client.loop_start()
+    try:
+        while not stop_event.is_set():
+            time.sleep(0.2)
+    finally:
+        client.loop_stop()
+        client.disconnect()
+
+
+class IngestWorkerPool:
+    """
+    N decode worker processes feeding one store writer in the parent.
+    """
+
+    def __init__(self, cfg: AppConfig, workers: Optional[int] = None, use_broker: bool = True) -> None:
+        mqtt_cfg = cfg.mqtt
+        self._n = max(1, workers if workers is not None else mqtt_cfg.ingest_workers)
+        self._use_broker = use_broker
+
+        password = None
+        if mqtt_cfg.username and mqtt_cfg.password_env:
+            password = os.getenv(mqtt_cfg.password_env) or None
+
+        # Persistent sessions need worker client ids that survive restarts
+        client_id_prefix = resolve_client_id(mqtt_cfg) or f"niagara-copilot-{os.getpid()}"
+
+        self._settings: Dict[str, Any] = {
+            "host": mqtt_cfg.host,
+            "port": mqtt_cfg.port,
+            "history_topic": mqtt_cfg.history_topic,
+            "equipment_topic": mqtt_cfg.equipment_topic,
+            "shared_group": mqtt_cfg.shared_group,
+            "client_id_prefix": client_id_prefix,
+            "clean_session": mqtt_cfg.clean_session,
+            "qos": mqtt_cfg.qos,
+            "username": mqtt_cfg.username,
+            "password": password,
+            "watermarks": None,
+        }
+        self._resume = mqtt_cfg.resume_from_watermark
+        self._catchup_idle = mqtt_cfg.catchup_idle_seconds
+
+        # spawn: the parent may already run paho / uvicorn threads
+        self._ctx = mp.get_context("spawn")
+        self._outbox: Any = self._ctx.Queue()
+        self._stop_event: Any = self._ctx.Event()
+        self._inboxes: List[Any] = []
+        self._procs: List[Any] = []
+        self._ready: List[Any] = []
+        self._rr = itertools.count()
+        self._writer: Optional[threading.Thread] = None
+
+        self.samples_written = 0
+        self.batches_written = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._resume:
+            from ..store import sqlite_store
+
+            self._settings["watermarks"] = sqlite_store.get_watermarks()
+        catchup_tracker.idle_seconds = self._catchup_idle
+        catchup_tracker.begin()
+
+        for i in range(self._n):
+            inbox = None if self._use_broker else self._ctx.Queue()
+            ready = self._ctx.Event()
+            self._ready.append(ready)
+            proc = self._ctx.Process(
+                target=_worker_main,
+                args=(i, self._settings, inbox, self._outbox, self._stop_event, ready),
+                name=f"mqtt-ingest-worker-{i}",
+                daemon=True,
+            )
+            proc.start()
+            self._procs.append(proc)
+            if inbox is not None:
+                self._inboxes.append(inbox)
+
+        self._writer = threading.Thread(target=self._writer_loop, name="mqtt-pool-writer", daemon=True)
+        self._writer.start()
+        mode = "shared subscription" if self._use_broker else "local dispatch"
+        print(f"[mqtt-pool] started {self._n} ingest workers ({mode})")
+
+    def wait_ready(self, timeout: float = 30.0) -> bool:
+        """
+        Block until every worker has started (and, with a broker, got its
+        shared subscription acknowledged). False on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        return all(ev.wait(max(0.0, deadline - time.monotonic())) for ev in self._ready)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop workers, then let the writer drain everything they produced.
+        """
+        self._stop_event.set()
+        for inbox in self._inboxes:
+            inbox.put(None)
+        deadline = time.monotonic() + timeout
+        for proc in self._procs:
+            proc.join(max(0.1, deadline - time.monotonic()))
+            if proc.is_alive():
+                print(f"[mqtt-pool] terminating unresponsive worker {proc.name}")
+                proc.terminate()
+        self._outbox.put(None)
+        if self._writer is not None:
+            self._writer.join(max(0.1, deadline - time.monotonic()))
+        self._procs = []
+        self._inboxes = []
+        self._ready = []
+        print(f"[mqtt-pool] stopped; wrote {self.samples_written} samples")
+
+    # Parity with paho clients so api.server can stop either kind
+    def loop_stop(self) -> None:
+        self.stop()
+
+    def disconnect(self) -> None:
+        pass
+
+    # ------------------------------------------------------------------
+    # Local broker stand-in
+    # ------------------------------------------------------------------
+
+    def dispatch(self, payload: bytes) -> None:
+        """
+        Round-robin a history payload to the next worker, mimicking how a
+        broker distributes a $share group. Only valid with use_broker=False.
+        """
+        if not self._inboxes:
+            raise RuntimeError("dispatch() requires IngestWorkerPool(use_broker=False) and start()")
+        self._inboxes[next(self._rr) % len(self._inboxes)].put(payload)
+
+    # ------------------------------------------------------------------
+    # Single writer
+    # ------------------------------------------------------------------
+
+    def _writer_loop(self) -> None:
+        done = False
+        while not done:
+            batch = self._outbox.get()
+            if batch is None:
+                break
+            samples: List[HistoryRecord] = list(batch)
+            for _ in range(_WRITER_COALESCE - 1):
+                try:
+                    more = self._outbox.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    done = True
+                    break
+                samples.extend(more)
+
+            catchup_tracker.note_message()
+            store_history_samples(samples)
+            self.samples_written += count_samples(samples)
+            self.batches_written += 1
@@ -0,0 +1,676 @@
+# src/niagara_client/standin_server.py
+"""
+Local stand-in for a JACE: synthetic Haystack (nHaystack) and Niagara
+Analytics Web API endpoints, for offline tests and reproducible benchmarks.
+
+Served (zinc for Haystack, JSON for Analytics):
+
+    GET/POST /login                       AX-style login accepted for any user
+    GET  /haystack/about, /haystack/ops
+    GET  /haystack/read?filter=..&limit=..    POST /haystack/read (id grid)
+    GET  /haystack/hisRead?id=..&range=..     POST /haystack/hisRead (multi-id grid)
+    POST /haystack/watchSub, watchPoll, watchUnsub
+    POST /na                              Analytics {"requests": [{"message": "GetNode", ...}]}
+
+The model is one site with ``equips`` VAVs of ``points_per_equip``
+historized points each (ZoneTemp, ZoneTempSp, DischargeAirFlow,
+DamperPos, ...). History is deterministic: the same point and timestamp
+always give the same value, on a ``history_step_minutes`` grid.
+Current values (curVal / watchPoll) change on every ``cur_change_seconds``
+boundary, for roughly ``cur_change_fraction`` of the points.
+
+Every knob lives on StandinConfig and is read per request, so a running
+server can be re-tuned (latency, failures, ...) between benchmark phases:
+
+    with StandinServer(StandinConfig(equips=100, latency_ms=40)) as srv:
+        client = HaystackHistoryClient(HaystackConfig(uri=srv.uri, username="u", password="p"))
+        ...
+        srv.cfg.failure_rate = 0.1
+        print(srv.stats.requests)
+
+or from a shell:
+
+    python -m src.niagara_client.standin_server --port 8080 --equips 200 --latency-ms 50
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import urllib.parse
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import hszinc
+
+# (navName, kind tags, unit, base value, daily swing)
+_POINT_KINDS: List[Tuple[str, Tuple[str, ...], Optional[str], float, float]] = [
+    ("ZoneTemp", ("zone", "air", "temp", "sensor"), "°F", 72.0, 3.0),
+    ("ZoneTempSp", ("zone", "air", "temp", "sp"), "°F", 72.0, 0.0),
+    ("DischargeAirFlow", ("discharge", "air", "flow", "sensor"), "cfm", 450.0, 150.0),
+    ("DamperPos", ("damper", "cmd"), "%", 45.0, 30.0),
+    ("DischargeAirTemp", ("discharge", "air", "temp", "sensor"), "°F", 58.0, 4.0),
+    ("Occupied", ("occupied", "sensor"), None, 0.5, 0.5),
+]
+
+
+@dataclass
+class StandinConfig:
+    site: str = "Site"
+    equips: int = 50
+    points_per_equip: int = 4           # first N of _POINT_KINDS
+    floors: int = 5
+    history_step_minutes: int = 15
+    history_days: int = 30              # hisRead returns nothing older than this
+    timezone: str = "UTC"               # station zone for 'today' / date ranges
+    # Timing
+    latency_ms: float = 0.0             # added to every data request
+    jitter_ms: float = 0.0              # uniform 0..jitter on top of latency
+    max_inflight: int = 0               # station request threads (0 = unbounded)
+    # Features
+    multi_his_read: bool = True         # accept the multi-id hisRead grid
+    cur_change_seconds: float = 10.0
+    cur_change_fraction: float = 0.2
+    # Failure injection
+    failure_rate: float = 0.0           # probability of HTTP 500 per data request
+    fail_ops: Set[str] = field(default_factory=set)      # limit failures to these ops
+    fail_points: Set[str] = field(default_factory=set)   # ids whose hisRead returns an error grid
+    seed: int = 0
+
+
+@dataclass
+class StandinStats:
+    requests: Dict[str, int] = field(default_factory=dict)
+    failures_injected: int = 0
+    inflight: int = 0
+    max_inflight_seen: int = 0
+    bytes_sent: int = 0
+
+
+@dataclass
+class _Point:
+    id: str
+    equip: str
+    floor: str
+    nav: str
+    tags: Tuple[str, ...]
+    unit: Optional[str]
+    base: float
+    swing: float
+    index: int
+
+
+# ---------------------------------------------------------------------------
+# Synthetic model
+# ---------------------------------------------------------------------------
+
+
+class _Model:
+    def __init__(self, cfg: StandinConfig) -> None:
+        self.cfg = cfg
+        self.points: List[_Point] = []
+        self.by_id: Dict[str, _Point] = {}
+        kinds = _POINT_KINDS[: max(1, min(cfg.points_per_equip, len(_POINT_KINDS)))]
+        for e in range(cfg.equips):
+            floor = f"Floor{e % max(1, cfg.floors) + 1}"
+            equip = f"Vav{e // max(1, cfg.floors) + 1}_{e % max(1, cfg.floors) + 1:02d}"
+            for nav, tags, unit, base, swing in kinds:
+                p = _Point(
+                    id=f"S.{cfg.site}.{equip}.{nav}",
+                    equip=f"S.{cfg.site}.{equip}",
+                    floor=f"S.{cfg.site}.{floor}",
+                    nav=nav,
+                    tags=tags,
+                    unit=unit,
+                    base=base,
+                    swing=swing,
+                    index=len(self.points),
+                )
+                self.points.append(p)
+                self.by_id[p.id] = p
+
+    def value(self, p: _Point, ts: float) -> float:
+        # Daily sine plus deterministic noise per (point, step)
+        phase = (p.index % 17) / 17.0
+        day = 2 * math.pi * ((ts / 86400.0) + phase)
+        noise = random.Random(p.index * 1_000_003 + int(ts) // 60).uniform(-0.3, 0.3)
+        if p.nav == "Occupied":
+            return 1.0 if 7 <= (ts % 86400) / 3600 < 18 else 0.0
+        return round(p.base + p.swing * math.sin(day) + noise, 2)
+
+    def entity_row(self, p: _Point) -> Dict[str, Any]:
+        row: Dict[str, Any] = {
+            "id": hszinc.Ref(p.id, f"{p.equip.split('.')[-1]} {p.nav}"),
+            "dis": f"{p.equip.split('.')[-1]} {p.nav}",
+            "navName": p.nav,
+            "point": hszinc.MARKER,
+            "his": hszinc.MARKER,
+            "cur": hszinc.MARKER,
+            "siteRef": hszinc.Ref(f"S.{self.cfg.site}", self.cfg.site),
+            "equipRef": hszinc.Ref(p.equip, p.equip.split(".")[-1]),
+            "floorRef": hszinc.Ref(p.floor, p.floor.split(".")[-1]),
+            "kind": "Number" if p.nav != "Occupied" else "Bool",
+            "tz": self.cfg.timezone,
+        }
+        for tag in p.tags:
+            row[tag] = hszinc.MARKER
+        if p.unit:
+            row["unit"] = p.unit
+        return row
+
+    def history(self, p: _Point, start: datetime, end: datetime) -> List[Tuple[datetime, float]]:
+        step = self.cfg.history_step_minutes * 60
+        now = time.time()
+        lo = max(start.timestamp(), now - self.cfg.history_days * 86400)
+        hi = min(end.timestamp(), now)
+        t = math.ceil(lo / step) * step
+        out = []
+        while t <= hi:
+            out.append((datetime.fromtimestamp(t, timezone.utc), self.value(p, t)))
+            t += step
+        return out
+
+    def cur_value(self, p: _Point, now: float) -> float:
+        return self.value(p, self._cur_epoch(p, now))
+
+    def _cur_epoch(self, p: _Point, now: float) -> float:
+        # Each point only changes on the ticks where its hash bucket is drawn
+        period = max(0.001, self.cfg.cur_change_seconds)
+        tick = int(now // period)
+        frac = max(0.01, self.cfg.cur_change_fraction)
+        while tick > 0 and random.Random(p.index * 7919 + tick).random() > frac:
+            tick -= 1
+        return tick * period
+
+
+# ---------------------------------------------------------------------------
+# Filters (the subset of Haystack filter syntax the clients use)
+# ---------------------------------------------------------------------------
+
+
+def _match_term(row: Dict[str, Any], term: str) -> bool:
+    term = term.strip().strip("()").strip()
+    if term.startswith("not "):
+        return term[4:].strip() not in row
+    if "==" in term:
+        tag, want = (x.strip() for x in term.split("==", 1))
+        have = row.get(tag)
+        if want.startswith("@"):
+            return isinstance(have, hszinc.Ref) and have.name == want[1:]
+        return str(have) == want.strip('"')
+    return term in row
+
+
+def _matches(row: Dict[str, Any], filter_expr: str) -> bool:
+    return any(
+        all(_match_term(row, t) for t in alt.split(" and "))
+        for alt in filter_expr.split(" or ")
+    )
+
+
+# ---------------------------------------------------------------------------
+# Range parsing
+# ---------------------------------------------------------------------------
+
+
+def _parse_range(rng: str, tz: Any) -> Tuple[datetime, datetime]:
+    text = rng.strip().strip('"')
+    today = datetime.now(tz).date()
+
+    def day(d: date) -> datetime:
+        return datetime(d.year, d.month, d.day, tzinfo=tz)
+
+    def point(part: str, is_end: bool) -> datetime:
+        part = part.strip()
+        if "T" in part:
+            dt = datetime.fromisoformat(part.split(" ")[0])
+            return dt if dt.tzinfo else dt.replace(tzinfo=tz)
+        d = date.fromisoformat(part)
+        return day(d + timedelta(days=1)) if is_end else day(d)
+
+    if text == "today":
+        return day(today), day(today + timedelta(days=1))
+    if text == "yesterday":
+        return day(today - timedelta(days=1)), day(today)
+    if "," in text:
+        a, b = text.split(",", 1)
+        return point(a, False), point(b, True)
+    return point(text, False), point(text, True)
+
+
+# ---------------------------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------------------------
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def log_message(self, *args: Any) -> None:  # quiet
+        pass
+
+    # ---- plumbing --------------------------------------------------------
+
+    def _send(self, code: int, body: bytes, ctype: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.stats_lock:
+            self.server.stats.bytes_sent += len(body)
+
+    def _send_grid(self, grid: Any) -> None:
+        body = hszinc.dump(grid, mode=hszinc.MODE_ZINC).encode("utf-8")
+        self._send(200, body, "text/zinc; charset=utf-8")
+
+    def _send_error_grid(self, msg: str) -> None:
+        grid = hszinc.Grid()
+        grid.metadata["err"] = hszinc.MARKER
+        grid.metadata["dis"] = msg
+        grid.column["empty"] = {}
+        self._send_grid(grid)
+
+    def _read_body(self) -> bytes:
+        n = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(n) if n else b""
+
+    def _data_op(self, op: str) -> bool:
+        """Count, delay and maybe fail a data request; False if it was failed."""
+        srv = self.server
+        cfg = srv.cfg
+        with srv.stats_lock:
+            srv.stats.requests[op] = srv.stats.requests.get(op, 0) + 1
+            fail = cfg.failure_rate > 0 and (not cfg.fail_ops or op in cfg.fail_ops) and (
+                srv.rng.random() < cfg.failure_rate
+            )
+            jitter = srv.rng.uniform(0, cfg.jitter_ms) if cfg.jitter_ms > 0 else 0.0
+        with srv.slots:
+            with srv.stats_lock:
+                srv.stats.inflight += 1
+                srv.stats.max_inflight_seen = max(srv.stats.max_inflight_seen, srv.stats.inflight)
+            try:
+                delay = (cfg.latency_ms + jitter) / 1000.0
+                if delay > 0:
+                    time.sleep(delay)
+            finally:
+                with srv.stats_lock:
+                    srv.stats.inflight -= 1
+        if fail:
+            with srv.stats_lock:
+                srv.stats.failures_injected += 1
+            self._send(500, b"injected failure", "text/plain")
+            return False
+        return True
+
+    def _login(self) -> None:
+        self._send(200, b"", "text/plain", {"Set-Cookie": "niagara_session=standin; Path=/"})
+
+    # ---- routing ---------------------------------------------------------
+
+    def do_GET(self) -> None:
+        self._route()
+
+    def do_POST(self) -> None:
+        self._route()
+
+    def _route(self) -> None:
+        url = urllib.parse.urlparse(self.path)
+        path = url.path.rstrip("/")
+        query = {k: v[0] for k, v in urllib.parse.parse_qs(url.query).items()}
+        # Always drain the body so keep-alive connections stay in sync
+        body = self._read_body() if self.command == "POST" else b""
+        try:
+            if path.endswith("/login") or path == "/j_security_check":
+                return self._login()
+            if path == "/na":
+                return self._analytics(body)
+            if not path.startswith("/haystack/"):
+                return self._send(404, b"not found", "text/plain")
+            op = path.rsplit("/", 1)[1]
+            handler = getattr(self, f"_hs_{op}", None)
+            if handler is None:
+                return self._send_error_grid(f"unknown op {op}")
+            if op not in ("about", "ops", "formats") and not self._data_op(op):
+                return
+            req = hszinc.parse(body.decode("utf-8"), mode=hszinc.MODE_ZINC, single=True) if body else None
+            handler(query, req)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as e:  # noqa: BLE001
+            self._send_error_grid(f"{type(e).__name__}: {e}")
+
+    # ---- Haystack ops ----------------------------------------------------
+
+    def _hs_about(self, query: Dict[str, str], req: Any) -> None:
+        grid = hszinc.Grid()
+        for col in ("haystackVersion", "productName", "productVersion", "serverName", "tz"):
+            grid.column[col] = {}
+        grid.append({
+            "haystackVersion": "2.0",
+            "productName": "Niagara AX",
+            "productVersion": "3.8.41",
+            "serverName": "standin",
+            "tz": self.server.cfg.timezone,
+        })
+        self._send_grid(grid)
+
+    def _hs_ops(self, query: Dict[str, str], req: Any) -> None:
+        grid = hszinc.Grid()
+        grid.column["name"] = {}
+        for name in ("about", "ops", "read", "hisRead", "watchSub", "watchPoll", "watchUnsub"):
+            grid.append({"name": name})
+        self._send_grid(grid)
+
+    def _hs_read(self, query: Dict[str, str], req: Any) -> None:
+        model = self.server.model
+        if req is not None and "id" in req.column:
+            ids = [r["id"].name for r in req if isinstance(r.get("id"), hszinc.Ref)]
+            rows = [model.entity_row(model.by_id[i]) for i in ids if i in model.by_id]
+        else:
+            filter_expr = query.get("filter") or (req.metadata.get("filter") if req is not None else "")
+            limit = int(query.get("limit") or 0) or len(model.points)
+            rows = []
+            for p in model.points:
+                row = model.entity_row(p)
+                if _matches(row, filter_expr or ""):
+                    rows.append(row)
+                    if len(rows) >= limit:
+                        break
+        self._send_grid(_rows_grid(rows))
+
+    def _hs_hisRead(self, query: Dict[str, str], req: Any) -> None:
+        srv = self.server
+        if req is not None:
+            if not srv.cfg.multi_his_read:
+                return self._send_error_grid("hisRead: multi-id requests not supported")
+            ids = [r["id"].name for r in req]
+            rng = str(req.metadata.get("range"))
+        else:
+            ids = [query["id"].lstrip("@")]
+            rng = query.get("range", "today")
+        start, end = _parse_range(rng, srv.tz)
+
+        for pid in ids:
+            if pid in srv.cfg.fail_points or f"@{pid}" in srv.cfg.fail_points:
+                return self._send_error_grid(f"hisRead failed for @{pid}")
+            if pid not in srv.model.by_id:
+                return self._send_error_grid(f"unknown rec @{pid}")
+
+        grid = hszinc.Grid()
+        grid.metadata["hisStart"] = start.astimezone(timezone.utc)
+        grid.metadata["hisEnd"] = end.astimezone(timezone.utc)
+        grid.column["ts"] = {}
+        if len(ids) == 1 and req is None:
+            grid.metadata["id"] = hszinc.Ref(ids[0])
+            grid.column["val"] = {}
+            for ts, val in srv.model.history(srv.model.by_id[ids[0]], start, end):
+                grid.append({"ts": ts, "val": val})
+            return self._send_grid(grid)
+
+        series = []
+        for i, pid in enumerate(ids):
+            grid.column[f"v{i}"] = {"id": hszinc.Ref(pid)}
+            series.append(dict(srv.model.history(srv.model.by_id[pid], start, end)))
+        for ts in sorted(set().union(*series)):
+            row: Dict[str, Any] = {"ts": ts}
+            for i, data in enumerate(series):
+                if ts in data:
+                    row[f"v{i}"] = data[ts]
+            grid.append(row)
+        self._send_grid(grid)
+
+    def _cur_rows(self, ids: List[str], only_changed_since: Optional[float]) -> List[Dict[str, Any]]:
+        model = self.server.model
+        now = time.time()
+        rows = []
+        for pid in ids:
+            p = model.by_id.get(pid)
+            if p is None:
+                continue
+            if only_changed_since is not None and model._cur_epoch(p, now) <= only_changed_since:
+                continue
+            val = model.cur_value(p, now)
+            rows.append({
+                "id": hszinc.Ref(pid),
+                "curVal": hszinc.Quantity(val, p.unit) if p.unit else val,
+                "curStatus": "ok",
+            })
+        return rows
+
+    def _hs_watchSub(self, query: Dict[str, str], req: Any) -> None:
+        srv = self.server
+        ids = [r["id"].name for r in req]
+        with srv.watch_lock:
+            watch_id = req.metadata.get("watchId")
+            if watch_id is None:
+                watch_id = f"w-{next(srv.watch_seq)}"
+                srv.watches[watch_id] = (set(), time.time())
+            elif watch_id not in srv.watches:
+                return self._send_error_grid(f"unknown watch {watch_id}")
+            members, _ = srv.watches[watch_id]
+            members.update(ids)
+            srv.watches[watch_id] = (members, time.time())
+        grid = _rows_grid(self._cur_rows(ids, None), ("id", "curVal", "curStatus"))
+        grid.metadata["watchId"] = watch_id
+        grid.metadata["lease"] = req.metadata.get("lease", hszinc.Quantity(300, "s"))
+        self._send_grid(grid)
+
+    def _hs_watchPoll(self, query: Dict[str, str], req: Any) -> None:
+        srv = self.server
+        watch_id = str(req.metadata.get("watchId"))
+        with srv.watch_lock:
+            if watch_id not in srv.watches:
+                return self._send_error_grid(f"unknown watch {watch_id}")
+            members, last = srv.watches[watch_id]
+            srv.watches[watch_id] = (members, time.time())
+        since = None if "refresh" in req.metadata else last
+        grid = _rows_grid(self._cur_rows(sorted(members), since), ("id", "curVal", "curStatus"))
+        grid.metadata["watchId"] = watch_id
+        self._send_grid(grid)
+
+    def _hs_watchUnsub(self, query: Dict[str, str], req: Any) -> None:
+        srv = self.server
+        watch_id = str(req.metadata.get("watchId"))
+        with srv.watch_lock:
+            if "close" in req.metadata:
+                srv.watches.pop(watch_id, None)
+            elif watch_id in srv.watches:
+                srv.watches[watch_id][0].difference_update(r["id"].name for r in req)
+        self._send_grid(_rows_grid([]))
+
+    # ---- Analytics -------------------------------------------------------
+
+    def _analytics(self, body: bytes) -> None:
+        if not self._data_op("GetNode"):
+            return
+        try:
+            payload = json.loads(body or b"{}")
+            requests_ = payload.get("requests") or []
+        except ValueError:
+            return self._send(400, b"bad json", "text/plain")
+        responses = [self.server.node_response(r.get("node", "")) for r in requests_]
+        body = json.dumps({"responses": responses}).encode("utf-8")
+        self._send(200, body, "application/json")
+
+
+def _rows_grid(rows: List[Dict[str, Any]], columns: Tuple[str, ...] = ()) -> Any:
+    grid = hszinc.Grid()
+    cols: Dict[str, None] = dict.fromkeys(columns)
+    for row in rows:
+        cols.update(dict.fromkeys(row))
+    if not cols:
+        cols["empty"] = None
+    for col in cols:
+        grid.column[col] = {}
+    grid.extend(rows)
+    return grid
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr: Tuple[str, int], cfg: StandinConfig) -> None:
+        super().__init__(addr, _Handler)
+        from zoneinfo import ZoneInfo
+
+        self.cfg = cfg
+        self.tz = ZoneInfo(cfg.timezone)
+        self.model = _Model(cfg)
+        self.stats = StandinStats()
+        self.stats_lock = threading.Lock()
+        self.rng = random.Random(cfg.seed)
+        self.slots: Any = (
+            threading.BoundedSemaphore(cfg.max_inflight) if cfg.max_inflight > 0 else _NoLimit()
+        )
+        self.watches: Dict[str, Tuple[Set[str], float]] = {}
+        self.watch_lock = threading.Lock()
+        self.watch_seq = iter(range(1, 1 << 62))
+
+    # Analytics node tree: slot:/  ->  floors  ->  equips  ->  points
+    def node_response(self, node: str) -> Dict[str, Any]:
+        model = self.model
+        site = self.cfg.site
+        path = node.split("slot:", 1)[-1].strip("/")
+        parts = [p for p in path.split("/") if p] if path else []
+
+        def item(data: str, name: str, kind: str, has_trend: bool = False) -> Dict[str, Any]:
+            return {"data": data, "name": name, "type": kind, "hasTrend": has_trend}
+
+        children: List[Dict[str, Any]] = []
+        name = parts[-1] if parts else site
+        if not parts:
+            floors = sorted({p.floor.split(".")[-1] for p in model.points})
+            children = [item(f"slot:/{f}", f, "folder") for f in floors]
+        elif len(parts) == 1:
+            equips = sorted({p.equip.split(".")[-1] for p in model.points if p.floor.endswith(f".{parts[0]}")})
+            children = [item(f"slot:/{parts[0]}/{e}", e, "equip") for e in equips]
+        elif len(parts) == 2:
+            pts = [p for p in model.points if p.equip == f"S.{site}.{parts[1]}" and p.floor.endswith(f".{parts[0]}")]
+            children = [item(f"slot:/{parts[0]}/{parts[1]}/{p.nav}", p.nav, "point", True) for p in pts]
+        elif len(parts) == 3 and f"S.{site}.{parts[1]}.{parts[2]}" in model.by_id:
+            return {
+                "message": "GetNode",
+                "node": node,
+                "name": name,
+                "hasChildren": False,
+                "data": [],
+                "actions": [{"action": "trend", "display": "Trend"}],
+            }
+        if not children:
+            return {"message": "GetNode", "node": node, "error": f"unknown node {node}"}
+        return {
+            "message": "GetNode",
+            "node": node,
+            "name": name,
+            "hasChildren": True,
+            "data": children,
+            "actions": [],
+        }
+
+
+class _NoLimit:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+class StandinServer:
+    """In-process stand-in station on 127.0.0.1 (port 0 = pick a free port)."""
+
+    def __init__(self, cfg: Optional[StandinConfig] = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        self._server = _Server((host, port), cfg or StandinConfig())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def cfg(self) -> StandinConfig:
+        return self._server.cfg
+
+    @property
+    def stats(self) -> StandinStats:
+        return self._server.stats
+
+    @property
+    def uri(self) -> str:
+        """Base URI for HaystackConfig.uri."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def analytics_url(self) -> str:
+        """base_url for AnalyticsApiClient."""
+        return f"{self.uri}/na"
+
+    def point_ids(self) -> List[str]:
+        return [f"@{p.id}" for p in self._server.model.points]
+
+    def reset_stats(self) -> None:
+        with self._server.stats_lock:
+            self._server.stats = StandinStats()
+
+    def start(self) -> "StandinServer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="standin", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "StandinServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def _main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local Haystack / Analytics stand-in station.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--equips", type=int, default=StandinConfig.equips)
+    parser.add_argument("--points-per-equip", type=int, default=StandinConfig.points_per_equip)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--max-inflight", type=int, default=0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--no-multi-his-read", action="store_true")
+    parser.add_argument("--timezone", default="UTC")
+    args = parser.parse_args(argv)
+
+    cfg = StandinConfig(
+        equips=args.equips,
+        points_per_equip=args.points_per_equip,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        max_inflight=args.max_inflight,
+        failure_rate=args.failure_rate,
+        multi_his_read=not args.no_multi_his_read,
+        timezone=args.timezone,
+    )
+    srv = StandinServer(cfg, host=args.host, port=args.port).start()
+    print(f"[standin] {len(srv.point_ids())} points; haystack {srv.uri}  analytics {srv.analytics_url}")
+    try:
+        while True:
+            time.sleep(5)
+    except KeyboardInterrupt:
+        print(f"[standin] {json.dumps(asdict(srv.stats))}")
+        srv.stop()
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,328 @@
+"""
+Bulk history backfill that bypasses MQTT.
+
+Accepts the MQTT history frame schema as NDJSON (one frame per line, row
+or columnar historyData), or a flat CSV with the same field names:
+
+    stationName,historyId,timestamp,value[,status][,equipment][,floor][,point][,unit]
+
+CSV timestamps may be Niagara strings ('2025-11-29 00:30:00.249-0700') or
+epoch milliseconds. Rows with an unusable timestamp or value are skipped
+and counted (ImportReport.rows_skipped), whichever format they come in.
+Input is parsed in chunks and written by sqlite_store.bulk_load() in a
+single transaction (see there for when the history index is rebuilt);
+the series catalog (sqlite_store series metadata, persisted in the
+series_meta table) and watermarks are updated as for live ingest.
+
+Seeding the server's database only sticks with ``db_reset_on_start: false``
+in its config: otherwise the next server start drops every table. The CLI
+reads the server config (--config) and refuses to import into its
+db_path when it would be reset, unless --force is given.
+
+    python -m src.store.bulk_import --db data/history.sqlite backfill.ndjson.gz
+    python -m src.store.bulk_import --format csv --db data/history.sqlite export.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import yaml
+
+from ..config import AppConfig
+from ..niagara_client.mqtt_history_ingest import (
+    _coerce_value,
+    _parse_timestamp,
+    _validate_history_frame,
+    epoch_ms_to_datetime,
+)
+from . import sqlite_store
+
+Row = Tuple[str, str, str, float, Optional[str]]
+
+# Rows handed to executemany per chunk
+DEFAULT_CHUNK_ROWS = 50_000
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+
+@dataclass
+class ImportReport:
+    format: str
+    rows: int = 0
+    rows_skipped: int = 0           # bad timestamp / value (row, columnar or CSV)
+    records: int = 0                # NDJSON frames or CSV lines read
+    record_errors: int = 0          # frames / lines rejected outright
+    series: int = 0
+    rows_outside_retention: int = 0  # older than db_retention_hours; pruned on next live ingest
+    seconds: float = 0.0
+    first_error: Optional[str] = None
+
+    @property
+    def rows_per_minute(self) -> float:
+        return self.rows * 60.0 / self.seconds if self.seconds > 0 else 0.0
+
+    def _error(self, msg: str) -> None:
+        self.record_errors += 1
+        if self.first_error is None:
+            self.first_error = msg
+
+
+@lru_cache(maxsize=1 << 16)
+def _ts_to_iso(raw: str) -> str:
+    """
+    Timestamp string -> ts_utc ISO string. Backfills repeat the same
+    timestamps across every point, so this is cached.
+    """
+    if raw.isdigit():
+        return epoch_ms_to_datetime(int(raw)).isoformat()
+    return sqlite_store._to_utc_iso(_parse_timestamp(raw))
+
+
+class _Importer:
+    """Turns records into row chunks and collects catalog metadata."""
+
+    def __init__(self, fmt: str, chunk_rows: int) -> None:
+        self.report = ImportReport(format=fmt)
+        self.chunk_rows = max(1, chunk_rows)
+        self.meta: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.series: set = set()
+        retention = sqlite_store._retention_hours
+        self._cutoff: Optional[str] = None
+        if retention > 0:
+            self._cutoff = (datetime.now(timezone.utc) - timedelta(hours=retention)).isoformat()
+
+    def _note_meta(self, key: Tuple[str, str], **fields: Any) -> None:
+        meta = self.meta.setdefault(key, {})
+        for name, val in fields.items():
+            if val is not None:
+                meta[name] = val
+
+    def _finish_chunk(self, rows: List[Row]) -> List[Row]:
+        self.report.rows += len(rows)
+        if self._cutoff is not None:
+            cutoff = self._cutoff
+            self.report.rows_outside_retention += sum(1 for r in rows if r[2] < cutoff)
+        return rows
+
+    # ---- NDJSON ----------------------------------------------------------
+
+    def _frame_rows(self, frame: Dict[str, Any]) -> List[Row]:
+        data = _validate_history_frame(frame)
+        station = data["station_name"]
+        history_id = data["history_id"]
+        self.series.add((station, history_id))
+        self._note_meta(
+            (station, history_id),
+            equipment=data["equipment"],
+            floor=data["floor"],
+            point_name=data["point_name"],
+            unit=data["unit"],
+            tags=data["tags"],
+        )
+
+        columns = data["columns"]
+        if columns is not None:
+            # Coerced per row by _validate_history_columns; bad rows dropped
+            self.report.rows_skipped += columns["skipped"]
+            n = len(columns["ts"])
+            return list(
+                zip(
+                    [station] * n,
+                    [history_id] * n,
+                    [epoch_ms_to_datetime(ms).isoformat() for ms in columns["ts"]],
+                    columns["value"],
+                    columns["status"],
+                )
+            )
+
+        out: List[Row] = []
+        for row in data["rows"]:
+            try:
+                ts_iso = _ts_to_iso(str(row["timestamp"]))
+                value = _coerce_value(row["value"])
+            except Exception:  # noqa: BLE001
+                value = None
+            if value is None:
+                self.report.rows_skipped += 1
+                continue
+            status = row.get("status")
+            out.append((station, history_id, ts_iso, value, None if status is None else str(status)))
+        return out
+
+    def ndjson_chunks(self, lines: Iterable[str]) -> Iterator[List[Row]]:
+        rows: List[Row] = []
+        for lineno, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line:
+                continue
+            self.report.records += 1
+            try:
+                rows.extend(self._frame_rows(json.loads(line)))
+            except Exception as e:  # noqa: BLE001
+                self.report._error(f"line {lineno}: {e}")
+                continue
+            if len(rows) >= self.chunk_rows:
+                yield self._finish_chunk(rows)
+                rows = []
+        if rows:
+            yield self._finish_chunk(rows)
+
+    # ---- CSV -------------------------------------------------------------
+
+    def csv_chunks(self, lines: Iterable[str]) -> Iterator[List[Row]]:
+        reader = csv.reader(lines)
+        header = next(reader, None)
+        if header is None:
+            return
+        col = {name.strip(): i for i, name in enumerate(header)}
+        missing = [c for c in ("stationName", "historyId", "timestamp", "value") if c not in col]
+        if missing:
+            raise ValueError(f"CSV header missing required columns: {missing}")
+
+        i_station, i_hist = col["stationName"], col["historyId"]
+        i_ts, i_val = col["timestamp"], col["value"]
+        i_status = col.get("status")
+        meta_cols = [
+            (field, col[name])
+            for field, name in (
+                ("equipment", "equipment"),
+                ("floor", "floor"),
+                ("point_name", "point"),
+                ("unit", "unit"),
+            )
+            if name in col
+        ]
+        rows: List[Row] = []
+        for rec in reader:
+            if not rec:
+                continue
+            self.report.records += 1
+            try:
+                station, history_id = rec[i_station], rec[i_hist]
+                ts_iso = _ts_to_iso(rec[i_ts])
+                value = _coerce_value(rec[i_val])
+            except Exception:  # noqa: BLE001
+                value = None
+            if value is None:
+                self.report.rows_skipped += 1
+                continue
+            status = rec[i_status] if i_status is not None and rec[i_status] != "" else None
+            rows.append((station, history_id, ts_iso, value, status))
+
+            key = (station, history_id)
+            if key not in self.series:
+                self.series.add(key)
+                if meta_cols:
+                    self._note_meta(key, **{f: (rec[i] or None) for f, i in meta_cols})
+
+            if len(rows) >= self.chunk_rows:
+                yield self._finish_chunk(rows)
+                rows = []
+        if rows:
+            yield self._finish_chunk(rows)
+
+
+def import_stream(
+    lines: Iterable[str],
+    fmt: str,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> ImportReport:
+    """
+    Import NDJSON or CSV text lines into the SQLite store (sqlite_store.init
+    must have been called). Returns an ImportReport.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format {fmt!r}; expected one of {IMPORT_FORMATS}")
+
+    importer = _Importer(fmt, chunk_rows)
+    chunks = importer.ndjson_chunks(lines) if fmt == "ndjson" else importer.csv_chunks(lines)
+
+    t0 = time.perf_counter()
+    sqlite_store.bulk_load(chunks)
+    for (station, history_id), meta in importer.meta.items():
+        sqlite_store.update_series_meta(
+            (station, history_id),
+            meta.get("equipment"),
+            meta.get("floor"),
+            meta.get("point_name"),
+            meta.get("unit"),
+            meta.get("tags"),
+        )
+    report = importer.report
+    report.seconds = time.perf_counter() - t0
+    report.series = len(importer.series)
+    return report
+
+
+def _open_text(path: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def guess_format(name: str) -> str:
+    """'csv' for *.csv[.gz], otherwise 'ndjson'."""
+    base = name[:-3] if name.endswith(".gz") else name
+    return "csv" if base.lower().endswith(".csv") else "ndjson"
+
+
+def _server_resets(config_path: str, db_path: str) -> bool:
+    """
+    True when the server config at config_path uses db_path and drops it on
+    start. Read without load_config(), which prompts for MQTT overrides.
+    """
+    path = Path(config_path)
+    if not path.exists():
+        return False
+    with path.open("r", encoding="utf-8") as f:
+        cfg = AppConfig.model_validate(yaml.safe_load(f) or {})
+    same_db = os.path.realpath(cfg.db_path) == os.path.realpath(db_path)
+    return same_db and cfg.db_reset_on_start
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk-import history (NDJSON frames or CSV) into SQLite.")
+    parser.add_argument("paths", nargs="+", help="input files (.gz allowed)")
+    parser.add_argument("--db", default="data/history.sqlite")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default=None,
+                        help="input format; guessed from the file extension by default")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--retention-hours", type=int, default=0,
+                        help="only used to report rows the server would prune (0 = keep all)")
+    parser.add_argument("--config", default="config/config.yaml",
+                        help="server config, checked for db_reset_on_start")
+    parser.add_argument("--force", action="store_true",
+                        help="import even if the server would reset this database on start")
+    args = parser.parse_args(argv)
+
+    if _server_resets(args.config, args.db) and not args.force:
+        parser.error(
+            f"{args.config} has db_reset_on_start: true for {args.db}, so the server "
+            f"would drop this import on its next start; set db_reset_on_start: false "
+            f"(or pass --force)"
+        )
+
+    sqlite_store.init(args.db, retention_hours=args.retention_hours, reset=False)
+    for path in args.paths:
+        fmt = args.format or guess_format(path)
+        with _open_text(path) as f:
+            report = import_stream(f, fmt, chunk_rows=args.chunk_rows)
+        print(f"[import] {path}")
+        for key, val in asdict(report).items():
+            print(f"{key:>24}: {val}")
+        print(f"{'rows_per_minute':>24}: {report.rows_per_minute:,.0f}")
+
+
+if __name__ == "__main__":
+    _main()
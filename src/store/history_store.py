@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import threading
 from collections import defaultdict
 from dataclasses import asdict
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 
-from ..niagara_client.mqtt_history_ingest import HistorySample, niagara_canonical_name
+from ..niagara_client.mqtt_history_ingest import (
+    HistoryColumns,
+    HistorySample,
+    niagara_canonical_name,
+)
 
 # Max samples to keep per (station, history_id)
 _MAX_PER_SERIES = 1000
@@ -13,10 +18,15 @@ _MAX_PER_SERIES = 1000
 # Key: (station_name, history_id) -> { timestamp -> HistorySample }
 _store: Dict[Tuple[str, str], Dict[datetime, HistorySample]] = defaultdict(dict)
 
+# Ingest may write from several threads (asyncio decode executor, pool
+# writer, Haystack syncer) while API handlers read; guards _store.
+_lock = threading.RLock()
+
 
 def clear() -> None:
     """Clear all stored history samples (mainly for tests)."""
-    _store.clear()
+    with _lock:
+        _store.clear()
 
 
 def add_batch(samples: List[HistorySample]) -> None:
@@ -31,25 +41,39 @@ def add_batch(samples: List[HistorySample]) -> None:
 
     # Track which series we touched so we can trim them once per batch.
     touched: set[Tuple[str, str]] = set()
-
-    for s in samples:
-        key = (
-            niagara_canonical_name(s.station_name),
-            niagara_canonical_name(s.history_id),
-        )
-        series = _store[key]
-        series[s.timestamp] = s
-        touched.add(key)
-
-    # Enforce per-series cap.
-    for key in touched:
-        series = _store[key]
-        if len(series) > _MAX_PER_SERIES:
-            # Sort timestamps ascending and drop the oldest ones.
-            timestamps = sorted(series.keys())
-            to_drop = timestamps[:-_MAX_PER_SERIES]
-            for ts in to_drop:
-                del series[ts]
+    # Canonical names once per series, not per sample
+    keys: Dict[Tuple[str, str], Tuple[str, str]] = {}
+
+    with _lock:
+        for s in samples:
+            raw = (s.station_name, s.history_id)
+            key = keys.get(raw)
+            if key is None:
+                key = keys[raw] = (
+                    niagara_canonical_name(s.station_name),
+                    niagara_canonical_name(s.history_id),
+                )
+            series = _store[key]
+            series[s.timestamp] = s
+            touched.add(key)
+
+        # Enforce per-series cap.
+        for key in touched:
+            series = _store[key]
+            if len(series) > _MAX_PER_SERIES:
+                # Sort timestamps ascending and drop the oldest ones.
+                timestamps = sorted(series.keys())
+                to_drop = timestamps[:-_MAX_PER_SERIES]
+                for ts in to_drop:
+                    del series[ts]
+
+
+def add_columns(block: HistoryColumns) -> None:
+    """Add a columnar block; only rows that can survive the per-series cap
+    are materialised as HistorySample objects."""
+    if not len(block):
+        return
+    add_batch(block.slice(max(0, len(block) - _MAX_PER_SERIES)).to_samples())
 
 
 def _sample_to_json(sample: HistorySample) -> dict:
@@ -87,19 +111,20 @@ def get_recent(
         niagara_canonical_name(history_id) if history_id is not None else None
     )
 
-    for (st_name, hist_id), series in _store.items():
-        if station_key is not None and st_name != station_key:
-            continue
-        if history_key is not None and hist_id != history_key:
-            continue
+    with _lock:
+        for (st_name, hist_id), series in _store.items():
+            if station_key is not None and st_name != station_key:
+                continue
+            if history_key is not None and hist_id != history_key:
+                continue
 
-        timestamps = sorted(series.keys())
-        if limit <= 0:
-            chosen_ts = timestamps
-        else:
-            chosen_ts = timestamps[-limit:]
+            timestamps = sorted(series.keys())
+            if limit <= 0:
+                chosen_ts = timestamps
+            else:
+                chosen_ts = timestamps[-limit:]
 
-        results.extend(series[ts] for ts in chosen_ts)
+            results.extend(series[ts] for ts in chosen_ts)
 
     # Global sort across all matching series (just in case)
     results.sort(key=lambda s: s.timestamp)
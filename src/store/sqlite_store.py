@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+import json
 import sqlite3
+import threading
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
-from ..niagara_client.mqtt_history_ingest import HistorySample
+from ..niagara_client.mqtt_history_ingest import (
+    HistoryColumns,
+    HistorySample,
+    epoch_ms_to_datetime,
+)
 
 
 # Path to DB and retention policy (configured via init)
@@ -14,10 +21,51 @@ _retention_hours: int = 24
 # Shared connection (simple pattern for this edge app)
 _conn: Optional[sqlite3.Connection] = None
 
+# Serialises access to the shared connection: MQTT ingest (paho thread or
+# executor workers) and FastAPI's threadpool handlers all use _conn.
+_lock = threading.RLock()
+
 # In-memory series metadata keyed by (station_name, history_id)
-# This is where we attach equipment / floor / point_name / unit / tags
+# This is where we attach equipment / floor / point_name / unit / tags;
+# mirrored to the series_meta table so it survives restarts.
 _series_meta: Dict[Tuple[str, str], Dict[str, Any]] = {}
 
+# Per-series high-watermark (latest committed ts_utc), mirrored from the
+# series_watermarks table so ingest can check it without a query.
+_watermarks: Dict[Tuple[str, str], str] = {}
+
+# Newest ts_utc of any stored sample per series, i.e. the series that
+# currently have rows in history_samples (pruning removes entries whose
+# newest sample fell out of retention).
+_series_latest: Dict[Tuple[str, str], str] = {}
+
+# Called with the (station, history_id) keys whose presence or metadata
+# changed; used to maintain derived indexes (zone_pairs.ZoneIndex).
+SeriesListener = Callable[[Set[Tuple[str, str]]], None]
+_series_listeners: List[SeriesListener] = []
+
+# Called after a committed write with (station, history_id) -> (oldest,
+# newest) ts_utc written for every series that received samples; used to
+# invalidate or update derived results (result_cache, zone_aggregates).
+SampleListener = Callable[[Dict[Tuple[str, str], Tuple[str, str]]], None]
+_sample_listeners: List[SampleListener] = []
+
+# Bumped by every init() so derived in-memory caches (series_roles) know
+# to reload from the new database.
+_generation: int = 0
+
+
+# Dropped and rebuilt around large bulk_load()s, so kept in one place
+_HISTORY_INDEX_DDL = """
+    CREATE INDEX IF NOT EXISTS idx_history_samples_station_hist_ts
+    ON history_samples (station, history_id, ts_utc);
+"""
+
+# bulk_load() drops the history index once the rows it has inserted exceed
+# this fraction of the rows already in the table: rebuilding costs a sort
+# of the whole table, so smaller imports insert into the index instead.
+_BULK_REINDEX_FRACTION = 0.25
+
 
 def _get_conn() -> sqlite3.Connection:
     global _conn
@@ -30,21 +78,29 @@ def _get_conn() -> sqlite3.Connection:
     return _conn
 
 
-def _init_schema() -> None:
+def _init_schema(reset: bool = True) -> None:
     """
-    Create the history_samples table and indexes.
+    Create the history_samples / series_watermarks / series_meta /
+    series_roles / live_values tables and indexes.
 
-    NOTE: This drops any existing history_samples table to avoid
-    schema-mismatch issues while we iterate on the design.
+    NOTE: With reset=True (the default) this drops any existing tables to
+    avoid schema-mismatch issues while we iterate on the design. Pass
+    reset=False to keep history across restarts (needed for resuming MQTT
+    ingest from the persisted watermarks).
     """
     conn = _get_conn()
 
-    # Blow away any legacy schema; this is an edge cache, so we can repopulate.
-    conn.execute("DROP TABLE IF EXISTS history_samples;")
+    if reset:
+        # Blow away any legacy schema; this is an edge cache, so we can repopulate.
+        conn.execute("DROP TABLE IF EXISTS history_samples;")
+        conn.execute("DROP TABLE IF EXISTS series_watermarks;")
+        conn.execute("DROP TABLE IF EXISTS series_meta;")
+        conn.execute("DROP TABLE IF EXISTS series_roles;")
+        conn.execute("DROP TABLE IF EXISTS live_values;")
 
     conn.execute(
         """
-        CREATE TABLE history_samples (
+        CREATE TABLE IF NOT EXISTS history_samples (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             station TEXT NOT NULL,
             history_id TEXT NOT NULL,
@@ -54,27 +110,104 @@ def _init_schema() -> None:
         );
         """
     )
+    conn.execute(_HISTORY_INDEX_DDL)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS series_watermarks (
+            station TEXT NOT NULL,
+            history_id TEXT NOT NULL,
+            ts_utc TEXT NOT NULL,   -- latest committed sample, ISO 8601 UTC
+            PRIMARY KEY (station, history_id)
+        );
+        """
+    )
     conn.execute(
         """
-        CREATE INDEX idx_history_samples_station_hist_ts
-        ON history_samples (station, history_id, ts_utc);
+        CREATE TABLE IF NOT EXISTS series_meta (
+            station TEXT NOT NULL,
+            history_id TEXT NOT NULL,
+            meta TEXT NOT NULL,     -- JSON: equipment, floor, point_name, unit, tags
+            PRIMARY KEY (station, history_id)
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS series_roles (
+            station TEXT NOT NULL,
+            history_id TEXT NOT NULL,
+            label TEXT NOT NULL,    -- lowercased label the role was inferred from
+            tags TEXT NOT NULL,     -- sorted lowercased tags, JSON list
+            role TEXT,              -- NULL: no rule matched
+            rules_fp TEXT NOT NULL, -- role_rules fingerprint at inference time
+            PRIMARY KEY (station, history_id)
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS live_values (
+            station TEXT NOT NULL,
+            history_id TEXT NOT NULL,
+            ts_utc TEXT NOT NULL,   -- when the value was observed, ISO 8601 UTC
+            value REAL NOT NULL,
+            status TEXT,
+            PRIMARY KEY (station, history_id)
+        );
         """
     )
 
 
-def init(db_path: str, retention_hours: int) -> None:
+def init(db_path: str, retention_hours: int, reset: bool = True) -> None:
     """
     Initialise the SQLite store.
 
     - db_path: filesystem path to SQLite file.
     - retention_hours: how long to retain data before pruning.
+    - reset: drop existing tables first (see _init_schema).
     """
-    global _db_path, _retention_hours, _conn, _series_meta
+    global _db_path, _retention_hours, _conn, _series_meta, _watermarks, _generation
+    global _series_latest
+    _generation += 1
     _db_path = db_path
     _retention_hours = int(retention_hours)
     _conn = None  # force reconnect with new path
+    _init_schema(reset=reset)
+    _series_meta = {
+        (station, history_id): json.loads(meta)
+        for station, history_id, meta in _get_conn().execute(
+            "SELECT station, history_id, meta FROM series_meta;"
+        )
+    }
+    _watermarks = {
+        (station, history_id): ts_utc
+        for station, history_id, ts_utc in _get_conn().execute(
+            "SELECT station, history_id, ts_utc FROM series_watermarks;"
+        )
+    }
+    _series_latest = {
+        (station, history_id): ts_utc
+        for station, history_id, ts_utc in _get_conn().execute(
+            "SELECT station, history_id, MAX(ts_utc) FROM history_samples GROUP BY station, history_id;"
+        )
+    }
+
+
+def init_readonly(db_path: str) -> None:
+    """
+    Open an existing store read-only, e.g. in an analytics worker process.
+    No schema changes, pruning or watermark loading; writes will fail.
+    """
+    global _db_path, _conn, _series_meta, _generation
+    _generation += 1
+    _db_path = db_path
     _series_meta = {}
-    _init_schema()
+    _conn = sqlite3.connect(
+        Path(db_path).resolve().as_uri() + "?mode=ro",
+        uri=True,
+        isolation_level=None,
+        check_same_thread=False,
+    )
 
 
 def _to_utc_iso(ts: datetime) -> str:
@@ -104,20 +237,136 @@ def _prune_old_rows() -> None:
         "DELETE FROM history_samples WHERE ts_utc < ?;",
         (cutoff_iso,),
     )
+    gone = {key for key, ts_iso in _series_latest.items() if ts_iso < cutoff_iso}
+    for key in gone:
+        del _series_latest[key]
+    _notify_series(gone)
+
+
+def _merge_series_meta(
+    key: Tuple[str, str],
+    equipment: Optional[str],
+    floor: Optional[str],
+    point_name: Optional[str],
+    unit: Optional[str],
+    tags: Optional[List[str]],
+) -> bool:
+    meta = _series_meta.get(key)
+    if meta is None:
+        meta = _series_meta[key] = {}
+    changed = False
+    # Only overwrite fields when new non-None values arrive
+    for field, value in (
+        ("equipment", equipment),
+        ("floor", floor),
+        ("point_name", point_name),
+        ("unit", unit),
+    ):
+        if value is not None and meta.get(field) != value:
+            meta[field] = value
+            changed = True
+    if tags is not None and meta.get("tags") != list(tags):
+        meta["tags"] = list(tags)
+        changed = True
+    return changed
+
+
+def _notify_series(keys: Set[Tuple[str, str]]) -> None:
+    if not keys:
+        return
+    for listener in list(_series_listeners):
+        try:
+            listener(keys)
+        except Exception as e:  # noqa: BLE001
+            print(f"[sqlite_store] Series listener failed: {e}")
+
+
+def _notify_samples(spans: Dict[Tuple[str, str], Tuple[str, str]]) -> None:
+    if not spans:
+        return
+    for listener in list(_sample_listeners):
+        try:
+            listener(spans)
+        except Exception as e:  # noqa: BLE001
+            print(f"[sqlite_store] Sample listener failed: {e}")
+
+
+def add_series_listener(listener: SeriesListener) -> None:
+    """Register a callback for series added, pruned or with changed metadata."""
+    if listener not in _series_listeners:
+        _series_listeners.append(listener)
+
+
+def remove_series_listener(listener: SeriesListener) -> None:
+    if listener in _series_listeners:
+        _series_listeners.remove(listener)
+
+
+def add_sample_listener(listener: SampleListener) -> None:
+    """Register a callback for series that received new samples."""
+    if listener not in _sample_listeners:
+        _sample_listeners.append(listener)
+
+
+def remove_sample_listener(listener: SampleListener) -> None:
+    if listener in _sample_listeners:
+        _sample_listeners.remove(listener)
+
+
+def series_keys() -> List[Tuple[str, str]]:
+    """(station, history_id) of every series with stored samples, unordered."""
+    return list(_series_latest)
+
+
+def has_series(key: Tuple[str, str]) -> bool:
+    return key in _series_latest
+
+
+def get_series_meta(key: Tuple[str, str]) -> Dict[str, Any]:
+    """Copy of the known metadata for one series (may be empty)."""
+    return dict(_series_meta.get(key) or {})
+
+
+def update_series_meta(
+    key: Tuple[str, str],
+    equipment: Optional[str],
+    floor: Optional[str],
+    point_name: Optional[str],
+    unit: Optional[str],
+    tags: Optional[List[str]],
+) -> None:
+    """Merge known metadata for a (station, history_id) into the series catalog."""
+    with _lock:
+        if not _merge_series_meta(key, equipment, floor, point_name, unit, tags):
+            return
+        _save_series_meta(_get_conn(), {key})
+    _notify_series({key})
+
+
+def _save_series_meta(conn: sqlite3.Connection, keys: Iterable[Tuple[str, str]]) -> None:
+    """Upsert the catalog entries of ``keys`` (lock held)."""
+    conn.executemany(
+        """
+        INSERT INTO series_meta (station, history_id, meta) VALUES (?, ?, ?)
+        ON CONFLICT(station, history_id) DO UPDATE SET meta = excluded.meta;
+        """,
+        [(station, history_id, json.dumps(_series_meta[(station, history_id)]))
+         for station, history_id in keys],
+    )
 
 
 def add_batch(samples: Iterable[HistorySample]) -> None:
     """
     Insert a batch of HistorySample into SQLite and update in-memory metadata.
 
-    Called from mqtt_history_ingest._on_mqtt_message.
+    Called from mqtt_history_ingest.store_history_samples.
     """
     samples = list(samples)
     if not samples:
         return
 
-    conn = _get_conn()
     rows: List[Tuple[str, str, str, float, Optional[str]]] = []
+    changed: Set[Tuple[str, str]] = set()
 
     for s in samples:
         ts_iso = _to_utc_iso(s.timestamp)
@@ -133,30 +382,301 @@ def add_batch(samples: Iterable[HistorySample]) -> None:
 
         # Update in-memory series metadata for this (station, history_id)
         key = (s.station_name, s.history_id)
-        meta = _series_meta.get(key) or {}
-        # Only overwrite fields when new non-None values arrive
-        if s.equipment is not None:
-            meta["equipment"] = s.equipment
-        if s.floor is not None:
-            meta["floor"] = s.floor
-        if s.point_name is not None:
-            meta["point_name"] = s.point_name
-        if s.unit is not None:
-            meta["unit"] = s.unit
-        if s.tags is not None:
-            meta["tags"] = list(s.tags)
-        _series_meta[key] = meta
+        if _merge_series_meta(key, s.equipment, s.floor, s.point_name, s.unit, s.tags):
+            changed.add(key)
+
+    # Newest timestamp per series in this batch
+    batch_max: Dict[Tuple[str, str], str] = {}
+    for station, history_id, ts_iso, _value, _status in rows:
+        key = (station, history_id)
+        if ts_iso > batch_max.get(key, ""):
+            batch_max[key] = ts_iso
 
+    _write_rows(rows, batch_max, changed)
+
+
+def add_columns(blocks: Iterable[HistoryColumns]) -> None:
+    """
+    Insert columnar history blocks. The value/status arrays are passed to
+    executemany as-is; only the epoch-ms timestamps are formatted.
+    """
+    rows: List[Tuple[str, str, str, float, Optional[str]]] = []
+    batch_max: Dict[Tuple[str, str], str] = {}
+    changed: Set[Tuple[str, str]] = set()
+
+    for block in blocks:
+        if not len(block):
+            continue
+        key = (block.station_name, block.history_id)
+        ts_isos = [epoch_ms_to_datetime(ms).isoformat() for ms in block.ts_ms]
+        n = len(ts_isos)
+        rows.extend(
+            zip([block.station_name] * n, [block.history_id] * n, ts_isos, block.values, block.status)
+        )
+        newest = max(ts_isos[0], ts_isos[-1])
+        if newest > batch_max.get(key, ""):
+            batch_max[key] = newest
+        if _merge_series_meta(
+            key, block.equipment, block.floor, block.point_name, block.unit, block.tags
+        ):
+            changed.add(key)
+
+    if rows:
+        _write_rows(rows, batch_max, changed)
+
+
+def _write_rows(
+    rows: List[Tuple[str, str, str, float, Optional[str]]],
+    batch_max: Dict[Tuple[str, str], str],
+    changed: Set[Tuple[str, str]],
+) -> None:
+    conn = _get_conn()
+    with _lock:
+        # One transaction: samples, their watermarks and the catalog
+        # entries whose metadata changed commit together.
+        conn.execute("BEGIN;")
+        try:
+            conn.executemany(
+                """
+                INSERT INTO history_samples (
+                    station, history_id, ts_utc, value, status
+                ) VALUES (?, ?, ?, ?, ?);
+                """,
+                rows,
+            )
+            _advance_watermarks(conn, batch_max)
+            _save_series_meta(conn, changed)
+            conn.execute("COMMIT;")
+        except Exception:
+            conn.execute("ROLLBACK;")
+            raise
+
+        for key, ts_iso in batch_max.items():
+            if ts_iso > _watermarks.get(key, ""):
+                _watermarks[key] = ts_iso
+        written = _track_latest(rows, changed)
+
+        _prune_old_rows()
+        _notify_series(changed)
+        _notify_samples(written)
+
+
+def _track_latest(
+    rows: Iterable[Tuple[str, str, str, float, Optional[str]]],
+    changed: Set[Tuple[str, str]],
+) -> Dict[Tuple[str, str], Tuple[str, str]]:
+    """
+    Update _series_latest from inserted rows; new series are added to
+    ``changed``. Returns (oldest, newest) ts_utc written per series.
+    """
+    written: Dict[Tuple[str, str], Tuple[str, str]] = {}
+    for station, history_id, ts_iso, _value, _status in rows:
+        key = (station, history_id)
+        span = written.get(key)
+        if span is None:
+            written[key] = (ts_iso, ts_iso)
+        elif ts_iso < span[0]:
+            written[key] = (ts_iso, span[1])
+        elif ts_iso > span[1]:
+            written[key] = (span[0], ts_iso)
+        latest = _series_latest.get(key)
+        if latest is None:
+            changed.add(key)
+            _series_latest[key] = ts_iso
+        elif ts_iso > latest:
+            _series_latest[key] = ts_iso
+    return written
+
+
+def bulk_load(chunks: Iterable[List[Tuple[str, str, str, float, Optional[str]]]]) -> int:
+    """
+    Backfill path: insert pre-built (station, history_id, ts_utc, value,
+    status) row chunks in ONE transaction. Once the import grows past
+    _BULK_REINDEX_FRACTION of the existing table (immediately for an empty
+    one), the (station, history_id, ts_utc) index is dropped for the rest
+    of the load and rebuilt once at the end; smaller imports keep it.
+
+    ``chunks`` may be a generator that parses its input lazily; it is
+    consumed while the store lock is held, so live ingest and queries
+    wait for the import. Watermarks advance in the same transaction.
+    Retention pruning is NOT applied here. Returns rows inserted.
+    """
+    conn = _get_conn()
+    total = 0
+    batch_min: Dict[Tuple[str, str], str] = {}
+    batch_max: Dict[Tuple[str, str], str] = {}
+    changed: Set[Tuple[str, str]] = set()
+
+    with _lock:
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            # Row count estimate from the rowid range (two O(log n) lookups)
+            lo, hi = conn.execute(
+                "SELECT (SELECT MIN(id) FROM history_samples), (SELECT MAX(id) FROM history_samples);"
+            ).fetchone()
+            existing = hi - lo + 1 if hi is not None else 0
+            indexed = True
+            for rows in chunks:
+                if not rows:
+                    continue
+                if indexed and total + len(rows) > existing * _BULK_REINDEX_FRACTION:
+                    conn.execute("DROP INDEX IF EXISTS idx_history_samples_station_hist_ts;")
+                    indexed = False
+                conn.executemany(
+                    """
+                    INSERT INTO history_samples (
+                        station, history_id, ts_utc, value, status
+                    ) VALUES (?, ?, ?, ?, ?);
+                    """,
+                    rows,
+                )
+                total += len(rows)
+                for station, history_id, ts_iso, _value, _status in rows:
+                    key = (station, history_id)
+                    if ts_iso > batch_max.get(key, ""):
+                        batch_max[key] = ts_iso
+                    oldest = batch_min.get(key)
+                    if oldest is None or ts_iso < oldest:
+                        batch_min[key] = ts_iso
+            if not indexed:
+                conn.execute(_HISTORY_INDEX_DDL)
+            _advance_watermarks(conn, batch_max)
+            conn.execute("COMMIT;")
+        except BaseException:
+            # Rolls back the rows and any index drop together.
+            conn.execute("ROLLBACK;")
+            raise
+
+        for key, ts_iso in batch_max.items():
+            if ts_iso > _watermarks.get(key, ""):
+                _watermarks[key] = ts_iso
+            if key not in _series_latest:
+                changed.add(key)
+            if ts_iso > _series_latest.get(key, ""):
+                _series_latest[key] = ts_iso
+
+    _notify_series(changed)
+    _notify_samples({key: (batch_min[key], ts_iso) for key, ts_iso in batch_max.items()})
+    return total
+
+
+def _advance_watermarks(conn: sqlite3.Connection, batch_max: Dict[Tuple[str, str], str]) -> None:
+    """Move series_watermarks forward (never backwards) for the given series."""
     conn.executemany(
         """
-        INSERT INTO history_samples (
-            station, history_id, ts_utc, value, status
-        ) VALUES (?, ?, ?, ?, ?);
+        INSERT INTO series_watermarks (station, history_id, ts_utc)
+        VALUES (?, ?, ?)
+        ON CONFLICT (station, history_id) DO UPDATE
+            SET ts_utc = excluded.ts_utc
+            WHERE excluded.ts_utc > series_watermarks.ts_utc;
         """,
-        rows,
+        [(station, history_id, ts) for (station, history_id), ts in batch_max.items()],
     )
 
-    _prune_old_rows()
+
+def put_live_values(samples: Iterable[HistorySample]) -> None:
+    """
+    Upsert the latest observed value per (station, history_id) into
+    live_values (e.g. Haystack watch values). Kept apart from
+    history_samples so current-value polling never duplicates the
+    station's trended history; an older observation never replaces a
+    newer one.
+    """
+    rows = [
+        (s.station_name, s.history_id, _to_utc_iso(s.timestamp), float(s.value), s.status)
+        for s in samples
+    ]
+    if not rows:
+        return
+    conn = _get_conn()
+    with _lock:
+        conn.execute("BEGIN;")
+        try:
+            conn.executemany(
+                """
+                INSERT INTO live_values (station, history_id, ts_utc, value, status)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (station, history_id) DO UPDATE SET
+                    ts_utc = excluded.ts_utc,
+                    value = excluded.value,
+                    status = excluded.status
+                WHERE excluded.ts_utc >= live_values.ts_utc;
+                """,
+                rows,
+            )
+            conn.execute("COMMIT;")
+        except Exception:
+            conn.execute("ROLLBACK;")
+            raise
+
+
+def get_live_values(station: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Latest live value per series, optionally for one station."""
+    sql = "SELECT station, history_id, ts_utc, value, status FROM live_values"
+    params: Tuple[Any, ...] = ()
+    if station is not None:
+        sql += " WHERE station = ?"
+        params = (station,)
+    conn = _get_conn()
+    with _lock:
+        rows = conn.execute(sql + " ORDER BY station, history_id;", params).fetchall()
+    return [
+        {"stationName": st, "historyId": hid, "ts": ts, "value": float(value), "status": status}
+        for st, hid, ts, value, status in rows
+    ]
+
+
+def generation() -> int:
+    """Number of init() calls so far."""
+    return _generation
+
+
+def get_watermark(station: str, history_id: str) -> Optional[str]:
+    """
+    Latest committed ts_utc (ISO 8601 UTC string) for a series, or None.
+    """
+    return _watermarks.get((station, history_id))
+
+
+def get_watermarks() -> Dict[Tuple[str, str], str]:
+    """Snapshot of all per-series watermarks."""
+    return dict(_watermarks)
+
+
+def load_series_roles() -> List[Tuple[str, str, str, str, Optional[str], str]]:
+    """All persisted (station, history_id, label, tags_json, role, rules_fp) rows."""
+    conn = _get_conn()
+    with _lock:
+        return conn.execute(
+            "SELECT station, history_id, label, tags, role, rules_fp FROM series_roles;"
+        ).fetchall()
+
+
+def save_series_roles(rows: Iterable[Tuple[str, str, str, str, Optional[str], str]]) -> None:
+    """Upsert (station, history_id, label, tags_json, role, rules_fp) rows."""
+    rows = list(rows)
+    if not rows:
+        return
+    conn = _get_conn()
+    with _lock:
+        conn.execute("BEGIN;")
+        try:
+            conn.executemany(
+                """
+                INSERT INTO series_roles (station, history_id, label, tags, role, rules_fp)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(station, history_id) DO UPDATE SET
+                    label = excluded.label,
+                    tags = excluded.tags,
+                    role = excluded.role,
+                    rules_fp = excluded.rules_fp;
+                """,
+                rows,
+            )
+            conn.execute("COMMIT;")
+        except Exception:
+            conn.execute("ROLLBACK;")
+            raise
 
 
 def list_series(limit: int = 5000) -> List[Dict[str, Any]]:
@@ -176,16 +696,17 @@ def list_series(limit: int = 5000) -> List[Dict[str, Any]]:
         }
     """
     conn = _get_conn()
-    cur = conn.execute(
-        """
-        SELECT DISTINCT station, history_id
-        FROM history_samples
-        ORDER BY station, history_id
-        LIMIT ?;
-        """,
-        (limit,),
-    )
-    rows = cur.fetchall()
+    with _lock:
+        cur = conn.execute(
+            """
+            SELECT DISTINCT station, history_id
+            FROM history_samples
+            ORDER BY station, history_id
+            LIMIT ?;
+            """,
+            (limit,),
+        )
+        rows = cur.fetchall()
 
     series: List[Dict[str, Any]] = []
     for station, history_id in rows:
@@ -224,19 +745,20 @@ def query_series(
     start_iso = _to_utc_iso(start)
     end_iso = _to_utc_iso(end)
     conn = _get_conn()
-    cur = conn.execute(
-        """
-        SELECT station, history_id, ts_utc, value, status
-        FROM history_samples
-        WHERE station = ?
-          AND history_id = ?
-          AND ts_utc >= ?
-          AND ts_utc <= ?
-        ORDER BY ts_utc;
-        """,
-        (station, history_id, start_iso, end_iso),
-    )
-    rows = cur.fetchall()
+    with _lock:
+        cur = conn.execute(
+            """
+            SELECT station, history_id, ts_utc, value, status
+            FROM history_samples
+            WHERE station = ?
+              AND history_id = ?
+              AND ts_utc >= ?
+              AND ts_utc <= ?
+            ORDER BY ts_utc, id;
+            """,
+            (station, history_id, start_iso, end_iso),
+        )
+        rows = cur.fetchall()
 
     results: List[Dict[str, Any]] = []
     for station_val, hist_val, ts_utc, value, status in rows:
@@ -251,3 +773,39 @@ def query_series(
         )
 
     return results
+
+
+def query_series_many(
+    station: str,
+    history_ids: Iterable[str],
+    start: datetime,
+    end: datetime,
+) -> Dict[str, List[Tuple[str, float]]]:
+    """
+    Samples of several series of one station in [start, end] under one
+    lock: history_id -> [(ts_utc, value), ...] ordered by ts_utc, ties in
+    insertion order. Series without samples are omitted. Cheaper than
+    query_series() per series for bulk analytics (no per-row dicts, no
+    repeated station/id columns).
+    """
+    start_iso = _to_utc_iso(start)
+    end_iso = _to_utc_iso(end)
+    out: Dict[str, List[Tuple[str, float]]] = {}
+    conn = _get_conn()
+    with _lock:
+        for history_id in dict.fromkeys(history_ids):
+            rows = conn.execute(
+                """
+                SELECT ts_utc, value
+                FROM history_samples
+                WHERE station = ?
+                  AND history_id = ?
+                  AND ts_utc >= ?
+                  AND ts_utc <= ?
+                ORDER BY ts_utc, id;
+                """,
+                (station, history_id, start_iso, end_iso),
+            ).fetchall()
+            if rows:
+                out[history_id] = rows
+    return out